@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Command line sweep of the status of many pacemaker clusters from the controller.
+
+The clusters are read from a YAML or JSON file mapping each cluster name to its nodes and
+type, e.g.
+
+    hdb01:
+      type: hana
+      sid: HDB
+      instance_number: "00"
+      hosts: [hanadb1, hanadb2]
+    s4d:
+      type: scs
+      sid: S4D
+      hosts: [sapscs1, sapscs2]
+
+Run from the repository root with: python3 -m src.fleet_status clusters.yaml
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from src.module_utils.cluster_fleet import (
+    MAX_CONCURRENCY,
+    PROBE_TIMEOUT,
+    FleetStatusCollector,
+    SSHTransport,
+)
+from src.module_utils.enums import HanaSRProvider, OperatingSystemFamily
+from src.modules.get_cluster_status_db import HanaClusterStatusChecker
+from src.modules.get_cluster_status_scs import SCSClusterStatusChecker
+
+
+def create_checker_factory(clusters: Dict[str, Dict[str, Any]]) -> Callable[[str], Any]:
+    """
+    Create the factory of the cluster status checkers described in the clusters file.
+
+    :param clusters: Configuration by cluster name
+    :type clusters: Dict[str, Dict[str, Any]]
+    :return: Function creating the checker of a cluster from its name
+    :rtype: Callable[[str], BaseClusterStatusChecker]
+    """
+
+    def create_checker(cluster: str) -> Any:
+        """
+        Create the cluster status checker of a cluster.
+
+        :param cluster: Cluster name
+        :type cluster: str
+        :raises ValueError: If the type of the cluster is unknown
+        :return: Cluster status checker
+        :rtype: BaseClusterStatusChecker
+        """
+        config = clusters[cluster]
+        os_family = OperatingSystemFamily(str(config.get("os_family", "SUSE")).upper())
+        cluster_type = str(config.get("type", "hana")).lower()
+        if cluster_type == "hana":
+            return HanaClusterStatusChecker(
+                database_sid=str(config["sid"]).lower(),
+                db_instance_number=str(config.get("instance_number", "00")),
+                saphanasr_provider=HanaSRProvider(config.get("provider", "SAPHanaSR")),
+                ansible_os_family=os_family,
+            )
+        if cluster_type == "scs":
+            return SCSClusterStatusChecker(
+                sap_sid=str(config["sid"]),
+                ansible_os_family=os_family,
+                read_resource_ids=False,
+            )
+        raise ValueError(f"Unknown type {cluster_type} of cluster {cluster}")
+
+    return create_checker
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line interface of the fleet status sweep.
+
+    :param argv: Command line arguments, sys.argv if None
+    :type argv: Optional[List[str]]
+    :return: 0 if every cluster is stable, 1 otherwise
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Collect the status of many pacemaker clusters")
+    parser.add_argument("clusters_file", help="YAML or JSON file describing the clusters")
+    parser.add_argument("--user", help="Remote user, the SSH configuration decides if not set")
+    parser.add_argument(
+        "--ssh-option",
+        action="append",
+        default=[],
+        help="Additional ssh argument, e.g. --ssh-option=-i --ssh-option=key.pem",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=PROBE_TIMEOUT)
+    parser.add_argument("--no-become", action="store_true", help="Run crm_mon without sudo")
+    args = parser.parse_args(argv)
+
+    with open(args.clusters_file, "r", encoding="utf-8") as clusters_file:
+        clusters = yaml.safe_load(clusters_file) or {}
+
+    collector = FleetStatusCollector(
+        create_checker_factory(clusters),
+        SSHTransport(user=args.user, ssh_options=args.ssh_option),
+        max_concurrency=args.max_concurrency,
+        timeout=args.timeout,
+        become=not args.no_become,
+    )
+    summary = collector.run({name: config["hosts"] for name, config in clusters.items()})
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if summary["stable"] == len(clusters) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
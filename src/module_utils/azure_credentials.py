@@ -0,0 +1,164 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Shared Azure credentials with a persistent access token cache
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from azure.core.credentials import AccessToken
+from azure.identity import ManagedIdentityCredential
+
+TOKEN_REFRESH_MARGIN = 300
+
+_CREDENTIALS: Dict[Tuple[Optional[str], str], "CachedTokenCredential"] = {}
+_CREDENTIALS_LOCK = threading.Lock()
+
+
+class CachedTokenCredential:
+    """
+    Azure credential reusing access tokens until shortly before they expire.
+
+    Tokens are kept in memory. When a cache file is given, they are also kept in that file,
+    readable only by the current user, so module runs in separate processes share one token
+    instead of each fetching its own from the Instance Metadata Service.
+    """
+
+    def __init__(self, credential: Any, cache_key: str, cache_file: Optional[str]):
+        """
+        :param credential: Credential fetching the tokens (e.g. ManagedIdentityCredential)
+        :type credential: Any
+        :param cache_key: Identity of the credential in the cache file
+        :type cache_key: str
+        :param cache_file: Path of the cache file, tokens are only kept in memory if None
+        :type cache_file: Optional[str]
+        """
+        self.credential = credential
+        self.cache_key = cache_key
+        self.cache_file = os.path.expanduser(cache_file) if cache_file else None
+        self._tokens: Dict[str, AccessToken] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        """
+        Get an access token for the scopes, from the cache when it is still valid.
+
+        Requests carrying claims (e.g. a continuous access evaluation challenge) always
+        fetch a new token.
+
+        :param scopes: Scopes of the token
+        :type scopes: str
+        :param kwargs: Additional arguments of the underlying credential, e.g. claims or
+            tenant_id
+        :type kwargs: Any
+        :return: Access token
+        :rtype: AccessToken
+        """
+        if kwargs.get("claims"):
+            return self.credential.get_token(*scopes, **kwargs)
+        key = f"{self.cache_key} {' '.join(sorted(scopes))}"
+        with self._lock:
+            token = self._tokens.get(key) or self._read_cached_token(key)
+            if token is None or token.expires_on - TOKEN_REFRESH_MARGIN < time.time():
+                token = self.credential.get_token(*scopes, **kwargs)
+                self._write_cached_token(key, token)
+            self._tokens[key] = token
+            return token
+
+    def _read_cache(self) -> Dict[str, Any]:
+        """
+        Read the cache file.
+
+        :return: Cached tokens by key, or an empty dictionary if the file is not usable
+        :rtype: Dict[str, Any]
+        """
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as cache:
+                tokens = json.load(cache)
+        except (OSError, ValueError):
+            return {}
+        return tokens if isinstance(tokens, dict) else {}
+
+    def _read_cached_token(self, key: str) -> Optional[AccessToken]:
+        """
+        Get a token from the cache file.
+
+        :param key: Cache key of the token
+        :type key: str
+        :return: Cached token or None
+        :rtype: Optional[AccessToken]
+        """
+        entry = self._read_cache().get(key)
+        if not isinstance(entry, dict) or not entry.get("token"):
+            return None
+        return AccessToken(entry["token"], int(entry.get("expires_on", 0)))
+
+    def _write_cached_token(self, key: str, token: AccessToken) -> None:
+        """
+        Store a token in the cache file, dropping expired ones.
+
+        The file is created with mode 0600 and replaced atomically. Failing to write it
+        only disables the cache across processes.
+
+        :param key: Cache key of the token
+        :type key: str
+        :param token: Access token
+        :type token: AccessToken
+        """
+        if not self.cache_file:
+            return
+        now = time.time()
+        tokens = {
+            cached_key: entry
+            for cached_key, entry in self._read_cache().items()
+            if isinstance(entry, dict) and entry.get("expires_on", 0) > now
+        }
+        tokens[key] = {"token": token.token, "expires_on": token.expires_on}
+        temporary_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), mode=0o700, exist_ok=True)
+            descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "w", encoding="utf-8") as cache:
+                json.dump(tokens, cache)
+            os.replace(temporary_path, self.cache_file)
+        except OSError:
+            try:
+                os.unlink(temporary_path)
+            except OSError:
+                pass
+
+
+def get_credential(
+    msi_client_id: Optional[str] = None, cache_file: Optional[str] = None
+) -> CachedTokenCredential:
+    """
+    Get the managed identity credential shared by all Azure collectors of the process.
+
+    :param msi_client_id: Client ID of a user-assigned managed identity, the system-assigned
+        identity is used if not given
+    :type msi_client_id: Optional[str]
+    :param cache_file: Path of a token cache file shared by module runs, tokens are only
+        kept in memory if None
+    :type cache_file: Optional[str]
+    :return: Credential with a token cache
+    :rtype: CachedTokenCredential
+    """
+    key = (msi_client_id or None, cache_file or "")
+    with _CREDENTIALS_LOCK:
+        if key not in _CREDENTIALS:
+            credential = (
+                ManagedIdentityCredential(client_id=msi_client_id)
+                if msi_client_id
+                else ManagedIdentityCredential()
+            )
+            _CREDENTIALS[key] = CachedTokenCredential(
+                credential, f"managed-identity:{msi_client_id or 'system'}", cache_file
+            )
+        return _CREDENTIALS[key]
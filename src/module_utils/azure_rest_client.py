@@ -0,0 +1,142 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Minimal Azure Resource Manager REST client
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+RESOURCE_MANAGER_ENDPOINT = "https://management.azure.com"
+RESOURCE_GRAPH_API_VERSION = "2022-10-01"
+
+
+class AzureRestClient:
+    """
+    Calls the Azure Resource Manager REST API over one HTTP session with one access token.
+
+    List calls follow the nextLink of every page, so all resources of a scope are
+    fetched with one request per page instead of one request per resource.
+    """
+
+    def __init__(
+        self,
+        credential: Any,
+        endpoint: str = RESOURCE_MANAGER_ENDPOINT,
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+    ):
+        """
+        Initialize the client.
+
+        :param credential: Azure credential providing get_token (e.g. ManagedIdentityCredential)
+        :type credential: Any
+        :param endpoint: Resource Manager endpoint
+        :type endpoint: str
+        :param session: HTTP session to reuse, a new one is created if not given
+        :type session: Optional[requests.Session]
+        :param timeout: Timeout in seconds for each request
+        :type timeout: float
+        """
+        self.credential = credential
+        self.endpoint = endpoint.rstrip("/")
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self._token = None
+
+    def _get_headers(self) -> Dict[str, str]:
+        """
+        Get the request headers, refreshing the access token when it is about to expire.
+
+        :return: Request headers
+        :rtype: Dict[str, str]
+        """
+        if self._token is None or self._token.expires_on - 300 < time.time():
+            self._token = self.credential.get_token(f"{self.endpoint}/.default")
+        return {"Authorization": f"Bearer {self._token.token}"}
+
+    def request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send a request to Resource Manager and decode the JSON response.
+
+        :param method: HTTP method
+        :type method: str
+        :param url: Absolute URL, or a path relative to the endpoint
+        :type url: str
+        :param kwargs: Additional arguments of requests.Session.request, e.g. params or json
+        :type kwargs: Any
+        :return: Decoded response body
+        :rtype: Dict[str, Any]
+        :raises requests.HTTPError: If Resource Manager answers with an error status
+        """
+        if not url.startswith("http"):
+            url = f"{self.endpoint}{url}"
+        response = self.session.request(
+            method, url, headers=self._get_headers(), timeout=self.timeout, **kwargs
+        )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def get(self, path: str, api_version: str) -> Dict[str, Any]:
+        """
+        Get a single resource.
+
+        :param path: Resource path, e.g. "/subscriptions/<id>/resourceGroups/<name>"
+        :type path: str
+        :param api_version: API version of the resource provider
+        :type api_version: str
+        :return: Resource
+        :rtype: Dict[str, Any]
+        """
+        return self.request("GET", path, params={"api-version": api_version})
+
+    def list_all(self, path: str, api_version: str) -> List[Dict[str, Any]]:
+        """
+        List all resources of a collection, following the nextLink of every page.
+
+        :param path: Collection path
+        :type path: str
+        :param api_version: API version of the resource provider
+        :type api_version: str
+        :return: Resources of all pages
+        :rtype: List[Dict[str, Any]]
+        """
+        resources = []
+        page = self.request("GET", path, params={"api-version": api_version})
+        resources.extend(page.get("value", []))
+        while page.get("nextLink"):
+            page = self.request("GET", page["nextLink"])
+            resources.extend(page.get("value", []))
+        return resources
+
+    def query_resources(self, query: str, subscriptions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run an Azure Resource Graph query, following the skip token of every page.
+
+        :param query: Kusto query over the resources table
+        :type query: str
+        :param subscriptions: Subscription IDs the query is scoped to
+        :type subscriptions: List[str]
+        :return: Rows of all pages as objects
+        :rtype: List[Dict[str, Any]]
+        """
+        body = {
+            "subscriptions": subscriptions,
+            "query": query,
+            "options": {"resultFormat": "objectArray"},
+        }
+        rows = []
+        while True:
+            page = self.request(
+                "POST",
+                "/providers/Microsoft.ResourceGraph/resources",
+                params={"api-version": RESOURCE_GRAPH_API_VERSION},
+                json=body,
+            )
+            rows.extend(page.get("data", []))
+            if not page.get("$skipToken"):
+                return rows
+            body["options"] = dict(body["options"], **{"$skipToken": page["$skipToken"]})
@@ -0,0 +1,423 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Controller-side collection of the status of many pacemaker clusters in SAP Automation QA
+"""
+
+import asyncio
+import os
+import shlex
+import shutil
+import tempfile
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    from ansible.module_utils.get_cluster_status import (
+        parse_cluster_status,
+        summarize_cluster_status,
+    )
+    from ansible.module_utils.commands import CIB_ADMIN, CLUSTER_STATUS
+    from ansible.module_utils.enums import TestStatus
+except ImportError:
+    from src.module_utils.get_cluster_status import (
+        parse_cluster_status,
+        summarize_cluster_status,
+    )
+    from src.module_utils.commands import CIB_ADMIN, CLUSTER_STATUS
+    from src.module_utils.enums import TestStatus
+
+MAX_CONCURRENCY = 32
+PROBE_TIMEOUT = 30
+CHECKER_BASE_KEYS = (
+    "status",
+    "message",
+    "details",
+    "logs",
+    "changed",
+    "start",
+    "end",
+    "pacemaker_status",
+    "stonith_action",
+    "cluster_summary",
+)
+
+
+class SSHTransport:
+    """
+    Runs commands on remote hosts with the OpenSSH client.
+
+    Connections are shared through an OpenSSH control master per host, so every command
+    after the first one on a host reuses the established connection. close stops the
+    control masters and removes the socket directory it created.
+    """
+
+    def __init__(
+        self,
+        user: Optional[str] = None,
+        control_dir: Optional[str] = None,
+        connect_timeout: int = 10,
+        control_persist: int = 60,
+        ssh_options: Sequence[str] = (),
+    ):
+        """
+        :param user: Remote user, the SSH configuration decides if None
+        :type user: Optional[str]
+        :param control_dir: Directory of the control master sockets, a temporary directory
+            if None
+        :type control_dir: Optional[str]
+        :param connect_timeout: Seconds to wait for a new connection
+        :type connect_timeout: int
+        :param control_persist: Seconds a control master stays open after its last command
+        :type control_persist: int
+        :param ssh_options: Additional ssh command line arguments, e.g. ["-i", "key.pem"]
+        :type ssh_options: Sequence[str]
+        """
+        self.user = user
+        self.owns_control_dir = control_dir is None
+        self.control_dir = control_dir or tempfile.mkdtemp(prefix="sap-qa-ssh-")
+        self.connect_timeout = connect_timeout
+        self.control_persist = control_persist
+        self.ssh_options = list(ssh_options)
+        self.hosts: Set[str] = set()
+
+    async def __aenter__(self) -> "SSHTransport":
+        """
+        Use the transport as an async context manager.
+
+        :return: The transport
+        :rtype: SSHTransport
+        """
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """
+        Close the transport when leaving the context.
+
+        :param exc_info: Exception type, value and traceback, if any
+        :type exc_info: Any
+        """
+        await self.close()
+
+    def _build_options(self) -> List[str]:
+        """
+        Build the ssh options shared by all commands of the transport.
+
+        :return: ssh options
+        :rtype: List[str]
+        """
+        return [
+            "-o",
+            "BatchMode=yes",
+            "-o",
+            f"ConnectTimeout={self.connect_timeout}",
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            f"ControlPath={os.path.join(self.control_dir, '%C')}",
+            "-o",
+            f"ControlPersist={self.control_persist}",
+            *self.ssh_options,
+            *(["-l", self.user] if self.user else []),
+        ]
+
+    def build_command(self, host: str, command: List[str]) -> List[str]:
+        """
+        Build the ssh command line running a command on a host.
+
+        :param host: Host name or address
+        :type host: str
+        :param command: Command and its arguments
+        :type command: List[str]
+        :return: ssh command line
+        :rtype: List[str]
+        """
+        return [
+            "ssh",
+            *self._build_options(),
+            host,
+            "--",
+            " ".join(shlex.quote(argument) for argument in command),
+        ]
+
+    def build_exit_command(self, host: str) -> List[str]:
+        """
+        Build the ssh command line stopping the control master of a host.
+
+        :param host: Host name or address
+        :type host: str
+        :return: ssh command line
+        :rtype: List[str]
+        """
+        return ["ssh", *self._build_options(), "-O", "exit", host]
+
+    async def run(self, host: str, command: List[str], timeout: float) -> Tuple[int, str, str]:
+        """
+        Run a command on a host.
+
+        :param host: Host name or address
+        :type host: str
+        :param command: Command and its arguments
+        :type command: List[str]
+        :param timeout: Seconds to wait for the command
+        :type timeout: float
+        :raises asyncio.TimeoutError: If the command does not finish in time
+        :return: Return code, standard output and standard error
+        :rtype: Tuple[int, str, str]
+        """
+        self.hosts.add(host)
+        process = await asyncio.create_subprocess_exec(
+            *self.build_command(host, command),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return (
+            process.returncode,
+            stdout.decode("utf-8", "replace"),
+            stderr.decode("utf-8", "replace"),
+        )
+
+    async def _exit_control_master(self, host: str) -> None:
+        """
+        Stop the control master of a host, ignoring hosts without one.
+
+        :param host: Host name or address
+        :type host: str
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.build_exit_command(host),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await asyncio.wait_for(process.wait(), self.connect_timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+
+    async def close(self) -> None:
+        """
+        Stop the control masters of all hosts and remove the socket directory if the
+        transport created it.
+        """
+        hosts, self.hosts = self.hosts, set()
+        await asyncio.gather(*(self._exit_control_master(host) for host in hosts))
+        if self.owns_control_dir:
+            shutil.rmtree(self.control_dir, ignore_errors=True)
+
+
+class FleetStatusCollector:
+    """
+    Collects the status of many pacemaker clusters concurrently from the controller.
+
+    One node of each cluster is probed with crm_mon, trying the next node when one does not
+    answer. The output is parsed with the _process_node_attributes method of a cluster
+    status checker, e.g. HanaClusterStatusChecker with its HanaSRProvider attribute mapping,
+    so the fleet summary reports the same primary and secondary nodes as the modules.
+    Checkers with a set_resource_ids method, such as SCSClusterStatusChecker, also get the
+    resources section of the CIB read on the same node.
+    """
+
+    def __init__(
+        self,
+        checker_factory: Callable[[str], Any],
+        transport: Any = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        timeout: float = PROBE_TIMEOUT,
+        become: bool = True,
+    ):
+        """
+        :param checker_factory: Creates the cluster status checker of a cluster from its name
+        :type checker_factory: Callable[[str], BaseClusterStatusChecker]
+        :param transport: Object with an async run(host, command, timeout) method returning
+            the return code, standard output and standard error, SSHTransport if None
+        :type transport: Any
+        :param max_concurrency: Number of clusters probed at the same time
+        :type max_concurrency: int
+        :param timeout: Seconds to wait for the status of one node
+        :type timeout: float
+        :param become: Run crm_mon with sudo
+        :type become: bool
+        """
+        self.checker_factory = checker_factory
+        self.transport = transport or SSHTransport()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.command = (["sudo", "-n"] if become else []) + CLUSTER_STATUS
+        self.resources_command = (["sudo", "-n"] if become else []) + CIB_ADMIN("resources")
+
+    def parse_status(
+        self,
+        cluster: str,
+        host: str,
+        cluster_status: str,
+        checker: Any = None,
+        resources: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Parse the crm_mon output of a cluster with its cluster status checker.
+
+        :param cluster: Cluster name
+        :type cluster: str
+        :param host: Node the status was read on
+        :type host: str
+        :param cluster_status: Output of crm_mon --output-as=xml
+        :type cluster_status: str
+        :param checker: Cluster status checker, created with the factory if None
+        :type checker: Optional[BaseClusterStatusChecker]
+        :param resources: Output of cibadmin --query --scope resources read on the node, for
+            checkers with a set_resource_ids method
+        :type resources: Optional[str]
+        :return: Status of the cluster
+        :rtype: Dict[str, Any]
+        """
+        if checker is None:
+            checker = self.checker_factory(cluster)
+        if resources is not None:
+            checker.set_resource_ids(resources)
+        cluster_status_xml, checker.resources_by_id = parse_cluster_status(
+            cluster_status, checker._get_status_resource_ids()
+        )
+        checker._process_node_attributes(cluster_status_xml)
+        stable = checker._is_cluster_stable()
+        return {
+            "cluster": cluster,
+            "host": host,
+            "status": TestStatus.SUCCESS.value if stable else TestStatus.WARNING.value,
+            "stable": stable,
+            "state": {
+                key: value for key, value in checker.result.items() if key not in CHECKER_BASE_KEYS
+            },
+            "cluster_summary": summarize_cluster_status(cluster_status_xml),
+        }
+
+    async def probe_cluster(
+        self, cluster: str, hosts: Sequence[str], semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """
+        Get the status of a cluster from the first of its nodes that answers.
+
+        :param cluster: Cluster name
+        :type cluster: str
+        :param hosts: Nodes of the cluster
+        :type hosts: Sequence[str]
+        :param semaphore: Semaphore bounding the number of clusters probed at the same time
+        :type semaphore: asyncio.Semaphore
+        :return: Status of the cluster
+        :rtype: Dict[str, Any]
+        """
+        errors = []
+        async with semaphore:
+            for host in hosts:
+                checker = self.checker_factory(cluster)
+                commands = [self.command]
+                if hasattr(checker, "set_resource_ids"):
+                    commands.append(self.resources_command)
+                outputs = []
+                for command in commands:
+                    try:
+                        returncode, stdout, stderr = await self.transport.run(
+                            host, command, self.timeout
+                        )
+                    except asyncio.TimeoutError:
+                        errors.append(f"{host}: no answer within {self.timeout}s")
+                        break
+                    except OSError as ex:
+                        errors.append(f"{host}: {ex}")
+                        break
+                    if returncode != 0:
+                        errors.append(f"{host}: exit code {returncode}: {stderr.strip()}")
+                        break
+                    outputs.append(stdout)
+                if len(outputs) < len(commands):
+                    continue
+                try:
+                    return self.parse_status(
+                        cluster, host, outputs[0], checker, outputs[1] if len(outputs) > 1 else None
+                    )
+                except Exception as ex:
+                    errors.append(f"{host}: could not parse the cluster status: {ex}")
+        return {
+            "cluster": cluster,
+            "host": "",
+            "status": TestStatus.ERROR.value,
+            "stable": False,
+            "message": "; ".join(errors) or "No hosts",
+        }
+
+    async def iter_results(
+        self, clusters: Dict[str, Sequence[str]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Probe the clusters and yield their status as soon as each one is known.
+
+        :param clusters: Nodes by cluster name
+        :type clusters: Dict[str, Sequence[str]]
+        :return: Status of each cluster, in completion order
+        :rtype: AsyncIterator[Dict[str, Any]]
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.ensure_future(self.probe_cluster(cluster, hosts, semaphore))
+            for cluster, hosts in clusters.items()
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def collect(self, clusters: Dict[str, Sequence[str]]) -> Dict[str, Any]:
+        """
+        Probe the clusters and summarize their status.
+
+        :param clusters: Nodes by cluster name
+        :type clusters: Dict[str, Sequence[str]]
+        :return: Status by cluster and the number of clusters by status
+        :rtype: Dict[str, Any]
+        """
+        results = {}
+        async for result in self.iter_results(clusters):
+            results[result["cluster"]] = result
+        statuses = [result["status"] for result in results.values()]
+        return {
+            "clusters": {cluster: results[cluster] for cluster in clusters},
+            "stable": statuses.count(TestStatus.SUCCESS.value),
+            "unstable": statuses.count(TestStatus.WARNING.value),
+            "unreachable": statuses.count(TestStatus.ERROR.value),
+        }
+
+    async def _collect_and_close(self, clusters: Dict[str, Sequence[str]]) -> Dict[str, Any]:
+        """
+        Probe the clusters, then close the transport if it can be closed.
+
+        :param clusters: Nodes by cluster name
+        :type clusters: Dict[str, Sequence[str]]
+        :return: Status by cluster and the number of clusters by status
+        :rtype: Dict[str, Any]
+        """
+        try:
+            return await self.collect(clusters)
+        finally:
+            close = getattr(self.transport, "close", None)
+            if close is not None:
+                await close()
+
+    def run(self, clusters: Dict[str, Sequence[str]]) -> Dict[str, Any]:
+        """
+        Probe the clusters from synchronous code and close the transport afterwards.
+
+        :param clusters: Nodes by cluster name
+        :type clusters: Dict[str, Sequence[str]]
+        :return: Status by cluster and the number of clusters by status
+        :rtype: Dict[str, Any]
+        """
+        return asyncio.run(self._collect_and_close(clusters))
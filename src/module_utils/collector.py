@@ -4,19 +4,33 @@
 """
 Collectors for data collection in SAP Automation QA
 """
-import json
+
 from abc import ABC, abstractmethod
 import logging
 import re
 import shlex
-from typing import Any
+from typing import Any, Dict, List, Tuple
 
 try:
     from ansible.module_utils.sap_automation_qa import SapAutomationQA
     from ansible.module_utils.commands import DANGEROUS_COMMANDS
+    from ansible.module_utils.shell_session import ShellSessionError
+    from ansible.module_utils.storage_topology import StorageTopology
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA
     from src.module_utils.commands import DANGEROUS_COMMANDS
+    from src.module_utils.shell_session import ShellSessionError
+    from src.module_utils.storage_topology import StorageTopology
+
+STORAGE_CONTEXT_KEYS = (
+    "filesystems",
+    "azure_disks_metadata",
+    "anf_storage_metadata",
+    "afs_storage_metadata",
+    "imds_disks_metadata",
+    "database_sid",
+    "sap_sid",
+)
 
 
 class Collector(ABC):
@@ -92,6 +106,111 @@ class Collector(ABC):
 class CommandCollector(Collector):
     """Collects data by executing shell commands"""
 
+    DEFAULT_TIMEOUT = 100
+
+    def _get_timeout(self, check) -> float:
+        """
+        Get the timeout for the command of a check.
+
+        Uses the "timeout" collector argument (default 100 seconds), capped by the time
+        left in the run budget of the parent module when it has one.
+
+        :param check: Check object with collector arguments
+        :type check: Check
+        :return: Timeout in seconds
+        :rtype: float
+        """
+        timeout = check.collector_args.get("timeout", self.DEFAULT_TIMEOUT)
+        try:
+            timeout = float(timeout)
+            if timeout <= 0:
+                raise ValueError("timeout must be positive")
+        except (TypeError, ValueError):
+            self.parent.log(
+                logging.WARNING,
+                f"Invalid timeout {timeout} for check {check.id}, "
+                + f"using {self.DEFAULT_TIMEOUT} seconds",
+            )
+            timeout = float(self.DEFAULT_TIMEOUT)
+
+        get_remaining_time = getattr(self.parent, "get_remaining_time", None)
+        remaining = get_remaining_time() if callable(get_remaining_time) else None
+        if remaining is not None:
+            timeout = max(1.0, min(timeout, remaining))
+        return timeout
+
+    def _build_command(self, check, context) -> str:
+        """
+        Validate, substitute and wrap the command of a check so that it is ready to run.
+
+        :param check: Check object with collector arguments
+        :type check: Check
+        :param context: Context variables to substitute in the command
+        :type context: Dict[str, Any]
+        :return: The command to execute
+        :rtype: str
+        :raises ValueError: If the check has no command, an invalid user or an unsafe command
+        """
+        command, user = self._prepare_command(check, context)
+        return self._wrap_command(check, command, user)
+
+    def _wrap_command(self, check, command: str, user: str) -> str:
+        """
+        Wrap a prepared command so that it runs as the given user.
+
+        :param check: Check object the command belongs to
+        :type check: Check
+        :param command: Validated and substituted command
+        :type command: str
+        :param user: User to run the command as
+        :type user: str
+        :return: The command to execute
+        :rtype: str
+        """
+        if user and user != "root":
+            command = f"su - {user} -c {shlex.quote(command)}"
+            self.parent.log(logging.INFO, f"Executing command as user {user} {command}")
+
+        check.command = command
+        return command
+
+    def _prepare_command(self, check, context) -> Tuple[str, str]:
+        """
+        Validate and substitute the command of a check and resolve the user to run it as.
+
+        :param check: Check object with collector arguments
+        :type check: Check
+        :param context: Context variables to substitute in the command
+        :type context: Dict[str, Any]
+        :return: The command and the user to run it as
+        :rtype: Tuple[str, str]
+        :raises ValueError: If the check has no command, an invalid user or an unsafe command
+        """
+        command = check.collector_args.get("command", "")
+        user = check.collector_args.get("user", "")
+        if not command:
+            raise ValueError("ERROR: No command specified")
+        if user:
+            if not re.match(r"^[a-zA-Z0-9_-]+$", user):
+                self.parent.log(logging.ERROR, f"Invalid user parameter detected: {user}")
+                raise ValueError("ERROR: Invalid user parameter")
+
+        try:
+            command = self.sanitize_command(command)
+        except ValueError as e:
+            self.parent.log(logging.ERROR, f"Command sanitization failed: {e}")
+            raise ValueError(f"ERROR: Command sanitization failed: {e}") from e
+        command = self.substitute_context_vars(command, context)
+        try:
+            command = self.sanitize_command(command)
+        except ValueError as e:
+            self.parent.log(logging.ERROR, f"Command sanitization failed after substitution: {e}")
+            raise ValueError(f"ERROR: Command sanitization failed after substitution: {e}") from e
+
+        if user == "db2sid":
+            user = f"db2{context.get('database_sid', '').lower()}"
+        return command, user
+
     def collect(self, check, context) -> str:
         """
         Execute a command and return the output.
@@ -104,44 +223,91 @@ class CommandCollector(Collector):
         :rtype: str
         """
         try:
-            command = check.collector_args.get("command", "")
-            user = check.collector_args.get("user", "")
-            if not command:
-                return "ERROR: No command specified"
-            if user:
-                if not re.match(r"^[a-zA-Z0-9_-]+$", user):
-                    self.parent.log(logging.ERROR, f"Invalid user parameter detected: {user}")
-                    return "ERROR: Invalid user parameter"
-
             try:
-                command = self.sanitize_command(command)
+                user_command, user = self._prepare_command(check, context)
             except ValueError as e:
-                self.parent.log(logging.ERROR, f"Command sanitization failed: {e}")
-                return f"ERROR: Command sanitization failed: {e}"
-            command = self.substitute_context_vars(command, context)
-            try:
-                command = self.sanitize_command(command)
-            except ValueError as e:
-                self.parent.log(
-                    logging.ERROR, f"Command sanitization failed after substitution: {e}"
-                )
-                return f"ERROR: Command sanitization failed after substitution: {e}"
+                return str(e)
+            command = self._wrap_command(check, user_command, user)
 
-            if user and user != "root":
-                if user == "db2sid":
-                    user = f"db2{context.get('database_sid', '').lower()}"
-                command = f"su - {user} -c {shlex.quote(command)}"
-                self.parent.log(logging.INFO, f"Executing command as user {user} {command}")
-
-            check.command = command
+            if self._uses_session(check):
+                try:
+                    return self.parent.session_pool.execute(
+                        user, user_command, timeout=self._get_timeout(check)
+                    ).strip()
+                except ShellSessionError as e:
+                    self.parent.log(logging.WARNING, f"{e}, falling back to a separate login shell")
 
             return self.parent.execute_command_subprocess(
-                command, shell_command=check.collector_args.get("shell", True)
+                command,
+                shell_command=check.collector_args.get("shell", True),
+                timeout=self._get_timeout(check),
             ).strip()
         except Exception as ex:
             self.parent.handle_error(ex)
             return f"ERROR: Command execution failed: {str(ex)}"
 
+    def _uses_session(self, check) -> bool:
+        """
+        Check whether the command of a check runs in a persistent session of its user.
+
+        :param check: Check object with collector arguments
+        :type check: Check
+        :return: True if the parent module has a session pool and the check runs as a
+            non-root user in a shell
+        :rtype: bool
+        """
+        user = check.collector_args.get("user", "")
+        return (
+            getattr(self.parent, "session_pool", None) is not None
+            and user not in ("", "root")
+            and check.collector_args.get("shell", True)
+        )
+
+    def collect_many(self, checks, context, max_concurrency: int = 4) -> List[str]:
+        """
+        Execute the commands of several independent checks concurrently.
+
+        Checks whose command cannot be built get their error message as output, and
+        checks that opt out of shell execution or run in a persistent user session are
+        run one by one through collect.
+
+        :param checks: Checks to collect data for
+        :type checks: List[Check]
+        :param context: Context variables to substitute in the commands
+        :type context: Dict[str, Any]
+        :param max_concurrency: Maximum number of commands running at the same time
+        :type max_concurrency: int
+        :return: The outputs of the commands, in the same order as the checks
+        :rtype: List[str]
+        """
+        outputs = [""] * len(checks)
+        batch_indexes, batch_commands, batch_timeouts = [], [], []
+        for index, check in enumerate(checks):
+            if not check.collector_args.get("shell", True) or self._uses_session(check):
+                outputs[index] = self.collect(check, context)
+                continue
+            try:
+                batch_commands.append(self._build_command(check, context))
+                batch_timeouts.append(self._get_timeout(check))
+                batch_indexes.append(index)
+            except ValueError as e:
+                outputs[index] = str(e)
+
+        try:
+            results = self.parent.execute_many(
+                batch_commands,
+                shell_command=True,
+                timeout=batch_timeouts,
+                max_concurrency=max_concurrency,
+            )
+            for index, output in zip(batch_indexes, results):
+                outputs[index] = output.strip()
+        except Exception as ex:
+            self.parent.handle_error(ex)
+            for index in batch_indexes:
+                outputs[index] = f"ERROR: Command execution failed: {str(ex)}"
+        return outputs
+
 
 class AzureDataParser(Collector):
     """
@@ -151,6 +317,84 @@ class AzureDataParser(Collector):
     def __init__(self, parent: SapAutomationQA):
         super().__init__(parent)
 
+    def _get_topology(self, context) -> StorageTopology:
+        """
+        Get the storage topology built by the filesystem collector for this run.
+
+        Falls back to building one from the context when the run has none, e.g. for check
+        types that do not collect filesystem data.
+
+        :param context: Context object containing all required data
+        :type context: Dict[str, Any]
+        :return: Storage topology
+        :rtype: StorageTopology
+        """
+        topology = getattr(self.parent, "storage_topology", None)
+        if topology is None:
+            cache = self._get_cache(context)
+            if cache["topology"] is None:
+                cache["topology"] = StorageTopology.from_context(context, self.parent.log)
+            topology = cache["topology"]
+        return topology
+
+    def _get_cache(self, context) -> Dict[str, Any]:
+        """
+        Get the lookup cache of the run, starting a new one when the storage context changed.
+
+        The cache holds the topology decoded from the context and the values resolved per
+        (resource type, mount point, property). It lives on the parent module so that it
+        outlives the parser created for a single check. Replacing or resizing any storage
+        value of the context, or the run topology, invalidates it.
+
+        :param context: Context object containing all required data
+        :type context: Dict[str, Any]
+        :return: Cache with the sources it was built from, the topology and resolved values
+        :rtype: Dict[str, Any]
+        """
+        sources = [getattr(self.parent, "storage_topology", None)] + [
+            context.get(key) for key in STORAGE_CONTEXT_KEYS
+        ]
+        sizes = [len(source) if hasattr(source, "__len__") else None for source in sources]
+        cache = getattr(self.parent, "azure_parser_cache", None)
+        if (
+            not cache
+            or cache["sizes"] != sizes
+            or any(cached is not source for cached, source in zip(cache["sources"], sources))
+        ):
+            cache = {"sources": sources, "sizes": sizes, "topology": None, "values": {}}
+            self.parent.azure_parser_cache = cache
+        return cache
+
+    def _memoise(self, resource_type: str, check, context, resolve) -> str:
+        """
+        Resolve a mount point property once per run and serve repeated lookups from the cache.
+
+        Errors are not cached so that a later check can retry the lookup.
+
+        :param resource_type: Resource type of the lookup
+        :type resource_type: str
+        :param check: Check object with collector arguments
+        :type check: Check
+        :param context: Context object containing all required data
+        :type context: Dict[str, Any]
+        :param resolve: Function resolving the property from the check and context
+        :type resolve: Callable[[Check, Dict[str, Any]], str]
+        :return: Property value
+        :rtype: str
+        """
+        values = self._get_cache(context)["values"]
+        key = (
+            resource_type,
+            check.collector_args.get("mount_point", ""),
+            check.collector_args.get("property", ""),
+        )
+        if key not in values:
+            value = resolve(check, context)
+            if value.startswith("ERROR"):
+                return value
+            values[key] = value
+        return values[key]
+
     def parse_azure_disks_vars(self, check, context) -> str:
         """
         Parse Azure disks variables from the given data.
@@ -175,35 +419,26 @@ class AzureDataParser(Collector):
         :return: Parsed ANF properties variables
         :rtype: str
         """
-        filesystem_data = context.get("filesystems", [])
-        anf_storage_data = context.get("anf_storage_metadata", [])
+        return self._memoise("anf", check, context, self._resolve_anf_property)
+
+    def _resolve_anf_property(self, check, context) -> str:
+        """
+        Resolve the ANF property of a mount point from the storage topology.
+
+        :param check: Check object with collector arguments
+        :type check: Check
+        :param context: Context object containing all required data
+        :type context: Dict[str, Any]
+        :return: Property value, "N/A" if not found or an error message
+        :rtype: str
+        """
         mount_point = check.collector_args.get("mount_point", "")
         property_name = check.collector_args.get("property", "")
         value = "N/A"
 
         try:
-            parsed_anf_volumes = []
-            if isinstance(anf_storage_data, str):
-                try:
-                    parsed_anf_volumes = json.loads(anf_storage_data)
-                except json.JSONDecodeError:
-                    self.parent.log(
-                        logging.WARNING,
-                        f"Failed to parse ANF storage metadata JSON: {anf_storage_data[:100]}",
-                    )
-            elif isinstance(anf_storage_data, list):
-                parsed_anf_volumes = anf_storage_data
-            else:
-                self.parent.log(
-                    logging.WARNING, f"Unexpected ANF storage data type: {type(anf_storage_data)}"
-                )
-                return value
-
-            fs_entry = None
-            for fs in filesystem_data:
-                if fs.get("target") == mount_point:
-                    fs_entry = fs
-                    break
+            topology = self._get_topology(context)
+            fs_entry = topology.get_filesystem(mount_point)
 
             if not fs_entry:
                 self.parent.log(
@@ -225,25 +460,23 @@ class AzureDataParser(Collector):
                 return value
 
             nfs_ip = source.split(":")[0]
-            for anf_volume in parsed_anf_volumes:
-                if anf_volume.get("ip") == nfs_ip:
-                    if property_name in anf_volume:
-                        value = str(anf_volume.get(property_name, "N/A"))
-                        self.parent.log(
-                            logging.INFO,
-                            f"Found {property_name}={value} for ANF volume at {mount_point} (IP: {nfs_ip})",
-                        )
-                    else:
-                        self.parent.log(
-                            logging.WARNING,
-                            f"Property '{property_name}' not found in ANF volume for {mount_point}",
-                        )
-                    break
-            else:
+            anf_volume = topology.get_anf_volume(nfs_ip)
+            if anf_volume is None:
                 self.parent.log(
                     logging.WARNING,
                     f"No ANF volume found with IP {nfs_ip} for mount point {mount_point}",
                 )
+            elif property_name in anf_volume:
+                value = str(anf_volume.get(property_name, "N/A"))
+                self.parent.log(
+                    logging.INFO,
+                    f"Found {property_name}={value} for ANF volume at {mount_point} (IP: {nfs_ip})",
+                )
+            else:
+                self.parent.log(
+                    logging.WARNING,
+                    f"Property '{property_name}' not found in ANF volume for {mount_point}",
+                )
 
         except Exception as ex:
             self.parent.handle_error(ex)
@@ -316,37 +549,29 @@ class AzureDataParser(Collector):
         :return: Aggregated property value or "N/A" if not found
         :rtype: str
         """
-        filesystem_data = context.get("filesystems", [])
-        disks_metadata = context.get("azure_disks_metadata", {})
+        return self._memoise("disks", check, context, self._resolve_disks_property)
+
+    def _resolve_disks_property(self, check, context) -> str:
+        """
+        Resolve the disk property of a mount point from the storage topology.
+
+        :param check: Check object with collector arguments
+        :type check: Check
+        :param context: Context object containing all required data
+        :type context: Dict[str, Any]
+        :return: Property value, "N/A" if not found or an error message
+        :rtype: str
+        """
         mount_point = check.collector_args.get("mount_point", "")
         property = check.collector_args.get("property", "")
         value = "N/A"
         try:
-            parsed_disks = []
-            for disk in disks_metadata:
-                if isinstance(disk, str):
-                    try:
-                        parsed_disks.append(json.loads(disk))
-                    except json.JSONDecodeError:
-                        self.parent.log(
-                            logging.WARNING,
-                            f"Failed to parse disk metadata JSON string: {disk[:100]}",
-                        )
-                        continue
-                elif isinstance(disk, dict):
-                    parsed_disks.append(disk)
-                else:
-                    self.parent.log(logging.WARNING, f"Unexpected disk metadata type: {type(disk)}")
-
-            fs_entry = None
-            for fs in filesystem_data:
-                if fs.get("target") in (
-                    mount_point,
-                    f"{mount_point}/{context.get('database_sid', '').upper()}",
-                    f"{mount_point}/{context.get('sap_sid', '').upper()}",
-                ):
-                    fs_entry = fs
-                    break
+            topology = self._get_topology(context)
+            fs_entry = topology.get_filesystem(
+                mount_point,
+                f"{mount_point}/{context.get('database_sid', '').upper()}",
+                f"{mount_point}/{context.get('sap_sid', '').upper()}",
+            )
 
             if not fs_entry:
                 self.parent.log(
@@ -360,7 +585,7 @@ class AzureDataParser(Collector):
                     f"Found {property}='{value}' for {mount_point} from filesystem data",
                 )
                 return value
-            if not parsed_disks:
+            if not topology.azure_disks:
                 self.parent.log(logging.WARNING, "No valid disk metadata found")
                 return value
 
@@ -368,7 +593,7 @@ class AzureDataParser(Collector):
                 total_value, matched_disks = 0, 0
 
                 for disk_name in fs_entry["azure_disk_names"]:
-                    disk = next((d for d in parsed_disks if d.get("name") == disk_name), None)
+                    disk = topology.get_disk(disk_name)
                     if disk and property in disk:
                         disk_value = disk.get(property, 0)
                         try:
@@ -393,10 +618,10 @@ class AzureDataParser(Collector):
                     )
             else:
                 disk_name = fs_entry.get("source")
-                disk = next((d for d in parsed_disks if d.get("name") == disk_name), None)
+                disk = topology.get_disk(disk_name)
                 if not disk:
                     device_name = disk_name.split("/")[-1] if "/" in disk_name else disk_name
-                    disk = next((d for d in parsed_disks if device_name in d.get("name", "")), None)
+                    disk = topology.find_disk_by_device(device_name, suffix=False)
                 if disk and property in disk:
                     value = str(disk.get(property, "N/A"))
                     self.parent.log(
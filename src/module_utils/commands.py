@@ -7,6 +7,7 @@ Commands module for SAP HANA cluster configuration.
 This module contains all the commands used for cluster validation
 and configuration.
 """
+
 from __future__ import absolute_import, division, print_function
 
 try:
@@ -58,6 +59,8 @@ PACEMAKER_STATUS = ["systemctl", "is-active", "pacemaker"]
 
 CLUSTER_STATUS = ["crm_mon", "--output-as=xml"]
 
+CLUSTER_STATUS_WITH_FENCING = ["crm_mon", "--output-as=xml", "--fence-history=1"]
+
 CONSTRAINTS = ["cibadmin", "--query", "--scope", "constraints"]
 
 RSC_CLEAR = {
@@ -67,6 +70,8 @@ RSC_CLEAR = {
 
 CIB_ADMIN = lambda scope: ["cibadmin", "--query", "--scope", scope]
 
+CIB_EPOCH = ["cibadmin", "--query", "--xpath", "/cib", "--no-children"]
+
 DANGEROUS_COMMANDS = [
     r"sudo\s+rm",
     r"rm\s+-rf",
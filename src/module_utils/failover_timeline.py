@@ -0,0 +1,318 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Sub-second recorder of pacemaker cluster transitions in SAP Automation QA
+"""
+
+import logging
+import os
+import re
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from ansible.module_utils.sap_automation_qa import SapAutomationQA
+    from ansible.module_utils.enums import TestStatus
+    from ansible.module_utils.commands import CLUSTER_STATUS_WITH_FENCING
+except ImportError:
+    from src.module_utils.sap_automation_qa import SapAutomationQA
+    from src.module_utils.enums import TestStatus
+    from src.module_utils.commands import CLUSTER_STATUS_WITH_FENCING
+
+SAMPLE_INTERVAL = 0.5
+ATTRIBUTE_PATTERN = r"_(clone_state|sync_state|roles|srmode)$|^runs_ers_"
+PROMOTED_ROLES = ("Promoted", "Master")
+
+StateKey = Tuple[str, str, str]
+
+
+def parse_cluster_state(
+    cluster_status: str, attribute_pattern: str = ATTRIBUTE_PATTERN
+) -> Tuple[Dict[StateKey, str], Dict[str, str]]:
+    """
+    Flatten crm_mon XML output into the cluster state compared between samples.
+
+    The state maps (kind, name, detail) keys to values:
+    ("node", node, "online"|"unclean"), ("resource", resource, node) to the role of the
+    resource on the node, ("attribute", node, attribute) for node attributes matching the
+    pattern and ("fencing", target, completed) for fence history events.
+
+    :param cluster_status: Output of crm_mon --output-as=xml
+    :type cluster_status: str
+    :param attribute_pattern: Regular expression of the node attributes to track
+    :type attribute_pattern: str
+    :return: Cluster state and resource agent by resource ID
+    :rtype: Tuple[Dict[StateKey, str], Dict[str, str]]
+    """
+    root = ET.fromstring(cluster_status)
+    state: Dict[StateKey, str] = {}
+    agents: Dict[str, str] = {}
+    attribute_regex = re.compile(attribute_pattern)
+
+    for node in root.findall("./nodes/node"):
+        name = node.get("name", "")
+        state[("node", name, "online")] = node.get("online", "false")
+        state[("node", name, "unclean")] = node.get("unclean", "false")
+
+    for resource in root.iter("resource"):
+        resource_id = resource.get("id", "")
+        agents[resource_id] = resource.get("resource_agent", "")
+        for node in resource.findall("node"):
+            state[("resource", resource_id, node.get("name", ""))] = resource.get("role", "")
+
+    for node in root.findall("./node_attributes/node"):
+        for attribute in node.findall("attribute"):
+            name = attribute.get("name", "")
+            if attribute_regex.search(name):
+                state[("attribute", node.get("name", ""), name)] = attribute.get("value", "")
+
+    for fence_event in root.findall("./fence_history/fence_event"):
+        state[
+            (
+                "fencing",
+                fence_event.get("target", ""),
+                fence_event.get("completed", "") or fence_event.get("status", ""),
+            )
+        ] = f"{fence_event.get('action', '')} {fence_event.get('status', '')}".strip()
+
+    return state, agents
+
+
+def _classify(key: StateKey, old: Optional[str], new: Optional[str], agent: str) -> str:
+    """
+    Name the transition of one state key.
+    """
+    kind, _, detail = key
+    if kind == "node":
+        if detail == "online":
+            return "node_online" if new == "true" else "node_offline"
+        return "fencing_pending" if new == "true" else "node_clean"
+    if kind == "fencing":
+        return "fencing"
+    if kind == "attribute":
+        return "sr_state_changed" if detail.endswith("_sync_state") else "attribute_changed"
+    if "IPaddr2" in agent:
+        return "ip_started" if new else "ip_stopped"
+    if new in PROMOTED_ROLES:
+        return "resource_promoted"
+    if old in PROMOTED_ROLES:
+        return "resource_demoted"
+    if old is None:
+        return "resource_started"
+    if new is None:
+        return "resource_stopped"
+    return "resource_role_changed"
+
+
+class FailoverTimelineRecorder(SapAutomationQA):
+    """
+    Samples the cluster status at sub-second intervals and records every transition.
+
+    The recorder runs on a cluster node, usually as an asynchronous task started before
+    the fault injection, until a stop file appears or its duration expires. Each
+    transition (node offline, fencing, promotion, virtual IP move, system replication
+    state change, ...) is timestamped when the sample showing it was taken. The fault
+    injection is marked by creating a fault file on the node, and the summary is then
+    measured from its modification time.
+    """
+
+    def __init__(
+        self,
+        duration: float,
+        interval: float = SAMPLE_INTERVAL,
+        stop_file: Optional[str] = None,
+        attribute_pattern: str = ATTRIBUTE_PATTERN,
+        fault_file: Optional[str] = None,
+    ):
+        """
+        :param duration: Maximum number of seconds to record
+        :type duration: float
+        :param interval: Seconds between two samples
+        :type interval: float
+        :param stop_file: File whose creation stops the recording
+        :type stop_file: Optional[str]
+        :param attribute_pattern: Regular expression of the node attributes to track
+        :type attribute_pattern: str
+        :param fault_file: File whose creation marks the fault injection
+        :type fault_file: Optional[str]
+        """
+        super().__init__()
+        self.duration = duration
+        self.interval = interval
+        self.stop_file = stop_file
+        self.attribute_pattern = attribute_pattern
+        self.fault_file = fault_file
+        self.fault_time: Optional[float] = None
+        self.timeline: List[Dict[str, Any]] = []
+        self.samples = 0
+        self.failed_samples = 0
+
+    def _query_cluster_status(self) -> str:
+        """
+        Run crm_mon once.
+
+        The command is run directly rather than through execute_command_subprocess, so that
+        hundreds of samples do not flood the result logs.
+
+        :return: crm_mon XML output
+        :rtype: str
+        """
+        return subprocess.run(
+            CLUSTER_STATUS_WITH_FENCING,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+            timeout=max(self.interval * 4, 5),
+        ).stdout.decode("utf-8")
+
+    def record_sample(
+        self, previous: Optional[Dict[StateKey, str]], cluster_status: str, elapsed: float
+    ) -> Dict[StateKey, str]:
+        """
+        Add the transitions between the previous state and a new sample to the timeline.
+
+        :param previous: State of the previous sample, None for the first sample
+        :type previous: Optional[Dict[StateKey, str]]
+        :param cluster_status: crm_mon XML output of the new sample
+        :type cluster_status: str
+        :param elapsed: Seconds since the recording started
+        :type elapsed: float
+        :return: State of the new sample
+        :rtype: Dict[StateKey, str]
+        """
+        state, agents = parse_cluster_state(cluster_status, self.attribute_pattern)
+        if previous is None:
+            return state
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        for key in sorted(set(previous) | set(state)):
+            old, new = previous.get(key), state.get(key)
+            if old == new:
+                continue
+            kind, name, detail = key
+            event = {
+                "timestamp": timestamp,
+                "elapsed": round(elapsed, 3),
+                "event": _classify(key, old, new, agents.get(name, "")),
+                "from": old,
+                "to": new,
+            }
+            if kind == "resource":
+                event.update({"resource": name, "node": detail, "agent": agents.get(name, "")})
+            elif kind == "attribute":
+                event.update({"node": name, "attribute": detail})
+            else:
+                event["node"] = name
+            self.timeline.append(event)
+        return state
+
+    def summarize(self, fault_elapsed: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the time of the first transition of each kind and the recovery time.
+
+        When the time of the fault injection is known, transitions before it are left out
+        and times are measured from it. Otherwise they are measured from the start of the
+        recording, and the recovery time from the first transition.
+
+        :param fault_elapsed: Seconds between the start of the recording and the fault
+        :type fault_elapsed: Optional[float]
+        :return: Seconds since the fault or the start of the recording by event, and the
+            seconds until the last transition as recovery_seconds
+        :rtype: Dict[str, Any]
+        """
+        origin = fault_elapsed or 0.0
+        events = [event for event in self.timeline if event["elapsed"] >= origin]
+        summary: Dict[str, Any] = {}
+        for event in events:
+            summary.setdefault(event["event"], round(event["elapsed"] - origin, 3))
+        if events:
+            first = origin if fault_elapsed is not None else events[0]["elapsed"]
+            summary["recovery_seconds"] = round(events[-1]["elapsed"] - first, 3)
+        return summary
+
+    def _check_fault_file(self) -> None:
+        """
+        Take the time of the fault injection from the fault file, removing it once seen.
+        """
+        if self.fault_time is not None or not self.fault_file:
+            return
+        try:
+            self.fault_time = os.stat(self.fault_file).st_mtime
+        except OSError:
+            return
+        try:
+            os.unlink(self.fault_file)
+        except OSError:
+            pass
+
+    def _stop_requested(self) -> bool:
+        """
+        Check for the stop file, removing it once seen.
+        """
+        if not self.stop_file or not os.path.exists(self.stop_file):
+            return False
+        try:
+            os.unlink(self.stop_file)
+        except OSError:
+            pass
+        return True
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Record the cluster transitions until stopped or the duration expires.
+
+        :return: Result with the timeline and its summary
+        :rtype: Dict[str, Any]
+        """
+        start = datetime.now(timezone.utc)
+        start_time = time.time()
+        started = time.monotonic()
+        deadline = started + self.duration
+        previous = None
+        self.log(logging.INFO, f"Recording cluster transitions every {self.interval}s")
+        while True:
+            sampled = time.monotonic()
+            try:
+                previous = self.record_sample(
+                    previous, self._query_cluster_status(), sampled - started
+                )
+                self.samples += 1
+            except (subprocess.SubprocessError, OSError, ET.ParseError) as ex:
+                self.failed_samples += 1
+                if self.failed_samples <= 10:
+                    self.log(logging.WARNING, f"Failed to sample the cluster status: {ex}")
+            self._check_fault_file()
+            if self._stop_requested() or time.monotonic() >= deadline:
+                break
+            time.sleep(max(0, self.interval - (time.monotonic() - sampled)))
+
+        self._check_fault_file()
+        fault, fault_elapsed = None, None
+        if self.fault_time is not None:
+            fault = datetime.fromtimestamp(self.fault_time, timezone.utc).isoformat(
+                timespec="milliseconds"
+            )
+            fault_elapsed = round(max(0.0, self.fault_time - start_time), 3)
+        self.result.update(
+            {
+                "status": (TestStatus.SUCCESS.value if self.samples else TestStatus.ERROR.value),
+                "message": f"Recorded {len(self.timeline)} cluster transitions "
+                + f"in {self.samples} samples ({self.failed_samples} failed)",
+                "details": {
+                    "start": start.isoformat(timespec="milliseconds"),
+                    "end": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    "fault": fault,
+                    "fault_elapsed": fault_elapsed,
+                    "interval": self.interval,
+                    "samples": self.samples,
+                    "failed_samples": self.failed_samples,
+                    "timeline": self.timeline,
+                    "summary": self.summarize(fault_elapsed),
+                },
+            }
+        )
+        self.log(logging.INFO, self.result["message"])
+        return self.result
@@ -4,17 +4,26 @@
 """
 Collectors for data collection in SAP Automation QA
 """
-import ipaddress
-import json
 import logging
-from typing import Any
+import platform
+from typing import Any, Dict, List
 
 try:
     from ansible.module_utils.sap_automation_qa import SapAutomationQA
     from ansible.module_utils.collector import Collector
+    from ansible.module_utils.lvm_report import LvmReport
+    from ansible.module_utils.storage_discovery import LocalStorageDiscovery
+    from ansible.module_utils.storage_topology import (
+        NFS_FSTYPES,
+        StorageTopology,
+        parse_metadata,
+    )
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA
     from src.module_utils.collector import Collector
+    from src.module_utils.lvm_report import LvmReport
+    from src.module_utils.storage_discovery import LocalStorageDiscovery
+    from src.module_utils.storage_topology import NFS_FSTYPES, StorageTopology, parse_metadata
 
 
 class FileSystemCollector(Collector):
@@ -35,16 +44,25 @@ class FileSystemCollector(Collector):
         anf_storage_data,
         afs_storage_data,
         vg_to_disk_names=None,
+        topology=None,
     ):
         """
         Parse filesystem data.
 
         :param vg_to_disk_names: Pre-computed mapping of VG names to Azure disk names
         :type vg_to_disk_names: Dict[str, List[str]]
+        :param topology: Storage topology shared by the run, built from the other
+            arguments if not given
+        :type topology: StorageTopology
         """
-        if vg_to_disk_names is None:
-            vg_to_disk_names = {}
-        filesystems = []
+        if topology is None:
+            topology = StorageTopology(
+                azure_disks=azure_disk_data,
+                anf_volumes=anf_storage_data,
+                afs_shares=afs_storage_data,
+                lvm_volumes=lvm_volume,
+                vg_to_disk_names=vg_to_disk_names,
+            )
         findmnt_data = {}
         df_data = {}
         df_lines = [line.strip() for line in df_output.split("\n") if line.strip()]
@@ -64,89 +82,74 @@ class FileSystemCollector(Collector):
             if len(parts) >= 4:
                 target = parts[0]
                 findmnt_data[target] = {"source": parts[1], "fstype": parts[2], "options": parts[3]}
+        mounted_filesystems = []
         for mountpoint, df_info in df_data.items():
             findmnt_info = findmnt_data.get(mountpoint, {})
+            mounted_filesystems.append(
+                {
+                    "target": mountpoint,
+                    "source": df_info["filesystem"],
+                    "fstype": findmnt_info.get("fstype", ""),
+                    "options": findmnt_info.get("options", ""),
+                    "size": df_info["size"],
+                    "free": df_info["free"],
+                    "used": df_info["used"],
+                    "used_percent": df_info["used_percent"],
+                }
+            )
+        return self._correlate_filesystems(mounted_filesystems, topology)
+
+    def _correlate_filesystems(self, mounted_filesystems, topology):
+        """
+        Add the LVM and Azure storage details of the topology to the mounted filesystems.
+
+        :param mounted_filesystems: Filesystems with target, source, fstype, options and usage
+        :type mounted_filesystems: List[Dict[str, Any]]
+        :param topology: Storage topology of the run
+        :type topology: StorageTopology
+        :return: Filesystem entries
+        :rtype: List[Dict[str, Any]]
+        """
+        filesystems = []
+        for mounted_filesystem in mounted_filesystems:
             vg_name, stripe_size = "", ""
-            filesystem_path = df_info["filesystem"]
-            for lv_name, lv_prop in lvm_volume.items():
-                if lv_prop.get("dm_path") == filesystem_path:
-                    vg_name = lv_prop.get("vg_name", "")
-                    stripe_size = lv_prop.get("stripe_size", "")
-                    break
-
-            filesystem_entry = {
-                "target": mountpoint,
-                "source": filesystem_path,
-                "fstype": findmnt_info.get("fstype", ""),
-                "options": findmnt_info.get("options", ""),
-                "size": df_info["size"],
-                "free": df_info["free"],
-                "used": df_info["used"],
-                "used_percent": df_info["used_percent"],
-                "vg": vg_name,
-                "stripe_size": stripe_size,
-                "max_mbps": 0,
-                "max_iops": 0,
-            }
+            filesystem_path = mounted_filesystem["source"]
+            lv_prop = topology.get_logical_volume(filesystem_path)
+            if lv_prop:
+                vg_name = lv_prop.get("vg_name", "")
+                stripe_size = lv_prop.get("stripe_size", "")
+
+            filesystem_entry = dict(
+                mounted_filesystem,
+                vg=vg_name,
+                stripe_size=stripe_size,
+                max_mbps=0,
+                max_iops=0,
+            )
 
-            if filesystem_entry["fstype"] in ["nfs", "nfs4"]:
+            if filesystem_entry["fstype"] in NFS_FSTYPES:
                 nfs_source = filesystem_entry["source"]
                 if ":" in nfs_source:
                     nfs_address = nfs_source.split(":")[0]
-
-                    matched = False
-                    for anf_volume in anf_storage_data:
-                        anf_ip = anf_volume.get("ip", "")
-                        if anf_ip and anf_ip == nfs_address:
-                            filesystem_entry["max_mbps"] = anf_volume.get("throughputMibps", 0)
-                            filesystem_entry["max_iops"] = "-"
-                            filesystem_entry["nfs_type"] = "ANF"
-                            filesystem_entry["service_level"] = anf_volume.get("serviceLevel", "")
-                            matched = True
-                            break
-
-                    if not matched:
-                        for nfs_share in afs_storage_data:
-                            storage_account_name = nfs_share.get("Pool", "")
-                            share_address = nfs_share.get("NFSAddress", "")
-                            ip_match = (
-                                ":" in share_address and share_address.split(":")[0] == nfs_address
-                            )
-                            fqdn_match = storage_account_name and storage_account_name in nfs_source
-                            ip_to_account_match = False
-                            try:
-                                ipaddress.ip_address(nfs_address)
-                            except Exception as ex:
-                                self.parent.log(
-                                    logging.DEBUG,
-                                    f"NFS address {nfs_address} is not a valid IP: {ex}",
-                                )
-                            if ":" in nfs_source and "/" in nfs_source:
-                                mount_path = nfs_source.split(":", 1)[1]
-                                ip_to_account_match = (
-                                    storage_account_name
-                                    and ("/" + storage_account_name + "/") in mount_path
-                                )
-                            if ip_match or fqdn_match or ip_to_account_match:
-                                filesystem_entry["max_mbps"] = nfs_share.get("ThroughputMibps", 0)
-                                filesystem_entry["max_iops"] = nfs_share.get("IOPS", 0)
-                                filesystem_entry["nfs_type"] = "AFS"
-                                break
+                    anf_volume = topology.get_anf_volume(nfs_address)
+                    nfs_share = None if anf_volume else topology.find_afs_share(nfs_source)
+                    if anf_volume:
+                        filesystem_entry["max_mbps"] = anf_volume.get("throughputMibps", 0)
+                        filesystem_entry["max_iops"] = "-"
+                        filesystem_entry["nfs_type"] = "ANF"
+                        filesystem_entry["service_level"] = anf_volume.get("serviceLevel", "")
+                    elif nfs_share:
+                        filesystem_entry["max_mbps"] = nfs_share.get("ThroughputMibps", 0)
+                        filesystem_entry["max_iops"] = nfs_share.get("IOPS", 0)
+                        filesystem_entry["nfs_type"] = "AFS"
             else:
                 if filesystem_path.startswith("/dev/sd") or filesystem_path.startswith("/dev/nvme"):
-                    disk_name = (
-                        filesystem_path.split("/")[-1]
-                        if "/" in filesystem_path
-                        else filesystem_path
-                    )
-
-                    for disk_data in azure_disk_data:
-                        if disk_data.get("name", "").endswith(disk_name):
-                            filesystem_entry["max_mbps"] = disk_data.get("mbps", 0)
-                            filesystem_entry["max_iops"] = disk_data.get("iops", 0)
-                            break
+                    disk_data = topology.find_disk_by_device(filesystem_path.split("/")[-1])
+                    if disk_data:
+                        filesystem_entry["max_mbps"] = disk_data.get("mbps", 0)
+                        filesystem_entry["max_iops"] = disk_data.get("iops", 0)
                 elif filesystem_path.startswith("/dev/mapper/") and vg_name:
-                    disk_names = vg_to_disk_names.get(vg_name, [])
+                    disk_names = topology.get_vg_disk_names(vg_name)
 
                     if disk_names:
                         filesystem_entry["azure_disk_names"] = disk_names
@@ -170,7 +173,7 @@ class FileSystemCollector(Collector):
 
         Chain: PV device (/dev/sdc) → LUN (0) → disk name (via IMDS) → Azure disk
 
-        :param lvm_fullreport: LVM fullreport JSON with PV information
+        :param lvm_fullreport: LVM fullreport as JSON text, dictionary or parsed LvmReport
         :param imds_metadata: IMDS metadata with lun-to-diskname mappings
         :param device_lun_map: Mapping of device names to LUN numbers (e.g., {"sdc": "0"})
         :return: Dict mapping VG names to lists of Azure disk names
@@ -186,52 +189,34 @@ class FileSystemCollector(Collector):
                 if lun is not None and name:
                     lun_to_diskname[str(lun)] = name
 
-            reports = lvm_fullreport.get("report", [])
+            lvm_report = LvmReport.parse(lvm_fullreport)
             self.parent.log(
                 logging.INFO,
-                f"Found {len(reports)} LVM reports",
+                f"Found {lvm_report.report_count} LVM reports",
             )
 
-            for report in reports:
-                pvs = report.get("pv", [])
-                vgs = report.get("vg", [])
-
-                vg_names = [vg.get("vg_name") for vg in vgs if vg.get("vg_name")]
-                if not vg_names:
+            for pv in lvm_report.pvs:
+                if not pv.vg_name:
                     self.parent.log(
                         logging.WARNING,
-                        f"Report has PVs but no VG names found, skipping",
+                        f"Report has PVs but no VG names found, skipping {pv.name}",
                     )
                     continue
-                vg_name = vg_names[0]
-
-                for pv in pvs:
-                    pv_name = pv.get("pv_name")
-
-                    if not pv_name:
-                        self.parent.log(
-                            logging.INFO,
-                            f"Skipping PV with missing pv_name",
-                        )
-                        continue
-                    device_name = pv_name.split("/")[-1] if "/" in pv_name else pv_name
-                    lun = device_lun_map.get(device_name)
-                    if lun is None:
-                        self.parent.log(
-                            logging.WARNING,
-                            f"No LUN mapping found for device {device_name} (PV: {pv_name})",
-                        )
-                        continue
-                    disk_name = lun_to_diskname.get(str(lun))
-                    if not disk_name:
-                        self.parent.log(
-                            logging.WARNING,
-                            f"No IMDS entry for LUN {lun} (device: {device_name})",
-                        )
-                        continue
-                    if vg_name not in vg_to_disk_names:
-                        vg_to_disk_names[vg_name] = []
-                    vg_to_disk_names[vg_name].append(disk_name)
+                lun = device_lun_map.get(pv.device_name)
+                if lun is None:
+                    self.parent.log(
+                        logging.WARNING,
+                        f"No LUN mapping found for device {pv.device_name} (PV: {pv.name})",
+                    )
+                    continue
+                disk_name = lun_to_diskname.get(str(lun))
+                if not disk_name:
+                    self.parent.log(
+                        logging.WARNING,
+                        f"No IMDS entry for LUN {lun} (device: {pv.device_name})",
+                    )
+                    continue
+                vg_to_disk_names.setdefault(pv.vg_name, []).append(disk_name)
 
         except Exception as ex:
             self.parent.log(
@@ -245,63 +230,42 @@ class FileSystemCollector(Collector):
         """
         Collect LVM volume information.
 
-        :param lvm_fullreport: Pre-fetched LVM fullreport JSON string
+        :param lvm_fullreport: LVM fullreport as JSON text, dictionary or parsed LvmReport
         :return: Tuple of logical volumes and volume groups
         :rtype: Tuple[Dict[str, Any], Dict[str, Any]]
         """
         log_volume_result = {}
         lvm_group_result = {}
         try:
-            lvm_volumes = lvm_fullreport
-            for lvm_volume in lvm_volumes.get("report", []):
-                vol_groups = lvm_volume.get("vg", [])
-                for vol_group in vol_groups:
-                    vg_name = vol_group.get("vg_name")
-                    pv_count = vol_group.get("pv_count", 0)
-                    try:
-                        pv_count = int(pv_count) if pv_count else 0
-                    except (ValueError, TypeError):
-                        pv_count = 0
-
-                    lvm_group_result[vg_name] = {
-                        "name": vg_name,
-                        "disks": pv_count,
-                        "logical_volumes": vol_group.get("lv_count", 0),
-                        "total_size": vol_group.get("vg_size"),
-                        "total_iops": 0,
-                        "total_mbps": 0,
-                    }
+            lvm_report = LvmReport.parse(lvm_fullreport)
+            for vol_group in lvm_report.vgs:
+                try:
+                    pv_count = int(vol_group.pv_count) if vol_group.pv_count else 0
+                except (ValueError, TypeError):
+                    pv_count = 0
+
+                lvm_group_result[vol_group.name] = {
+                    "name": vol_group.name,
+                    "disks": pv_count,
+                    "logical_volumes": vol_group.lv_count,
+                    "total_size": vol_group.size,
+                    "total_iops": 0,
+                    "total_mbps": 0,
+                }
 
-                logical_volumes = lvm_volume.get("lv", [])
-                segments = lvm_volume.get("seg", [])
-
-                for lv in logical_volumes:
-                    lv_name = lv.get("lv_name")
-                    vg_name = ""
-                    if lv.get("lv_full_name") and "/" in lv.get("lv_full_name", ""):
-                        vg_name = lv.get("lv_full_name", "").split("/")[0]
-                    elif lv.get("vg_name"):
-                        vg_name = lv.get("vg_name")
-
-                    stripe_size, stripes = "", ""
-                    lv_uuid = lv.get("lv_uuid")
-                    for segment in segments:
-                        if segment.get("lv_uuid") == lv_uuid:
-                            stripes = segment.get("stripes", "")
-                            stripe_size = segment.get("stripe_size", "")
-                            break
-
-                    if vg_name and vg_name != "rootvg":
-                        log_volume_result[lv_name] = {
-                            "name": lv_name,
-                            "vg_name": vg_name,
-                            "path": lv.get("lv_path"),
-                            "dm_path": lv.get("lv_dm_path"),
-                            "layout": lv.get("lv_layout"),
-                            "size": lv.get("lv_size"),
-                            "stripe_size": stripe_size,
-                            "stripes": stripes,
-                        }
+            for lv in lvm_report.lvs:
+                segment = lvm_report.get_segment(lv.uuid)
+                if lv.vg_name and lv.vg_name != "rootvg":
+                    log_volume_result[lv.name] = {
+                        "name": lv.name,
+                        "vg_name": lv.vg_name,
+                        "path": lv.path,
+                        "dm_path": lv.dm_path,
+                        "layout": lv.layout,
+                        "size": lv.size,
+                        "stripe_size": segment.stripe_size if segment else "",
+                        "stripes": segment.stripes if segment else "",
+                    }
 
         except Exception as ex:
             return f"ERROR: LVM volume collection failed: {str(ex)}"
@@ -315,78 +279,10 @@ class FileSystemCollector(Collector):
         :param data_type: Type of data for logging purposes
         :return: List of dictionaries
         """
-        parsed_data = []
-
-        if not raw_data:
-            self.parent.log(
-                logging.INFO,
-                f"No {data_type} data provided (empty or None)",
-            )
-            return parsed_data
-
-        self.parent.log(
-            logging.INFO,
-            f"Parsing {data_type}: type={type(raw_data)}, "
-            f"length={len(raw_data) if hasattr(raw_data, '__len__') else 'N/A'}",
-        )
-
-        if isinstance(raw_data, list):
-            for item in raw_data:
-                if isinstance(item, dict):
-                    parsed_data.append(item)
-                elif isinstance(item, str):
-                    item_stripped = item.strip()
-                    if not item_stripped:
-                        continue
-                    try:
-                        parsed_item = json.loads(item_stripped)
-                        if isinstance(parsed_item, dict):
-                            parsed_data.append(parsed_item)
-                        elif isinstance(parsed_item, list):
-                            parsed_data.extend(parsed_item)
-                    except json.JSONDecodeError:
-                        self.parent.log(
-                            logging.WARNING,
-                            f"Failed to parse {data_type} item as JSON: {item_stripped[:100]}",
-                        )
-        elif isinstance(raw_data, dict):
-            parsed_data = [raw_data]
-        elif isinstance(raw_data, str):
-            try:
-                parsed_data = json.loads(raw_data)
-                if not isinstance(parsed_data, list):
-                    parsed_data = [parsed_data]
-            except json.JSONDecodeError:
-                for line in raw_data.splitlines():
-                    if line.strip():
-                        try:
-                            parsed_data.append(json.loads(line.strip()))
-                        except json.JSONDecodeError:
-                            self.parent.log(
-                                logging.WARNING,
-                                f"Failed to parse {data_type} line: {line.strip()[:100]}",
-                            )
-
-        validated_data = []
-        for item in parsed_data:
-            if isinstance(item, dict):
-                validated_data.append(item)
-            else:
-                self.parent.log(
-                    logging.WARNING,
-                    f"Skipping non-dict item in {data_type}: {type(item)} - {str(item)[:100]}",
-                )
-
-        self.parent.log(
-            logging.INFO,
-            f"Successfully parsed {len(validated_data)} {data_type} items, "
-            f"skipped {len(parsed_data) - len(validated_data)} non-dict items",
-        )
-
-        return validated_data
+        return parse_metadata(raw_data, data_type, self.parent.log)
 
     def gather_all_filesystem_info(
-        self, context, filesystems, lvm_volumes, vg_to_disk_names
+        self, context, filesystems, lvm_volumes, vg_to_disk_names, topology=None
     ) -> list:
         """
         Gather all filesystem information and correlate as a single dictionary.
@@ -406,31 +302,25 @@ class FileSystemCollector(Collector):
         :type lvm_volumes: Dict[str, Any]
         :param vg_to_disk_names: Pre-computed mapping of VG names to Azure disk names
         :type vg_to_disk_names: Dict[str, List[str]]
+        :param topology: Storage topology shared by the run, built from the context if not given
+        :type topology: StorageTopology
         :return: List keyed by target/mount point with all filesystem information
         :rtype: list
         """
         try:
             lvm_fullreport = context.get("lvm_fullreport", "")
-            if not lvm_fullreport or not lvm_fullreport.get("report"):
+            if not lvm_fullreport or (
+                isinstance(lvm_fullreport, dict) and not lvm_fullreport.get("report")
+            ):
                 self.parent.log(
                     logging.WARNING,
                     "lvm_fullreport is empty or invalid. LVM data correlation will be incomplete.",
                 )
 
-            azure_disk_data = self._parse_metadata(
-                context.get("azure_disks_metadata", []), "Azure disk"
-            )
-            afs_storage_data = self._parse_metadata(
-                context.get("afs_storage_metadata", ""), "AFS storage"
-            )
-            anf_storage_data = self._parse_metadata(
-                context.get("anf_storage_metadata", ""), "ANF storage"
-            )
-            diskname_to_diskdata = {}
-            for disk_data in azure_disk_data:
-                disk_name = disk_data.get("name", "")
-                if disk_name:
-                    diskname_to_diskdata[disk_name] = disk_data
+            if topology is None:
+                topology = StorageTopology.from_context(
+                    context, self.parent.log, lvm_volumes, vg_to_disk_names
+                )
 
             correlated_info = []
 
@@ -449,75 +339,43 @@ class FileSystemCollector(Collector):
                 stripes = ""
 
                 if not stripe_size and vg_name and source:
-                    for lv_name, lv_info in lvm_volumes.items():
-                        if lv_info.get("dm_path") == source:
-                            stripe_size = lv_info.get("stripe_size", "")
-                            stripes = lv_info.get("stripes", "")
-                            self.parent.log(
-                                logging.INFO,
-                                f"Found LVM details for {target}: "
-                                + f"stripe_size={stripe_size}, stripes={stripes}",
-                            )
-                            break
+                    lv_info = topology.get_logical_volume(source)
+                    if lv_info:
+                        stripe_size = lv_info.get("stripe_size", "")
+                        stripes = lv_info.get("stripes", "")
+                        self.parent.log(
+                            logging.INFO,
+                            f"Found LVM details for {target}: "
+                            + f"stripe_size={stripe_size}, stripes={stripes}",
+                        )
 
                 max_mbps = fs.get("max_mbps", 0)
                 max_iops = fs.get("max_iops", 0)
                 azure_disk_names = []
                 disk_count = 0
-                if fstype in ["nfs", "nfs4"]:
+                if fstype in NFS_FSTYPES:
                     if ":" in source:
-                        nfs_address = source.split(":")[0]
-                        matched = False
-                        for anf_volume in anf_storage_data:
-                            anf_ip = anf_volume.get("ip", "")
-                            if anf_ip and anf_ip == nfs_address:
-                                max_mbps = anf_volume.get("throughputMibps", 0)
-                                max_iops = "-"
-                                self.parent.log(
-                                    logging.INFO,
-                                    f"Correlated NFS {target} with "
-                                    + f"ANF: MBPS={max_mbps}, ServiceLevel={anf_volume.get('serviceLevel', '')}",
-                                )
-                                matched = True
-                                break
-                        if not matched:
-                            for nfs_share in afs_storage_data:
-                                share_address = nfs_share.get("NFSAddress", "")
-                                storage_account_name = nfs_share.get("Pool", "")
-                                ip_match = (
-                                    ":" in share_address
-                                    and share_address.split(":")[0] == nfs_address
-                                )
-                                fqdn_match = storage_account_name and storage_account_name in source
-                                ip_to_account_match = False
-                                try:
-                                    ipaddress.ip_address(nfs_address)
-                                    if ":" in source and "/" in source:
-                                        mount_path = source.split(":", 1)[1]
-                                        ip_to_account_match = (
-                                            storage_account_name
-                                            and ("/" + storage_account_name + "/") in mount_path
-                                        )
-                                except ValueError:
-                                    pass
-
-                                if ip_match or fqdn_match or ip_to_account_match:
-                                    max_mbps = nfs_share.get("ThroughputMibps", 0)
-                                    max_iops = nfs_share.get("IOPS", 0)
-                                    match_type = (
-                                        "IP"
-                                        if ip_match
-                                        else ("FQDN" if fqdn_match else "IP→Account")
-                                    )
-                                    self.parent.log(
-                                        logging.INFO,
-                                        f"Correlated NFS {target} with "
-                                        + f"AFS ({match_type}): MBPS={max_mbps}, IOPS={max_iops}, Account={storage_account_name}",
-                                    )
-                                    break
+                        anf_volume = topology.get_anf_volume(source.split(":")[0])
+                        nfs_share = None if anf_volume else topology.find_afs_share(source)
+                        if anf_volume:
+                            max_mbps = anf_volume.get("throughputMibps", 0)
+                            max_iops = "-"
+                            self.parent.log(
+                                logging.INFO,
+                                f"Correlated NFS {target} with "
+                                + f"ANF: MBPS={max_mbps}, ServiceLevel={anf_volume.get('serviceLevel', '')}",
+                            )
+                        elif nfs_share:
+                            max_mbps = nfs_share.get("ThroughputMibps", 0)
+                            max_iops = nfs_share.get("IOPS", 0)
+                            self.parent.log(
+                                logging.INFO,
+                                f"Correlated NFS {target} with "
+                                + f"AFS: MBPS={max_mbps}, IOPS={max_iops}, Account={nfs_share.get('Pool', '')}",
+                            )
 
                 elif source.startswith("/dev/mapper/") and vg_name:
-                    disk_names = vg_to_disk_names.get(vg_name, [])
+                    disk_names = topology.get_vg_disk_names(vg_name)
 
                     if disk_names:
                         azure_disk_names = disk_names
@@ -526,7 +384,7 @@ class FileSystemCollector(Collector):
                         total_iops = 0
 
                         for disk_name in disk_names:
-                            disk_data = diskname_to_diskdata.get(disk_name)
+                            disk_data = topology.get_disk(disk_name)
                             if disk_data:
                                 total_mbps += disk_data.get("mbps", 0)
                                 total_iops += disk_data.get("iops", 0)
@@ -550,19 +408,16 @@ class FileSystemCollector(Collector):
                         )
 
                 elif source.startswith("/dev/sd") or source.startswith("/dev/nvme"):
-                    disk_name = source.split("/")[-1] if "/" in source else source
-
-                    for disk_data in azure_disk_data:
-                        if disk_data.get("name", "").endswith(disk_name):
-                            max_mbps = disk_data.get("mbps", 0)
-                            max_iops = disk_data.get("iops", 0)
-                            azure_disk_names = [disk_data.get("name", "")]
-                            disk_count = 1
-                            self.parent.log(
-                                logging.INFO,
-                                f"Correlated direct disk {target}: MBPS={max_mbps}, IOPS={max_iops}",
-                            )
-                            break
+                    disk_data = topology.find_disk_by_device(source.split("/")[-1])
+                    if disk_data:
+                        max_mbps = disk_data.get("mbps", 0)
+                        max_iops = disk_data.get("iops", 0)
+                        azure_disk_names = [disk_data.get("name", "")]
+                        disk_count = 1
+                        self.parent.log(
+                            logging.INFO,
+                            f"Correlated direct disk {target}: MBPS={max_mbps}, IOPS={max_iops}",
+                        )
                 correlated_info.append(
                     {
                         "target": target,
@@ -586,7 +441,7 @@ class FileSystemCollector(Collector):
             self.parent.log(
                 logging.INFO,
                 f"Successfully correlated FS info for {len(correlated_info)} mount points with "
-                f"{len(azure_disk_data)} Azure disks and {len(vg_to_disk_names)} VG mappings",
+                f"{len(topology.azure_disks)} Azure disks and {len(vg_to_disk_names)} VG mappings",
             )
 
             return correlated_info
@@ -598,53 +453,31 @@ class FileSystemCollector(Collector):
             self.parent.handle_error(ex)
             return []
 
-    def gather_azure_disks_info(self, context, lvm_fullreport, device_lun_map):
+    def gather_azure_disks_info(self, context, lvm_fullreport, device_lun_map, topology=None):
         """
         Gather correlated Azure disk information with LUN, device mapping, and performance metrics.
 
         :param context: Context containing Azure metadata
-        :param lvm_fullreport: LVM fullreport JSON
+        :param lvm_fullreport: LVM fullreport as JSON text, dictionary or parsed LvmReport
         :param device_lun_map: Mapping of device names to LUN numbers
+        :param topology: Storage topology shared by the run, built from the context if not given
         :return: List of Azure disk information dictionaries
         :rtype: List[Dict[str, Any]]
         """
         azure_disks_info = []
 
         try:
-            imds_metadata = self._parse_metadata(
-                context.get("imds_disks_metadata", []), "IMDS disk"
-            )
-            azure_disk_data = self._parse_metadata(
-                context.get("azure_disks_metadata", []), "Azure disk"
-            )
-
-            diskname_to_details = {}
-            for disk_data in azure_disk_data:
-                disk_name = disk_data.get("name", "")
-                if disk_name:
-                    diskname_to_details[disk_name] = disk_data
-            lun_to_imds = {}
-            for disk_info in imds_metadata:
-                lun = disk_info.get("lun")
-                if lun is not None:
-                    lun_to_imds[str(lun)] = disk_info
-            device_to_vg = {}
-            if lvm_fullreport and lvm_fullreport.get("report"):
-                for report in lvm_fullreport.get("report", []):
-                    pvs = report.get("pv", [])
-                    vgs = report.get("vg", [])
-                    vg_name = vgs[0].get("vg_name") if vgs else ""
-
-                    for pv in pvs:
-                        pv_name = pv.get("pv_name", "")
-                        if pv_name:
-                            device_name = pv_name.split("/")[-1] if "/" in pv_name else pv_name
-                            device_to_vg[device_name] = vg_name
+            if topology is None:
+                topology = StorageTopology.from_context(
+                    context,
+                    self.parent.log,
+                    lvm_report=LvmReport.parse(lvm_fullreport) if lvm_fullreport else None,
+                )
             for device_name, lun in device_lun_map.items():
-                imds_data = lun_to_imds.get(str(lun), {})
+                imds_data = topology.get_imds_disk(lun) or {}
                 disk_name = imds_data.get("name", "")
-                disk_details = diskname_to_details.get(disk_name, {})
-                vg_name = device_to_vg.get(device_name, "")
+                disk_details = topology.get_disk(disk_name) or {}
+                vg_name = topology.get_device_vg(device_name)
 
                 azure_disks_info.append(
                     {
@@ -872,6 +705,29 @@ class FileSystemCollector(Collector):
 
         return anf_volumes_info
 
+    def _get_local_filesystems(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Read the mounted filesystems of the host the module runs on.
+
+        Only used when the context carries no filesystems of the node. When the module runs
+        on another host, e.g. delegated to the controller, its filesystems would be taken for
+        those of the node, so none are returned.
+
+        :param context: Context object
+        :type context: Dict[str, Any]
+        :return: Filesystems with target, source, fstype, options and usage
+        :rtype: List[Dict[str, Any]]
+        """
+        hostname = context.get("hostname")
+        if hostname and hostname != platform.node().split(".")[0]:
+            self.parent.log(
+                logging.WARNING,
+                f"The context carries no filesystems of {hostname} and the module runs on "
+                + f"{platform.node()}. Filesystem checks will have no data.",
+            )
+            return []
+        return LocalStorageDiscovery(self.parent).get_filesystems()
+
     def collect(self, check, context) -> Any:
         """
         Collect filesystem information
@@ -885,17 +741,22 @@ class FileSystemCollector(Collector):
         """
         try:
             lvm_fullreport = context.get("lvm_fullreport", "")
-            if not lvm_fullreport or lvm_fullreport == {} or not lvm_fullreport.get("report"):
+            try:
+                lvm_report = LvmReport.parse(lvm_fullreport or {})
+            except ValueError as ex:
+                self.parent.log(logging.ERROR, f"Failed to decode lvm_fullreport: {ex}")
+                lvm_report = LvmReport()
+            if not lvm_report.report_count:
                 self.parent.log(
                     logging.ERROR,
-                    f"lvm_fullreport is empty or invalid: {lvm_fullreport}. "
+                    f"lvm_fullreport is empty or invalid: {str(lvm_fullreport)[:500]}. "
                     f"LVM data collection may have failed. VG-to-disk mapping will not work.",
                 )
 
-            lvm_volumes, lvm_groups = self.collect_lvm_volumes(lvm_fullreport)
+            lvm_volumes, lvm_groups = self.collect_lvm_volumes(lvm_report)
 
-            findmnt_output = context.get("mount_info", "")
-            df_output = context.get("df_info", "")
+            findmnt_output = context.get("mount_info")
+            df_output = context.get("df_info")
 
             raw_anf_data = context.get("anf_storage_metadata", "")
             self.parent.log(
@@ -905,23 +766,21 @@ class FileSystemCollector(Collector):
                 f"First 500 chars: {str(raw_anf_data)[:500]}",
             )
 
-            azure_disk_data = self._parse_metadata(
-                context.get("azure_disks_metadata", []), "Azure disk"
-            )
-            afs_storage_data = self._parse_metadata(
-                context.get("afs_storage_metadata", ""), "AFS storage"
-            )
-            anf_storage_data = self._parse_metadata(raw_anf_data, "ANF storage")
-            imds_metadata = self._parse_metadata(
-                context.get("imds_disks_metadata", []), "IMDS disk"
+            topology = StorageTopology.from_context(
+                context, self.parent.log, lvm_volumes, lvm_report=lvm_report
             )
+            azure_disk_data = topology.azure_disks
+            afs_storage_data = topology.afs_shares
+            anf_storage_data = topology.anf_volumes
+            imds_metadata = topology.imds_disks
 
             device_lun_map = context.get("device_lun_map", {})
             vg_to_disk_names = {}
             if device_lun_map and imds_metadata:
                 vg_to_disk_names = self._map_vg_to_disk_names(
-                    lvm_fullreport, imds_metadata, device_lun_map
+                    lvm_report, imds_metadata, device_lun_map
                 )
+                topology.vg_to_disk_names = vg_to_disk_names
             elif imds_metadata:
                 self.parent.log(
                     logging.WARNING,
@@ -939,28 +798,41 @@ class FileSystemCollector(Collector):
                 f"VG→disk_names mapping: {vg_to_disk_names}",
             )
 
-            filesystems = self._parse_filesystem_data(
-                findmnt_output,
-                df_output,
-                lvm_volumes,
-                lvm_groups,
-                azure_disk_data=azure_disk_data,
-                anf_storage_data=anf_storage_data,
-                afs_storage_data=afs_storage_data,
-                vg_to_disk_names=vg_to_disk_names,
-            )
+            mounted_filesystems = context.get("mounted_filesystems")
+            if mounted_filesystems:
+                filesystems = self._correlate_filesystems(mounted_filesystems, topology)
+            elif findmnt_output is None and df_output is None:
+                filesystems = self._correlate_filesystems(
+                    self._get_local_filesystems(context), topology
+                )
+            else:
+                filesystems = self._parse_filesystem_data(
+                    findmnt_output or "",
+                    df_output or "",
+                    lvm_volumes,
+                    lvm_groups,
+                    azure_disk_data=azure_disk_data,
+                    anf_storage_data=anf_storage_data,
+                    afs_storage_data=afs_storage_data,
+                    vg_to_disk_names=vg_to_disk_names,
+                    topology=topology,
+                )
+            topology.index_filesystems(filesystems)
+            self.parent.storage_topology = topology
 
             formatted_filesystem_info = self.gather_all_filesystem_info(
                 context=context,
                 filesystems=filesystems,
                 lvm_volumes=lvm_volumes,
                 vg_to_disk_names=vg_to_disk_names,
+                topology=topology,
             )
 
             azure_disks_info = self.gather_azure_disks_info(
                 context=context,
-                lvm_fullreport=lvm_fullreport,
+                lvm_fullreport=lvm_report,
                 device_lun_map=device_lun_map,
+                topology=topology,
             )
 
             lvm_groups_info = self.gather_lvm_groups_info(
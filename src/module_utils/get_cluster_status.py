@@ -5,11 +5,15 @@
 Base class for cluster status checking implementations.
 """
 
+import gzip
+import io
 import logging
+import os
+import time
 from abc import abstractmethod
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Tuple
 
 try:
     from ansible.module_utils.sap_automation_qa import SapAutomationQA
@@ -18,6 +22,7 @@ try:
         STONITH_ACTION,
         PACEMAKER_STATUS,
         CLUSTER_STATUS,
+        CIB_ADMIN,
     )
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA
@@ -26,20 +31,191 @@ except ImportError:
         STONITH_ACTION,
         PACEMAKER_STATUS,
         CLUSTER_STATUS,
+        CIB_ADMIN,
     )
 
+POLL_INTERVAL = 5
+CLUSTER_STATUS_SECTIONS = ("summary", "nodes", "node_attributes")
+
+
+def parse_cluster_status(
+    cluster_status: str, resource_ids: Optional[Iterable[str]] = None
+) -> Tuple[ET.Element, Dict[str, ET.Element]]:
+    """
+    Extract the parts of crm_mon XML output used by the checkers in one streaming pass.
+
+    Only the summary, nodes and node_attributes sections and the wanted resources are
+    kept; every other element is cleared as soon as it has been read. The kept resources
+    are flattened into a single resources element, without their clone or group parents.
+
+    :param cluster_status: Output of crm_mon --output-as=xml
+    :type cluster_status: str
+    :param resource_ids: IDs of the resources to keep, None to keep all of them
+    :type resource_ids: Optional[Iterable[str]]
+    :return: Pruned cluster status and the kept resources by ID (first occurrence)
+    :rtype: Tuple[ET.Element, Dict[str, ET.Element]]
+    """
+    wanted = set(resource_ids) if resource_ids is not None else None
+    root = None
+    pruned = None
+    resources_by_id: Dict[str, ET.Element] = {}
+    kept_resources = []
+    depth = 0
+    for event, element in ET.iterparse(
+        io.BytesIO(cluster_status.encode("utf-8")), events=("start", "end")
+    ):
+        if event == "start":
+            if root is None:
+                root = element
+                pruned = ET.Element(element.tag, element.attrib)
+            depth += 1
+            continue
+        depth -= 1
+        if element.tag == "resource":
+            resource_id = element.get("id", "")
+            if wanted is None or resource_id in wanted:
+                kept_resources.append(element)
+                resources_by_id.setdefault(resource_id, element)
+            else:
+                element.clear()
+        elif depth == 1:
+            if element.tag in CLUSTER_STATUS_SECTIONS:
+                pruned.append(element)
+            else:
+                element.clear()
+            root.remove(element)
+
+    if pruned is None:
+        raise ET.ParseError("Empty cluster status")
+    resources = ET.SubElement(pruned, "resources")
+    resources.extend(kept_resources)
+    return pruned, resources_by_id
+
+
+def get_cluster_last_change(cluster_status: str) -> str:
+    """
+    Get the last configuration change reported in the summary of crm_mon XML output.
+
+    Parsing stops at the end of the summary, which crm_mon writes first.
+
+    :param cluster_status: Output of crm_mon --output-as=xml
+    :type cluster_status: str
+    :return: Attributes of the last_change element, or an empty string if there is none
+    :rtype: str
+    """
+    for _, element in ET.iterparse(io.BytesIO(cluster_status.encode("utf-8"))):
+        if element.tag == "last_change":
+            return " ".join(f"{name}={value}" for name, value in sorted(element.attrib.items()))
+        if element.tag == "summary":
+            break
+    return ""
+
+
+def get_cluster_property(configuration: ET.Element, name: str) -> Optional[str]:
+    """
+    Get a cluster property from the configuration section of the CIB.
+
+    :param configuration: Output of cibadmin --query --scope configuration
+    :type configuration: ET.Element
+    :param name: Name of the property, e.g. stonith-action
+    :type name: str
+    :return: Value of the property, or None if it is not set
+    :rtype: Optional[str]
+    """
+    for nvpair in configuration.iterfind("./crm_config/cluster_property_set/nvpair"):
+        if nvpair.get("name") == name:
+            return nvpair.get("value")
+    return None
+
+
+def get_resource_parameter(configuration: ET.Element, resource_id: str, name: str) -> Optional[str]:
+    """
+    Get an instance attribute of a resource from the configuration section of the CIB.
+
+    Like crm_resource --get-parameter, a clone or group ID resolves to its primitives.
+
+    :param configuration: Output of cibadmin --query --scope configuration
+    :type configuration: ET.Element
+    :param resource_id: ID of the primitive, clone or group
+    :type resource_id: str
+    :param name: Name of the instance attribute, e.g. AUTOMATED_REGISTER
+    :type name: str
+    :return: Value of the instance attribute, or None if it is not set
+    :rtype: Optional[str]
+    """
+    for resource in configuration.iterfind(f"./resources//*[@id='{resource_id}']"):
+        for nvpair in resource.iterfind(".//instance_attributes/nvpair"):
+            if nvpair.get("name") == name:
+                return nvpair.get("value")
+    return None
+
+
+def summarize_cluster_status(cluster_status_xml: ET.Element) -> Dict[str, Any]:
+    """
+    Build a compact view of crm_mon XML output.
+
+    :param cluster_status_xml: XML element containing cluster status.
+    :type cluster_status_xml: ET.Element
+    :return: Node states, resource roles by node and node attributes.
+    :rtype: Dict[str, Any]
+    """
+    nodes = {}
+    for node in cluster_status_xml.findall("./nodes/node"):
+        if node.get("unclean") == "true":
+            nodes[node.get("name", "")] = "unclean"
+        elif node.get("online") == "true":
+            nodes[node.get("name", "")] = "standby" if node.get("standby") == "true" else "online"
+        else:
+            nodes[node.get("name", "")] = "offline"
+
+    resources: Dict[str, Dict[str, Any]] = {}
+    for resource in cluster_status_xml.iter("resource"):
+        entry = resources.setdefault(
+            resource.get("id", ""),
+            {"agent": resource.get("resource_agent", ""), "roles": {}},
+        )
+        if resource.get("failed") == "true":
+            entry["failed"] = True
+        for node in resource.findall("node"):
+            entry["roles"][node.get("name", "")] = resource.get("role", "")
+
+    attributes = {
+        node.get("name", ""): {
+            attribute.get("name", ""): attribute.get("value", "")
+            for attribute in node.findall("attribute")
+        }
+        for node in cluster_status_xml.findall("./node_attributes/node")
+    }
+    return {"nodes": nodes, "resources": resources, "attributes": attributes}
+
 
 class BaseClusterStatusChecker(SapAutomationQA):
     """
     Base class to check the status of a pacemaker cluster.
+
+    The check either returns the first ready cluster status or, when given an expected
+    state, polls the cluster status until it matches or the timeout expires, so that
+    playbooks wait for a failover inside a single module run.
+
+    The result carries a compact cluster_summary of the last crm_mon output; the raw XML
+    is only returned or written to a compressed file on request.
+
+    In snapshot mode, the cluster properties and resource parameters are read from one
+    cibadmin query of the CIB configuration; their command line tools are only run for
+    values the configuration does not set.
     """
 
-    def __init__(self, ansible_os_family: OperatingSystemFamily):
+    def __init__(self, ansible_os_family: OperatingSystemFamily, use_snapshot: bool = False):
         super().__init__()
         self.ansible_os_family = ansible_os_family
+        self.use_snapshot = use_snapshot
+        self.cluster_configuration: Optional[ET.Element] = None
+        self.raw_cluster_status = ""
+        self.resources_by_id: Dict[str, ET.Element] = {}
         self.result.update(
             {
                 "cluster_status": "",
+                "cluster_summary": {},
                 "start": datetime.now(),
                 "end": None,
                 "pacemaker_status": "",
@@ -84,11 +260,51 @@ class BaseClusterStatusChecker(SapAutomationQA):
         """
         raise NotImplementedError("Child classes must implement this method")
 
+    def _get_status_resource_ids(self) -> Optional[Iterable[str]]:
+        """
+        Get the IDs of the resources the checker looks at in the cluster status.
+
+        :return: Resource IDs, or None to keep every resource.
+        :rtype: Optional[Iterable[str]]
+        """
+        return None
+
+    def _refresh_resource_ids(self, cluster_status: str) -> None:
+        """
+        Update the IDs of the resources the checker looks at from a new cluster status.
+
+        :param cluster_status: Output of crm_mon --output-as=xml
+        :type cluster_status: str
+        """
+
+    def _get_cluster_configuration(self) -> Optional[ET.Element]:
+        """
+        Get the configuration section of the CIB in snapshot mode, querying it once per run.
+
+        :return: CIB configuration, or None outside snapshot mode or if it could not be read.
+        :rtype: Optional[ET.Element]
+        """
+        if self.use_snapshot and self.cluster_configuration is None:
+            try:
+                self.cluster_configuration = ET.fromstring(
+                    self.execute_command_subprocess(CIB_ADMIN("configuration"))
+                )
+            except ET.ParseError as ex:
+                self.log(logging.WARNING, f"Failed to get the cluster configuration: {ex}")
+                self.use_snapshot = False
+        return self.cluster_configuration
+
     def _get_stonith_action(self) -> None:
         """
-        Retrieves the stonith action from the system.
+        Retrieves the stonith action from the CIB configuration or from the system.
         """
         self.result["stonith_action"] = "unknown"
+        configuration = self._get_cluster_configuration()
+        if configuration is not None:
+            stonith_action = get_cluster_property(configuration, "stonith-action")
+            if stonith_action:
+                self.result["stonith_action"] = stonith_action
+                return
         try:
             stonith_action = self.execute_command_subprocess(STONITH_ACTION[self.ansible_os_family])
             actions = [
@@ -142,24 +358,103 @@ class BaseClusterStatusChecker(SapAutomationQA):
                 self.result["message"] = f"Node {node.attrib['name']} is not online"
                 self.log(logging.WARNING, self.result["message"])
 
-    def run(self) -> Dict[str, str]:
+    def _matches_expected_state(self, expected_state: Dict[str, str]) -> bool:
+        """
+        Check if the last cluster status matches the expected state.
+
+        :param expected_state: Expected values by result key, e.g. {"primary_node": "node2"}
+        :type expected_state: Dict[str, str]
+        :return: True if every expected value matches, False otherwise.
+        :rtype: bool
+        """
+        return all(self.result.get(key) == value for key, value in expected_state.items())
+
+    def _update_cluster_status(self) -> None:
+        """
+        Retrieve the cluster status and process it.
+        """
+        self.raw_cluster_status = self.execute_command_subprocess(CLUSTER_STATUS)
+        self._refresh_resource_ids(self.raw_cluster_status)
+        cluster_status_xml, self.resources_by_id = parse_cluster_status(
+            self.raw_cluster_status, self._get_status_resource_ids()
+        )
+        self.result["cluster_summary"] = summarize_cluster_status(cluster_status_xml)
+        self.log(logging.INFO, "Cluster status retrieved")
+
+        self._validate_cluster_basic_status(cluster_status_xml)
+        self._process_node_attributes(cluster_status_xml=cluster_status_xml)
+
+    def _wait_for_state(
+        self, expected_state: Dict[str, str], timeout: float, interval: float
+    ) -> bool:
+        """
+        Poll the cluster status until it matches the expected state or the timeout expires.
+
+        Failing queries, e.g. while a node is being fenced, are logged and retried.
+
+        :param expected_state: Expected values by result key
+        :type expected_state: Dict[str, str]
+        :param timeout: Seconds to wait for the expected state
+        :type timeout: float
+        :param interval: Seconds between two cluster status queries
+        :type interval: float
+        :return: True if the expected state was reached, False otherwise.
+        :rtype: bool
+        """
+        deadline = time.monotonic() + timeout
+        polls = 0
+        while True:
+            polls += 1
+            try:
+                self._update_cluster_status()
+            except Exception as ex:
+                self.log(logging.WARNING, f"Failed to get cluster status: {ex}")
+            else:
+                if self._matches_expected_state(expected_state):
+                    reached = True
+                    break
+            if time.monotonic() + interval > deadline:
+                reached = False
+                break
+            time.sleep(interval)
+        self.result.update({"state_reached": reached, "polls": polls})
+        self.log(
+            logging.INFO if reached else logging.WARNING,
+            f"Expected cluster state {expected_state} "
+            + ("reached" if reached else "not reached")
+            + f" after {polls} cluster status queries",
+        )
+        return reached
+
+    def run(
+        self,
+        expected_state: Optional[Dict[str, str]] = None,
+        timeout: float = 0,
+        interval: float = POLL_INTERVAL,
+    ) -> Dict[str, str]:
         """
         Run the cluster status check.
 
+        :param expected_state: Expected values by result key to wait for, None to return the
+            first ready cluster status
+        :type expected_state: Optional[Dict[str, str]]
+        :param timeout: Seconds to wait for the expected state
+        :type timeout: float
+        :param interval: Seconds between two cluster status queries
+        :type interval: float
         :return: Result of the cluster status check.
         :rtype: Dict[str, str]
         """
         self.log(logging.INFO, "Starting cluster status check")
         self._get_stonith_action()
+        reached = not expected_state
 
         try:
-            while not self._is_cluster_ready():
-                self.result["cluster_status"] = self.execute_command_subprocess(CLUSTER_STATUS)
-                cluster_status_xml = ET.fromstring(self.result["cluster_status"])
-                self.log(logging.INFO, "Cluster status retrieved")
-
-                self._validate_cluster_basic_status(cluster_status_xml)
-                self._process_node_attributes(cluster_status_xml=cluster_status_xml)
+            if expected_state:
+                reached = self._wait_for_state(expected_state, timeout, interval)
+            else:
+                while not self._is_cluster_ready():
+                    self._update_cluster_status()
 
             if not self._is_cluster_stable():
                 self.result["message"] = "Pacemaker cluster isn't stable"
@@ -169,6 +464,34 @@ class BaseClusterStatusChecker(SapAutomationQA):
             self.handle_error(ex)
 
         self.result["end"] = datetime.now()
-        self.result["status"] = TestStatus.SUCCESS.value
+        if reached:
+            self.result["status"] = TestStatus.SUCCESS.value
+        else:
+            self.result["status"] = TestStatus.ERROR.value
+            message = f"Cluster did not reach the expected state {expected_state} within {timeout}s"
+            self.result["message"] = message
         self.log(logging.INFO, "Cluster status check completed")
         return self.result
+
+    def export_raw_status(self, include: bool = False, status_file: Optional[str] = None) -> None:
+        """
+        Return the raw crm_mon XML output of the last query, or write it to a gzip file.
+
+        :param include: Add the XML to the result as cluster_status_xml
+        :type include: bool
+        :param status_file: Path of a gzip file to write the XML to, returned as
+            cluster_status_file
+        :type status_file: Optional[str]
+        """
+        if include:
+            self.result["cluster_status_xml"] = self.raw_cluster_status
+        if status_file and self.raw_cluster_status:
+            try:
+                os.makedirs(os.path.dirname(status_file) or ".", exist_ok=True)
+                with gzip.open(status_file, "wt", encoding="utf-8") as raw_status:
+                    raw_status.write(self.raw_cluster_status)
+                self.result["cluster_status_file"] = status_file
+            except OSError as ex:
+                self.log(
+                    logging.WARNING, f"Could not write the cluster status to {status_file}: {ex}"
+                )
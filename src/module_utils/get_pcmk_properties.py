@@ -11,17 +11,22 @@ Classes:
     BaseHAClusterValidator: Base validator class for cluster configurations.
 """
 
+import copy
 import logging
+import time
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from ansible.module_utils.sap_automation_qa import SapAutomationQA
     from ansible.module_utils.enums import OperatingSystemFamily, Parameters, TestStatus
     from ansible.module_utils.commands import CIB_ADMIN, RECOMMENDATION_MESSAGES
+    from ansible.module_utils.pcmk_constants import load_compiled_constants
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA
     from src.module_utils.enums import OperatingSystemFamily, Parameters, TestStatus
     from src.module_utils.commands import CIB_ADMIN, RECOMMENDATION_MESSAGES
+    from src.module_utils.pcmk_constants import load_compiled_constants
 
 
 class BaseHAClusterValidator(SapAutomationQA, ABC):
@@ -55,6 +60,8 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         fencing_mechanism: str,
         cib_output: str = "",
         category=None,
+        constants_cache_dir=None,
+        concurrent=False,
     ):
         """
         Initialize the base validator.
@@ -71,6 +78,10 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         :type fencing_mechanism: str
         :param category: Category being processed (optional)
         :type category: str
+        :param constants_cache_dir: Directory caching the compiled constants on disk (optional)
+        :type constants_cache_dir: str
+        :param concurrent: Validate the categories concurrently in live mode (optional)
+        :type concurrent: bool
         """
         super().__init__()
         self.os_type = os_type.value.upper()
@@ -80,7 +91,36 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         self.fencing_mechanism = fencing_mechanism
         self.constants = constants
         self.cib_output = cib_output
+        self.constants_cache_dir = constants_cache_dir
+        self.concurrent = concurrent
+        self.nfs_provider = None
+        self._live_cib = None
         self.missing_required_items = []
+        self._compiled_constants = None
+        self._compiled_constants_key = None
+
+    def _get_compiled_constants(self):
+        """
+        Get the expected values of the constants, compiled for the current configuration.
+
+        :return: The compiled constants.
+        :rtype: CompiledConstants
+        """
+        key = (id(self.constants), self.os_type, self.fencing_mechanism, self.nfs_provider)
+        if self._compiled_constants_key != key:
+            self._compiled_constants = load_compiled_constants(
+                self.constants,
+                self.os_type,
+                self.fencing_mechanism,
+                {
+                    category: defaults_key
+                    for category, (_, defaults_key) in self.BASIC_CATEGORIES.items()
+                },
+                self.nfs_provider,
+                self.constants_cache_dir,
+            )
+            self._compiled_constants_key = key
+        return self._compiled_constants
 
     def _get_expected_value(self, category, name):
         """
@@ -93,33 +133,7 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         :return: The expected value for the configuration parameter.
         :rtype: tuple(str, bool)
         """
-        _, defaults_key = self.BASIC_CATEGORIES[category]
-
-        fence_config = self.constants["VALID_CONFIGS"].get(self.fencing_mechanism, {})
-        os_config = self.constants["VALID_CONFIGS"].get(self.os_type, {})
-
-        fence_param = fence_config.get(name, {})
-        if fence_param:
-            if isinstance(fence_param, dict) and fence_param.get("value"):
-                return (fence_param.get("value", ""), fence_param.get("required", False))
-            elif isinstance(fence_param, (str, list)):
-                return (fence_param, False)
-
-        os_param = os_config.get(name, {})
-        if os_param:
-            if isinstance(os_param, dict) and os_param.get("value"):
-                return (os_param.get("value", ""), os_param.get("required", False))
-            elif isinstance(os_param, (str, list)):
-                return (os_param, False)
-
-        default_param = self.constants[defaults_key].get(name, {})
-        if default_param:
-            if isinstance(default_param, dict) and default_param.get("value"):
-                return (default_param.get("value", ""), default_param.get("required", False))
-            elif isinstance(default_param, (str, list)):
-                return (default_param, False)
-
-        return None
+        return self._get_compiled_constants().get(category, name)
 
     def _get_resource_expected_value(self, resource_type, section, param_name, op_name=None):
         """
@@ -136,19 +150,7 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         :return: The expected value for the resource configuration parameter.
         :rtype: tuple(str, bool)
         """
-        resource_defaults = (
-            self.constants["RESOURCE_DEFAULTS"].get(self.os_type, {}).get(resource_type, {})
-        )
-        attr = None
-        if section == "meta_attributes":
-            attr = resource_defaults.get("meta_attributes", {}).get(param_name)
-        elif section == "operations":
-            ops = resource_defaults.get("operations", {}).get(op_name, {})
-            attr = ops.get(param_name)
-        elif section == "instance_attributes":
-            attr = resource_defaults.get("instance_attributes", {}).get(param_name)
-
-        return (attr.get("value"), attr.get("required", False)) if attr else None
+        return self._get_compiled_constants().get(resource_type, param_name, section, op_name)
 
     def _create_parameter(
         self,
@@ -180,17 +182,21 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         :return: A dictionary representing the parameter.
         :rtype: dict
         """
+        provider_values = None
         if expected_value is None:
             expected_config = self._get_expected_value_for_category(
                 category, subcategory, name, op_name
             )
+            provider_values = self._get_provider_values_for_category(
+                category, subcategory, name, op_name
+            )
         else:
             if isinstance(expected_value, tuple) and len(expected_value) == 2:
                 expected_config = expected_value  # Already in correct format
             else:
                 expected_config = (expected_value, False)
 
-        status = self._determine_parameter_status(value, expected_config)
+        status = self._determine_parameter_status(value, expected_config, provider_values)
 
         if status == TestStatus.WARNING.value and not value:
             self._handle_missing_required_parameter(
@@ -258,7 +264,30 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         else:
             return self._get_expected_value(category, name)
 
-    def _determine_parameter_status(self, value, expected_config):
+    def _get_provider_values_for_category(self, category, subcategory, name, op_name):
+        """
+        Get the values resolved for the NFS provider of a parameter based on category type.
+        This method can be overridden by subclasses for custom logic.
+
+        :param category: The category of the configuration parameter.
+        :type category: str
+        :param subcategory: The subcategory of the configuration parameter.
+        :type subcategory: str
+        :param name: The name of the configuration parameter.
+        :type name: str
+        :param op_name: The name of the operation (if applicable).
+        :type op_name: str
+        :return: The resolved values, or None if the expected value is not given per provider.
+        :rtype: list or None
+        """
+        if category in self.RESOURCE_CATEGORIES:
+            return self._get_compiled_constants().get_provider_values(
+                category, name, subcategory, op_name
+            )
+        else:
+            return self._get_compiled_constants().get_provider_values(category, name)
+
+    def _determine_parameter_status(self, value, expected_config, provider_values=None):
         """
         Determine the status of a parameter based on its value and expected value.
 
@@ -266,6 +295,9 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         :type value: str
         :param expected_config: The expected value of the parameter and bool indicating if required.
         :type expected_config: tuple(str, bool)
+        :param provider_values: The values resolved for the NFS provider, if the expected value
+            is given per provider, defaults to None
+        :type provider_values: list, optional
         :return: The status of the parameter.
         :rtype: str
         """
@@ -287,6 +319,9 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
             else:
                 return TestStatus.INFO.value
 
+        if provider_values is not None:
+            expected_value = provider_values
+
         if expected_value is None or expected_value == "":
             return TestStatus.INFO.value
         elif isinstance(expected_value, list):
@@ -384,23 +419,25 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         parameters = []
 
         os_parameters = self.constants["OS_PARAMETERS"].get("DEFAULTS", {})
+        expected_parameters = [
+            (section, param_name, expected_value)
+            for section, params in os_parameters.items()
+            for param_name, expected_value in params.items()
+        ]
+        outputs = self.execute_many(
+            [[section, param_name] for section, param_name, _ in expected_parameters]
+        )
 
-        for section, params in os_parameters.items():
-            for param_name, expected_value in params.items():
-                value = (
-                    self.execute_command_subprocess(command=[section, param_name])
-                    .strip()
-                    .split("\n")[0]
-                )
-                parameters.append(
-                    self._create_parameter(
-                        category="os",
-                        id=section,
-                        name=param_name,
-                        value=value,
-                        expected_value=expected_value.get("value", "") if expected_value else None,
-                    )
+        for (section, param_name, expected_value), output in zip(expected_parameters, outputs):
+            parameters.append(
+                self._create_parameter(
+                    category="os",
+                    id=section,
+                    name=param_name,
+                    value=output.strip().split("\n")[0],
+                    expected_value=expected_value.get("value", "") if expected_value else None,
                 )
+            )
 
         return parameters
 
@@ -520,35 +557,150 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
             return self.cib_output.find(xpath)
         return None
 
-    def validate_from_constants(self):
+    def _get_scope(self, scope):
         """
-        Constants-first validation approach: iterate through constants and validate against CIB.
-        This ensures all expected parameters are checked, with offline validation support.
+        Get a scope of the CIB from the CIB output, the live CIB snapshot or cibadmin.
+
+        :param scope: The scope to get (e.g., 'resources', 'constraints')
+        :type scope: str
+        :return: XML element for the scope
+        :rtype: xml.etree.ElementTree.Element or None
         """
-        parameters = []
+        if self.cib_output:
+            return self._get_scope_from_cib(scope)
+        if self._live_cib is not None:
+            live_cib = self._live_cib.result()
+            if live_cib is not None:
+                return live_cib.find(f".//{scope}")
+        return self.parse_xml_output(self.execute_command_subprocess(CIB_ADMIN(scope=scope)))
 
-        for category in ["crm_config", "rsc_defaults", "op_defaults"]:
-            if not self._should_skip_scope(category):
-                parameters.extend(self._validate_basic_constants(category))
-        parameters.extend(self._validate_resource_constants())
-        parameters.extend(self._validate_constraint_constants())
-        try:
-            if not self.cib_output:
-                parameters.extend(self._parse_os_parameters())
-            else:
-                self.result["message"] += "CIB output provided, skipping OS parameters parsing. "
-        except Exception as ex:
-            self.result["message"] += f"Failed to get OS parameters: {str(ex)} "
+    def _get_live_cib(self):
+        """
+        Query the configuration section of the live CIB once for all categories.
 
-        try:
-            if not self.cib_output:
-                parameters.extend(self._get_additional_parameters())
-            else:
+        :return: XML element of the configuration, or None to query each scope separately
+        :rtype: xml.etree.ElementTree.Element or None
+        """
+        configuration = self.parse_xml_output(
+            self.execute_command_subprocess(CIB_ADMIN(scope="configuration"))
+        )
+        return configuration if configuration.tag == "configuration" else None
+
+    def _validate_category(self, category):
+        """
+        Validate the parameters of one category.
+
+        :param category: crm_config, rsc_defaults, op_defaults, resources, constraints, os or
+            additional
+        :type category: str
+        :return: A list of parameter dictionaries
+        :rtype: list
+        """
+        if category in self.BASIC_CATEGORIES:
+            return self._validate_basic_constants(category)
+        if category == "resources":
+            return self._validate_resource_constants()
+        if category == "constraints":
+            return self._validate_constraint_constants()
+        if category == "os":
+            try:
+                if not self.cib_output:
+                    return self._parse_os_parameters()
+                self.result["message"] += "CIB output provided, skipping OS parameters parsing. "
+            except Exception as ex:
+                self.result["message"] += f"Failed to get OS parameters: {str(ex)} "
+        elif category == "additional":
+            try:
+                if not self.cib_output:
+                    return self._get_additional_parameters()
                 self.result[
                     "message"
                 ] += "CIB output provided, skipping additional parameters parsing. "
-        except Exception as ex:
-            self.result["message"] += f"Failed to get additional parameters: {str(ex)} "
+            except Exception as ex:
+                self.result["message"] += f"Failed to get additional parameters: {str(ex)} "
+        return []
+
+    @staticmethod
+    def _run_category(validator, category):
+        """
+        Validate one category and measure how long it takes.
+
+        :param validator: Validator to run the category on
+        :type validator: BaseHAClusterValidator
+        :param category: The category to validate
+        :type category: str
+        :return: The parameters of the category and the elapsed seconds
+        :rtype: tuple(list, float)
+        """
+        start = time.perf_counter()
+        parameters = validator._validate_category(category)
+        return parameters, round(time.perf_counter() - start, 3)
+
+    def _validate_categories_concurrently(self, categories):
+        """
+        Validate the categories in worker threads while the live CIB is being queried.
+
+        Every worker validates a shallow copy of the validator with its own message, logs
+        and missing items, which are merged back in category order, so the result does not
+        depend on the order the workers finish in.
+
+        :param categories: The categories to validate
+        :type categories: list
+        :return: The parameters and elapsed seconds of each category, in category order
+        :rtype: list
+        """
+        self._get_compiled_constants()
+        workers = []
+        for _ in categories:
+            worker = copy.copy(self)
+            worker.result = {**self.result, "message": "", "logs": []}
+            worker.missing_required_items = []
+            workers.append(worker)
+
+        with ThreadPoolExecutor(max_workers=len(categories) + 1) as executor:
+            self._live_cib = executor.submit(self._get_live_cib)
+            for worker in workers:
+                worker._live_cib = self._live_cib
+            futures = [
+                executor.submit(self._run_category, worker, category)
+                for worker, category in zip(workers, categories)
+            ]
+            results = [future.result() for future in futures]
+
+        initial_result = dict(self.result)
+        for worker in workers:
+            self.result["message"] += worker.result["message"]
+            self.result["logs"].extend(worker.result["logs"])
+            self.missing_required_items.extend(worker.missing_required_items)
+            for key, value in worker.result.items():
+                if key not in ("message", "logs") and value != initial_result.get(key):
+                    self.result[key] = value
+        return results
+
+    def validate_from_constants(self):
+        """
+        Constants-first validation approach: iterate through constants and validate against CIB.
+        This ensures all expected parameters are checked, with offline validation support.
+
+        In concurrent live mode, the categories are validated by worker threads sharing one
+        query of the CIB configuration. The seconds spent on each category are returned in
+        the timings of the details.
+        """
+        categories = [
+            category
+            for category in ["crm_config", "rsc_defaults", "op_defaults"]
+            if not self._should_skip_scope(category)
+        ] + ["resources", "constraints", "os", "additional"]
+
+        if self.concurrent and not self.cib_output:
+            results = self._validate_categories_concurrently(categories)
+        else:
+            results = [self._run_category(self, category) for category in categories]
+
+        parameters = [
+            parameter for category_parameters, _ in results for parameter in category_parameters
+        ]
+        timings = {category: elapsed for category, (_, elapsed) in zip(categories, results)}
 
         failed_parameters = [
             param
@@ -591,7 +743,7 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
 
         self.result.update(
             {
-                "details": {"parameters": parameters},
+                "details": {"parameters": parameters, "timings": timings},
                 "status": overall_status,
             }
         )
@@ -660,12 +812,7 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
         """
         param_value, param_id = "", ""
         try:
-            if self.cib_output:
-                root = self._get_scope_from_cib(category)
-            else:
-                root = self.parse_xml_output(
-                    self.execute_command_subprocess(CIB_ADMIN(scope=category))
-                )
+            root = self._get_scope(category)
 
             if not root:
                 return param_value, param_id
@@ -704,12 +851,7 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
             return
 
         try:
-            if self.cib_output:
-                resource_scope = self._get_scope_from_cib("resources")
-            else:
-                resource_scope = self.parse_xml_output(
-                    self.execute_command_subprocess(CIB_ADMIN(scope="resources"))
-                )
+            resource_scope = self._get_scope("resources")
             if resource_scope is None:
                 return
 
@@ -775,12 +917,7 @@ class BaseHAClusterValidator(SapAutomationQA, ABC):
             return parameters
 
         try:
-            if self.cib_output:
-                constraints_scope = self._get_scope_from_cib("constraints")
-            else:
-                constraints_scope = self.parse_xml_output(
-                    self.execute_command_subprocess(CIB_ADMIN(scope="constraints"))
-                )
+            constraints_scope = self._get_scope("constraints")
 
             if constraints_scope is not None:
                 for constraint_type, constraint_config in self.constants["CONSTRAINTS"].items():
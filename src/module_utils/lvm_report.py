@@ -0,0 +1,211 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Compact records for the LVM full report in SAP Automation QA
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+
+class PhysicalVolume:
+    """
+    Physical volume of an LVM report.
+    """
+
+    __slots__ = ("name", "vg_name")
+
+    def __init__(self, name: str, vg_name: str):
+        self.name = name
+        self.vg_name = vg_name
+
+    @property
+    def device_name(self) -> str:
+        """
+        Kernel device name of the physical volume, e.g. sdc for /dev/sdc.
+        """
+        return self.name.split("/")[-1]
+
+
+class VolumeGroup:
+    """
+    Volume group of an LVM report.
+    """
+
+    __slots__ = ("name", "pv_count", "lv_count", "size")
+
+    def __init__(self, name: str, pv_count: Any, lv_count: Any, size: Optional[str]):
+        self.name = name
+        self.pv_count = pv_count
+        self.lv_count = lv_count
+        self.size = size
+
+
+class LogicalVolume:
+    """
+    Logical volume of an LVM report.
+    """
+
+    __slots__ = ("name", "vg_name", "uuid", "path", "dm_path", "layout", "size")
+
+    def __init__(
+        self,
+        name: str,
+        vg_name: str,
+        uuid: Optional[str],
+        path: Optional[str],
+        dm_path: Optional[str],
+        layout: Optional[str],
+        size: Optional[str],
+    ):
+        self.name = name
+        self.vg_name = vg_name
+        self.uuid = uuid
+        self.path = path
+        self.dm_path = dm_path
+        self.layout = layout
+        self.size = size
+
+
+class Segment:
+    """
+    Segment of an LVM logical volume.
+    """
+
+    __slots__ = ("lv_uuid", "stripes", "stripe_size")
+
+    def __init__(self, lv_uuid: Optional[str], stripes: Any, stripe_size: Any):
+        self.lv_uuid = lv_uuid
+        self.stripes = stripes
+        self.stripe_size = stripe_size
+
+
+class LvmReport:
+    """
+    Physical volumes, volume groups, logical volumes and segments of an LVM full report.
+
+    The report is built from the output of "lvm fullreport --reportformat json". Raw JSON
+    text is decoded one volume group report at a time, so only the compact records of the
+    whole report are kept in memory.
+    """
+
+    __slots__ = ("report_count", "pvs", "vgs", "lvs", "segments", "_segment_by_lv")
+
+    def __init__(self):
+        self.report_count = 0
+        self.pvs: List[PhysicalVolume] = []
+        self.vgs: List[VolumeGroup] = []
+        self.lvs: List[LogicalVolume] = []
+        self.segments: List[Segment] = []
+        self._segment_by_lv: Dict[str, Segment] = {}
+
+    @classmethod
+    def parse(cls, lvm_fullreport: Union[str, Dict[str, Any], "LvmReport"]) -> "LvmReport":
+        """
+        Parse an LVM full report.
+
+        :param lvm_fullreport: Report as raw JSON text, decoded dictionary or parsed report
+        :type lvm_fullreport: Union[str, Dict[str, Any], LvmReport]
+        :return: Parsed report
+        :rtype: LvmReport
+        :raises TypeError: If the report is of an unsupported type
+        """
+        if isinstance(lvm_fullreport, LvmReport):
+            return lvm_fullreport
+        if isinstance(lvm_fullreport, str):
+            reports = _iter_json_reports(lvm_fullreport)
+        elif isinstance(lvm_fullreport, dict):
+            reports = iter(lvm_fullreport.get("report", []))
+        else:
+            raise TypeError(f"Unsupported LVM report type: {type(lvm_fullreport)}")
+
+        lvm_report = cls()
+        for report in reports:
+            lvm_report.add_report(report)
+        return lvm_report
+
+    def add_report(self, report: Dict[str, Any]) -> None:
+        """
+        Add the records of one volume group report.
+
+        Physical volumes belong to the first volume group of their report; the report of
+        orphan physical volumes has none.
+
+        :param report: Decoded entry of the "report" list
+        :type report: Dict[str, Any]
+        """
+        self.report_count += 1
+        vg_names = [vg.get("vg_name") for vg in report.get("vg", []) if vg.get("vg_name")]
+        vg_name = vg_names[0] if vg_names else ""
+        for pv in report.get("pv", []):
+            if pv.get("pv_name"):
+                self.pvs.append(PhysicalVolume(pv["pv_name"], vg_name))
+        for vg in report.get("vg", []):
+            self.vgs.append(
+                VolumeGroup(
+                    vg.get("vg_name"),
+                    vg.get("pv_count", 0),
+                    vg.get("lv_count", 0),
+                    vg.get("vg_size"),
+                )
+            )
+        for lv in report.get("lv", []):
+            lv_full_name = lv.get("lv_full_name") or ""
+            self.lvs.append(
+                LogicalVolume(
+                    lv.get("lv_name"),
+                    lv_full_name.split("/")[0] if "/" in lv_full_name else lv.get("vg_name") or "",
+                    lv.get("lv_uuid"),
+                    lv.get("lv_path"),
+                    lv.get("lv_dm_path"),
+                    lv.get("lv_layout"),
+                    lv.get("lv_size"),
+                )
+            )
+        for seg in report.get("seg", []):
+            segment = Segment(
+                seg.get("lv_uuid"), seg.get("stripes", ""), seg.get("stripe_size", "")
+            )
+            self.segments.append(segment)
+            self._segment_by_lv.setdefault(segment.lv_uuid, segment)
+
+    def get_segment(self, lv_uuid: Optional[str]) -> Optional[Segment]:
+        """
+        Get the first segment of a logical volume.
+
+        :param lv_uuid: UUID of the logical volume
+        :type lv_uuid: Optional[str]
+        :return: Segment or None
+        :rtype: Optional[Segment]
+        """
+        return self._segment_by_lv.get(lv_uuid)
+
+
+def _iter_json_reports(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Decode the entries of the "report" list of raw LVM JSON output one at a time.
+
+    Anything after the list, such as the LVM log or warnings printed on stderr, is ignored.
+
+    :param text: Raw output of "lvm fullreport --reportformat json"
+    :type text: str
+    :return: Iterator over the decoded report entries
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    decoder = json.JSONDecoder()
+    key = text.find('"report"')
+    if key < 0:
+        return
+    position = text.find("[", key) + 1
+    if position == 0:
+        return
+    length = len(text)
+    while position < length:
+        while position < length and text[position] in " \t\r\n,":
+            position += 1
+        if position >= length or text[position] == "]":
+            return
+        report, position = decoder.raw_decode(text, position)
+        if isinstance(report, dict):
+            yield report
@@ -0,0 +1,173 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Timeout-bounded probing of mounted filesystems in SAP Automation QA
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Tuple
+
+PROBE_TIMEOUT = 10
+STAT_FILESYSTEM = ["stat", "--file-system", "--format", "%b %f %a %S", "--"]
+
+FilesystemStats = namedtuple("FilesystemStats", ["f_blocks", "f_bfree", "f_bavail", "f_frsize"])
+
+
+class MountProbe:
+    """
+    Stats mount points in parallel without letting an unresponsive one block the others.
+
+    Local mount points are stat'ed with statvfs in daemon threads. Mount points listed as
+    isolated, typically NFS shares, are stat'ed by a "stat --file-system" child process in
+    its own session, which is killed when it does not answer in time, so a hung server
+    leaves no blocked thread behind in the module. Mount points that do not answer are
+    recorded in stale_mounts.
+    """
+
+    def __init__(self, parent: Any, timeout: float = PROBE_TIMEOUT):
+        """
+        :param parent: Module logging the probe results
+        :type parent: SapAutomationQA
+        :param timeout: Seconds to wait for all mount points to answer
+        :type timeout: float
+        """
+        self.parent = parent
+        self.timeout = timeout
+        self.stale_mounts: List[str] = []
+
+    def probe(self, targets: Iterable[str], isolated: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Stat the given mount points.
+
+        :param targets: Mount points to stat in-process
+        :type targets: Iterable[str]
+        :param isolated: Mount points to stat in a child process
+        :type isolated: Iterable[str]
+        :return: statvfs result by mount point, for the mount points that answered
+        :rtype: Dict[str, Any]
+        """
+        deadline = time.monotonic() + self.timeout
+        isolated = list(dict.fromkeys(isolated))
+        processes = {target: self._start_process(target) for target in isolated}
+        threads, results = self._start_threads(
+            [target for target in dict.fromkeys(targets) if target not in processes]
+        )
+
+        stats = {}
+        for target, thread in threads.items():
+            thread.join(max(0, deadline - time.monotonic()))
+            if thread.is_alive():
+                self._mark_stale(target)
+            elif isinstance(results.get(target), OSError):
+                self.parent.log(logging.WARNING, f"Could not stat {target}: {results[target]}")
+            else:
+                stats[target] = results[target]
+        for target, process in processes.items():
+            if process is None:
+                continue
+            result = self._wait_process(target, process, deadline)
+            if result is not None:
+                stats[target] = result
+        return stats
+
+    def _start_threads(
+        self, targets: List[str]
+    ) -> Tuple[Dict[str, threading.Thread], Dict[str, Any]]:
+        """
+        Start one statvfs daemon thread per mount point.
+
+        :param targets: Mount points
+        :type targets: List[str]
+        :return: Threads by mount point and the dictionary they store their result in
+        :rtype: Tuple[Dict[str, threading.Thread], Dict[str, Any]]
+        """
+        results: Dict[str, Any] = {}
+
+        def stat(target: str) -> None:
+            try:
+                results[target] = os.statvfs(target)
+            except OSError as ex:
+                results[target] = ex
+
+        threads = {}
+        for target in targets:
+            threads[target] = threading.Thread(target=stat, args=(target,), daemon=True)
+            threads[target].start()
+        return threads, results
+
+    def _start_process(self, target: str) -> Any:
+        """
+        Start the child process stat'ing an isolated mount point.
+
+        :param target: Mount point
+        :type target: str
+        :return: Child process, or None if it could not be started
+        :rtype: subprocess.Popen
+        """
+        try:
+            return subprocess.Popen(
+                STAT_FILESYSTEM + [target],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+        except OSError as ex:
+            self.parent.log(logging.WARNING, f"Could not stat {target}: {ex}")
+            return None
+
+    def _wait_process(self, target: str, process: Any, deadline: float) -> Any:
+        """
+        Wait for the child process of a mount point until the deadline, killing it if late.
+
+        :param target: Mount point
+        :type target: str
+        :param process: Child process
+        :type process: subprocess.Popen
+        :param deadline: time.monotonic() value after which the mount point is stale
+        :type deadline: float
+        :return: Filesystem statistics, or None if the mount point failed or is stale
+        :rtype: FilesystemStats
+        """
+        try:
+            stdout, stderr = process.communicate(timeout=max(0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            if process.poll() is not None:
+                return self._wait_process(target, process, time.monotonic() + 1)
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            for stream in (process.stdout, process.stderr):
+                stream.close()
+            self._mark_stale(target)
+            return None
+        if process.returncode != 0:
+            self.parent.log(
+                logging.WARNING,
+                f"Could not stat {target}: {stderr.decode('utf-8', 'replace').strip()}",
+            )
+            return None
+        try:
+            return FilesystemStats(*(int(value) for value in stdout.split()))
+        except (TypeError, ValueError):
+            self.parent.log(logging.WARNING, f"Could not stat {target}: unexpected output")
+            return None
+
+    def _mark_stale(self, target: str) -> None:
+        """
+        Record a mount point that did not answer in time.
+
+        :param target: Mount point
+        :type target: str
+        """
+        self.stale_mounts.append(target)
+        self.parent.log(
+            logging.WARNING, f"Could not stat {target}: no answer within {self.timeout}s"
+        )
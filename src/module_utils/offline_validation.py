@@ -0,0 +1,195 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Batch offline validation of recorded Pacemaker CIB files in SAP Automation QA
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from ansible.module_utils.sap_automation_qa import SapAutomationQA
+    from ansible.module_utils.enums import TestStatus
+except ImportError:
+    from src.module_utils.sap_automation_qa import SapAutomationQA
+    from src.module_utils.enums import TestStatus
+
+_WORKER_STATE: Dict[str, Tuple[type, Dict[str, Any]]] = {}
+
+
+def get_cib_hostname(cib_file: str) -> str:
+    """
+    Get the host a CIB file was recorded on, from its offline_validation/<host>/cib path.
+
+    :param cib_file: Path of the CIB file
+    :type cib_file: str
+    :return: Host name
+    :rtype: str
+    """
+    return os.path.basename(os.path.dirname(os.path.abspath(cib_file)))
+
+
+def _init_worker(validator_class: type, validator_kwargs: Dict[str, Any]) -> None:
+    """
+    Keep the validator class and its arguments, including the constants, in the worker.
+
+    Workers are forked, so the arguments are inherited instead of being sent per file.
+    """
+    _WORKER_STATE["validator"] = (validator_class, validator_kwargs)
+
+
+def _validate_cib_file(cib_file: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Validate one CIB file with the validator of the worker.
+
+    :param cib_file: Path of the CIB file
+    :type cib_file: str
+    :return: Host name and validation result
+    :rtype: Tuple[str, Dict[str, Any]]
+    """
+    validator_class, validator_kwargs = _WORKER_STATE["validator"]
+    hostname = get_cib_hostname(cib_file)
+    try:
+        with open(cib_file, "r", encoding="utf-8") as cib:
+            cib_output = cib.read()
+    except OSError as ex:
+        return hostname, {
+            "status": TestStatus.ERROR.value,
+            "message": f"Could not read CIB file {cib_file}: {ex}",
+            "details": {"parameters": []},
+        }
+    if not cib_output.strip():
+        return hostname, {
+            "status": TestStatus.ERROR.value,
+            "message": f"CIB file {cib_file} is empty",
+            "details": {"parameters": []},
+        }
+    validator = validator_class(
+        virtual_machine_name=hostname, cib_output=cib_output, **validator_kwargs
+    )
+    result = validator.get_result()
+    return hostname, {
+        "status": result["status"],
+        "message": result["message"],
+        "details": result["details"],
+    }
+
+
+class OfflineCIBValidator(SapAutomationQA):
+    """
+    Validates the CIB files recorded on many hosts in one module call.
+
+    The files are validated concurrently by a pool of forked worker processes, which inherit
+    the validator arguments and the already parsed constants. The result holds the result of
+    every host and the parameters whose values differ between hosts.
+    """
+
+    def __init__(
+        self,
+        validator_class: type,
+        validator_kwargs: Dict[str, Any],
+        max_workers: Optional[int] = None,
+    ):
+        """
+        :param validator_class: HAClusterValidator class of the DB or SCS module
+        :type validator_class: type
+        :param validator_kwargs: Arguments of the validator besides the host and CIB content
+        :type validator_kwargs: Dict[str, Any]
+        :param max_workers: Number of worker processes, defaults to the number of CPUs
+        :type max_workers: Optional[int]
+        """
+        super().__init__()
+        self.validator_class = validator_class
+        self.validator_kwargs = validator_kwargs
+        self.max_workers = max_workers
+
+    def _validate_all(self, cib_files: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Validate the CIB files, in worker processes when there are several of them.
+
+        :param cib_files: Paths of the CIB files
+        :type cib_files: List[str]
+        :return: Host name and validation result of every file, in input order
+        :rtype: List[Tuple[str, Dict[str, Any]]]
+        """
+        workers = min(len(cib_files), self.max_workers or os.cpu_count() or 1)
+        initargs = (self.validator_class, self.validator_kwargs)
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=initargs,
+            ) as executor:
+                return list(executor.map(_validate_cib_file, cib_files))
+        _init_worker(*initargs)
+        return [_validate_cib_file(cib_file) for cib_file in cib_files]
+
+    def compare_hosts(self, hosts: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Find the parameters whose values differ between hosts.
+
+        Parameters are matched by category, ID and name. A parameter missing on some hosts
+        is reported with a None value for them.
+
+        :param hosts: Validation result by host
+        :type hosts: Dict[str, Dict[str, Any]]
+        :return: Differing parameters with their value on every host
+        :rtype: List[Dict[str, Any]]
+        """
+        values: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for hostname, result in hosts.items():
+            for parameter in result.get("details", {}).get("parameters", []):
+                key = (
+                    parameter.get("category", ""),
+                    parameter.get("id", ""),
+                    parameter.get("name", ""),
+                )
+                values.setdefault(key, {}).setdefault(hostname, parameter.get("value"))
+
+        differences = []
+        for (category, parameter_id, name), host_values in values.items():
+            host_values = {hostname: host_values.get(hostname) for hostname in hosts}
+            if len({repr(value) for value in host_values.values()}) > 1:
+                differences.append(
+                    {"category": category, "id": parameter_id, "name": name, "values": host_values}
+                )
+        return differences
+
+    def validate(self, cib_files: List[str]) -> Dict[str, Any]:
+        """
+        Validate the CIB files and compare the results across hosts.
+
+        :param cib_files: Paths of the CIB files
+        :type cib_files: List[str]
+        :return: Result with the result of every host and the differences between hosts
+        :rtype: Dict[str, Any]
+        """
+        try:
+            hosts = dict(self._validate_all(list(cib_files)))
+        except Exception as ex:
+            self.handle_error(ex)
+            return self.result
+
+        differences = self.compare_hosts(hosts) if len(hosts) > 1 else []
+        statuses = [result["status"] for result in hosts.values()]
+        if TestStatus.ERROR.value in statuses:
+            self.result["status"] = TestStatus.ERROR.value
+        elif TestStatus.WARNING.value in statuses:
+            self.result["status"] = TestStatus.WARNING.value
+        else:
+            self.result["status"] = TestStatus.SUCCESS.value
+        self.result["message"] = (
+            f"Validated {len(hosts)} CIB files: "
+            + f"{statuses.count(TestStatus.SUCCESS.value)} passed, "
+            + f"{statuses.count(TestStatus.WARNING.value)} with warnings, "
+            + f"{statuses.count(TestStatus.ERROR.value)} failed. "
+            + f"{len(differences)} parameters differ between hosts."
+        )
+        self.result["details"] = {"hosts": hosts, "differences": differences}
+        self.log(logging.INFO, self.result["message"])
+        return self.result
@@ -0,0 +1,357 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Compilation of the Pacemaker validation constants in SAP Automation QA.
+
+The constants of the HA validators are resolved once per operating system, fencing
+mechanism and NFS provider into a flat table of expected values, which is cached in memory
+and on disk by the content hash of the constants.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+CONSTANTS_CACHE_DIR = os.path.join("~", ".cache", "sap-automation-qa", "pcmk_constants")
+RESOURCE_SECTIONS = ("meta_attributes", "instance_attributes")
+
+ExpectedKey = Tuple[str, str, str, str]
+ExpectedValue = Tuple[Any, bool]
+
+_COMPILED: Dict[str, "CompiledConstants"] = {}
+
+
+def _get_expected_entry(param: Any) -> Optional[ExpectedValue]:
+    """
+    Get the expected value and whether it is required from a constants entry.
+
+    :param param: Entry of VALID_CONFIGS or of a defaults dictionary
+    :type param: Any
+    :return: Expected value and required flag, or None if the entry sets no value
+    :rtype: Optional[Tuple[Any, bool]]
+    """
+    if not param:
+        return None
+    if isinstance(param, dict):
+        if param.get("value"):
+            return (param.get("value", ""), param.get("required", False))
+        return None
+    if isinstance(param, (str, list)):
+        return (param, False)
+    return None
+
+
+def resolve_provider_values(expected_value: dict, nfs_provider: Optional[str] = None) -> list:
+    """
+    Resolve the values of an expected value given per NFS provider.
+
+    The values of the given provider are used if it has any, otherwise the values of all
+    providers are accepted.
+
+    :param expected_value: Expected values by provider
+    :type expected_value: dict
+    :param nfs_provider: NFS provider of the system
+    :type nfs_provider: Optional[str]
+    :raises TypeError: If expected_value is not a dictionary
+    :return: Accepted values
+    :rtype: list
+    """
+    if not isinstance(expected_value, dict):
+        raise TypeError("Expected value must be a dictionary for provider resolution")
+
+    def extract(provider_config: Any) -> Any:
+        """
+        Get the values of one provider from its configuration.
+
+        :param provider_config: Values of the provider, or a dictionary with a value key
+        :type provider_config: Any
+        :return: Values of the provider
+        :rtype: Any
+        """
+        if isinstance(provider_config, dict) and "value" in provider_config:
+            return provider_config["value"]
+        return provider_config
+
+    if nfs_provider and nfs_provider in expected_value:
+        provider_values = extract(expected_value[nfs_provider])
+    else:
+        provider_values = []
+        for provider_config in expected_value.values():
+            extracted_values = extract(provider_config)
+            if isinstance(extracted_values, list):
+                provider_values.extend(extracted_values)
+            else:
+                provider_values.append(extracted_values)
+
+    return provider_values if isinstance(provider_values, list) else [provider_values]
+
+
+class CompiledConstants:
+    """
+    Expected values of the HA validators, pre-resolved for one configuration.
+
+    Entries are keyed by (category, section, operation, name). Basic categories such as
+    crm_config use empty section and operation names, resource parameters outside of
+    operations use an empty operation name.
+    """
+
+    def __init__(
+        self,
+        expected_values: Dict[ExpectedKey, ExpectedValue],
+        provider_values: Optional[Dict[ExpectedKey, list]] = None,
+    ):
+        """
+        :param expected_values: Expected value and required flag by key
+        :type expected_values: Dict[Tuple[str, str, str, str], Tuple[Any, bool]]
+        :param provider_values: Resolved values by key, for values given per NFS provider
+        :type provider_values: Optional[Dict[Tuple[str, str, str, str], list]]
+        """
+        self.expected_values = expected_values
+        self.provider_values = provider_values or {}
+
+    @staticmethod
+    def _get_key(
+        category: str, name: str, section: str = "", op_name: Optional[str] = None
+    ) -> ExpectedKey:
+        """
+        Get the table key of a parameter.
+
+        :param category: Basic category or resource type
+        :type category: str
+        :param name: Name of the parameter
+        :type name: str
+        :param section: Resource section (meta_attributes, instance_attributes or operations)
+        :type section: str
+        :param op_name: Name of the operation, only used in the operations section
+        :type op_name: Optional[str]
+        :return: Key of the parameter
+        :rtype: Tuple[str, str, str, str]
+        """
+        op_name = (op_name or "") if section == "operations" else ""
+        return (category, section or "", op_name, name)
+
+    def get(
+        self, category: str, name: str, section: str = "", op_name: Optional[str] = None
+    ) -> Optional[ExpectedValue]:
+        """
+        Get the expected value of a parameter.
+
+        :param category: Basic category or resource type
+        :type category: str
+        :param name: Name of the parameter
+        :type name: str
+        :param section: Resource section (meta_attributes, instance_attributes or operations)
+        :type section: str
+        :param op_name: Name of the operation, only used in the operations section
+        :type op_name: Optional[str]
+        :return: Expected value and required flag, or None if there is none
+        :rtype: Optional[Tuple[Any, bool]]
+        """
+        return self.expected_values.get(self._get_key(category, name, section, op_name))
+
+    def get_provider_values(
+        self, category: str, name: str, section: str = "", op_name: Optional[str] = None
+    ) -> Optional[list]:
+        """
+        Get the resolved values of a parameter whose expected value is given per NFS provider.
+
+        :param category: Basic category or resource type
+        :type category: str
+        :param name: Name of the parameter
+        :type name: str
+        :param section: Resource section (meta_attributes, instance_attributes or operations)
+        :type section: str
+        :param op_name: Name of the operation, only used in the operations section
+        :type op_name: Optional[str]
+        :return: Resolved values, or None if the parameter has no values per provider
+        :rtype: Optional[list]
+        """
+        return self.provider_values.get(self._get_key(category, name, section, op_name))
+
+    def to_json(self) -> List[List[Any]]:
+        """
+        Serialize the table for the disk cache.
+
+        :return: One [category, section, operation, name, expected, required, provider
+            values] row per entry
+        :rtype: List[List[Any]]
+        """
+        return [
+            [*key, expected, required, self.provider_values.get(key)]
+            for key, (expected, required) in self.expected_values.items()
+        ]
+
+    @classmethod
+    def from_json(cls, rows: List[List[Any]]) -> "CompiledConstants":
+        """
+        Deserialize a table written by to_json.
+
+        :param rows: Serialized table
+        :type rows: List[List[Any]]
+        :return: Compiled constants
+        :rtype: CompiledConstants
+        """
+        expected_values = {}
+        provider_values = {}
+        for category, section, op_name, name, expected, required, values in rows:
+            key = (category, section, op_name, name)
+            expected_values[key] = (expected, required)
+            if values is not None:
+                provider_values[key] = values
+        return cls(expected_values, provider_values)
+
+
+def compile_constants(
+    constants: Dict[str, Any],
+    os_type: str,
+    fencing_mechanism: str,
+    basic_categories: Dict[str, str],
+    nfs_provider: Optional[str] = None,
+) -> CompiledConstants:
+    """
+    Flatten the constants into a table of expected values.
+
+    Basic parameters take their value from VALID_CONFIGS of the fencing mechanism, then of
+    the operating system, then from the defaults of their category. Resource parameters
+    take it from RESOURCE_DEFAULTS of the operating system. Values given per NFS provider
+    are resolved for the provider.
+
+    :param constants: Validation constants
+    :type constants: Dict[str, Any]
+    :param os_type: Operating system family, e.g. SUSE
+    :type os_type: str
+    :param fencing_mechanism: Fencing mechanism, e.g. AFA
+    :type fencing_mechanism: str
+    :param basic_categories: Defaults key by basic category, e.g. crm_config:
+        CRM_CONFIG_DEFAULTS
+    :type basic_categories: Dict[str, str]
+    :param nfs_provider: NFS provider of the system
+    :type nfs_provider: Optional[str]
+    :return: Compiled constants
+    :rtype: CompiledConstants
+    """
+    expected_values: Dict[ExpectedKey, ExpectedValue] = {}
+    valid_configs = constants.get("VALID_CONFIGS") or {}
+    overrides = (valid_configs.get(fencing_mechanism) or {}, valid_configs.get(os_type) or {})
+    for category, defaults_key in basic_categories.items():
+        defaults = constants.get(defaults_key) or {}
+        for name in {**overrides[0], **overrides[1], **defaults}:
+            for source in (*overrides, defaults):
+                entry = _get_expected_entry(source.get(name))
+                if entry is not None:
+                    expected_values[(category, "", "", name)] = entry
+                    break
+
+    resource_defaults = (constants.get("RESOURCE_DEFAULTS") or {}).get(os_type) or {}
+    for resource_type, resource_config in resource_defaults.items():
+        if not isinstance(resource_config, dict):
+            continue
+        for section in RESOURCE_SECTIONS:
+            for name, attr in (resource_config.get(section) or {}).items():
+                if isinstance(attr, dict) and attr:
+                    expected_values[(resource_type, section, "", name)] = (
+                        attr.get("value"),
+                        attr.get("required", False),
+                    )
+        for op_name, operation in (resource_config.get("operations") or {}).items():
+            for name, attr in (operation or {}).items():
+                if isinstance(attr, dict) and attr:
+                    expected_values[(resource_type, "operations", op_name, name)] = (
+                        attr.get("value"),
+                        attr.get("required", False),
+                    )
+
+    provider_values = {
+        key: resolve_provider_values(expected, nfs_provider)
+        for key, (expected, _) in expected_values.items()
+        if isinstance(expected, dict)
+    }
+    return CompiledConstants(expected_values, provider_values)
+
+
+def load_compiled_constants(
+    constants: Dict[str, Any],
+    os_type: str,
+    fencing_mechanism: str,
+    basic_categories: Dict[str, str],
+    nfs_provider: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> CompiledConstants:
+    """
+    Get the compiled constants from the process or disk cache, compiling them if needed.
+
+    Both caches are keyed by the SHA-256 hash of the constants and the configuration, so
+    changed constants are compiled again. Failing to use the disk cache only disables it.
+
+    :param constants: Validation constants
+    :type constants: Dict[str, Any]
+    :param os_type: Operating system family
+    :type os_type: str
+    :param fencing_mechanism: Fencing mechanism
+    :type fencing_mechanism: str
+    :param basic_categories: Defaults key by basic category
+    :type basic_categories: Dict[str, str]
+    :param nfs_provider: NFS provider of the system
+    :type nfs_provider: Optional[str]
+    :param cache_dir: Directory of the disk cache, only the process cache is used if None
+    :type cache_dir: Optional[str]
+    :return: Compiled constants
+    :rtype: CompiledConstants
+    """
+    try:
+        digest = hashlib.sha256(
+            json.dumps(
+                [constants, os_type, fencing_mechanism, basic_categories, nfs_provider],
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
+    except (TypeError, ValueError):
+        return compile_constants(
+            constants, os_type, fencing_mechanism, basic_categories, nfs_provider
+        )
+    if digest in _COMPILED:
+        return _COMPILED[digest]
+
+    cache_file = (
+        os.path.join(os.path.expanduser(cache_dir), f"{digest}.json") if cache_dir else None
+    )
+    compiled = None
+    if cache_file:
+        try:
+            with open(cache_file, "r", encoding="utf-8") as cache:
+                compiled = CompiledConstants.from_json(json.load(cache))
+        except (OSError, ValueError, TypeError):
+            compiled = None
+    if compiled is None:
+        compiled = compile_constants(
+            constants, os_type, fencing_mechanism, basic_categories, nfs_provider
+        )
+        if cache_file:
+            _write_cache_file(cache_file, compiled)
+    _COMPILED[digest] = compiled
+    return compiled
+
+
+def _write_cache_file(cache_file: str, compiled: CompiledConstants) -> None:
+    """
+    Write compiled constants to the disk cache, replacing the file atomically.
+
+    :param cache_file: Path of the cache file
+    :type cache_file: str
+    :param compiled: Compiled constants
+    :type compiled: CompiledConstants
+    """
+    temporary_path = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), mode=0o700, exist_ok=True)
+        with open(temporary_path, "w", encoding="utf-8") as cache:
+            json.dump(compiled.to_json(), cache)
+        os.replace(temporary_path, cache_file)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(temporary_path)
+        except OSError:
+            pass
@@ -7,11 +7,14 @@ and setup base variables for the test case running in the sap-automation-qa
 """
 
 from abc import ABC
+import asyncio
+import os
+import signal
 import sys
 import logging
 import subprocess
 import traceback
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Union
 import xml.etree.ElementTree as ET
 import yaml
 
@@ -20,6 +23,45 @@ try:
 except ImportError:
     from src.module_utils.enums import Result, TestStatus
 
+HANA_INI_PATH = "/usr/sap/{sid}/SYS/global/hdb/custom/config/{name}"
+
+_INI_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict[str, str]]]] = {}
+
+
+def parse_ini_content(content: str) -> Dict[str, Dict[str, str]]:
+    """
+    Index the content of an INI file, such as the global.ini of SAP HANA, in one pass.
+
+    Blank lines and lines starting with # or ; are skipped. A line ending with a backslash
+    is continued by the next line. Keys before the first section are kept under the empty
+    section name, and a section given several times is merged.
+
+    :param content: Content of the INI file
+    :type content: str
+    :return: Values by key by section name
+    :rtype: Dict[str, Dict[str, str]]
+    """
+    index: Dict[str, Dict[str, str]] = {}
+    section = index.setdefault("", {})
+    pending = ""
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not pending and (not line or line[0] in "#;"):
+            continue
+        if line.endswith("\\"):
+            pending += line[:-1]
+            continue
+        line, pending = pending + line, ""
+        if line.startswith("[") and line.endswith("]"):
+            section = index.setdefault(line[1:-1].strip(), {})
+            continue
+        key, separator, value = line.partition("=")
+        if separator and key.strip():
+            section[key.strip()] = value.strip()
+    if not index[""]:
+        del index[""]
+    return index
+
 
 class SapAutomationQA(ABC):
     """
@@ -78,14 +120,21 @@ class SapAutomationQA(ABC):
         self.result["logs"].append(error_message)
         self.result["logs"].append(f"Traceback:\n{traceback.format_exc()}")
 
-    def execute_command_subprocess(self, command: Any, shell_command: bool = False) -> str:
+    def execute_command_subprocess(
+        self, command: Any, shell_command: bool = False, timeout: float = 100
+    ) -> str:
         """
         Executes a shell command using subprocess with a timeout and logs output or errors.
 
+        The command runs in its own process group so that, on timeout, every process it
+        spawned (e.g. the children of "su - user -c ...") is killed along with it.
+
         :param command: Shell command to execute
         :type command: str
         :param shell_command: Whether the command is a shell command
         :type shell_command: bool
+        :param timeout: Timeout in seconds for the command
+        :type timeout: float
         :return: Standard output from the command
         :rtype: str
         """
@@ -95,26 +144,27 @@ class SapAutomationQA(ABC):
             f"Executing command: {command_string}",
         )
         try:
-            command_output = subprocess.run(
+            with subprocess.Popen(
                 command,
-                timeout=100,
-                check=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 shell=shell_command,
-            )
-            stdout = command_output.stdout.decode("utf-8")
-            stderr = command_output.stderr.decode("utf-8")
-
-            if stdout and stderr:
-                return f"{stdout}\nERROR: {stderr}"
-            elif stderr:
-                return stderr
-            else:
-                return stdout
+                start_new_session=True,
+            ) as process:
+                try:
+                    stdout, stderr = process.communicate(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    self._kill_process_group(process.pid)
+                    process.communicate()
+                    raise
+                if process.returncode != 0:
+                    raise subprocess.CalledProcessError(
+                        process.returncode, command, output=stdout, stderr=stderr
+                    )
+            return self._format_command_output(stdout.decode("utf-8"), stderr.decode("utf-8"))
         except subprocess.TimeoutExpired as ex:
             self.handle_error(ex, "Command timed out")
-            return f"ERROR: Command timed out after 100 seconds"
+            return f"ERROR: Command timed out after {timeout} seconds"
         except subprocess.CalledProcessError as ex:
             stderr_msg = ex.stderr.decode("utf-8").strip() if ex.stderr else ""
             error_msg = f"ERROR: Command failed with exit code {ex.returncode}"
@@ -126,6 +176,168 @@ class SapAutomationQA(ABC):
             self.handle_error(ex, "")
             return f"ERROR: Unexpected error during command execution: {str(ex)}"
 
+    def _kill_process_group(self, pid: int) -> None:
+        """
+        Kills the process group led by a timed out command.
+
+        :param pid: Process ID of the command, which is also its process group ID
+        :type pid: int
+        """
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError) as ex:
+            self.log(logging.WARNING, f"Could not kill process group {pid}: {ex}")
+
+    def _format_command_output(self, stdout: str, stderr: str) -> str:
+        """
+        Combines the standard output and standard error of a finished command.
+
+        :param stdout: Standard output from the command
+        :type stdout: str
+        :param stderr: Standard error from the command
+        :type stderr: str
+        :return: Combined output in the format returned by execute_command_subprocess
+        :rtype: str
+        """
+        if stdout and stderr:
+            return f"{stdout}\nERROR: {stderr}"
+        elif stderr:
+            return stderr
+        else:
+            return stdout
+
+    async def _execute_command_async(
+        self,
+        command: Any,
+        shell_command: bool,
+        timeout: float,
+        semaphore: asyncio.Semaphore,
+    ) -> str:
+        """
+        Executes a single command with asyncio once a slot in the semaphore is free.
+
+        :param command: Command to execute, either a string or a list of arguments
+        :type command: Any
+        :param shell_command: Whether the command is a shell command
+        :type shell_command: bool
+        :param timeout: Timeout in seconds for the command
+        :type timeout: float
+        :param semaphore: Semaphore bounding the number of concurrent commands
+        :type semaphore: asyncio.Semaphore
+        :return: Standard output from the command
+        :rtype: str
+        """
+        command_string = command if isinstance(command, str) else " ".join(command).replace("'", "")
+        async with semaphore:
+            self.log(logging.INFO, f"Executing command: {command_string}")
+            try:
+                if shell_command or isinstance(command, str):
+                    args = ["/bin/sh", "-c", command_string]
+                else:
+                    args = [str(arg) for arg in command]
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True,
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+                except asyncio.TimeoutError as ex:
+                    self._kill_process_group(process.pid)
+                    await process.wait()
+                    self.handle_error(ex, "Command timed out")
+                    return f"ERROR: Command timed out after {timeout} seconds"
+
+                stderr_msg = stderr.decode("utf-8")
+                if process.returncode != 0:
+                    error_msg = f"ERROR: Command failed with exit code {process.returncode}"
+                    if stderr_msg.strip():
+                        error_msg += f": {stderr_msg.strip()}"
+                    self.handle_error(
+                        subprocess.CalledProcessError(process.returncode, command),
+                        stderr_msg.strip(),
+                    )
+                    return error_msg
+                return self._format_command_output(stdout.decode("utf-8"), stderr_msg)
+            except Exception as ex:
+                self.handle_error(ex, "")
+                return f"ERROR: Unexpected error during command execution: {str(ex)}"
+
+    async def _execute_many_async(
+        self,
+        commands: List[Any],
+        shell_command: bool,
+        timeouts: List[float],
+        max_concurrency: int,
+    ) -> List[str]:
+        """
+        Schedules all commands on the running event loop and gathers their outputs.
+
+        :param commands: Commands to execute
+        :type commands: List[Any]
+        :param shell_command: Whether the commands are shell commands
+        :type shell_command: bool
+        :param timeouts: Timeout in seconds for each command
+        :type timeouts: List[float]
+        :param max_concurrency: Maximum number of commands running at the same time
+        :type max_concurrency: int
+        :return: Outputs of the commands in the order they were given
+        :rtype: List[str]
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        return list(
+            await asyncio.gather(
+                *[
+                    self._execute_command_async(command, shell_command, limit, semaphore)
+                    for command, limit in zip(commands, timeouts)
+                ]
+            )
+        )
+
+    def execute_many(
+        self,
+        commands: List[Any],
+        shell_command: bool = False,
+        timeout: Union[float, List[float]] = 100,
+        max_concurrency: int = 4,
+    ) -> List[str]:
+        """
+        Executes independent commands concurrently and returns their outputs in order.
+
+        Each output has the same format as the one returned by execute_command_subprocess,
+        so callers can switch between both without changing how results are interpreted.
+
+        :param commands: Commands to execute, each either a string or a list of arguments
+        :type commands: List[Any]
+        :param shell_command: Whether the commands are shell commands
+        :type shell_command: bool
+        :param timeout: Timeout in seconds for each command, or one timeout per command
+        :type timeout: Union[float, List[float]]
+        :param max_concurrency: Maximum number of commands running at the same time
+        :type max_concurrency: int
+        :return: Outputs of the commands in the order they were given
+        :rtype: List[str]
+        """
+        if not commands:
+            return []
+        timeouts = (
+            list(timeout) if isinstance(timeout, (list, tuple)) else [timeout] * len(commands)
+        )
+        try:
+            return asyncio.run(
+                self._execute_many_async(commands, shell_command, timeouts, max_concurrency)
+            )
+        except RuntimeError as ex:
+            self.log(
+                logging.WARNING,
+                f"Concurrent execution unavailable ({ex}), running commands sequentially",
+            )
+            return [
+                self.execute_command_subprocess(command, shell_command=shell_command, timeout=limit)
+                for command, limit in zip(commands, timeouts)
+            ]
+
     def parse_xml_output(self, xml_output: str) -> ET.Element:
         """
         Parses the XML output and returns the root element.
@@ -139,6 +351,48 @@ class SapAutomationQA(ABC):
             return ET.fromstring(xml_output)
         return ET.Element("root")
 
+    def read_ini_file(self, path: str) -> Dict[str, Dict[str, str]]:
+        """
+        Reads and indexes an INI file, reusing the index while the file is unchanged.
+
+        The index is cached per process by path, modification time and size of the file.
+
+        :param path: Path of the INI file
+        :type path: str
+        :raises OSError: If the file cannot be read
+        :return: Values by key by section name
+        :rtype: Dict[str, Dict[str, str]]
+        """
+        try:
+            stat = os.stat(path)
+            signature: Optional[Tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        cached = _INI_CACHE.get(path)
+        if signature is not None and cached is not None and cached[0] == signature:
+            index = cached[1]
+        else:
+            with open(path, "r", encoding="utf-8") as file:
+                index = parse_ini_content(file.read())
+            if signature is not None:
+                _INI_CACHE[path] = (signature, index)
+        return {section: dict(values) for section, values in index.items()}
+
+    def get_hana_ini(self, sid: str, name: str = "global.ini") -> Dict[str, Dict[str, str]]:
+        """
+        Reads and indexes a custom configuration file of SAP HANA, e.g. global.ini,
+        indexserver.ini or nameserver.ini.
+
+        :param sid: SAP system ID of the database
+        :type sid: str
+        :param name: Name of the configuration file
+        :type name: str
+        :raises OSError: If the file cannot be read
+        :return: Values by key by section name
+        :rtype: Dict[str, Dict[str, str]]
+        """
+        return self.read_ini_file(HANA_INI_PATH.format(sid=sid, name=name))
+
     def get_result(self) -> Dict[str, Any]:
         """
         Returns the result dictionary.
@@ -0,0 +1,319 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Persistent login shells used to run commands as SAP users
+"""
+import logging
+import os
+import re
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    from ansible.module_utils.sap_automation_qa import SapAutomationQA
+except ImportError:
+    from src.module_utils.sap_automation_qa import SapAutomationQA
+
+
+class ShellSessionError(Exception):
+    """
+    Raised when a shell session cannot be started or stops responding
+    """
+
+
+class ShellSession:
+    """
+    A login shell of a single user that runs commands over a framed stdin/stdout protocol.
+
+    The login profile is loaded once when the session starts, and every command inherits
+    the environment it set up. Each command runs in its own child of the login shell of the
+    user ("$SHELL -c", e.g. csh for sidadm), as with "su - user -c", with stdin redirected
+    from /dev/null, so that it can neither change the state of the session nor consume the
+    protocol stream. csh shells are started with -f, so that they do not read ~/.cshrc and
+    the SAP environment scripts it sources again. The end of the output of a command is
+    marked by a sentinel line on stdout (carrying the exit code) and on stderr.
+    """
+
+    def __init__(
+        self,
+        parent: SapAutomationQA,
+        user: str,
+        login_command: Sequence[str],
+        startup_timeout: float = 60,
+    ):
+        """
+        Initialize the session without starting it.
+
+        :param parent: Parent module with logging capability
+        :type parent: SapAutomationQA
+        :param user: User that owns the session
+        :type user: str
+        :param login_command: Command that starts the login shell of the user
+        :type login_command: Sequence[str]
+        :param startup_timeout: Timeout in seconds for the login profile to load
+        :type startup_timeout: float
+        """
+        self.parent = parent
+        self.user = user
+        self.login_command = list(login_command)
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.lock = threading.Lock()
+        self._token = uuid.uuid4().hex
+        self._sequence = 0
+
+    def start(self) -> None:
+        """
+        Start the login shell and wait until the login profile has been loaded.
+
+        :raises ShellSessionError: If the shell cannot be started or does not become ready
+        """
+        self.parent.log(logging.INFO, f"Starting shell session for user {self.user}")
+        try:
+            self.process = subprocess.Popen(
+                self.login_command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+                start_new_session=True,
+            )
+            self._request("true", self.startup_timeout)
+        except subprocess.TimeoutExpired as ex:
+            self.close()
+            raise ShellSessionError(
+                f"Shell session for user {self.user} was not ready after "
+                + f"{self.startup_timeout} seconds"
+            ) from ex
+        except (OSError, ShellSessionError) as ex:
+            self.close()
+            raise ShellSessionError(
+                f"Could not start shell session for user {self.user}: {ex}"
+            ) from ex
+
+    def is_alive(self) -> bool:
+        """
+        Check whether the login shell is still running.
+
+        :return: True if the shell is running
+        :rtype: bool
+        """
+        return self.process is not None and self.process.poll() is None
+
+    def execute(self, command: str, timeout: float) -> Tuple[str, str, int]:
+        """
+        Run a command in the session.
+
+        :param command: Shell command to run
+        :type command: str
+        :param timeout: Timeout in seconds for the command
+        :type timeout: float
+        :return: Standard output, standard error and exit code of the command
+        :rtype: Tuple[str, str, int]
+        :raises subprocess.TimeoutExpired: If the command does not finish in time
+        :raises ShellSessionError: If the session is not running or exits unexpectedly
+        """
+        with self.lock:
+            if not self.is_alive():
+                raise ShellSessionError(f"Shell session for user {self.user} is not running")
+            stdout, stderr, returncode = self._request(command, timeout)
+            return stdout.decode("utf-8"), stderr.decode("utf-8"), returncode
+
+    def close(self) -> None:
+        """
+        Stop the login shell and every process it started.
+        """
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write(b"exit 0\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.parent._kill_process_group(self.process.pid)
+                self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout, self.process.stderr):
+            if stream:
+                stream.close()
+        self.process = None
+
+    def _request(self, command: str, timeout: float) -> Tuple[bytes, bytes, int]:
+        """
+        Send one framed command to the shell and read its framed output.
+
+        :param command: Shell command to run
+        :type command: str
+        :param timeout: Timeout in seconds for the command
+        :type timeout: float
+        :return: Standard output, standard error and exit code of the command
+        :rtype: Tuple[bytes, bytes, int]
+        """
+        self._sequence += 1
+        marker = f"__SAPQA_{self._token}_{self._sequence}__"
+        request = (
+            'case "${SHELL:=/bin/sh}" in *csh) set -- -f ;; *) set -- ;; esac; '
+            + f'"$SHELL" "$@" -c {shlex.quote(command)} </dev/null; __sapqa_rc=$?; '
+            + f"printf '\\n{marker} %s\\n' \"$__sapqa_rc\"; printf '\\n{marker}\\n' >&2\n"
+        )
+        try:
+            self.process.stdin.write(request.encode("utf-8"))
+            self.process.stdin.flush()
+        except OSError as ex:
+            raise ShellSessionError(f"Shell session for user {self.user} exited: {ex}") from ex
+
+        stdout_frame = re.compile(b"\n" + marker.encode() + b" (\\d+)\n")
+        stderr_frame = re.compile(b"\n" + marker.encode() + b"\n")
+        frames = {
+            self.process.stdout.fileno(): stdout_frame,
+            self.process.stderr.fileno(): stderr_frame,
+        }
+        buffers: Dict[int, bytes] = {fd: b"" for fd in frames}
+        matches: Dict[int, re.Match] = {}
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            for fd in frames:
+                selector.register(fd, selectors.EVENT_READ)
+            while len(matches) < len(frames):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(command, timeout)
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise ShellSessionError(f"Shell session for user {self.user} exited")
+                    buffers[key.fd] += chunk
+                    match = frames[key.fd].search(buffers[key.fd])
+                    if match:
+                        matches[key.fd] = match
+                        selector.unregister(key.fd)
+
+        stdout_fd, stderr_fd = self.process.stdout.fileno(), self.process.stderr.fileno()
+        return (
+            buffers[stdout_fd][: matches[stdout_fd].start()],
+            buffers[stderr_fd][: matches[stderr_fd].start()],
+            int(matches[stdout_fd].group(1)),
+        )
+
+
+class ShellSessionPool:
+    """
+    Keeps one persistent login shell per user and runs commands in it.
+    """
+
+    def __init__(
+        self,
+        parent: SapAutomationQA,
+        login_command: Sequence[str] = ("su", "-", "{user}", "-c", "exec /bin/sh"),
+        startup_timeout: float = 60,
+    ):
+        """
+        Initialize an empty pool.
+
+        :param parent: Parent module with logging capability
+        :type parent: SapAutomationQA
+        :param login_command: Command that loads the login profile of the user and then
+            runs a POSIX shell reading the protocol, "{user}" is replaced with the name of
+            the user. Commands run in the login shell of the user, taken from $SHELL.
+        :type login_command: Sequence[str]
+        :param startup_timeout: Timeout in seconds for the login profile to load
+        :type startup_timeout: float
+        """
+        self.parent = parent
+        self.login_command = login_command
+        self.startup_timeout = startup_timeout
+        self.sessions: Dict[str, ShellSession] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, user: str) -> ShellSession:
+        """
+        Get the session of a user, starting it when it does not exist yet.
+
+        :param user: User that owns the session
+        :type user: str
+        :return: Running session of the user
+        :rtype: ShellSession
+        :raises ShellSessionError: If the session cannot be started
+        """
+        with self._lock:
+            session = self.sessions.get(user)
+            if session is None or not session.is_alive():
+                session = ShellSession(
+                    self.parent,
+                    user,
+                    [part.replace("{user}", user) for part in self.login_command],
+                    self.startup_timeout,
+                )
+                session.start()
+                self.sessions[user] = session
+            return session
+
+    def execute(self, user: str, command: str, timeout: float = 100) -> str:
+        """
+        Run a command as a user and return its output.
+
+        The output has the same format as the one returned by execute_command_subprocess.
+        A session whose command timed out is discarded, and the next command of the user
+        starts a new one.
+
+        :param user: User to run the command as
+        :type user: str
+        :param command: Shell command to run
+        :type command: str
+        :param timeout: Timeout in seconds for the command
+        :type timeout: float
+        :return: Output of the command
+        :rtype: str
+        :raises ShellSessionError: If the session of the user is not usable
+        """
+        self.parent.log(logging.INFO, f"Executing command in session of {user}: {command}")
+        session = self.get_session(user)
+        try:
+            stdout, stderr, returncode = session.execute(command, timeout)
+        except subprocess.TimeoutExpired as ex:
+            self._discard(user, session)
+            self.parent.handle_error(ex, "Command timed out")
+            return f"ERROR: Command timed out after {timeout} seconds"
+        except ShellSessionError:
+            self._discard(user, session)
+            raise
+
+        if returncode != 0:
+            stderr_msg = stderr.strip()
+            error_msg = f"ERROR: Command failed with exit code {returncode}"
+            if stderr_msg:
+                error_msg += f": {stderr_msg}"
+            self.parent.handle_error(subprocess.CalledProcessError(returncode, command), stderr_msg)
+            return error_msg
+        return self.parent._format_command_output(stdout, stderr)
+
+    def close(self) -> None:
+        """
+        Stop all sessions of the pool.
+        """
+        with self._lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+    def _discard(self, user: str, session: ShellSession) -> None:
+        """
+        Kill a session that can no longer be trusted and remove it from the pool.
+
+        :param user: User that owns the session
+        :type user: str
+        :param session: Session to discard
+        :type session: ShellSession
+        """
+        if session.process is not None:
+            self.parent._kill_process_group(session.process.pid)
+        session.close()
+        with self._lock:
+            if self.sessions.get(user) is session:
+                del self.sessions[user]
@@ -0,0 +1,348 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Native discovery of the local storage topology of a host
+"""
+
+import glob
+import json
+import logging
+import math
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from ansible.module_utils.sap_automation_qa import SapAutomationQA
+    from ansible.module_utils.mount_probe import PROBE_TIMEOUT, MountProbe
+    from ansible.module_utils.storage_topology import NFS_FSTYPES
+except ImportError:
+    from src.module_utils.sap_automation_qa import SapAutomationQA
+    from src.module_utils.mount_probe import PROBE_TIMEOUT, MountProbe
+    from src.module_utils.storage_topology import NFS_FSTYPES
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+AZURE_LUN_LINKS = "/dev/disk/azure/scsi1/lun*"
+IMDS_DATA_DISKS_URL = (
+    "http://169.254.169.254/metadata/instance/compute/storageProfile/dataDisks/"
+    + "?api-version=2021-12-13"
+)
+LVM_FULLREPORT = ["/sbin/lvm", "fullreport", "--reportformat", "json"]
+GIB = 1024**3
+
+
+def decode_mount_field(value: str) -> str:
+    """
+    Decode the octal escapes (e.g. "\\040" for a space) used in /proc/self/mountinfo.
+
+    :param value: Escaped field
+    :type value: str
+    :return: Decoded field
+    :rtype: str
+    """
+    return re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), value)
+
+
+def _used_percent(used: int, available: int) -> str:
+    """
+    Compute the Use% column of df: used space relative to the space usable by users.
+    """
+    return f"{math.ceil(used * 100 / (used + available))}%" if used + available else "-"
+
+
+class LocalStorageDiscovery:
+    """
+    Reads the storage topology of the local host without going through shell tools.
+    """
+
+    def __init__(self, parent: SapAutomationQA):
+        """
+        Initialize with parent module for logging and command execution
+
+        :param parent: Parent module
+        :type parent: SapAutomationQA
+        """
+        self.parent = parent
+
+    def read_mounts(self) -> List[Dict[str, str]]:
+        """
+        Read the mounted filesystems from /proc/self/mountinfo.
+
+        The options combine the per-mount and the filesystem-specific options, as in
+        the OPTIONS column of findmnt.
+
+        :return: Mounts with target, source, fstype, options and device (major:minor)
+        :rtype: List[Dict[str, str]]
+        """
+        mounts = []
+        with open(MOUNTINFO_PATH, "r", encoding="utf-8") as mountinfo:
+            for line in mountinfo:
+                fields = line.split()
+                if "-" not in fields:
+                    continue
+                separator = fields.index("-")
+                if separator < 6 or len(fields) < separator + 4:
+                    continue
+                options = fields[5].split(",")
+                for option in fields[separator + 3].split(","):
+                    if option not in options:
+                        options.append(option)
+                mounts.append(
+                    {
+                        "target": decode_mount_field(fields[4]),
+                        "source": decode_mount_field(fields[separator + 2]),
+                        "fstype": fields[separator + 1],
+                        "options": ",".join(options),
+                        "device": fields[2],
+                    }
+                )
+        return mounts
+
+    def stat_mounts(
+        self, mounts: List[Dict[str, str]], timeout: float = PROBE_TIMEOUT
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Stat all mount points in parallel, bounded by a timeout.
+
+        NFS mount points are stat'ed in child processes that are killed when the server
+        does not answer, so a hung share cannot block the healthy mounts or the module.
+
+        :param mounts: Mounts returned by read_mounts
+        :type mounts: List[Dict[str, str]]
+        :param timeout: Seconds to wait for the mount points to answer
+        :type timeout: float
+        :return: statvfs result by mount point, and the mount points that did not answer
+        :rtype: Tuple[Dict[str, Any], List[str]]
+        """
+        probe = MountProbe(self.parent, timeout)
+        stats = probe.probe(
+            [mount["target"] for mount in mounts if mount["fstype"] not in NFS_FSTYPES],
+            isolated=[mount["target"] for mount in mounts if mount["fstype"] in NFS_FSTYPES],
+        )
+        return stats, probe.stale_mounts
+
+    def get_filesystem_usage(
+        self, mounts: List[Dict[str, str]], timeout: float = PROBE_TIMEOUT
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the usage of the mounted filesystems in bytes.
+
+        Like df, filesystems without blocks are left out and a device mounted several
+        times is reported once, on its shortest mount point. Mount points that did not
+        answer are kept with stale set and no usage.
+
+        :param mounts: Mounts returned by read_mounts
+        :type mounts: List[Dict[str, str]]
+        :param timeout: Seconds to wait for the mount points to answer
+        :type timeout: float
+        :return: Mounts with stale, size_bytes, used_bytes and free_bytes (available to users)
+        :rtype: List[Dict[str, Any]]
+        """
+        stats_by_target, stale_mounts = self.stat_mounts(mounts, timeout)
+        usage_by_device: Dict[str, Dict[str, Any]] = {}
+        for mount in mounts:
+            stats = stats_by_target.get(mount["target"])
+            stale = mount["target"] in stale_mounts
+            if not stale and (stats is None or not stats.f_blocks):
+                continue
+            current = usage_by_device.get(mount["device"])
+            if current and len(current["target"]) <= len(mount["target"]):
+                continue
+            usage_by_device[mount["device"]] = dict(
+                mount,
+                stale=stale,
+                size_bytes=None if stale else stats.f_blocks * stats.f_frsize,
+                used_bytes=None if stale else (stats.f_blocks - stats.f_bfree) * stats.f_frsize,
+                free_bytes=None if stale else stats.f_bavail * stats.f_frsize,
+            )
+        return list(usage_by_device.values())
+
+    def get_filesystems(
+        self, timeout: float = PROBE_TIMEOUT, mounts: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the mounted filesystems in the format of the FileSystemCollector entries.
+
+        Sizes are given in the rounded-up GiB of "df -BG" and as exact byte counts. They are
+        empty for stale mount points.
+
+        :param timeout: Seconds to wait for the mount points to answer
+        :type timeout: float
+        :param mounts: Mounts returned by read_mounts, read again if not given
+        :type mounts: Optional[List[Dict[str, str]]]
+        :return: Filesystems with target, source, fstype, options, stale and usage
+        :rtype: List[Dict[str, Any]]
+        """
+        filesystems = []
+        if mounts is None:
+            mounts = self.read_mounts()
+        for usage in self.get_filesystem_usage(mounts, timeout):
+            filesystem = {
+                "target": usage["target"],
+                "source": usage["source"],
+                "fstype": usage["fstype"],
+                "options": usage["options"],
+                "size": "",
+                "free": "",
+                "used": "",
+                "used_percent": "",
+                "stale": usage["stale"],
+                "size_bytes": usage["size_bytes"],
+                "free_bytes": usage["free_bytes"],
+                "used_bytes": usage["used_bytes"],
+            }
+            if not usage["stale"]:
+                filesystem.update(
+                    size=f"{math.ceil(usage['size_bytes'] / GIB)}G",
+                    free=f"{math.ceil(usage['free_bytes'] / GIB)}G",
+                    used=f"{math.ceil(usage['used_bytes'] / GIB)}G",
+                    used_percent=_used_percent(usage["used_bytes"], usage["free_bytes"]),
+                )
+            filesystems.append(filesystem)
+        return filesystems
+
+    def get_device_lun_map(self) -> Dict[str, str]:
+        """
+        Map block devices to the LUN of the Azure data disk behind them.
+
+        :return: Device name to LUN, e.g. {"sdc": "0"}
+        :rtype: Dict[str, str]
+        """
+        device_lun_map = {}
+        for lun_link in glob.glob(AZURE_LUN_LINKS):
+            if os.path.islink(lun_link):
+                lun = os.path.basename(lun_link)[len("lun") :]
+                device_lun_map[os.path.basename(os.path.realpath(lun_link))] = lun
+        return device_lun_map
+
+    def get_lvm_fullreport(self) -> Dict[str, Any]:
+        """
+        Get the LVM full report as a dictionary.
+
+        Warnings that LVM prints on stderr are appended after the JSON document and ignored.
+
+        :return: Decoded report, or an empty dictionary if LVM is not available
+        :rtype: Dict[str, Any]
+        """
+        output = self.parent.execute_command_subprocess(LVM_FULLREPORT)
+        try:
+            report, _ = json.JSONDecoder().raw_decode(output.lstrip())
+            return report if isinstance(report, dict) else {}
+        except ValueError:
+            self.parent.log(logging.WARNING, f"LVM full report not available: {output[:200]}")
+            return {}
+
+    def get_imds_data_disks(self, retries: int = 3, delay: float = 2) -> List[Dict[str, Any]]:
+        """
+        Get the data disks of the virtual machine from the Instance Metadata Service.
+
+        :param retries: Number of attempts
+        :type retries: int
+        :param delay: Delay in seconds between attempts
+        :type delay: float
+        :return: Data disks with name and LUN, or an empty list if IMDS is not reachable
+        :rtype: List[Dict[str, Any]]
+        """
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        request = urllib.request.Request(IMDS_DATA_DISKS_URL, headers={"Metadata": "true"})
+        for attempt in range(retries):
+            try:
+                with opener.open(request, timeout=10) as response:
+                    return json.loads(response.read().decode("utf-8"))
+            except (OSError, ValueError) as ex:
+                self.parent.log(
+                    logging.WARNING,
+                    f"IMDS data disks request failed (attempt {attempt + 1}/{retries}): {ex}",
+                )
+                if attempt < retries - 1:
+                    time.sleep(delay)
+        return []
+
+    def classify_nfs_mounts(self, mounts: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Find the NFS servers behind the mounts and tell Azure Files (AFS) from
+        Azure NetApp Files (ANF).
+
+        An NFS server given by IP address is probed over HTTP: Azure Files endpoints
+        answer with a windows.net storage account name, anything else is taken as ANF.
+
+        :param mounts: Mounts returned by read_mounts
+        :type mounts: List[Dict[str, str]]
+        :return: has_nfs_mounts, anf_ip_addresses and afs_storage_accounts
+        :rtype: Dict[str, Any]
+        """
+        nfs_sources = [mount["source"] for mount in mounts if mount["fstype"] in NFS_FSTYPES]
+        ip_addresses, afs_storage_accounts = [], []
+        for source in nfs_sources:
+            server = source.split(":", 1)[0]
+            if re.match(r"^(\d{1,3}\.){3}\d{1,3}$", server) and server not in ip_addresses:
+                ip_addresses.append(server)
+            fqdn_match = re.search(r"\.file\.core\.windows\.net:/([^/]+)/", source)
+            if fqdn_match and fqdn_match.group(1) not in afs_storage_accounts:
+                afs_storage_accounts.append(fqdn_match.group(1))
+
+        anf_ip_addresses = []
+        if ip_addresses:
+            with ThreadPoolExecutor(max_workers=min(8, len(ip_addresses))) as executor:
+                accounts = list(executor.map(self._probe_afs_account, ip_addresses))
+            for ip_address, account in zip(ip_addresses, accounts):
+                if account is None:
+                    anf_ip_addresses.append(ip_address)
+                elif account and account not in afs_storage_accounts:
+                    afs_storage_accounts.append(account)
+
+        return {
+            "has_nfs_mounts": bool(nfs_sources),
+            "anf_ip_addresses": anf_ip_addresses,
+            "afs_storage_accounts": afs_storage_accounts,
+        }
+
+    def _probe_afs_account(self, ip_address: str) -> Any:
+        """
+        Probe an NFS server over HTTP to find the Azure Files storage account behind it.
+
+        :param ip_address: IP address of the NFS server
+        :type ip_address: str
+        :return: Storage account name, "" for an Azure Files endpoint without a readable
+            account name, or None if the server is not an Azure Files endpoint
+        :rtype: Optional[str]
+        """
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        try:
+            with opener.open(f"http://{ip_address}/", timeout=5) as response:
+                body = response.read().decode("utf-8", errors="replace")
+        except urllib.error.HTTPError as ex:
+            body = ex.read().decode("utf-8", errors="replace")
+        except OSError as ex:
+            self.parent.log(logging.INFO, f"NFS server {ip_address} did not answer HTTP: {ex}")
+            return None
+        if "windows.net" not in body:
+            return None
+        account_match = re.search(r"([a-z0-9]+)\.file\.core\.windows\.net", body)
+        return account_match.group(1) if account_match else ""
+
+    def discover(self) -> Dict[str, Any]:
+        """
+        Gather the storage topology in the format of the FileSystemCollector context.
+
+        The mounted filesystems of the host are part of it, so that checks that do not run
+        on the host, such as the Azure checks run on the controller, see them.
+
+        :return: mounted_filesystems, lvm_fullreport, device_lun_map, imds_disks_metadata
+            and the NFS classification
+        :rtype: Dict[str, Any]
+        """
+        mounts = self.read_mounts()
+        topology = {
+            "mounted_filesystems": self.get_filesystems(mounts=mounts),
+            "lvm_fullreport": self.get_lvm_fullreport(),
+            "device_lun_map": self.get_device_lun_map(),
+            "imds_disks_metadata": self.get_imds_data_disks(),
+        }
+        topology.update(self.classify_nfs_mounts(mounts))
+        return topology
@@ -0,0 +1,359 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Indexed view of the storage topology of a host in SAP Automation QA
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from ansible.module_utils.lvm_report import LvmReport
+except ImportError:
+    from src.module_utils.lvm_report import LvmReport
+
+NFS_FSTYPES = ("nfs", "nfs3", "nfs4")
+
+
+def parse_metadata(raw_data: Any, data_type: str, log: Callable[[int, str], None]) -> List[dict]:
+    """
+    Parse metadata that can be in various formats: dict, list, or JSON strings.
+
+    :param raw_data: Raw metadata from context
+    :type raw_data: Any
+    :param data_type: Type of data for logging purposes
+    :type data_type: str
+    :param log: Logging function of the parent module
+    :type log: Callable[[int, str], None]
+    :return: List of dictionaries
+    :rtype: List[dict]
+    """
+    parsed_data = []
+
+    if not raw_data:
+        log(logging.INFO, f"No {data_type} data provided (empty or None)")
+        return parsed_data
+
+    log(
+        logging.INFO,
+        f"Parsing {data_type}: type={type(raw_data)}, "
+        f"length={len(raw_data) if hasattr(raw_data, '__len__') else 'N/A'}",
+    )
+
+    if isinstance(raw_data, list):
+        for item in raw_data:
+            if isinstance(item, dict):
+                parsed_data.append(item)
+            elif isinstance(item, str):
+                item_stripped = item.strip()
+                if not item_stripped:
+                    continue
+                try:
+                    parsed_item = json.loads(item_stripped)
+                    if isinstance(parsed_item, dict):
+                        parsed_data.append(parsed_item)
+                    elif isinstance(parsed_item, list):
+                        parsed_data.extend(parsed_item)
+                except json.JSONDecodeError:
+                    log(
+                        logging.WARNING,
+                        f"Failed to parse {data_type} item as JSON: {item_stripped[:100]}",
+                    )
+    elif isinstance(raw_data, dict):
+        parsed_data = [raw_data]
+    elif isinstance(raw_data, str):
+        try:
+            parsed_data = json.loads(raw_data)
+            if not isinstance(parsed_data, list):
+                parsed_data = [parsed_data]
+        except json.JSONDecodeError:
+            for line in raw_data.splitlines():
+                if line.strip():
+                    try:
+                        parsed_data.append(json.loads(line.strip()))
+                    except json.JSONDecodeError:
+                        log(
+                            logging.WARNING,
+                            f"Failed to parse {data_type} line: {line.strip()[:100]}",
+                        )
+
+    validated_data = []
+    for item in parsed_data:
+        if isinstance(item, dict):
+            validated_data.append(item)
+        else:
+            log(
+                logging.WARNING,
+                f"Skipping non-dict item in {data_type}: {type(item)} - {str(item)[:100]}",
+            )
+
+    log(
+        logging.INFO,
+        f"Successfully parsed {len(validated_data)} {data_type} items, "
+        f"skipped {len(parsed_data) - len(validated_data)} non-dict items",
+    )
+
+    return validated_data
+
+
+def _first_index(items: Iterable[dict], key: Callable[[dict], Any]) -> Dict[Any, int]:
+    """
+    Map each key to the position of the first item carrying it.
+
+    Keeping the first occurrence preserves the result of the former linear scans,
+    which stopped at the first matching item.
+    """
+    index = {}
+    for position, item in enumerate(items):
+        value = key(item)
+        if value and value not in index:
+            index[value] = position
+    return index
+
+
+def _nfs_host(nfs_source: str) -> str:
+    """
+    Get the server part of an NFS source or address.
+    """
+    return nfs_source.split(":")[0] if ":" in nfs_source else ""
+
+
+class StorageTopology:
+    """
+    Hash indexes over the filesystems, LVM volumes and Azure storage of a host.
+
+    The topology is built once per run from the storage context and shared by the
+    filesystem collector and the Azure data parser, so that every lookup of a check is
+    answered without rescanning the metadata lists.
+    """
+
+    def __init__(
+        self,
+        azure_disks: Optional[List[dict]] = None,
+        anf_volumes: Optional[List[dict]] = None,
+        afs_shares: Optional[List[dict]] = None,
+        imds_disks: Optional[List[dict]] = None,
+        lvm_volumes: Optional[Dict[str, dict]] = None,
+        vg_to_disk_names: Optional[Dict[str, List[str]]] = None,
+        lvm_report: Optional[LvmReport] = None,
+    ):
+        self.azure_disks = list(azure_disks or [])
+        self.anf_volumes = list(anf_volumes or [])
+        self.afs_shares = list(afs_shares or [])
+        self.imds_disks = list(imds_disks or [])
+        self.lvm_volumes = dict(lvm_volumes or {})
+        self.vg_to_disk_names = dict(vg_to_disk_names or {})
+        self.filesystems: List[dict] = []
+
+        self._disks_by_name = {
+            name: self.azure_disks[position]
+            for name, position in _first_index(self.azure_disks, lambda d: d.get("name")).items()
+        }
+        self._anf_by_ip = {
+            ip: self.anf_volumes[position]
+            for ip, position in _first_index(self.anf_volumes, lambda v: v.get("ip")).items()
+        }
+        self._imds_by_lun = {
+            str(disk["lun"]): disk for disk in self.imds_disks if disk.get("lun") is not None
+        }
+        self._lv_by_dm_path: Dict[str, dict] = {}
+        for logical_volume in self.lvm_volumes.values():
+            if logical_volume.get("dm_path"):
+                self._lv_by_dm_path.setdefault(logical_volume["dm_path"], logical_volume)
+        self._vg_by_device = (
+            {pv.device_name: pv.vg_name for pv in lvm_report.pvs} if lvm_report else {}
+        )
+        self._afs_by_host = _first_index(
+            self.afs_shares, lambda s: _nfs_host(s.get("NFSAddress", ""))
+        )
+        self._afs_by_account = _first_index(self.afs_shares, lambda s: s.get("Pool"))
+        self._filesystems_by_target: Dict[str, int] = {}
+        self._disk_by_device: Dict[tuple, Optional[dict]] = {}
+        self._afs_by_source: Dict[str, Optional[dict]] = {}
+
+    @classmethod
+    def from_context(
+        cls,
+        context: Dict[str, Any],
+        log: Callable[[int, str], None],
+        lvm_volumes: Optional[Dict[str, dict]] = None,
+        vg_to_disk_names: Optional[Dict[str, List[str]]] = None,
+        lvm_report: Optional[LvmReport] = None,
+    ) -> "StorageTopology":
+        """
+        Build the topology from the storage metadata of a check context.
+
+        Filesystems already present in the context are indexed as well.
+
+        :param context: Context containing the storage metadata
+        :type context: Dict[str, Any]
+        :param log: Logging function of the parent module
+        :type log: Callable[[int, str], None]
+        :param lvm_volumes: Logical volumes keyed by name
+        :type lvm_volumes: Dict[str, dict]
+        :param vg_to_disk_names: Mapping of VG names to Azure disk names
+        :type vg_to_disk_names: Dict[str, List[str]]
+        :param lvm_report: Parsed LVM full report
+        :type lvm_report: LvmReport
+        :return: Storage topology
+        :rtype: StorageTopology
+        """
+        topology = cls(
+            azure_disks=parse_metadata(context.get("azure_disks_metadata", []), "Azure disk", log),
+            anf_volumes=parse_metadata(context.get("anf_storage_metadata", ""), "ANF storage", log),
+            afs_shares=parse_metadata(context.get("afs_storage_metadata", ""), "AFS storage", log),
+            imds_disks=parse_metadata(context.get("imds_disks_metadata", []), "IMDS disk", log),
+            lvm_volumes=lvm_volumes,
+            vg_to_disk_names=vg_to_disk_names,
+            lvm_report=lvm_report,
+        )
+        topology.index_filesystems(context.get("filesystems", []))
+        return topology
+
+    def index_filesystems(self, filesystems: List[dict]) -> None:
+        """
+        Index the parsed filesystems by mount point.
+
+        :param filesystems: Filesystem entries in mount order
+        :type filesystems: List[dict]
+        """
+        self.filesystems = list(filesystems)
+        self._filesystems_by_target = _first_index(self.filesystems, lambda f: f.get("target"))
+
+    def get_filesystem(self, *targets: str) -> Optional[dict]:
+        """
+        Get the first mounted filesystem matching any of the given mount points.
+
+        :param targets: Candidate mount points
+        :type targets: str
+        :return: Filesystem entry or None
+        :rtype: Optional[dict]
+        """
+        positions = [
+            self._filesystems_by_target[target]
+            for target in targets
+            if target in self._filesystems_by_target
+        ]
+        return self.filesystems[min(positions)] if positions else None
+
+    def get_logical_volume(self, dm_path: str) -> Optional[dict]:
+        """
+        Get the LVM logical volume behind a device mapper path.
+
+        :param dm_path: Device mapper path such as /dev/mapper/vg-lv
+        :type dm_path: str
+        :return: Logical volume entry or None
+        :rtype: Optional[dict]
+        """
+        return self._lv_by_dm_path.get(dm_path)
+
+    def get_vg_disk_names(self, vg_name: str) -> List[str]:
+        """
+        Get the Azure disk names backing a volume group.
+
+        :param vg_name: Volume group name
+        :type vg_name: str
+        :return: Azure disk names
+        :rtype: List[str]
+        """
+        return self.vg_to_disk_names.get(vg_name, [])
+
+    def get_device_vg(self, device_name: str) -> str:
+        """
+        Get the volume group of an LVM physical volume device.
+
+        :param device_name: Kernel device name such as sdc
+        :type device_name: str
+        :return: Volume group name, or an empty string if the device is not an LVM PV
+        :rtype: str
+        """
+        return self._vg_by_device.get(device_name, "")
+
+    def get_disk(self, name: str) -> Optional[dict]:
+        """
+        Get the Azure disk metadata by disk name.
+
+        :param name: Azure disk name
+        :type name: str
+        :return: Disk metadata or None
+        :rtype: Optional[dict]
+        """
+        return self._disks_by_name.get(name)
+
+    def find_disk_by_device(self, device_name: str, suffix: bool = True) -> Optional[dict]:
+        """
+        Get the first Azure disk whose name ends with (or contains) a device name.
+
+        Results are memoised, so repeated lookups for the same device are O(1).
+
+        :param device_name: Kernel device name such as sdc
+        :type device_name: str
+        :param suffix: Match the end of the disk name instead of any part of it
+        :type suffix: bool
+        :return: Disk metadata or None
+        :rtype: Optional[dict]
+        """
+        key = (device_name, suffix)
+        if key not in self._disk_by_device:
+            self._disk_by_device[key] = next(
+                (
+                    disk
+                    for disk in self.azure_disks
+                    if (
+                        disk.get("name", "").endswith(device_name)
+                        if suffix
+                        else device_name in disk.get("name", "")
+                    )
+                ),
+                None,
+            )
+        return self._disk_by_device[key]
+
+    def get_imds_disk(self, lun: Any) -> Optional[dict]:
+        """
+        Get the IMDS data disk attached at a LUN.
+
+        :param lun: LUN number
+        :type lun: Any
+        :return: IMDS disk entry or None
+        :rtype: Optional[dict]
+        """
+        return self._imds_by_lun.get(str(lun))
+
+    def get_anf_volume(self, ip_address: str) -> Optional[dict]:
+        """
+        Get the Azure NetApp Files volume exported from an IP address.
+
+        :param ip_address: NFS server address of the mount
+        :type ip_address: str
+        :return: ANF volume metadata or None
+        :rtype: Optional[dict]
+        """
+        return self._anf_by_ip.get(ip_address)
+
+    def find_afs_share(self, nfs_source: str) -> Optional[dict]:
+        """
+        Get the Azure Files share of an NFS mount source.
+
+        A share matches when its NFS address has the same server as the mount, or when its
+        storage account name is a host label or path component of the mount source. The
+        first matching share in metadata order is returned.
+
+        :param nfs_source: Mount source such as account.file.core.windows.net:/account/share
+        :type nfs_source: str
+        :return: AFS share metadata or None
+        :rtype: Optional[dict]
+        """
+        if nfs_source not in self._afs_by_source:
+            host = _nfs_host(nfs_source)
+            path = nfs_source.split(":", 1)[1] if ":" in nfs_source else ""
+            positions = [self._afs_by_host[host]] if host in self._afs_by_host else []
+            positions.extend(
+                self._afs_by_account[token]
+                for token in host.split(".") + path.split("/")
+                if token in self._afs_by_account
+            )
+            self._afs_by_source[nfs_source] = self.afs_shares[min(positions)] if positions else None
+        return self._afs_by_source[nfs_source]
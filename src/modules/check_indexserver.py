@@ -147,11 +147,8 @@ class IndexServerCheck(SapAutomationQA):
             )
             return
 
-        global_ini_path = f"/usr/sap/{self.database_sid}/SYS/global/hdb/custom/config/global.ini"
-        global_ini = []
         try:
-            with open(global_ini_path, "r", encoding="utf-8") as file:
-                global_ini = [line.strip() for line in file.readlines()]
+            global_ini = self.get_hana_ini(self.database_sid, "global.ini")
 
             self.log(
                 logging.INFO,
@@ -160,20 +157,15 @@ class IndexServerCheck(SapAutomationQA):
 
             for os_props in os_props_list if isinstance(os_props_list, list) else [os_props_list]:
                 section_title = list(os_props.keys())[0]
-                if section_title in global_ini:
-                    section_start = global_ini.index(section_title)
-                    properties_slice = global_ini[section_start + 1 : section_start + 4]
+                section_name = section_title.strip("[]")
+                if section_name in global_ini:
+                    extracted_properties = global_ini[section_name]
 
                     self.log(
                         logging.INFO,
-                        f"Extracted properties: {properties_slice}",
+                        f"Extracted properties: {extracted_properties}",
                     )
 
-                    extracted_properties = {
-                        prop.split("=")[0].strip(): prop.split("=")[1].strip()
-                        for prop in properties_slice
-                    }
-
                     if all(
                         extracted_properties.get(key) == value
                         for key, value in os_props[section_title].items()
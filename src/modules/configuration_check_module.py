@@ -31,6 +31,8 @@ try:
         ModuleCollector,
     )
     from ansible.module_utils.filesystem_collector import FileSystemCollector
+    from ansible.module_utils.shell_session import ShellSessionPool
+    from ansible.module_utils.storage_topology import StorageTopology
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA
     from src.module_utils.enums import (
@@ -47,6 +49,8 @@ except ImportError:
         ModuleCollector,
     )
     from src.module_utils.filesystem_collector import FileSystemCollector
+    from src.module_utils.shell_session import ShellSessionPool
+    from src.module_utils.storage_topology import StorageTopology
 
 
 class ConfigurationCheckModule(SapAutomationQA):
@@ -73,6 +77,14 @@ class ConfigurationCheckModule(SapAutomationQA):
         self.failure_count = 0
         self.max_failures = 5
         self.last_failure_time = None
+        self.command_concurrency = 1
+        self._prefetched_data: Dict[str, Any] = {}
+        self.time_budget: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self.shed_checks: List[str] = []
+        self.session_pool: Optional[ShellSessionPool] = None
+        self.storage_topology: Optional[StorageTopology] = None
+        self.azure_parser_cache: Dict[str, Any] = {}
 
     def _init_collector_registry(self) -> Dict[str, Type[Collector]]:
         """
@@ -97,6 +109,28 @@ class ConfigurationCheckModule(SapAutomationQA):
             "properties": self.validate_properties,
         }
 
+    def start_time_budget(self, time_budget: Optional[float]) -> None:
+        """
+        Start the run-level time budget shared by all checks of this execution.
+
+        :param time_budget: Time budget in seconds, None or 0 to run without a budget
+        :type time_budget: Optional[float]
+        """
+        self.time_budget = time_budget if time_budget and time_budget > 0 else None
+        self._deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        self.shed_checks = []
+
+    def get_remaining_time(self) -> Optional[float]:
+        """
+        Get the time left in the run-level time budget.
+
+        :return: Remaining seconds, or None when no budget is set
+        :rtype: Optional[float]
+        """
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+
     def execute_check_with_retry(self, check: Check, max_retries: int = 3) -> CheckResult:
         """
         Execute check with retry logic for enhanced robustness
@@ -123,6 +157,13 @@ class ConfigurationCheckModule(SapAutomationQA):
                     logging.WARNING, f"Check {check.id} failed on attempt {attempt + 1}: {str(e)}"
                 )
 
+                remaining = self.get_remaining_time()
+                if remaining is not None and remaining <= 2**attempt:
+                    self.log(
+                        logging.WARNING,
+                        f"Not retrying check {check.id}, run time budget is exhausted",
+                    )
+                    break
                 if attempt < max_retries - 1:
                     wait_time = 2**attempt
                     self.log(logging.INFO, f"Retrying check {check.id} in {wait_time} seconds...")
@@ -141,6 +182,38 @@ class ConfigurationCheckModule(SapAutomationQA):
             details=f"Check failed after {max_retries} attempts. Last error: {str(last_error)}",
         )
 
+    def prefetch_command_outputs(self, checks: List[Check]) -> None:
+        """
+        Run the commands of applicable command checks concurrently before validation.
+
+        The outputs are consumed by execute_check instead of running each command on its own.
+        Nothing is prefetched unless command_concurrency is greater than one.
+
+        :param checks: Checks that are about to be executed
+        :type checks: List[Check]
+        """
+        if self.command_concurrency <= 1:
+            return
+        command_checks = [
+            check
+            for check in checks
+            if check.collector_type == "command"
+            and self._collector_registry.get("command") is CommandCollector
+            and self.is_check_applicable(check)
+        ]
+        if not command_checks:
+            return
+        self.log(
+            logging.INFO,
+            f"Collecting {len(command_checks)} command checks with "
+            + f"concurrency {self.command_concurrency}",
+        )
+        outputs = CommandCollector(parent=self).collect_many(
+            command_checks, self.context, max_concurrency=self.command_concurrency
+        )
+        for check, output in zip(command_checks, outputs):
+            self._prefetched_data[check.id] = output
+
     def build_execution_order(self, checks: List[Check]) -> List[List[Check]]:
         """
         Group checks into execution batches based on dependencies using simple topological sort
@@ -180,6 +253,7 @@ class ConfigurationCheckModule(SapAutomationQA):
         filter_categories: Optional[List[str]] = None,
         max_workers: int = 3,
         enable_retry: bool = True,
+        time_budget: Optional[float] = None,
     ) -> list:
         """
         Execute checks in parallel batches respecting dependencies
@@ -192,6 +266,8 @@ class ConfigurationCheckModule(SapAutomationQA):
         :type max_workers: int
         :param enable_retry: Whether to enable retry mechanism
         :type enable_retry: bool
+        :param time_budget: Run-level time budget in seconds
+        :type time_budget: Optional[float]
         :return: List of check results
         :rtype: List[CheckResult]
         """
@@ -212,6 +288,8 @@ class ConfigurationCheckModule(SapAutomationQA):
             return []
 
         self.start_time = datetime.now()
+        self.start_time_budget(time_budget)
+        self.prefetch_command_outputs(checks_to_run)
         self.log(
             logging.INFO,
             f"Starting parallel execution of {len(checks_to_run)} checks with {max_workers} workers",
@@ -249,6 +327,11 @@ class ConfigurationCheckModule(SapAutomationQA):
         duration = (self.end_time - self.start_time).total_seconds()
 
         self.log(logging.INFO, f"Parallel execution completed in {duration:.2f} seconds")
+        if self.shed_checks:
+            self.log(
+                logging.WARNING,
+                f"Run time budget exhausted, {len(self.shed_checks)} checks were not executed",
+            )
 
         summary = self.get_results_summary()
 
@@ -265,6 +348,7 @@ class ConfigurationCheckModule(SapAutomationQA):
                     "parallel_batches": len(execution_batches),
                     "max_workers": max_workers,
                 },
+                "shed_checks": self.shed_checks,
             }
         )
 
@@ -305,6 +389,31 @@ class ConfigurationCheckModule(SapAutomationQA):
         self.context = context
         self.hostname = context.get("hostname")
 
+    def load_storage_context(self, path: str) -> Dict[str, Any]:
+        """
+        Load the storage artefacts (mount, df, LVM and Azure storage metadata) written to a
+        temporary file on the node by the configuration checks role.
+
+        :param path: Path to the JSON file
+        :type path: str
+        :return: Storage context entries, or an empty dictionary if the file is not usable
+        :rtype: Dict[str, Any]
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                storage_context = json.load(cache_file)
+        except (OSError, ValueError) as ex:
+            self.log(logging.WARNING, f"Could not load storage context from {path}: {ex}")
+            return {}
+        if not isinstance(storage_context, dict):
+            self.log(logging.WARNING, f"Storage context in {path} is not a dictionary")
+            return {}
+        self.log(
+            logging.INFO,
+            f"Loaded storage context from {path}: {sorted(storage_context.keys())}",
+        )
+        return storage_context
+
     def load_checks(self, raw_file_content: str) -> None:
         """
         Load checks from a YAML file.
@@ -697,6 +806,15 @@ class ConfigurationCheckModule(SapAutomationQA):
         if not self.is_check_applicable(check):
             return create_result(TestStatus.SKIPPED.value, details="Check not applicable")
 
+        remaining = self.get_remaining_time()
+        if remaining is not None and remaining <= 0:
+            self.shed_checks.append(check.id)
+            return create_result(
+                TestStatus.WARNING.value,
+                details=f"Check not executed: run time budget of {self.time_budget} seconds "
+                + "exhausted",
+            )
+
         collector_class = self._collector_registry.get(check.collector_type)
         if not collector_class:
             available = list(self._collector_registry.keys())
@@ -708,7 +826,10 @@ class ConfigurationCheckModule(SapAutomationQA):
         collector = collector_class(parent=self)
         start_time = time.time()
         try:
-            collected_data = collector.collect(check, self.context)
+            if check.id in self._prefetched_data:
+                collected_data = self._prefetched_data.pop(check.id)
+            else:
+                collected_data = collector.collect(check, self.context)
             execution_time = time.time() - start_time
             if check.severity == TestSeverity.INFO:
                 return create_result(TestStatus.INFO.value, actual_value=collected_data)
@@ -736,6 +857,7 @@ class ConfigurationCheckModule(SapAutomationQA):
         parallel: bool = False,
         max_workers: int = 3,
         enable_retry: bool = False,
+        time_budget: Optional[float] = None,
     ) -> list:
         """
         Execute all loaded checks, optionally filtered by tags or categories
@@ -750,6 +872,9 @@ class ConfigurationCheckModule(SapAutomationQA):
         :type max_workers: int
         :param enable_retry: Whether to enable retry mechanism for failed checks
         :type enable_retry: bool
+        :param time_budget: Run-level time budget in seconds; checks that have not started
+            when it runs out are reported without being executed
+        :type time_budget: Optional[float]
         :return: List of check results
         :rtype: List[CheckResult]
         """
@@ -759,6 +884,7 @@ class ConfigurationCheckModule(SapAutomationQA):
                 filter_categories=filter_categories,
                 max_workers=max_workers,
                 enable_retry=enable_retry,
+                time_budget=time_budget,
             )
         checks_to_run = self.checks
 
@@ -779,6 +905,8 @@ class ConfigurationCheckModule(SapAutomationQA):
             return list()
 
         self.start_time = datetime.now()
+        self.start_time_budget(time_budget)
+        self.prefetch_command_outputs(checks_to_run)
         self.log(logging.INFO, f"Starting execution of {len(checks_to_run)} checks")
 
         results = list()
@@ -791,6 +919,11 @@ class ConfigurationCheckModule(SapAutomationQA):
             self.result["check_results"].append(result)
 
         self.end_time = datetime.now()
+        if self.shed_checks:
+            self.log(
+                logging.WARNING,
+                f"Run time budget exhausted, {len(self.shed_checks)} checks were not executed",
+            )
 
         summary = self.get_results_summary()
 
@@ -811,6 +944,7 @@ class ConfigurationCheckModule(SapAutomationQA):
                 "message": f"Check execution completed with {summary['failed']} failures",
                 "summary": summary,
                 "check_results": results,
+                "shed_checks": self.shed_checks,
             }
         )
         return results
@@ -934,12 +1068,17 @@ class ConfigurationCheckModule(SapAutomationQA):
                 context["hostname"] = custom_hostname
 
             self.set_context(context)
+            self.command_concurrency = self.module_params.get("command_concurrency") or 1
             if self.context.get("check_type", {}).get("file_name") in [
                 "hana",
                 "db2",
                 "ascs",
                 "app",
             ]:
+                if self.module_params.get("storage_context_file"):
+                    self.context.update(
+                        self.load_storage_context(self.module_params["storage_context_file"])
+                    )
                 temp_context = FileSystemCollector(parent=self).collect(
                     check=None, context=self.context
                 )
@@ -972,13 +1111,21 @@ class ConfigurationCheckModule(SapAutomationQA):
                 )
                 self.module.exit_json(**self.result)
                 return
-            self.execute_checks(
-                filter_tags=self.module_params["filter_tags"],
-                filter_categories=self.module_params["filter_categories"],
-                parallel=self.module_params.get("parallel_execution", False),
-                max_workers=self.module_params.get("max_workers", 3),
-                enable_retry=self.module_params.get("enable_retry", False),
-            )
+            if self.module_params.get("reuse_user_sessions", False):
+                self.session_pool = ShellSessionPool(parent=self)
+            try:
+                self.execute_checks(
+                    filter_tags=self.module_params["filter_tags"],
+                    filter_categories=self.module_params["filter_categories"],
+                    parallel=self.module_params.get("parallel_execution", False),
+                    max_workers=self.module_params.get("max_workers", 3),
+                    enable_retry=self.module_params.get("enable_retry", False),
+                    time_budget=self.module_params.get("time_budget"),
+                )
+            finally:
+                if self.session_pool is not None:
+                    self.session_pool.close()
+                    self.session_pool = None
             self.format_results_for_html_report()
             result = dict(self.result)
             execution_end_time = datetime.now()
@@ -1048,7 +1195,11 @@ def main():
         filter_categories=dict(type="list", elements="str", required=False, default=None),
         parallel_execution=dict(type="bool", required=False, default=False),
         max_workers=dict(type="int", required=False, default=3),
+        command_concurrency=dict(type="int", required=False, default=1),
         enable_retry=dict(type="bool", required=False, default=False),
+        time_budget=dict(type="float", required=False, default=None),
+        reuse_user_sessions=dict(type="bool", required=False, default=False),
+        storage_context_file=dict(type="str", required=False, default=None),
         workspace_directory=dict(type="str", required=True),
         hostname=dict(type="str", required=False, default=None),
         test_group_invocation_id=dict(type="str", required=True),
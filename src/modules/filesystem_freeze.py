@@ -12,9 +12,11 @@ from ansible.module_utils.basic import AnsibleModule
 try:
     from ansible.module_utils.sap_automation_qa import SapAutomationQA, TestStatus
     from ansible.module_utils.commands import FREEZE_FILESYSTEM
+    from ansible.module_utils.mount_probe import MountProbe
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA, TestStatus
     from src.module_utils.commands import FREEZE_FILESYSTEM
+    from src.module_utils.mount_probe import MountProbe
 
 DOCUMENTATION = r"""
 ---
@@ -43,6 +45,7 @@ author:
 notes:
     - This module requires root permissions to execute filesystem commands.
     - Uses /proc/mounts to identify the filesystem device.
+    - Fails without freezing if the filesystem does not answer a statfs call in time.
     - Only works with Azure NetApp Files as the NFS provider.
     - Skips the operation if the NFS provider is not ANF.
 """
@@ -91,6 +94,11 @@ mount_point:
     returned: on success
     type: str
     sample: "/hana/shared"
+stale_mounts:
+    description: Mount points that did not answer when probed.
+    returned: when the filesystem is not responding
+    type: list
+    sample: ["/hana/shared"]
 """
 
 
@@ -141,6 +149,18 @@ class FileSystemFreeze(SapAutomationQA):
         file_system, mount_point = self._find_filesystem()
 
         if file_system and mount_point:
+            probe = MountProbe(self)
+            probe.probe([], isolated=[mount_point])
+            if probe.stale_mounts:
+                self.result.update(
+                    {
+                        "message": f"The filesystem mounted on {mount_point} is not responding.",
+                        "status": TestStatus.ERROR.value,
+                        "stale_mounts": probe.stale_mounts,
+                    }
+                )
+                return self.result
+
             self.log(
                 logging.INFO,
                 f"Found the filesystem mounted on: {file_system} at {mount_point}",
@@ -7,17 +7,21 @@ Custom ansible module for getting Azure Load Balancer details
 
 import logging
 import ast
-from typing import Dict
-from azure.identity import ManagedIdentityCredential
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
 from azure.mgmt.network import NetworkManagementClient
 from ansible.module_utils.basic import AnsibleModule
 
 try:
     from ansible.module_utils.sap_automation_qa import SapAutomationQA
     from ansible.module_utils.enums import TestStatus, Parameters
+    from ansible.module_utils.azure_credentials import get_credential
 except ImportError:
     from src.module_utils.sap_automation_qa import SapAutomationQA
     from src.module_utils.enums import TestStatus, Parameters
+    from src.module_utils.azure_credentials import get_credential
 
 DOCUMENTATION = r"""
 ---
@@ -27,23 +31,36 @@ description:
     - This module retrieves Azure Load Balancer details for DB/SCS/ERS in a specific resource group.
     - Validates load balancer rules and health probe configurations against expected values.
     - Uses Azure SDK to interact with Azure Network resources.
+    - Can record the matched load balancers to a snapshot file and validate offline from it,
+      like the offline validation of the Pacemaker CIB.
 options:
     subscription_id:
         description:
             - The Azure subscription ID.
+            - Required unless validating from loadbalancer_snapshot.
         type: str
-        required: true
+        required: false
     region:
         description:
             - Azure region where the resources are deployed.
+            - Required with subscription_id.
         type: str
-        required: true
+        required: false
+    resource_group:
+        description:
+            - Resource group of the load balancers.
+            - Optional; if not provided, all load balancers of the subscription in the region
+              are searched. Frontend IPs not found in the resource group are searched in the
+              whole subscription.
+        type: str
+        required: false
     inbound_rules:
         description:
             - JSON string containing inbound rule configurations to check for.
             - Must include privateIpAddress fields to match load balancers.
+            - Required with subscription_id; taken from the snapshot if not given offline.
         type: str
-        required: true
+        required: false
     constants:
         description:
             - Dictionary containing expected configuration values for validation.
@@ -56,11 +73,32 @@ options:
             - Optional; if not provided, the default Managed Identity will be used.
         type: str
         required: false
+    token_cache_file:
+        description:
+            - File caching the access token of the managed identity until it expires, shared
+              with the other module runs, e.g. ~/.cache/sap-automation-qa/azure_tokens.json.
+              The file is only readable by the current user.
+            - If not set, the token is kept in memory only.
+        type: str
+        required: false
+    snapshot_file:
+        description:
+            - Path of a file to record the inbound rules and the matched load balancers to,
+              e.g. offline_validation/<host>/loadbalancer.json in the workspace.
+        type: str
+        required: false
+    loadbalancer_snapshot:
+        description:
+            - Content of a recorded snapshot file. When set, the load balancers are validated
+              from the snapshot without calling Azure.
+        type: str
+        required: false
 author:
     - Microsoft Corporation
 notes:
     - Requires Azure SDK for Python.
     - Uses Managed Identity for authentication.
+    - Stops listing load balancers as soon as all frontend IPs of the inbound rules are found.
     - Must be run on a machine with Managed Identity credentials configured.
 requirements:
     - python >= 3.6
@@ -105,6 +143,20 @@ EXAMPLES = r"""
           number_of_probes: 3
     msi_client_id: "{{ managed_identity_client_id }}"
   register: lb_result
+
+- name: Record the load balancers for offline validation
+  get_azure_lb:
+    subscription_id: "{{ azure_subscription_id }}"
+    region: "{{ azure_region }}"
+    inbound_rules: "{{ inbound_rules | to_json }}"
+    constants: "{{ all_constants }}"
+    snapshot_file: "{{ _workspace_directory }}/offline_validation/{{ hostname }}/loadbalancer.json"
+
+- name: Validate the load balancers from the recorded snapshot
+  get_azure_lb:
+    constants: "{{ all_constants }}"
+    loadbalancer_snapshot: "{{ lookup('file', snapshot_path) }}"
+  register: lb_result
 """
 
 RETURN = r"""
@@ -156,6 +208,24 @@ details:
 """
 
 
+def _get_field(resource: Any, name: str) -> Any:
+    """
+    Read a field of an SDK model object, or of its dictionary form from a snapshot.
+    """
+    if isinstance(resource, dict):
+        return resource.get(name)
+    return getattr(resource, name, None)
+
+
+def _get_private_ip(config: Any) -> Optional[str]:
+    """
+    Extract private IP from frontend config, handling different key variations.
+    Azure SDK might return different structures based on authentication context, and
+    configs are read from the SDK model objects without converting them to dictionaries.
+    """
+    return _get_field(config, "private_ip_address") or _get_field(config, "privateIpAddress")
+
+
 class AzureLoadBalancer(SapAutomationQA):
     """
     Class to get the details of the DB/SCS/ERS load balancers in a specific resource group.
@@ -167,18 +237,17 @@ class AzureLoadBalancer(SapAutomationQA):
         self.module_params = module_params
         self.network_client = None
         self.constants = module_params["constants"].get("AZURE_LOADBALANCER", {})
+        self.frontend_ip_index: Dict[str, Any] = {}
 
     def _create_network_client(self) -> bool:
         """
-        Create the network client object.
+        Create the network client object with the shared, token-caching credential.
         """
         try:
-            if self.module_params.get("msi_client_id"):
-                self.credential = ManagedIdentityCredential(
-                    client_id=self.module_params["msi_client_id"]
-                )
-            else:
-                self.credential = ManagedIdentityCredential()
+            self.credential = get_credential(
+                self.module_params.get("msi_client_id"),
+                self.module_params.get("token_cache_file") or None,
+            )
             self.network_client = NetworkManagementClient(
                 self.credential, self.module_params["subscription_id"]
             )
@@ -190,10 +259,18 @@ class AzureLoadBalancer(SapAutomationQA):
             )
             return False
 
-    def get_load_balancers(self) -> list:
+    def get_load_balancers(self, wanted_ips: Optional[Iterable[str]] = None) -> list:
         """
-        Get the list of load balancers in a specific resource group.
+        Get the list of load balancers in the region.
 
+        Only the resource group is listed when it is known, falling back to the whole
+        subscription for wanted frontend IPs that are not in it. Pages are fetched lazily,
+        and listing stops once load balancers with all wanted frontend IPs have been found.
+        The load balancers are returned as SDK objects; only their frontend IP
+        configurations are read, to index them by private IP in frontend_ip_index.
+
+        :param wanted_ips: Private frontend IPs to look for
+        :type wanted_ips: Optional[Iterable[str]]
         :return: List of load balancers
         :rtype: list
         """
@@ -201,33 +278,126 @@ class AzureLoadBalancer(SapAutomationQA):
             if self.network_client is None:
                 return []
 
-            load_balancers = self.network_client.load_balancers.list_all()
-            return [
-                lb.as_dict()
-                for lb in load_balancers
-                if str(lb.location).lower() == self.module_params["region"].lower()
-            ]
+            listings = [self.network_client.load_balancers.list_all]
+            resource_group = self.module_params.get("resource_group")
+            if resource_group:
+                listings.insert(0, lambda: self.network_client.load_balancers.list(resource_group))
+            missing_ips = set(wanted_ips or [])
+            found = []
+            seen_ids = set()
+            for index, listing in enumerate(listings):
+                if index:
+                    self.log(
+                        logging.INFO,
+                        f"Frontend IPs {sorted(missing_ips)} not found in resource group "
+                        + f"{resource_group}, listing the subscription",
+                    )
+                for lb in listing():
+                    if str(lb.location).lower() != self.module_params["region"].lower():
+                        continue
+                    lb_id = getattr(lb, "id", None)
+                    if lb_id is not None:
+                        if lb_id in seen_ids:
+                            continue
+                        seen_ids.add(lb_id)
+                    found.append(lb)
+                    for config in lb.frontend_ip_configurations or []:
+                        private_ip = _get_private_ip(config)
+                        if private_ip:
+                            self.frontend_ip_index.setdefault(private_ip, lb)
+                            missing_ips.discard(private_ip)
+                    if wanted_ips and not missing_ips:
+                        self.log(logging.INFO, "Found all frontend IPs, stopped listing")
+                        return found
+                if not wanted_ips:
+                    break
+            return found
 
         except Exception as ex:
             self.handle_error(ex)
             self.result["message"] += f" Failed to get load balancers. {ex} \n"
         return []
 
-    def get_load_balancers_details(self) -> None:
+    def load_snapshot(self, snapshot: str) -> Tuple[list, list]:
         """
-        Get the details of the load balancers in a specific resource group.
+        Load the inbound rules and load balancers of a recorded snapshot.
+
+        The load balancers are indexed by frontend IP like the ones listed from Azure.
+
+        :param snapshot: Content of the snapshot file
+        :type snapshot: str
+        :return: Inbound rules and load balancers in dictionary form
+        :rtype: Tuple[list, list]
         """
-        self._create_network_client()
+        content = json.loads(snapshot)
+        load_balancers = content.get("load_balancers") or []
+        for lb in load_balancers:
+            for config in lb.get("frontend_ip_configurations") or []:
+                private_ip = _get_private_ip(config)
+                if private_ip:
+                    self.frontend_ip_index.setdefault(private_ip, lb)
+        self.log(
+            logging.INFO,
+            f"Loaded {len(load_balancers)} load balancers recorded at "
+            + f"{content.get('recorded_at', 'unknown time')}",
+        )
+        return content.get("inbound_rules") or [], load_balancers
 
-        if self.result["status"] == TestStatus.ERROR.value:
-            return self.result
+    def save_snapshot(self, path: str, inbound_rules: list, load_balancers: list) -> None:
+        """
+        Record the inbound rules and the matched load balancers for offline validation.
+
+        :param path: Path of the snapshot file
+        :type path: str
+        :param inbound_rules: Inbound rules of the load balancer metadata
+        :type inbound_rules: list
+        :param load_balancers: Matched load balancers in dictionary form
+        :type load_balancers: list
+        """
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as snapshot_file:
+                json.dump(
+                    {
+                        "subscription_id": self.module_params.get("subscription_id"),
+                        "region": self.module_params.get("region"),
+                        "recorded_at": datetime.now(timezone.utc).isoformat(),
+                        "inbound_rules": inbound_rules,
+                        "load_balancers": load_balancers,
+                    },
+                    snapshot_file,
+                    indent=2,
+                    default=str,
+                )
+            self.log(logging.INFO, f"Recorded {len(load_balancers)} load balancers to {path}")
+        except OSError as ex:
+            self.log(logging.WARNING, f"Could not record load balancer snapshot to {path}: {ex}")
 
-        load_balancers = self.get_load_balancers()
+    def get_load_balancers_details(self) -> Dict[str, Any]:
+        """
+        Get the details of the load balancers in a specific resource group.
 
-        if self.result["status"] == TestStatus.ERROR.value:
-            return self.result
+        :return: Result of the validation, also kept in self.result
+        :rtype: Dict[str, Any]
+        """
+        snapshot = self.module_params.get("loadbalancer_snapshot")
+        if snapshot:
+            try:
+                inbound_rules, load_balancers = self.load_snapshot(snapshot)
+            except (ValueError, AttributeError) as ex:
+                self.handle_error(ex)
+                self.result["message"] += f" Failed to load the load balancer snapshot. {ex} \n"
+                return self.result
+            if self.module_params.get("inbound_rules"):
+                inbound_rules = ast.literal_eval(self.module_params["inbound_rules"])
+        else:
+            self._create_network_client()
+
+            if self.result["status"] == TestStatus.ERROR.value:
+                return self.result
+
+            inbound_rules = ast.literal_eval(self.module_params["inbound_rules"])
 
-        inbound_rules = ast.literal_eval(self.module_params["inbound_rules"])
         load_balancer_ips = list(
             inbound_rule["privateIpAddress"]
             for inbound_rule in inbound_rules
@@ -236,42 +406,35 @@ class AzureLoadBalancer(SapAutomationQA):
 
         self.log(logging.INFO, f"Looking for load balancers with IPs: {load_balancer_ips}")
 
-        found_load_balancer = None
-
-        def get_private_ip_from_config(config):
-            """
-            Extract private IP from frontend config, handling different key variations.
-            Azure SDK might return different structures based on authentication context.
-            """
-            private_ip = config.get("private_ip_address") or config.get("privateIpAddress")
-            return private_ip
-
-        found_load_balancer = next(
-            (
-                lb
-                for lb in load_balancers
-                for frontend_ip_config in lb.get("frontend_ip_configurations", [])
-                if get_private_ip_from_config(frontend_ip_config) in load_balancer_ips
-            ),
-            None,
-        )
+        if not snapshot:
+            load_balancers = self.get_load_balancers(load_balancer_ips)
+
+            if self.result["status"] == TestStatus.ERROR.value:
+                return self.result
+
+        matched_ids = {
+            id(self.frontend_ip_index[ip])
+            for ip in load_balancer_ips
+            if ip in self.frontend_ip_index
+        }
+        found_load_balancers = [
+            lb if isinstance(lb, dict) else lb.as_dict()
+            for lb in load_balancers
+            if id(lb) in matched_ids
+        ]
+        if not snapshot and self.module_params.get("snapshot_file"):
+            self.save_snapshot(
+                self.module_params["snapshot_file"], inbound_rules, found_load_balancers
+            )
 
-        if not found_load_balancer and load_balancers:
-            available_ips = []
+        if not found_load_balancers and load_balancers:
             self.log(
                 logging.WARNING, f"No matching load balancer found for IPs: {load_balancer_ips}"
             )
-            for lb in load_balancers:
-                lb_name = lb.get("name", "unknown")
-                for config in lb.get("frontend_ip_configurations", []):
-                    private_ip = get_private_ip_from_config(config)
-                    if private_ip:
-                        available_ips.append(f"{lb_name}:{private_ip}")
-                    else:
-                        self.log(
-                            logging.DEBUG,
-                            f"Frontend config structure for {lb_name}: {list(config.keys())}",
-                        )
+            available_ips = [
+                f"{_get_field(lb, 'name') or 'unknown'}:{private_ip}"
+                for private_ip, lb in self.frontend_ip_index.items()
+            ]
             self.log(logging.WARNING, f"Available load balancers and private IPs: {available_ips}")
         parameters = []
 
@@ -296,14 +459,14 @@ class AzureLoadBalancer(SapAutomationQA):
                 )
 
         try:
-            if found_load_balancer:
+            for found_load_balancer in found_load_balancers:
                 self.log(
                     logging.INFO,
                     f"Found load balancer {found_load_balancer['name']}",
                 )
                 self.result[
                     "message"
-                ] += f"Validating load balancer parameters {found_load_balancer['name']}"
+                ] += f"Validating load balancer parameters {found_load_balancer['name']}. "
                 for rule in found_load_balancer["load_balancing_rules"]:
                     try:
                         check_parameters(
@@ -332,6 +495,7 @@ class AzureLoadBalancer(SapAutomationQA):
                         ] += f"Failed to validate load balancer probe parameters. {ex} \n"
                         continue
 
+            if found_load_balancers:
                 failed_parameters = [
                     param
                     for param in parameters
@@ -364,20 +528,31 @@ class AzureLoadBalancer(SapAutomationQA):
         except Exception as ex:
             self.handle_error(ex)
 
+        return self.result
+
 
 def run_module():
     """
     Entry point of the script.
     """
     module_args = dict(
-        subscription_id=dict(type="str", required=True),
-        region=dict(type="str", required=True),
-        inbound_rules=dict(type="str", required=True),
+        subscription_id=dict(type="str", required=False),
+        region=dict(type="str", required=False),
+        resource_group=dict(type="str", required=False),
+        inbound_rules=dict(type="str", required=False),
         constants=dict(type="dict", required=True),
         msi_client_id=dict(type="str", required=False),
+        token_cache_file=dict(type="str", required=False),
+        snapshot_file=dict(type="str", required=False),
+        loadbalancer_snapshot=dict(type="str", required=False),
     )
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        required_one_of=[("subscription_id", "loadbalancer_snapshot")],
+        required_by={"subscription_id": ("region", "inbound_rules")},
+    )
 
     load_balancer = AzureLoadBalancer(module_params=module.params)
     load_balancer.get_load_balancers_details()
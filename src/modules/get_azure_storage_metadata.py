@@ -0,0 +1,570 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Custom ansible module for getting Azure disk, NetApp Files and Azure Files metadata
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    from ansible.module_utils.sap_automation_qa import SapAutomationQA
+    from ansible.module_utils.enums import TestStatus
+    from ansible.module_utils.azure_rest_client import AzureRestClient
+    from ansible.module_utils.azure_credentials import get_credential
+except ImportError:
+    from src.module_utils.sap_automation_qa import SapAutomationQA
+    from src.module_utils.enums import TestStatus
+    from src.module_utils.azure_rest_client import AzureRestClient
+    from src.module_utils.azure_credentials import get_credential
+
+DOCUMENTATION = r"""
+---
+module: get_azure_storage_metadata
+short_description: Gets metadata of the Azure storage used by a virtual machine
+description:
+    - Lists the managed disks of a resource group, the volumes of all capacity pools of an
+      Azure NetApp Files account and the NFS shares of Azure Files storage accounts.
+    - Fetches the disks, NetApp capacity pools and volumes and storage accounts with one
+      Azure Resource Graph query, falling back to paged Azure Resource Manager list calls over
+      one authenticated session when Resource Graph is not usable.
+    - Can keep the collected metadata in a workspace cache file for a limited time, so that
+      the check types of a run share one collection.
+    - Returns the metadata in the format expected by the configuration check collectors.
+options:
+    subscription_id:
+        description:
+            - The Azure subscription ID.
+        type: str
+        required: true
+    resource_group_name:
+        description:
+            - Resource group of the managed disks.
+        type: str
+        required: true
+    disk_names:
+        description:
+            - Names of the managed disks to return. All disks of the resource group are
+              returned if empty.
+        type: list
+        elements: str
+        required: false
+    anf_account_resource_group:
+        description:
+            - Resource group of the Azure NetApp Files account.
+            - Defaults to resource_group_name.
+        type: str
+        required: false
+    anf_account_name:
+        description:
+            - Name of the Azure NetApp Files account. ANF metadata is only collected if set.
+        type: str
+        required: false
+    afs_storage_accounts:
+        description:
+            - Names of the storage accounts of mounted Azure Files NFS shares.
+        type: list
+        elements: str
+        required: false
+    msi_client_id:
+        description:
+            - Managed Identity Client ID for authentication.
+            - Optional; if not provided, the default Managed Identity will be used.
+        type: str
+        required: false
+    use_resource_graph:
+        description:
+            - Fetch the resources with one Azure Resource Graph query instead of one list call
+              per collection.
+        type: bool
+        required: false
+        default: true
+    cache_file:
+        description:
+            - JSON file in the workspace caching the collected metadata.
+            - Metadata is only read from and written to the cache if set.
+            - Writers of the file are serialized with a lock on the file with a .lock suffix.
+        type: str
+        required: false
+    cache_ttl:
+        description:
+            - Seconds for which cached metadata is reused.
+        type: int
+        required: false
+        default: 300
+author:
+    - Microsoft Corporation
+notes:
+    - Uses Managed Identity for authentication.
+    - Must be run on a machine with Managed Identity credentials configured.
+requirements:
+    - python >= 3.6
+    - azure-identity
+    - requests
+"""
+
+EXAMPLES = r"""
+- name: Collect Azure disk, ANF and AFS metadata
+  delegate_to: localhost
+  get_azure_storage_metadata:
+    subscription_id: "{{ compute_metadata.json.compute.subscriptionId }}"
+    resource_group_name: "{{ compute_metadata.json.compute.resourceGroupName }}"
+    disk_names: "{{ storage_discovery.imds_disks_metadata | map(attribute='name') | list }}"
+    anf_account_name: "{{ ANF_account_name }}"
+    afs_storage_accounts: "{{ storage_discovery.afs_storage_accounts }}"
+    cache_file: "{{ _workspace_directory }}/cache/azure_storage_metadata.json"
+  register: azure_storage_metadata
+"""
+
+RETURN = r"""
+status:
+    description: Status of the collection.
+    returned: always
+    type: str
+    sample: "PASSED"
+azure_disks_metadata:
+    description: Managed disks with name, sku, size, encryption, iops, mbps and tier.
+    returned: always
+    type: list
+anf_storage_metadata:
+    description: NetApp volumes with name, id, throughputMibps, serviceLevel, qosType and ip.
+    returned: always
+    type: list
+afs_storage_metadata:
+    description: Azure Files NFS shares with their throughput and IOPS limits.
+    returned: always
+    type: list
+cached:
+    description: Whether the metadata was read from the cache file.
+    returned: always
+    type: bool
+"""
+
+COMPUTE_API_VERSION = "2023-04-02"
+NETAPP_API_VERSION = "2023-07-01"
+STORAGE_API_VERSION = "2023-01-01"
+DISK_TYPE = "microsoft.compute/disks"
+CAPACITY_POOL_TYPE = "microsoft.netapp/netappaccounts/capacitypools"
+VOLUME_TYPE = "microsoft.netapp/netappaccounts/capacitypools/volumes"
+STORAGE_ACCOUNT_TYPE = "microsoft.storage/storageaccounts"
+CACHE_KEYS = (
+    "subscription_id",
+    "resource_group_name",
+    "disk_names",
+    "anf_account_resource_group",
+    "anf_account_name",
+    "afs_storage_accounts",
+)
+
+
+def _kusto_string(value: str) -> str:
+    """
+    Quote a value as a Kusto string literal.
+    """
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class AzureStorageMetadata(SapAutomationQA):
+    """
+    Class to get the metadata of the Azure storage used by a virtual machine.
+    """
+
+    def __init__(self, module_params: Dict[str, Any], client: AzureRestClient = None):
+        super().__init__()
+        self.module_params = module_params
+        self.client = client
+        self.subscription_path = f"/subscriptions/{module_params['subscription_id']}"
+        self.resources: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+    def _create_client(self) -> None:
+        """
+        Create the Resource Manager client with the shared managed identity credential.
+        """
+        if self.client is not None:
+            return
+        self.client = AzureRestClient(get_credential(self.module_params.get("msi_client_id")))
+
+    def _get_anf_resource_group(self) -> str:
+        """
+        Get the resource group of the NetApp account.
+
+        :return: Resource group name
+        :rtype: str
+        """
+        return (
+            self.module_params.get("anf_account_resource_group")
+            or self.module_params["resource_group_name"]
+        )
+
+    def build_resource_query(self) -> str:
+        """
+        Build the Resource Graph query selecting all resources the collectors need.
+
+        :return: Kusto query
+        :rtype: str
+        """
+        conditions = [
+            f"(type =~ '{DISK_TYPE}' and resourceGroup =~ "
+            + f"{_kusto_string(self.module_params['resource_group_name'])})"
+        ]
+        if self.module_params.get("anf_account_name"):
+            conditions.append(
+                f"(type in~ ('{CAPACITY_POOL_TYPE}', '{VOLUME_TYPE}') and resourceGroup =~ "
+                + f"{_kusto_string(self._get_anf_resource_group())} and name startswith "
+                + f"{_kusto_string(self.module_params['anf_account_name'] + '/')})"
+            )
+        if self.module_params.get("afs_storage_accounts"):
+            account_names = ", ".join(
+                _kusto_string(name) for name in self.module_params["afs_storage_accounts"]
+            )
+            conditions.append(f"(type =~ '{STORAGE_ACCOUNT_TYPE}' and name in~ ({account_names}))")
+        return (
+            "resources | where "
+            + " or ".join(conditions)
+            + " | project id, name, type, sku, properties"
+        )
+
+    def query_resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch all resources of the collectors with one Resource Graph query.
+
+        :return: Resources by lower-case resource type
+        :rtype: Dict[str, List[Dict[str, Any]]]
+        """
+        resources: Dict[str, List[Dict[str, Any]]] = {
+            DISK_TYPE: [],
+            CAPACITY_POOL_TYPE: [],
+            VOLUME_TYPE: [],
+            STORAGE_ACCOUNT_TYPE: [],
+        }
+        for resource in self.client.query_resources(
+            self.build_resource_query(), [self.module_params["subscription_id"]]
+        ):
+            resources.setdefault(resource.get("type", "").lower(), []).append(resource)
+        return resources
+
+    def get_disks(self) -> List[Dict[str, Any]]:
+        """
+        Get the managed disks of the resource group.
+
+        :return: Disks in the format of "az disk show" used by the collectors
+        :rtype: List[Dict[str, Any]]
+        """
+        disk_names = set(self.module_params.get("disk_names") or [])
+        if self.resources is not None:
+            disks = self.resources[DISK_TYPE]
+        else:
+            disks = self.client.list_all(
+                f"{self.subscription_path}/resourceGroups/"
+                + f"{self.module_params['resource_group_name']}/providers/Microsoft.Compute/disks",
+                COMPUTE_API_VERSION,
+            )
+        return [
+            {
+                "name": disk.get("name"),
+                "sku": disk.get("sku", {}).get("name"),
+                "size": disk.get("properties", {}).get("diskSizeGB"),
+                "encryption": disk.get("properties", {}).get("encryption", {}).get("type"),
+                "iops": disk.get("properties", {}).get("diskIOPSReadWrite"),
+                "mbps": disk.get("properties", {}).get("diskMBpsReadWrite"),
+                "tier": disk.get("properties", {}).get("tier"),
+            }
+            for disk in disks
+            if not disk_names or disk.get("name") in disk_names
+        ]
+
+    def get_anf_volumes(self) -> List[Dict[str, Any]]:
+        """
+        Get the volumes of all capacity pools of the NetApp account.
+
+        :return: Volumes in the format used by the collectors
+        :rtype: List[Dict[str, Any]]
+        """
+        account_path = (
+            f"{self.subscription_path}/resourceGroups/{self._get_anf_resource_group()}"
+            + f"/providers/Microsoft.NetApp/netAppAccounts/{self.module_params['anf_account_name']}"
+        )
+        if self.resources is not None:
+            pools = self.resources[CAPACITY_POOL_TYPE]
+        else:
+            pools = self.client.list_all(f"{account_path}/capacityPools", NETAPP_API_VERSION)
+        volumes = []
+        for pool in pools:
+            pool_name = pool.get("name", "").split("/")[-1]
+            qos_type = pool.get("properties", {}).get("qosType")
+            if self.resources is not None:
+                pool_volumes = [
+                    volume
+                    for volume in self.resources[VOLUME_TYPE]
+                    if volume.get("name", "").split("/")[1:2] == [pool_name]
+                ]
+            else:
+                pool_volumes = self.client.list_all(
+                    f"{account_path}/capacityPools/{pool_name}/volumes", NETAPP_API_VERSION
+                )
+            for volume in pool_volumes:
+                properties = volume.get("properties", {})
+                mount_targets = properties.get("mountTargets") or [{}]
+                volumes.append(
+                    {
+                        "name": volume.get("name"),
+                        "id": volume.get("id"),
+                        "throughputMibps": properties.get("throughputMibps"),
+                        "provisionedAvailabilityZone": properties.get(
+                            "provisionedAvailabilityZone"
+                        ),
+                        "protocolTypes": properties.get("protocolTypes"),
+                        "serviceLevel": properties.get("serviceLevel"),
+                        "qosType": qos_type,
+                        "ip": mount_targets[0].get("ipAddress"),
+                        "token": properties.get("creationToken"),
+                    }
+                )
+        return volumes
+
+    def get_afs_shares(self) -> List[Dict[str, Any]]:
+        """
+        Get the NFS shares of the Azure Files storage accounts.
+
+        Throughput and IOPS limits are derived from the provisioned share quota. Shares are
+        not indexed by Resource Graph, so they are always listed per storage account.
+
+        :return: Shares in the format used by the collectors
+        :rtype: List[Dict[str, Any]]
+        """
+        account_names = set(self.module_params.get("afs_storage_accounts") or [])
+        if self.resources is not None:
+            accounts = self.resources[STORAGE_ACCOUNT_TYPE]
+        else:
+            accounts = self.client.list_all(
+                f"{self.subscription_path}/providers/Microsoft.Storage/storageAccounts",
+                STORAGE_API_VERSION,
+            )
+        accounts = [account for account in accounts if account.get("name") in account_names]
+        shares = []
+        for account in accounts:
+            name = account["name"]
+            dns = f"{name}.privatelink.file.core.windows.net"
+            for share in self.client.list_all(
+                f"{account['id']}/fileServices/default/shares", STORAGE_API_VERSION
+            ):
+                properties = share.get("properties", {})
+                if properties.get("enabledProtocols") != "NFS":
+                    continue
+                quota = int(properties.get("shareQuota") or 0)
+                shares.append(
+                    {
+                        "Type": "AFS",
+                        "Name": share.get("name"),
+                        "Pool": name,
+                        "ServiceLevel": properties.get("accessTier"),
+                        "Quota": str(quota),
+                        "ThroughputMibps": 100 + (quota * 4 + 99) // 100 + (quota * 6 + 99) // 100,
+                        "ProtocolTypes": "NFS4.1",
+                        "NFSAddressDNS": f"{dns}:/{name}/{share.get('name')}",
+                        "NFSAddress": f"{dns}:/{name}/{share.get('name')}",
+                        "QoSType": "Manual",
+                        "IOPS": min(quota + 3000, 100000),
+                        "Id": account.get("id"),
+                    }
+                )
+        return shares
+
+    def _get_cache_key(self) -> str:
+        """
+        Get the key of the collected metadata in the cache file.
+
+        :return: Digest of the parameters selecting the resources
+        :rtype: str
+        """
+        selection = {key: self.module_params.get(key) for key in CACHE_KEYS}
+        return hashlib.sha256(json.dumps(selection, sort_keys=True).encode()).hexdigest()
+
+    def _read_cache(self) -> Dict[str, Any]:
+        """
+        Read the cache file.
+
+        :return: Cache entries by key, or an empty dictionary if the file is not usable
+        :rtype: Dict[str, Any]
+        """
+        try:
+            with open(self.module_params["cache_file"], "r", encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            self.log(logging.WARNING, f"Could not read {self.module_params['cache_file']}: {ex}")
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def load_cached_metadata(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata cached for the same resources within the TTL.
+
+        :return: Cached metadata or None
+        :rtype: Optional[Dict[str, Any]]
+        """
+        if not self.module_params.get("cache_file"):
+            return None
+        entry = self._read_cache().get(self._get_cache_key())
+        if not isinstance(entry, dict):
+            return None
+        age = time.time() - entry.get("timestamp", 0)
+        if not 0 <= age <= (self.module_params.get("cache_ttl") or 0):
+            self.log(logging.INFO, f"Cached Azure storage metadata expired ({age:.0f}s old)")
+            return None
+        self.log(logging.INFO, f"Using Azure storage metadata cached {age:.0f}s ago")
+        return entry.get("metadata")
+
+    def save_cached_metadata(self, metadata: Dict[str, Any]) -> None:
+        """
+        Store the collected metadata in the cache file, replacing the file atomically.
+
+        The hosts of a play write the same file from the controller, so the file is read,
+        merged and replaced under an exclusive lock on a sibling lock file.
+
+        :param metadata: Collected metadata
+        :type metadata: Dict[str, Any]
+        """
+        if not self.module_params.get("cache_file"):
+            return
+        path = self.module_params["cache_file"]
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(f"{path}.lock", "a", encoding="utf-8") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                cache = self._read_cache()
+                cache[self._get_cache_key()] = {"timestamp": time.time(), "metadata": metadata}
+                temporary_path = f"{path}.{os.getpid()}.tmp"
+                with open(temporary_path, "w", encoding="utf-8") as cache_file:
+                    json.dump(cache, cache_file)
+                os.replace(temporary_path, path)
+        except OSError as ex:
+            self.log(logging.WARNING, f"Could not write {path}: {ex}")
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Collect the metadata of all storage types and add it to the result.
+
+        A failure for one storage type is logged and leaves its metadata empty. Only
+        complete collections are cached.
+
+        :return: Result of the module
+        :rtype: Dict[str, Any]
+        """
+        self.result.update(
+            {
+                "azure_disks_metadata": [],
+                "anf_storage_metadata": [],
+                "afs_storage_metadata": [],
+                "cached": False,
+            }
+        )
+        cached_metadata = self.load_cached_metadata()
+        if cached_metadata is not None:
+            self.result.update(cached_metadata)
+            self.result.update(
+                {
+                    "cached": True,
+                    "status": TestStatus.SUCCESS.value,
+                    "message": "Azure storage metadata loaded from cache",
+                }
+            )
+            return self.result
+
+        try:
+            self._create_client()
+        except Exception as ex:
+            self.handle_error(ex)
+            self.result["message"] += " Failed to authenticate to Azure."
+            return self.result
+
+        if self.module_params.get("use_resource_graph", True):
+            try:
+                self.resources = self.query_resources()
+                self.log(
+                    logging.INFO,
+                    "Fetched "
+                    + ", ".join(f"{len(items)} {kind}" for kind, items in self.resources.items())
+                    + " from Resource Graph",
+                )
+            except Exception as ex:
+                self.log(
+                    logging.WARNING,
+                    f"Resource Graph query failed ({ex}), falling back to list calls",
+                )
+                self.resources = None
+
+        collectors = [("azure_disks_metadata", self.get_disks)]
+        if self.module_params.get("anf_account_name"):
+            collectors.append(("anf_storage_metadata", self.get_anf_volumes))
+        if self.module_params.get("afs_storage_accounts"):
+            collectors.append(("afs_storage_metadata", self.get_afs_shares))
+
+        failures = []
+        for key, collector in collectors:
+            try:
+                self.result[key] = collector()
+                self.log(logging.INFO, f"Collected {len(self.result[key])} items for {key}")
+            except Exception as ex:
+                self.log(logging.ERROR, f"Failed to collect {key}: {ex}")
+                failures.append(key)
+
+        self.result["status"] = TestStatus.WARNING.value if failures else TestStatus.SUCCESS.value
+        self.result["message"] = (
+            f"Failed to collect {', '.join(failures)}"
+            if failures
+            else "Azure storage metadata collected"
+        )
+        if not failures:
+            self.save_cached_metadata(
+                {
+                    key: self.result[key]
+                    for key in (
+                        "azure_disks_metadata",
+                        "anf_storage_metadata",
+                        "afs_storage_metadata",
+                    )
+                }
+            )
+        return self.result
+
+
+def run_module() -> None:
+    """
+    Entry point of the module.
+    """
+    module_args = dict(
+        subscription_id=dict(type="str", required=True),
+        resource_group_name=dict(type="str", required=True),
+        disk_names=dict(type="list", elements="str", required=False, default=[]),
+        anf_account_resource_group=dict(type="str", required=False),
+        anf_account_name=dict(type="str", required=False),
+        afs_storage_accounts=dict(type="list", elements="str", required=False, default=[]),
+        msi_client_id=dict(type="str", required=False),
+        use_resource_graph=dict(type="bool", required=False, default=True),
+        cache_file=dict(type="str", required=False),
+        cache_ttl=dict(type="int", required=False, default=300),
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    result = AzureStorageMetadata(module_params=module.params).collect()
+    module.exit_json(**result)
+
+
+def main() -> None:
+    """
+    Entry point of the script.
+    """
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
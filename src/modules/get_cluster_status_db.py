@@ -7,16 +7,26 @@ Python script to get and validate the status of a HANA cluster.
 
 import logging
 import xml.etree.ElementTree as ET
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.facts.compat import ansible_facts
 
 try:
-    from ansible.module_utils.get_cluster_status import BaseClusterStatusChecker
+    from ansible.module_utils.get_cluster_status import (
+        BaseClusterStatusChecker,
+        POLL_INTERVAL,
+        get_cluster_property,
+        get_resource_parameter,
+    )
     from ansible.module_utils.enums import OperatingSystemFamily, HanaSRProvider
     from ansible.module_utils.commands import AUTOMATED_REGISTER, PRIORITY_FENCING_DELAY
 except ImportError:
-    from src.module_utils.get_cluster_status import BaseClusterStatusChecker
+    from src.module_utils.get_cluster_status import (
+        BaseClusterStatusChecker,
+        POLL_INTERVAL,
+        get_cluster_property,
+        get_resource_parameter,
+    )
     from src.module_utils.commands import AUTOMATED_REGISTER, PRIORITY_FENCING_DELAY
     from src.module_utils.enums import OperatingSystemFamily, HanaSRProvider
 
@@ -51,6 +61,47 @@ options:
             - The instance number of the SAP HANA database
         type: str
         required: true
+    expect_primary:
+        description:
+            - Primary node to wait for, an empty string waits for no primary node.
+        type: str
+        required: false
+    expect_secondary:
+        description:
+            - Secondary node to wait for, an empty string waits for no secondary node.
+        type: str
+        required: false
+    timeout:
+        description:
+            - Seconds to wait for the expected state, polling the cluster status locally.
+        type: int
+        required: false
+        default: 0
+    interval:
+        description:
+            - Seconds between two cluster status queries while waiting.
+        type: int
+        required: false
+        default: 5
+    include_raw_status:
+        description:
+            - Return the raw crm_mon XML output of the last query as cluster_status_xml.
+        type: bool
+        required: false
+        default: false
+    raw_status_file:
+        description:
+            - Path of a gzip file to write the raw crm_mon XML output of the last query to.
+        type: str
+        required: false
+    cluster_snapshot:
+        description:
+            - Read the stonith action, AUTOMATED_REGISTER and priority-fencing-delay from one
+              cibadmin query of the CIB configuration. The pcs/crm, crm_resource and
+              crm_attribute commands are only run for values the configuration does not set.
+        type: bool
+        required: false
+        default: true
 author:
     - Microsoft Corporation
 notes:
@@ -70,6 +121,19 @@ EXAMPLES = r"""
     saphanasr_provider: "SAPHanaSR"
   register: cluster_result
 
+- name: Wait for the secondary node to take over
+  get_cluster_status_db:
+    operation_step: "test_execution"
+    database_sid: "HDB"
+    saphanasr_provider: "SAPHanaSR"
+    db_instance_number: "00"
+    expect_primary: "hanadb2"
+    expect_secondary: ""
+    timeout: 500
+    interval: 5
+  register: cluster_result
+  failed_when: not cluster_result.state_reached
+
 - name: Display cluster status
   debug:
     msg: "Primary node: {{ cluster_result.primary_node }}, Secondary node: {{ cluster_result.secondary_node }}"
@@ -121,6 +185,30 @@ AUTOMATED_REGISTER:
     returned: always
     type: str
     sample: "true"
+cluster_summary:
+    description: Compact view of the last crm_mon output
+    returned: always
+    type: dict
+    contains:
+        nodes:
+            description: State of each node (online, standby, offline or unclean)
+            type: dict
+        resources:
+            description: Resource agent and role by node of each resource
+            type: dict
+        attributes:
+            description: Node attributes by node
+            type: dict
+state_reached:
+    description: Whether the cluster reached the expected state within the timeout
+    returned: when an expected state is given
+    type: bool
+    sample: true
+polls:
+    description: Number of cluster status queries made while waiting
+    returned: when an expected state is given
+    type: int
+    sample: 4
 cluster_status:
     description: Detailed cluster attributes for each node
     returned: always
@@ -148,8 +236,9 @@ class HanaClusterStatusChecker(BaseClusterStatusChecker):
         ansible_os_family: OperatingSystemFamily,
         hana_clone_resource_name: str = "",
         hana_primitive_resource_name: str = "",
+        use_snapshot: bool = False,
     ):
-        super().__init__(ansible_os_family)
+        super().__init__(ansible_os_family, use_snapshot)
         self.database_sid = database_sid
         self.saphanasr_provider = saphanasr_provider
         self.db_instance_number = db_instance_number
@@ -170,20 +259,39 @@ class HanaClusterStatusChecker(BaseClusterStatusChecker):
     def _get_cluster_parameters(self) -> None:
         """
         Retrieves the values of the AUTOMATED_REGISTER and PRIORITY_FENCING_DELAY attributes.
+
+        In snapshot mode, values set in the CIB configuration are taken from it and only the
+        missing ones are queried with crm_resource and crm_attribute.
         """
+        resource_name = self.hana_primitive_resource_name or self.hana_clone_resource_name
         param_commands = {
-            "AUTOMATED_REGISTER": (
-                AUTOMATED_REGISTER(self.hana_primitive_resource_name)
-                if self.hana_primitive_resource_name
-                else AUTOMATED_REGISTER(self.hana_clone_resource_name)
-            ),
+            "AUTOMATED_REGISTER": AUTOMATED_REGISTER(resource_name),
             "PRIORITY_FENCING_DELAY": PRIORITY_FENCING_DELAY,
         }
 
-        for param_name, command in param_commands.items():
-            try:
-                self.result[param_name] = self.execute_command_subprocess(command).strip()
-            except Exception:
+        configuration = self._get_cluster_configuration()
+        if configuration is not None:
+            snapshot_values = {
+                "AUTOMATED_REGISTER": get_resource_parameter(
+                    configuration, resource_name, "AUTOMATED_REGISTER"
+                ),
+                "PRIORITY_FENCING_DELAY": get_cluster_property(
+                    configuration, "priority-fencing-delay"
+                ),
+            }
+            for param_name, value in snapshot_values.items():
+                if value is not None:
+                    self.result[param_name] = value
+                    del param_commands[param_name]
+            if not param_commands:
+                return
+
+        try:
+            outputs = self.execute_many(list(param_commands.values()))
+            for param_name, output in zip(param_commands, outputs):
+                self.result[param_name] = output.strip()
+        except Exception:
+            for param_name in param_commands:
                 self.result[param_name] = "unknown"
 
     def _process_node_attributes(self, cluster_status_xml: ET.Element) -> Dict[str, Any]:
@@ -285,14 +393,25 @@ class HanaClusterStatusChecker(BaseClusterStatusChecker):
         """
         return self.result["primary_node"] != "" and self.result["secondary_node"] != ""
 
-    def run(self) -> Dict[str, str]:
+    def run(
+        self,
+        expected_state: Optional[Dict[str, str]] = None,
+        timeout: float = 0,
+        interval: float = POLL_INTERVAL,
+    ) -> Dict[str, str]:
         """
         Main function that runs the cluster status checks.
 
+        :param expected_state: Expected values by result key to wait for
+        :type expected_state: Optional[Dict[str, str]]
+        :param timeout: Seconds to wait for the expected state
+        :type timeout: float
+        :param interval: Seconds between two cluster status queries
+        :type interval: float
         :return: Dictionary with the result of the checks.
         :rtype: Dict[str, str]
         """
-        result = super().run()
+        result = super().run(expected_state, timeout, interval)
         self._get_cluster_parameters()
         return result
 
@@ -308,6 +427,13 @@ def run_module() -> None:
         db_instance_number=dict(type="str", required=True),
         hana_clone_resource_name=dict(type="str", required=False),
         hana_primitive_resource_name=dict(type="str", required=False),
+        expect_primary=dict(type="str", required=False),
+        expect_secondary=dict(type="str", required=False),
+        timeout=dict(type="int", required=False, default=0),
+        interval=dict(type="int", required=False, default=POLL_INTERVAL),
+        include_raw_status=dict(type="bool", required=False, default=False),
+        raw_status_file=dict(type="str", required=False),
+        cluster_snapshot=dict(type="bool", required=False, default=True),
         filter=dict(type="str", required=False, default="os_family"),
     )
 
@@ -322,8 +448,24 @@ def run_module() -> None:
         db_instance_number=module.params["db_instance_number"],
         hana_clone_resource_name=module.params.get("hana_clone_resource_name", ""),
         hana_primitive_resource_name=module.params.get("hana_primitive_resource_name", ""),
+        use_snapshot=module.params.get("cluster_snapshot", True),
+    )
+    expected_state = {
+        key: module.params[param]
+        for param, key in (
+            ("expect_primary", "primary_node"),
+            ("expect_secondary", "secondary_node"),
+        )
+        if module.params.get(param) is not None
+    }
+    checker.run(
+        expected_state,
+        module.params.get("timeout", 0),
+        module.params.get("interval", POLL_INTERVAL),
+    )
+    checker.export_raw_status(
+        module.params.get("include_raw_status", False), module.params.get("raw_status_file")
     )
-    checker.run()
 
     module.exit_json(**checker.get_result())
 
@@ -5,23 +5,36 @@
 Python script to get and validate the status of an SCS cluster.
 """
 
+import json
 import logging
+import os
 import xml.etree.ElementTree as ET
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.facts.compat import ansible_facts
 
 try:
-    from ansible.module_utils.get_cluster_status import BaseClusterStatusChecker
-    from ansible.module_utils.commands import CIB_ADMIN
+    from ansible.module_utils.get_cluster_status import (
+        BaseClusterStatusChecker,
+        POLL_INTERVAL,
+        get_cluster_last_change,
+    )
+    from ansible.module_utils.commands import CIB_ADMIN, CIB_EPOCH
     from ansible.module_utils.enums import OperatingSystemFamily
 except ImportError:
-    from src.module_utils.get_cluster_status import BaseClusterStatusChecker
+    from src.module_utils.get_cluster_status import (
+        BaseClusterStatusChecker,
+        POLL_INTERVAL,
+        get_cluster_last_change,
+    )
     from src.module_utils.commands import (
         CIB_ADMIN,
+        CIB_EPOCH,
     )
     from src.module_utils.enums import OperatingSystemFamily
 
+RESOURCE_ID_CACHE_FILE = os.path.join("~", ".cache", "sap-automation-qa", "scs_resource_ids.json")
+
 
 DOCUMENTATION = r"""
 ---
@@ -39,6 +52,54 @@ options:
             - Used to identify the specific ASCS and ERS resources.
         type: str
         required: true
+    expect_ascs:
+        description:
+            - Node to wait for the ASCS instance on, an empty string waits for no ASCS node.
+        type: str
+        required: false
+    expect_ers:
+        description:
+            - Node to wait for the ERS instance on, an empty string waits for no ERS node.
+        type: str
+        required: false
+    timeout:
+        description:
+            - Seconds to wait for the expected state, polling the cluster status locally.
+        type: int
+        required: false
+        default: 0
+    interval:
+        description:
+            - Seconds between two cluster status queries while waiting.
+        type: int
+        required: false
+        default: 5
+    include_raw_status:
+        description:
+            - Return the raw crm_mon XML output of the last query as cluster_status_xml.
+        type: bool
+        required: false
+        default: false
+    raw_status_file:
+        description:
+            - Path of a gzip file to write the raw crm_mon XML output of the last query to.
+        type: str
+        required: false
+    resource_id_cache_file:
+        description:
+            - Path of the file caching the ASCS and ERS resource IDs on the host, keyed by
+              the CIB epoch. Polls only query cibadmin when crm_mon reports a configuration
+              change. An empty string disables the cache.
+        type: str
+        required: false
+        default: "~/.cache/sap-automation-qa/scs_resource_ids.json"
+    cluster_snapshot:
+        description:
+            - Read the stonith action from one cibadmin query of the CIB configuration. The
+              pcs/crm command is only run if the configuration does not set it.
+        type: bool
+        required: false
+        default: true
 author:
     - Microsoft Corporation
 notes:
@@ -57,6 +118,14 @@ EXAMPLES = r"""
     sap_sid: "S4D"
   register: cluster_result
 
+- name: Wait for the ASCS instance to move to the ERS node
+  get_cluster_status_scs:
+    sap_sid: "S4D"
+    expect_ascs: "{{ cluster_result.ers_node }}"
+    timeout: 500
+  register: cluster_status_post
+  failed_when: not cluster_status_post.state_reached
+
 - name: Display SCS cluster status
   debug:
     msg: "ASCS node: {{ cluster_result.ascs_node }}, ERS node: {{ cluster_result.ers_node }}"
@@ -82,6 +151,30 @@ message:
     returned: always
     type: str
     sample: "Cluster is stable and ready."
+cluster_summary:
+    description: Compact view of the last crm_mon output
+    returned: always
+    type: dict
+    contains:
+        nodes:
+            description: State of each node (online, standby, offline or unclean)
+            type: dict
+        resources:
+            description: Resource agent and role by node of each resource
+            type: dict
+        attributes:
+            description: Node attributes by node
+            type: dict
+state_reached:
+    description: Whether the cluster reached the expected state within the timeout.
+    returned: when an expected state is given
+    type: bool
+    sample: true
+polls:
+    description: Number of cluster status queries made while waiting.
+    returned: when an expected state is given
+    type: int
+    sample: 4
 ascs_node:
     description: Name of the node running the ASCS instance.
     returned: always
@@ -109,18 +202,49 @@ cluster_status:
 class SCSClusterStatusChecker(BaseClusterStatusChecker):
     """
     Class to check the status of a pacemaker cluster in an SAP SCS environment.
+
+    With a cache file, the ASCS and ERS resource IDs are kept on the host with the CIB epoch
+    they were read at and the last configuration change reported by crm_mon. They are then
+    resolved together with each status poll: cibadmin is only queried when crm_mon reports
+    a new configuration change, and the resources are only read again when the CIB epoch
+    changed.
     """
 
     def __init__(
         self,
         sap_sid: str,
         ansible_os_family: OperatingSystemFamily,
+        cache_file: Optional[str] = None,
+        use_snapshot: bool = False,
+        read_resource_ids: bool = True,
     ):
-        super().__init__(ansible_os_family)
+        """
+        :param sap_sid: SAP System ID
+        :type sap_sid: str
+        :param ansible_os_family: Operating system family
+        :type ansible_os_family: OperatingSystemFamily
+        :param cache_file: Path of the resource ID cache file, the resource IDs are read from
+            the CIB once per run if None
+        :type cache_file: Optional[str]
+        :param use_snapshot: Read the stonith action from the CIB configuration
+        :type use_snapshot: bool
+        :param read_resource_ids: Read the resource IDs from the local CIB or cache file. Off
+            when the checker does not run on a cluster node and the resource IDs are given
+            with set_resource_ids.
+        :type read_resource_ids: bool
+        """
+        super().__init__(ansible_os_family, use_snapshot)
         self.sap_sid = sap_sid
         self.ascs_resource_id = ""
         self.ers_resource_id = ""
-        self._get_resource_ids()
+        self.cache_file = os.path.expanduser(cache_file) if cache_file else None
+        self._cache_entry: Dict[str, str] = {}
+        if not read_resource_ids:
+            self.cache_file = None
+        elif self.cache_file:
+            self._load_cached_resource_ids()
+        else:
+            self._get_resource_ids()
         self.result.update(
             {
                 "ascs_node": "",
@@ -139,30 +263,158 @@ class SCSClusterStatusChecker(BaseClusterStatusChecker):
         try:
             resources_string = self.execute_command_subprocess(CIB_ADMIN("resources"))
             if resources_string is not None:
-                resources = ET.fromstring(resources_string).findall(
-                    ".//primitive[@type='SAPInstance']"
-                )
-                for resource in resources:
-                    resource_id = resource.attrib.get("id")
-                    instance_attributes = resource.find("instance_attributes")
+                self._parse_resource_ids(resources_string)
 
-                    if instance_attributes is not None:
-                        is_ers = False
+        except Exception as ex:
+            self.handle_error(ex)
+
+    def _parse_resource_ids(self, resources_string: str) -> None:
+        """
+        Take the resource IDs for ASCS and ERS from the resources section of the CIB.
+
+        :param resources_string: Output of cibadmin --query --scope resources
+        :type resources_string: str
+        """
+        resources = ET.fromstring(resources_string).findall(".//primitive[@type='SAPInstance']")
+        for resource in resources:
+            resource_id = resource.attrib.get("id")
+            instance_attributes = resource.find("instance_attributes")
 
-                        for nvpair in instance_attributes:
-                            name = nvpair.attrib.get("name")
-                            value = nvpair.attrib.get("value")
+            if instance_attributes is not None:
+                is_ers = False
 
-                            if name == "IS_ERS" and value == "true":
-                                is_ers = True
+                for nvpair in instance_attributes:
+                    name = nvpair.attrib.get("name")
+                    value = nvpair.attrib.get("value")
 
-                        if is_ers:
-                            self.ers_resource_id = resource_id
-                        else:
-                            self.ascs_resource_id = resource_id
+                    if name == "IS_ERS" and value == "true":
+                        is_ers = True
 
+                if is_ers:
+                    self.ers_resource_id = resource_id
+                else:
+                    self.ascs_resource_id = resource_id
+
+    def set_resource_ids(self, resources_string: str) -> None:
+        """
+        Set the ASCS and ERS resource IDs from a resources section of the CIB read elsewhere,
+        e.g. on a cluster node over SSH.
+
+        :param resources_string: Output of cibadmin --query --scope resources
+        :type resources_string: str
+        :raises ET.ParseError: If the output is not valid XML
+        """
+        self.ascs_resource_id = ""
+        self.ers_resource_id = ""
+        self._parse_resource_ids(resources_string)
+        self.result.update(
+            {"ascs_resource_id": self.ascs_resource_id, "ers_resource_id": self.ers_resource_id}
+        )
+
+    def _read_cache(self) -> Dict[str, Any]:
+        """
+        Read the resource ID cache file.
+
+        :return: Cache entries by SAP System ID, or an empty dictionary if the file is not usable
+        :rtype: Dict[str, Any]
+        """
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as cache:
+                entries = json.load(cache)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _load_cached_resource_ids(self) -> None:
+        """
+        Take the ASCS and ERS resource IDs from the cache file, if it has an entry for the SID.
+        """
+        entry = self._read_cache().get(self.sap_sid.upper())
+        if isinstance(entry, dict):
+            self._cache_entry = entry
+            self.ascs_resource_id = entry.get("ascs_resource_id", "")
+            self.ers_resource_id = entry.get("ers_resource_id", "")
+
+    def _write_cached_resource_ids(self) -> None:
+        """
+        Store the cache entry of the SID in the cache file, replacing the file atomically.
+
+        Failing to write it only disables the cache for the next runs.
+        """
+        entries = self._read_cache()
+        entries[self.sap_sid.upper()] = self._cache_entry
+        temporary_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), mode=0o700, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as cache:
+                json.dump(entries, cache)
+            os.replace(temporary_path, self.cache_file)
+        except OSError as ex:
+            self.log(logging.WARNING, f"Could not write the resource ID cache: {ex}")
+            try:
+                os.unlink(temporary_path)
+            except OSError:
+                pass
+
+    def _get_cib_epoch(self) -> str:
+        """
+        Get the admin_epoch and epoch of the CIB, which change with every configuration change.
+
+        :return: "<admin_epoch>:<epoch>", or an empty string if they could not be read
+        :rtype: str
+        """
+        try:
+            cib = ET.fromstring(self.execute_command_subprocess(CIB_EPOCH))
         except Exception as ex:
-            self.handle_error(ex)
+            self.log(logging.WARNING, f"Failed to get the CIB epoch: {ex}")
+            return ""
+        if cib.get("epoch") is None:
+            return ""
+        return f"{cib.get('admin_epoch', '0')}:{cib.get('epoch')}"
+
+    def _refresh_resource_ids(self, cluster_status: str) -> None:
+        """
+        Make sure the cached ASCS and ERS resource IDs match the configuration of the cluster
+        status, reading them from the CIB again if its epoch changed.
+
+        :param cluster_status: Output of crm_mon --output-as=xml
+        :type cluster_status: str
+        """
+        if not self.cache_file:
+            return
+        cached = bool(self.ascs_resource_id and self.ers_resource_id)
+        last_change = get_cluster_last_change(cluster_status)
+        if cached and last_change and self._cache_entry.get("last_change") == last_change:
+            return
+
+        epoch = self._get_cib_epoch()
+        if not (cached and epoch and self._cache_entry.get("epoch") == epoch):
+            self.log(logging.INFO, f"Reading the resource IDs from the CIB (epoch {epoch})")
+            self.ascs_resource_id = ""
+            self.ers_resource_id = ""
+            self._get_resource_ids()
+        self.result.update(
+            {"ascs_resource_id": self.ascs_resource_id, "ers_resource_id": self.ers_resource_id}
+        )
+        if epoch and self.ascs_resource_id and self.ers_resource_id:
+            self._cache_entry = {
+                "epoch": epoch,
+                "last_change": last_change,
+                "ascs_resource_id": self.ascs_resource_id,
+                "ers_resource_id": self.ers_resource_id,
+            }
+            self._write_cached_resource_ids()
+
+    def _get_status_resource_ids(self) -> Optional[List[str]]:
+        """
+        Keep only the ASCS and ERS resources of the cluster status, once both are known.
+
+        :return: ASCS and ERS resource IDs, or None to keep every resource.
+        :rtype: Optional[List[str]]
+        """
+        if self.ascs_resource_id and self.ers_resource_id:
+            return [self.ascs_resource_id, self.ers_resource_id]
+        return None
 
     def _process_node_attributes(self, cluster_status_xml: ET.Element) -> Dict[str, Any]:
         """
@@ -203,8 +455,12 @@ class SCSClusterStatusChecker(BaseClusterStatusChecker):
                 return self.result
 
             if resources is not None and self.ascs_resource_id and self.ers_resource_id:
-                ascs_resource = resources.find(f".//resource[@id='{self.ascs_resource_id}']")
-                ers_resource = resources.find(f".//resource[@id='{self.ers_resource_id}']")
+                resources_by_id = dict(self.resources_by_id)
+                if not resources_by_id:
+                    for resource in resources.iter("resource"):
+                        resources_by_id.setdefault(resource.attrib.get("id"), resource)
+                ascs_resource = resources_by_id.get(self.ascs_resource_id)
+                ers_resource = resources_by_id.get(self.ers_resource_id)
 
                 for resource in [ascs_resource, ers_resource]:
                     if resource is None:
@@ -281,6 +537,14 @@ def run_module() -> None:
     """
     module_args = dict(
         sap_sid=dict(type="str", required=True),
+        expect_ascs=dict(type="str", required=False),
+        expect_ers=dict(type="str", required=False),
+        timeout=dict(type="int", required=False, default=0),
+        interval=dict(type="int", required=False, default=POLL_INTERVAL),
+        include_raw_status=dict(type="bool", required=False, default=False),
+        raw_status_file=dict(type="str", required=False),
+        resource_id_cache_file=dict(type="str", required=False, default=RESOURCE_ID_CACHE_FILE),
+        cluster_snapshot=dict(type="bool", required=False, default=True),
         filter=dict(type="str", required=False, default="os_family"),
     )
 
@@ -290,8 +554,22 @@ def run_module() -> None:
     checker = SCSClusterStatusChecker(
         sap_sid=module.params["sap_sid"],
         ansible_os_family=OperatingSystemFamily(ansible_os_family),
+        cache_file=module.params.get("resource_id_cache_file", RESOURCE_ID_CACHE_FILE),
+        use_snapshot=module.params.get("cluster_snapshot", True),
+    )
+    expected_state = {
+        key: module.params[param]
+        for param, key in (("expect_ascs", "ascs_node"), ("expect_ers", "ers_node"))
+        if module.params.get(param) is not None
+    }
+    checker.run(
+        expected_state,
+        module.params.get("timeout", 0),
+        module.params.get("interval", POLL_INTERVAL),
+    )
+    checker.export_raw_status(
+        module.params.get("include_raw_status", False), module.params.get("raw_status_file")
     )
-    checker.run()
 
     module.exit_json(**checker.get_result())
 
@@ -0,0 +1,194 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Custom ansible module for recording the timeline of a cluster failover
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    from ansible.module_utils.failover_timeline import (
+        ATTRIBUTE_PATTERN,
+        SAMPLE_INTERVAL,
+        FailoverTimelineRecorder,
+    )
+except ImportError:
+    from src.module_utils.failover_timeline import (
+        ATTRIBUTE_PATTERN,
+        SAMPLE_INTERVAL,
+        FailoverTimelineRecorder,
+    )
+
+DOCUMENTATION = r"""
+---
+module: get_failover_timeline
+short_description: Records the timeline of pacemaker cluster transitions
+description:
+    - This module samples crm_mon XML output at sub-second intervals and records every
+      transition of the cluster with its timestamp.
+    - Records nodes going offline or online, pending and completed fencing, resources being
+      promoted, demoted, started or stopped, virtual IP moves and changes of the system
+      replication state and other tracked node attributes.
+    - Meant to run as an asynchronous task on a surviving node, started before the fault
+      injection and stopped by creating the stop file.
+    - The fault injection is marked by creating the fault file on the same node. The summary
+      is then measured from the modification time of the file.
+options:
+    duration:
+        description:
+            - Maximum number of seconds to record.
+        type: int
+        required: false
+        default: 600
+    interval:
+        description:
+            - Seconds between two samples.
+        type: float
+        required: false
+        default: 0.5
+    stop_file:
+        description:
+            - Path of a file whose creation stops the recording. The file is removed.
+        type: str
+        required: false
+    fault_file:
+        description:
+            - Path of a file whose creation marks the fault injection. The file is removed.
+            - If not set or never created, the summary is measured from the start of the
+              recording.
+        type: str
+        required: false
+    attribute_pattern:
+        description:
+            - Regular expression of the node attributes to track.
+        type: str
+        required: false
+        default: "_(clone_state|sync_state|roles|srmode)$|^runs_ers_"
+author:
+    - Microsoft Corporation
+notes:
+    - This module requires root privileges to run crm_mon.
+requirements:
+    - python >= 3.6
+    - pacemaker cluster environment
+"""
+
+EXAMPLES = r"""
+- name: Start recording the failover timeline
+  get_failover_timeline:
+    duration: 600
+    stop_file: "/tmp/failover_timeline.stop"
+    fault_file: "/tmp/failover_timeline.fault"
+  async: 660
+  poll: 0
+  register: failover_timeline_job
+
+- name: Mark the fault injection
+  ansible.builtin.file:
+    path: "/tmp/failover_timeline.fault"
+    state: touch
+
+- name: Stop recording the failover timeline
+  ansible.builtin.file:
+    path: "/tmp/failover_timeline.stop"
+    state: touch
+
+- name: Collect the failover timeline
+  ansible.builtin.async_status:
+    jid: "{{ failover_timeline_job.ansible_job_id }}"
+  register: failover_timeline
+  until: failover_timeline.finished
+  retries: 10
+  delay: 1
+"""
+
+RETURN = r"""
+status:
+    description: Status of the recording, FAILED if no sample could be taken
+    returned: always
+    type: str
+    sample: "PASSED"
+message:
+    description: Number of recorded transitions and samples
+    returned: always
+    type: str
+    sample: "Recorded 6 cluster transitions in 240 samples (2 failed)"
+details:
+    description: Recorded timeline
+    returned: always
+    type: dict
+    contains:
+        start:
+            description: UTC time the recording started
+            type: str
+            sample: "2025-01-01T10:00:00.000+00:00"
+        end:
+            description: UTC time the recording ended
+            type: str
+            sample: "2025-01-01T10:02:00.000+00:00"
+        fault:
+            description: UTC time of the fault injection, null if it was not marked
+            type: str
+            sample: "2025-01-01T10:00:10.250+00:00"
+        fault_elapsed:
+            description: Seconds between the start of the recording and the fault injection
+            type: float
+            sample: 10.25
+        samples:
+            description: Number of successful samples
+            type: int
+            sample: 240
+        timeline:
+            description: Transitions in the order they were seen
+            type: list
+            elements: dict
+            sample:
+                - timestamp: "2025-01-01T10:00:12.512+00:00"
+                  elapsed: 12.5
+                  event: "node_offline"
+                  node: "hanadb1"
+                  from: "true"
+                  to: "false"
+        summary:
+            description: Seconds from the fault injection to the first transition of each
+                kind, and to the last transition as recovery_seconds. Without a marked fault,
+                seconds from the start of the recording, and between the first and the last
+                transition as recovery_seconds.
+            type: dict
+            sample: {"node_offline": 2.25, "resource_promoted": 30.75, "recovery_seconds": 35.25}
+"""
+
+
+def run_module() -> None:
+    """
+    Entry point of the module.
+    """
+    module_args = dict(
+        duration=dict(type="int", required=False, default=600),
+        interval=dict(type="float", required=False, default=SAMPLE_INTERVAL),
+        stop_file=dict(type="str", required=False),
+        attribute_pattern=dict(type="str", required=False, default=ATTRIBUTE_PATTERN),
+        fault_file=dict(type="str", required=False),
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    recorder = FailoverTimelineRecorder(
+        duration=module.params["duration"],
+        interval=module.params["interval"],
+        stop_file=module.params.get("stop_file"),
+        attribute_pattern=module.params["attribute_pattern"],
+        fault_file=module.params.get("fault_file"),
+    )
+    module.exit_json(**recorder.run())
+
+
+def main() -> None:
+    """
+    Entry point of the script.
+    """
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
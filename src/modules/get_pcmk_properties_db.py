@@ -17,12 +17,14 @@ from ansible.module_utils.facts.compat import ansible_facts
 
 try:
     from ansible.module_utils.get_pcmk_properties import BaseHAClusterValidator
+    from ansible.module_utils.offline_validation import OfflineCIBValidator
     from ansible.module_utils.enums import OperatingSystemFamily, HanaSRProvider
-    from ansible.module_utils.commands import CIB_ADMIN
+    from ansible.module_utils.pcmk_constants import CONSTANTS_CACHE_DIR
 except ImportError:
     from src.module_utils.get_pcmk_properties import BaseHAClusterValidator
+    from src.module_utils.offline_validation import OfflineCIBValidator
     from src.module_utils.enums import OperatingSystemFamily, HanaSRProvider
-    from src.module_utils.commands import CIB_ADMIN
+    from src.module_utils.pcmk_constants import CONSTANTS_CACHE_DIR
 
 DOCUMENTATION = r"""
 ---
@@ -69,6 +71,35 @@ options:
             - Output from cibadmin command to query Pacemaker configuration
         type: str
         required: false
+    cib_files:
+        description:
+            - Paths of CIB files recorded as offline_validation/<host>/cib, validated in one
+              call by parallel worker processes instead of cib_output.
+            - The result then holds the result of every host and the parameters differing
+              between hosts.
+        type: list
+        elements: str
+        required: false
+    max_workers:
+        description:
+            - Number of worker processes validating cib_files, defaults to the number of CPUs.
+        type: int
+        required: false
+    constants_cache_dir:
+        description:
+            - Directory caching the pcmk_constants compiled into a table of expected values,
+              keyed by the content hash of the constants. An empty string disables the cache.
+        type: str
+        required: false
+        default: "~/.cache/sap-automation-qa/pcmk_constants"
+    concurrent_validation:
+        description:
+            - Validate the parameter categories concurrently, sharing one query of the CIB
+              configuration. Only used without cib_output. The seconds spent on each category
+              are returned in details.timings.
+        type: bool
+        required: false
+        default: true
 author:
     - Microsoft Corporation
 notes:
@@ -185,6 +216,8 @@ class HAClusterValidator(BaseHAClusterValidator):
         saphanasr_provider: HanaSRProvider,
         cib_output: str,
         category=None,
+        constants_cache_dir=None,
+        concurrent=False,
     ):
         super().__init__(
             os_type=os_type,
@@ -194,6 +227,8 @@ class HAClusterValidator(BaseHAClusterValidator):
             fencing_mechanism=fencing_mechanism,
             category=category,
             cib_output=cib_output,
+            constants_cache_dir=constants_cache_dir,
+            concurrent=concurrent,
         )
         self.instance_number = instance_number
         self.saphanasr_provider = saphanasr_provider
@@ -236,12 +271,7 @@ class HAClusterValidator(BaseHAClusterValidator):
         parameters = []
 
         try:
-            if self.cib_output:
-                resource_scope = self._get_scope_from_cib("resources")
-            else:
-                resource_scope = self.parse_xml_output(
-                    self.execute_command_subprocess(CIB_ADMIN(scope="resources"))
-                )
+            resource_scope = self._get_scope("resources")
             if resource_scope is not None:
                 parameters.extend(self._parse_resources_section(resource_scope))
 
@@ -266,51 +296,32 @@ class HAClusterValidator(BaseHAClusterValidator):
         )
 
         try:
-            with open(
-                f"/usr/sap/{self.sid}/SYS/global/hdb/custom/config/global.ini",
-                "r",
-                encoding="utf-8",
-            ) as file:
-                global_ini_content = file.read().splitlines()
+            global_ini = self.get_hana_ini(self.sid, "global.ini")
 
             for section_name, section_properties in global_ini_defaults.items():
-                try:
-                    section_start = global_ini_content.index(f"[{section_name}]")
-                    next_section_start = len(global_ini_content)
-                    for i in range(section_start + 1, len(global_ini_content)):
-                        if global_ini_content[i].strip().startswith("["):
-                            next_section_start = i
-                            break
-
-                    properties_slice = global_ini_content[section_start + 1 : next_section_start]
-
-                    global_ini_properties = {
-                        key.strip(): val.strip()
-                        for line in properties_slice
-                        for key, sep, val in [line.partition("=")]
-                        if sep and key.strip()
-                    }
-
-                    for param_name, expected_config in section_properties.items():
-                        value = global_ini_properties.get(param_name, "")
-                        expected_value = expected_config.get("value", "")
-
-                        self.log(
-                            logging.INFO,
-                            f"param_name: {param_name}, value: {value}, "
-                            + f"expected_value: {expected_value}",
-                        )
-                        parameters.append(
-                            self._create_parameter(
-                                category="global_ini",
-                                id=section_name,
-                                name=param_name,
-                                value=value,
-                                expected_value=expected_value,
-                            )
-                        )
-                except ValueError:
+                if section_name not in global_ini:
                     self.log(logging.WARNING, f"Section {section_name} not found in global.ini")
+                    continue
+                global_ini_properties = global_ini[section_name]
+
+                for param_name, expected_config in section_properties.items():
+                    value = global_ini_properties.get(param_name, "")
+                    expected_value = expected_config.get("value", "")
+
+                    self.log(
+                        logging.INFO,
+                        f"param_name: {param_name}, value: {value}, "
+                        + f"expected_value: {expected_value}",
+                    )
+                    parameters.append(
+                        self._create_parameter(
+                            category="global_ini",
+                            id=section_name,
+                            name=param_name,
+                            value=value,
+                            expected_value=expected_value,
+                        )
+                    )
         except Exception as ex:
             self.log(logging.ERROR, f"Error parsing global.ini: {str(ex)}")
 
@@ -341,6 +352,10 @@ def main() -> None:
                 pcmk_constants=dict(type="dict"),
                 saphanasr_provider=dict(type="str"),
                 cib_output=dict(type="str", required=False, default=""),
+                cib_files=dict(type="list", elements="str", required=False, default=[]),
+                max_workers=dict(type="int", required=False),
+                constants_cache_dir=dict(type="str", required=False, default=CONSTANTS_CACHE_DIR),
+                concurrent_validation=dict(type="bool", required=False, default=True),
                 os_family=dict(type="str", required=False),
                 filter=dict(type="str", required=False, default="os_family"),
             )
@@ -358,23 +373,39 @@ def main() -> None:
                 pcmk_constants=dict(type="dict"),
                 saphanasr_provider=dict(type="str"),
                 cib_output=dict(type="str", required=False, default=""),
+                cib_files=dict(type="list", elements="str", required=False, default=[]),
+                max_workers=dict(type="int", required=False),
+                constants_cache_dir=dict(type="str", required=False, default=CONSTANTS_CACHE_DIR),
+                concurrent_validation=dict(type="bool", required=False, default=True),
                 os_family=dict(type="str", required=False),
             )
         )
         os_family = module.params.get("os_family", "UNKNOWN")
 
-    validator = HAClusterValidator(
+    validator_kwargs = dict(
         os_type=OperatingSystemFamily(os_family.upper()),
         instance_number=module.params["instance_number"],
         sid=module.params["sid"],
-        virtual_machine_name=module.params["virtual_machine_name"],
         fencing_mechanism=module.params["fencing_mechanism"],
         constants=module.params["pcmk_constants"],
         saphanasr_provider=HanaSRProvider(module.params["saphanasr_provider"]),
-        cib_output=module.params.get("cib_output"),
+        constants_cache_dir=module.params.get("constants_cache_dir", CONSTANTS_CACHE_DIR),
+        concurrent=module.params.get("concurrent_validation", True),
     )
+    if module.params.get("cib_files"):
+        offline_validator = OfflineCIBValidator(
+            HAClusterValidator, validator_kwargs, module.params.get("max_workers")
+        )
+        result = offline_validator.validate(module.params["cib_files"])
+    else:
+        validator = HAClusterValidator(
+            virtual_machine_name=module.params["virtual_machine_name"],
+            cib_output=module.params.get("cib_output"),
+            **validator_kwargs,
+        )
+        result = validator.get_result()
 
-    module.exit_json(**validator.get_result())
+    module.exit_json(**result)
 
 
 if __name__ == "__main__":
@@ -16,12 +16,14 @@ from ansible.module_utils.facts.compat import ansible_facts
 
 try:
     from ansible.module_utils.get_pcmk_properties import BaseHAClusterValidator
+    from ansible.module_utils.offline_validation import OfflineCIBValidator
     from ansible.module_utils.enums import OperatingSystemFamily, TestStatus
-    from ansible.module_utils.commands import CIB_ADMIN
+    from ansible.module_utils.pcmk_constants import CONSTANTS_CACHE_DIR, resolve_provider_values
 except ImportError:
     from src.module_utils.get_pcmk_properties import BaseHAClusterValidator
+    from src.module_utils.offline_validation import OfflineCIBValidator
     from src.module_utils.enums import OperatingSystemFamily, TestStatus
-    from src.module_utils.commands import CIB_ADMIN
+    from src.module_utils.pcmk_constants import CONSTANTS_CACHE_DIR, resolve_provider_values
 
 
 DOCUMENTATION = r"""
@@ -71,6 +73,40 @@ options:
         type: str
         required: false
         default: ""
+    cib_output:
+        description:
+            - Output from cibadmin command to query Pacemaker configuration
+        type: str
+        required: false
+    cib_files:
+        description:
+            - Paths of CIB files recorded as offline_validation/<host>/cib, validated in one
+              call by parallel worker processes instead of cib_output.
+            - The result then holds the result of every host and the parameters differing
+              between hosts.
+        type: list
+        elements: str
+        required: false
+    max_workers:
+        description:
+            - Number of worker processes validating cib_files, defaults to the number of CPUs.
+        type: int
+        required: false
+    constants_cache_dir:
+        description:
+            - Directory caching the pcmk_constants compiled into a table of expected values,
+              keyed by the content hash of the constants. An empty string disables the cache.
+        type: str
+        required: false
+        default: "~/.cache/sap-automation-qa/pcmk_constants"
+    concurrent_validation:
+        description:
+            - Validate the parameter categories concurrently, sharing one query of the CIB
+              configuration. Only used without cib_output. The seconds spent on each category
+              are returned in details.timings.
+        type: bool
+        required: false
+        default: true
 author:
     - Microsoft Corporation
 notes:
@@ -181,6 +217,8 @@ class HAClusterValidator(BaseHAClusterValidator):
         cib_output: str,
         nfs_provider=None,
         category=None,
+        constants_cache_dir=None,
+        concurrent=False,
     ):
         super().__init__(
             os_type=os_type,
@@ -190,6 +228,8 @@ class HAClusterValidator(BaseHAClusterValidator):
             fencing_mechanism=fencing_mechanism,
             category=category,
             cib_output=cib_output,
+            constants_cache_dir=constants_cache_dir,
+            concurrent=concurrent,
         )
         self.scs_instance_number = scs_instance_number
         self.ers_instance_number = ers_instance_number
@@ -221,6 +261,28 @@ class HAClusterValidator(BaseHAClusterValidator):
         else:
             return self._get_expected_value(category, name)
 
+    def _get_provider_values_for_category(self, category, subcategory, name, op_name):
+        """
+        Get the values resolved for the NFS provider of a parameter with SCS-specific logic.
+
+        :param category: The category of the configuration parameter.
+        :type category: str
+        :param subcategory: The subcategory of the configuration parameter.
+        :type subcategory: str
+        :param name: The name of the configuration parameter.
+        :type name: str
+        :param op_name: The name of the operation (if applicable).
+        :type op_name: str
+        :return: The resolved values, or None if the expected value is not given per provider.
+        :rtype: list or None
+        """
+        if category in self.RESOURCE_CATEGORIES or category in ["ascs", "ers"]:
+            return self._get_compiled_constants().get_provider_values(
+                category, name, subcategory, op_name
+            )
+        else:
+            return self._get_compiled_constants().get_provider_values(category, name)
+
     def _validate_resource_constants(self):
         """
         Resource validation with SCS-specific logic and offline validation support.
@@ -233,12 +295,7 @@ class HAClusterValidator(BaseHAClusterValidator):
         parameters = []
 
         try:
-            if self.cib_output:
-                resource_scope = self._get_scope_from_cib("resources")
-            else:
-                resource_scope = self.parse_xml_output(
-                    self.execute_command_subprocess(CIB_ADMIN(scope="resources"))
-                )
+            resource_scope = self._get_scope("resources")
 
             if resource_scope is not None:
                 parameters.extend(self._parse_resources_section(resource_scope))
@@ -263,43 +320,7 @@ class HAClusterValidator(BaseHAClusterValidator):
         :rtype: list
         :raises TypeError: If expected_value is not a dictionary
         """
-        if not isinstance(expected_value, dict):
-            raise TypeError("Expected value must be a dictionary for provider resolution")
-
-        provider_values = []
-        if self.nfs_provider and self.nfs_provider in expected_value:
-            provider_config = expected_value[self.nfs_provider]
-            provider_values = self._extract_values_from_config(provider_config)
-        else:
-            for _, provider_config in expected_value.items():
-                extracted_values = self._extract_values_from_config(provider_config)
-                if isinstance(extracted_values, list):
-                    provider_values.extend(extracted_values)
-                else:
-                    provider_values.append(extracted_values)
-
-        return provider_values if isinstance(provider_values, list) else [provider_values]
-
-    def _extract_values_from_config(self, provider_config):
-        """
-        Extract values from a provider configuration structure.
-
-        Handles various configuration formats:
-        - {"value": [list]} or {"value": "single"}
-        - [list] directly
-        - "single" value directly
-
-        :param provider_config: Configuration object to extract values from
-        :type provider_config: dict or list or str
-        :return: Extracted value(s)
-        :rtype: list or str
-        """
-        if isinstance(provider_config, dict) and "value" in provider_config:
-            return provider_config["value"]
-        elif isinstance(provider_config, (list, str)):
-            return provider_config
-        else:
-            return provider_config
+        return resolve_provider_values(expected_value, self.nfs_provider)
 
     def _compare_value_with_expectations(self, value: str, expected_values) -> str:
         """
@@ -325,7 +346,7 @@ class HAClusterValidator(BaseHAClusterValidator):
                 else TestStatus.ERROR.value
             )
 
-    def _determine_parameter_status(self, value, expected_value):
+    def _determine_parameter_status(self, value, expected_value, provider_values=None):
         """
         Determine the status of a parameter with SCS-specific logic for NFS provider.
 
@@ -333,6 +354,9 @@ class HAClusterValidator(BaseHAClusterValidator):
         :type value: str
         :param expected_value: The expected value tuple (value, required) or legacy format.
         :type expected_value: tuple or str or list or dict
+        :param provider_values: The values resolved for the NFS provider by the compiled
+            constants, defaults to None
+        :type provider_values: list, optional
         :return: The status of the parameter.
         :rtype: str
         """
@@ -354,7 +378,8 @@ class HAClusterValidator(BaseHAClusterValidator):
         # Handle complex provider-based dictionary cases
         elif isinstance(expected_value, dict):
             try:
-                provider_values = self._resolve_provider_values(expected_value)
+                if provider_values is None:
+                    provider_values = self._resolve_provider_values(expected_value)
                 return self._compare_value_with_expectations(value, provider_values)
             except (TypeError, KeyError) as ex:
                 self.result["message"] += f"Error resolving provider values: {str(ex)} "
@@ -407,6 +432,10 @@ def main() -> None:
                 fencing_mechanism=dict(type="str"),
                 nfs_provider=dict(type="str", default=""),
                 cib_output=dict(type="str", required=False, default=""),
+                cib_files=dict(type="list", elements="str", required=False, default=[]),
+                max_workers=dict(type="int", required=False),
+                constants_cache_dir=dict(type="str", required=False, default=CONSTANTS_CACHE_DIR),
+                concurrent_validation=dict(type="bool", required=False, default=True),
                 os_family=dict(type="str", required=False),
                 filter=dict(type="str", required=False, default="os_family"),
             )
@@ -425,23 +454,39 @@ def main() -> None:
                 fencing_mechanism=dict(type="str"),
                 nfs_provider=dict(type="str", default=""),
                 cib_output=dict(type="str", required=False, default=""),
+                cib_files=dict(type="list", elements="str", required=False, default=[]),
+                max_workers=dict(type="int", required=False),
+                constants_cache_dir=dict(type="str", required=False, default=CONSTANTS_CACHE_DIR),
+                concurrent_validation=dict(type="bool", required=False, default=True),
                 os_family=dict(type="str", required=False, default="UNKNOWN"),
             )
         )
         os_family = module.params.get("os_family", "UNKNOWN").upper()
 
-    validator = HAClusterValidator(
+    validator_kwargs = dict(
         sid=module.params["sid"],
         scs_instance_number=module.params["ascs_instance_number"],
         ers_instance_number=module.params["ers_instance_number"],
         os_type=OperatingSystemFamily(os_family.upper()),
-        virtual_machine_name=module.params["virtual_machine_name"],
         constants=module.params["pcmk_constants"],
         fencing_mechanism=module.params["fencing_mechanism"],
         nfs_provider=module.params.get("nfs_provider"),
-        cib_output=module.params.get("cib_output"),
+        constants_cache_dir=module.params.get("constants_cache_dir", CONSTANTS_CACHE_DIR),
+        concurrent=module.params.get("concurrent_validation", True),
     )
-    module.exit_json(**validator.get_result())
+    if module.params.get("cib_files"):
+        offline_validator = OfflineCIBValidator(
+            HAClusterValidator, validator_kwargs, module.params.get("max_workers")
+        )
+        result = offline_validator.validate(module.params["cib_files"])
+    else:
+        validator = HAClusterValidator(
+            virtual_machine_name=module.params["virtual_machine_name"],
+            cib_output=module.params.get("cib_output"),
+            **validator_kwargs,
+        )
+        result = validator.get_result()
+    module.exit_json(**result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Custom ansible module for discovering the local storage topology of a host
+"""
+
+from typing import Any, Dict
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    from ansible.module_utils.sap_automation_qa import SapAutomationQA
+    from ansible.module_utils.enums import TestStatus
+    from ansible.module_utils.storage_discovery import LocalStorageDiscovery
+except ImportError:
+    from src.module_utils.sap_automation_qa import SapAutomationQA
+    from src.module_utils.enums import TestStatus
+    from src.module_utils.storage_discovery import LocalStorageDiscovery
+
+DOCUMENTATION = r"""
+---
+module: get_storage_context
+short_description: Discovers the local storage topology of a host
+description:
+    - Reads mounted filesystems from /proc/self/mountinfo and their usage with statvfs.
+    - Reads the LVM full report, the device to LUN mapping of Azure data disks and the
+      data disks of the virtual machine from the Instance Metadata Service.
+    - Classifies NFS mounts as Azure NetApp Files or Azure Files.
+    - Returns the storage keys expected by the configuration check filesystem collector,
+      including the mounted filesystems of the host for checks run on the controller.
+options: {}
+author:
+    - Microsoft Corporation
+notes:
+    - Requires root permissions to read the LVM report.
+requirements:
+    - python >= 3.6
+"""
+
+EXAMPLES = r"""
+- name: Discover local storage topology
+  become: true
+  get_storage_context:
+  register: storage_discovery
+"""
+
+RETURN = r"""
+status:
+    description: Status of the discovery.
+    returned: always
+    type: str
+    sample: "PASSED"
+mounted_filesystems:
+    description: Mounted filesystems of the host with their usage, in the format of the
+        filesystem collector entries.
+    returned: always
+    type: list
+    sample: [{"target": "/hana/data", "source": "/dev/mapper/datavg-datalv", "fstype": "xfs",
+              "options": "rw,relatime", "size": "512G", "free": "460G", "used": "52G",
+              "used_percent": "11%", "stale": false, "size_bytes": 549755813888,
+              "free_bytes": 493921239040, "used_bytes": 55834574848}]
+lvm_fullreport:
+    description: Decoded output of lvm fullreport --reportformat json.
+    returned: always
+    type: dict
+device_lun_map:
+    description: Block device name to Azure data disk LUN.
+    returned: always
+    type: dict
+    sample: {"sdc": "0"}
+imds_disks_metadata:
+    description: Data disks of the virtual machine from the Instance Metadata Service.
+    returned: always
+    type: list
+has_nfs_mounts:
+    description: Whether any NFS filesystem is mounted.
+    returned: always
+    type: bool
+anf_ip_addresses:
+    description: IP addresses of NFS servers that are not Azure Files endpoints.
+    returned: always
+    type: list
+afs_storage_accounts:
+    description: Storage accounts of the mounted Azure Files NFS shares.
+    returned: always
+    type: list
+"""
+
+
+class StorageContext(SapAutomationQA):
+    """
+    Class to discover the local storage topology of a host.
+    """
+
+    def discover(self) -> Dict[str, Any]:
+        """
+        Discover the storage topology and add it to the result.
+
+        :return: Result of the module
+        :rtype: Dict[str, Any]
+        """
+        try:
+            self.result.update(LocalStorageDiscovery(parent=self).discover())
+            self.result["status"] = TestStatus.SUCCESS.value
+            self.result["message"] = "Storage topology discovered"
+        except Exception as ex:
+            self.handle_error(ex)
+        return self.result
+
+
+def run_module() -> None:
+    """
+    Entry point of the module.
+    """
+    module = AnsibleModule(argument_spec=dict(), supports_check_mode=True)
+    result = StorageContext().discover()
+    if result["status"] == TestStatus.ERROR.value:
+        module.fail_json(msg=result["message"], **result)
+    module.exit_json(**result)
+
+
+def main() -> None:
+    """
+    Entry point of the script.
+    """
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the fleet_status command line.
+"""
+
+import json
+
+import pytest
+
+from src.fleet_status import create_checker_factory, main
+from src.modules.get_cluster_status_db import HanaClusterStatusChecker
+from src.modules.get_cluster_status_scs import SCSClusterStatusChecker
+
+
+def test_create_checker_factory(mocker):
+    """
+    Test the checkers are created from the type of each cluster, without reading the SCS
+    resource IDs locally.
+
+    :param mocker: Mocker fixture for mocking functions.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    execute = mocker.patch.object(SCSClusterStatusChecker, "execute_command_subprocess")
+    factory = create_checker_factory(
+        {
+            "hdb01": {"type": "hana", "sid": "HDB", "instance_number": "01", "hosts": []},
+            "s4d": {"type": "scs", "sid": "S4D", "os_family": "redhat", "hosts": []},
+            "web": {"type": "webdispatcher", "sid": "WD1", "hosts": []},
+        }
+    )
+
+    hana_checker = factory("hdb01")
+    scs_checker = factory("s4d")
+
+    assert isinstance(hana_checker, HanaClusterStatusChecker)
+    assert (hana_checker.database_sid, hana_checker.db_instance_number) == ("hdb", "01")
+    assert isinstance(scs_checker, SCSClusterStatusChecker)
+    assert scs_checker.ansible_os_family.value == "REDHAT"
+    execute.assert_not_called()
+    with pytest.raises(ValueError):
+        factory("web")
+
+
+def test_main(mocker, tmp_path, capsys):
+    """
+    Test the command line prints the fleet summary and fails when a cluster is not stable.
+
+    :param mocker: Mocker fixture for mocking functions.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Temporary directory
+    :type tmp_path: pathlib.Path
+    :param capsys: Captured standard output
+    :type capsys: pytest.CaptureFixture
+    """
+    clusters_file = tmp_path / "clusters.yaml"
+    clusters_file.write_text(
+        "hdb01:\n  sid: HDB\n  hosts: [hanadb1, hanadb2]\n"
+        "s4d:\n  type: scs\n  sid: S4D\n  hosts: [sapscs1]\n",
+        encoding="utf-8",
+    )
+    summary = {"clusters": {}, "stable": 1, "unstable": 1, "unreachable": 0}
+    run = mocker.patch("src.fleet_status.FleetStatusCollector.run", return_value=summary)
+
+    assert main([str(clusters_file), "--user", "azureadm", "--no-become"]) == 1
+    run.assert_called_once_with({"hdb01": ["hanadb1", "hanadb2"], "s4d": ["sapscs1"]})
+    assert json.loads(capsys.readouterr().out) == summary
+
+    summary["stable"], summary["unstable"] = 2, 0
+    assert main([str(clusters_file)]) == 0
@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the azure_credentials module.
+"""
+
+import os
+import stat
+import time
+
+from azure.core.credentials import AccessToken
+
+from src.module_utils import azure_credentials
+from src.module_utils.azure_credentials import CachedTokenCredential, get_credential
+
+
+class MockCredential:
+    """
+    Mock Azure credential counting the tokens it issues
+    """
+
+    def __init__(self, client_id=None, lifetime=3600):
+        self.client_id = client_id
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        """
+        Mock get_token method
+        """
+        self.calls += 1
+        return AccessToken(f"token-{self.calls}", int(time.time()) + self.lifetime)
+
+
+class TestCachedTokenCredential:
+    """
+    Test suite for CachedTokenCredential
+    """
+
+    def test_token_shared_through_cache_file(self, tmp_path):
+        """
+        Test a token is reused in memory and by a credential of another process
+        """
+        cache_file = str(tmp_path / "cache" / "azure_tokens.json")
+        first = MockCredential()
+        credential = CachedTokenCredential(first, "managed-identity:system", cache_file)
+        assert credential.get_token("https://management.azure.com/.default").token == "token-1"
+        assert credential.get_token("https://management.azure.com/.default").token == "token-1"
+        assert first.calls == 1
+        assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+
+        second = MockCredential()
+        credential = CachedTokenCredential(second, "managed-identity:system", cache_file)
+        assert credential.get_token("https://management.azure.com/.default").token == "token-1"
+        assert second.calls == 0
+        credential.get_token("https://graph.microsoft.com/.default")
+        credential.get_token("https://management.azure.com/.default", claims="challenge")
+        assert second.calls == 2
+
+    def test_expiring_token_refreshed(self, tmp_path):
+        """
+        Test a token about to expire is fetched again
+        """
+        inner = MockCredential(lifetime=60)
+        credential = CachedTokenCredential(inner, "managed-identity:system", None)
+        credential.get_token("https://management.azure.com/.default")
+        credential.get_token("https://management.azure.com/.default")
+        assert inner.calls == 2
+        assert not list(tmp_path.iterdir())
+
+    def test_get_credential_shared(self, monkeypatch, tmp_path):
+        """
+        Test the same credential is returned for the same identity
+        """
+        monkeypatch.setattr(azure_credentials, "ManagedIdentityCredential", MockCredential)
+        monkeypatch.setattr(azure_credentials, "_CREDENTIALS", {})
+        cache_file = str(tmp_path / "azure_tokens.json")
+        credential = get_credential("client", cache_file)
+        assert get_credential("client", cache_file) is credential
+        assert credential.credential.client_id == "client"
+        assert get_credential(None, cache_file) is not credential
+        assert get_credential().cache_file is None
@@ -0,0 +1,242 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the cluster_fleet module.
+"""
+
+import asyncio
+import os
+
+from src.module_utils.cluster_fleet import FleetStatusCollector, SSHTransport
+from src.module_utils.enums import HanaSRProvider, OperatingSystemFamily
+from src.modules.get_cluster_status_db import HanaClusterStatusChecker
+from src.modules.get_cluster_status_scs import SCSClusterStatusChecker
+
+CLUSTER_STATUS = """<pacemaker-result>
+    <summary><nodes_configured number="2"/></summary>
+    <nodes><node name="{0}1" online="true"/><node name="{0}2" online="true"/></nodes>
+    <node_attributes>
+        <node name="{0}1">
+            <attribute name="hana_hdb_clone_state" value="PROMOTED"/>
+            <attribute name="hana_hdb_sync_state" value="PRIM"/>
+        </node>
+        <node name="{0}2">
+            <attribute name="hana_hdb_clone_state" value="{1}"/>
+            <attribute name="hana_hdb_sync_state" value="SOK"/>
+        </node>
+    </node_attributes>
+</pacemaker-result>"""
+
+SCS_CLUSTER_STATUS = """<pacemaker-result>
+    <summary><nodes_configured number="2"/></summary>
+    <nodes><node name="{0}1" online="true"/><node name="{0}2" online="true"/></nodes>
+    <resources>
+        <group id="g-S4D_ASCS">
+            <resource id="rsc_sap_S4D_ASCS00" active="true" role="Started" failed="false">
+                <node name="{0}1"/>
+            </resource>
+        </group>
+        <group id="g-S4D_ERS">
+            <resource id="rsc_sap_S4D_ERS01" active="true" role="Started" failed="{1}">
+                <node name="{0}2"/>
+            </resource>
+        </group>
+    </resources>
+    <node_attributes>
+        <node name="{0}1"><attribute name="runs_ers_S4D" value="0"/></node>
+        <node name="{0}2"><attribute name="runs_ers_S4D" value="1"/></node>
+    </node_attributes>
+</pacemaker-result>"""
+
+SCS_RESOURCES = """<resources>
+    <group id="g-S4D_ASCS">
+        <primitive id="rsc_sap_S4D_ASCS00" class="ocf" provider="heartbeat" type="SAPInstance">
+            <instance_attributes><nvpair name="IS_ERS" value="false"/></instance_attributes>
+        </primitive>
+    </group>
+    <group id="g-S4D_ERS">
+        <primitive id="rsc_sap_S4D_ERS01" class="ocf" provider="heartbeat" type="SAPInstance">
+            <instance_attributes><nvpair name="IS_ERS" value="true"/></instance_attributes>
+        </primitive>
+    </group>
+</resources>"""
+
+
+class StubTransport:
+    """
+    Transport answering with canned crm_mon and cibadmin output.
+    """
+
+    def __init__(self, outputs, resources=None):
+        self.outputs = outputs
+        self.resources = resources or {}
+        self.calls = []
+        self.closed = False
+
+    async def run(self, host, command, timeout):
+        """
+        Return the output of a host, raising it if it is an exception.
+        """
+        self.calls.append((host, command))
+        await asyncio.sleep(0)
+        outputs = self.resources if "cibadmin" in command else self.outputs
+        output = outputs[host]
+        if isinstance(output, Exception):
+            raise output
+        return output
+
+    async def close(self):
+        """
+        Record that the transport was closed.
+        """
+        self.closed = True
+
+
+class TestFleetStatusCollector:
+    """
+    Test suite for FleetStatusCollector
+    """
+
+    @staticmethod
+    def checker_factory(cluster):
+        """
+        Create the HANA cluster status checker of a cluster.
+        """
+        return HanaClusterStatusChecker(
+            database_sid="hdb",
+            db_instance_number="00",
+            saphanasr_provider=HanaSRProvider.SAPHANASR,
+            ansible_os_family=OperatingSystemFamily.SUSE,
+        )
+
+    def test_collect(self):
+        """
+        Test the fleet summary, falling back to the second node and reporting unreachable
+        clusters.
+        """
+        transport = StubTransport(
+            {
+                "a1": (0, CLUSTER_STATUS.format("a", "DEMOTED"), ""),
+                "b1": asyncio.TimeoutError(),
+                "b2": (0, CLUSTER_STATUS.format("b", "UNDEFINED"), ""),
+                "c1": (1, "", "crm_mon: Connection to cluster failed"),
+                "c2": OSError("No route to host"),
+            }
+        )
+        collector = FleetStatusCollector(self.checker_factory, transport, max_concurrency=2)
+
+        summary = collector.run({"a": ["a1", "a2"], "b": ["b1", "b2"], "c": ["c1", "c2"]})
+
+        assert list(summary["clusters"]) == ["a", "b", "c"]
+        assert (summary["stable"], summary["unstable"], summary["unreachable"]) == (1, 1, 1)
+        assert summary["clusters"]["a"]["state"]["primary_node"] == "a1"
+        assert summary["clusters"]["a"]["state"]["secondary_node"] == "a2"
+        assert summary["clusters"]["b"]["host"] == "b2"
+        assert summary["clusters"]["b"]["state"]["secondary_node"] == ""
+        assert summary["clusters"]["b"]["cluster_summary"]["nodes"]["b1"] == "online"
+        assert "exit code 1" in summary["clusters"]["c"]["message"]
+        assert "No route to host" in summary["clusters"]["c"]["message"]
+        assert "a2" not in [host for host, _ in transport.calls]
+        assert transport.calls[0][1] == ["sudo", "-n", "crm_mon", "--output-as=xml"]
+        assert transport.closed
+
+    def test_collect_scs(self):
+        """
+        Test the ASCS and ERS resource IDs of SCS clusters are read on the probed node.
+        """
+        transport = StubTransport(
+            {
+                "a1": (0, SCS_CLUSTER_STATUS.format("a", "false"), ""),
+                "b1": (0, SCS_CLUSTER_STATUS.format("b", "false"), ""),
+                "b2": (0, SCS_CLUSTER_STATUS.format("b", "true"), ""),
+            },
+            resources={
+                "a1": (0, SCS_RESOURCES, ""),
+                "b1": (1, "", "cibadmin: Connection to the CIB manager failed"),
+                "b2": (0, SCS_RESOURCES, ""),
+            },
+        )
+        collector = FleetStatusCollector(
+            lambda cluster: SCSClusterStatusChecker(
+                "S4D", OperatingSystemFamily.SUSE, read_resource_ids=False
+            ),
+            transport,
+        )
+
+        summary = collector.run({"a": ["a1", "a2"], "b": ["b1", "b2"]})
+
+        state = summary["clusters"]["a"]["state"]
+        assert summary["clusters"]["a"]["stable"]
+        assert (state["ascs_node"], state["ers_node"]) == ("a1", "a2")
+        assert state["ascs_resource_id"] == "rsc_sap_S4D_ASCS00"
+        assert state["cluster_status"]["ers_node"]["id"] == "rsc_sap_S4D_ERS01"
+        assert summary["clusters"]["b"]["host"] == "b2"
+        assert summary["clusters"]["b"]["status"] == "WARNING"
+        assert summary["clusters"]["b"]["state"]["ers_node"] == ""
+        assert [command for host, command in transport.calls if host == "a1"] == [
+            ["sudo", "-n", "crm_mon", "--output-as=xml"],
+            ["sudo", "-n", "cibadmin", "--query", "--scope", "resources"],
+        ]
+
+    def test_ssh_command_reuses_connections(self, tmp_path):
+        """
+        Test the ssh command line shares a control master and quotes the remote command.
+        """
+        transport = SSHTransport(user="azureadm", control_dir=str(tmp_path))
+
+        command = transport.build_command("node1", ["crm_mon", "--output-as=xml", "a b"])
+
+        assert "ControlMaster=auto" in command
+        assert f"ControlPath={tmp_path}/%C" in command
+        assert command[-4:] == ["azureadm", "node1", "--", "crm_mon --output-as=xml 'a b'"]
+
+    def test_ssh_transport_close(self, monkeypatch, tmp_path):
+        """
+        Test closing the transport stops the control master of every host it used and removes
+        only the socket directory it created.
+        """
+        commands = []
+
+        class MockProcess:
+            """
+            Finished ssh process.
+            """
+
+            returncode = 0
+
+            async def communicate(self):
+                """
+                Return empty output.
+                """
+                return b"", b""
+
+            async def wait(self):
+                """
+                Return the exit code.
+                """
+                return 0
+
+        async def mock_create_subprocess_exec(*args, **kwargs):
+            commands.append(list(args))
+            return MockProcess()
+
+        monkeypatch.setattr(
+            "src.module_utils.cluster_fleet.asyncio.create_subprocess_exec",
+            mock_create_subprocess_exec,
+        )
+
+        async def use_transport(transport):
+            async with transport:
+                await transport.run("node1", ["true"], 5)
+                await transport.run("node1", ["true"], 5)
+
+        transport = SSHTransport()
+        asyncio.run(use_transport(transport))
+        assert commands[-1][-3:] == ["-O", "exit", "node1"]
+        assert len(commands) == 3
+        assert not os.path.exists(transport.control_dir)
+
+        transport = SSHTransport(control_dir=str(tmp_path))
+        asyncio.run(use_transport(transport))
+        assert tmp_path.exists()
@@ -16,6 +16,7 @@ from src.module_utils.collector import (
     CommandCollector,
     ModuleCollector,
 )
+from src.module_utils.shell_session import ShellSessionError
 
 
 class MockCheck:
@@ -24,6 +25,7 @@ class MockCheck:
     """
 
     def __init__(self, collector_args: Dict[str, Any] | None = None):
+        self.id = "mock_check"
         self.collector_args = collector_args or {}
         self.command = None
 
@@ -36,6 +38,7 @@ class MockParent:
     def __init__(self):
         self.logs = []
         self.errors = []
+        self.timeouts = []
 
     def log(self, level: int, message: str) -> None:
         """
@@ -49,12 +52,24 @@ class MockParent:
         """
         self.errors.append(error)
 
-    def execute_command_subprocess(self, command: str, shell_command: bool = True) -> str:
+    def execute_command_subprocess(
+        self, command: str, shell_command: bool = True, timeout: float = 100
+    ) -> str:
         """
         Mock execute_command_subprocess method
         """
+        self.timeouts.append(timeout)
         return "mock_output"
 
+    def execute_many(
+        self, commands: list, shell_command: bool = True, timeout=100, max_concurrency: int = 4
+    ) -> list:
+        """
+        Mock execute_many method
+        """
+        self.timeouts.append(timeout)
+        return [f"output of {command}" for command in commands]
+
 
 class TestCollector:
     """
@@ -146,7 +161,7 @@ class TestCommandCollector:
         parent = MockParent()
         collector = CommandCollector(parent)
 
-        def mock_execute_failing(command: str, shell_command: bool = True) -> str:
+        def mock_execute_failing(command: str, shell_command: bool = True, **kwargs) -> str:
             raise Exception("Command failed")
 
         monkeypatch.setattr(parent, "execute_command_subprocess", mock_execute_failing)
@@ -154,6 +169,98 @@ class TestCommandCollector:
         assert "ERROR: Command execution failed" in result
         assert len(parent.errors) == 1
 
+    def test_collect_timeout(self):
+        """
+        Test the command timeout comes from collector_args and is capped by the run budget
+        """
+        parent = MockParent()
+        collector = CommandCollector(parent)
+        collector.collect(MockCheck({"command": "hostname"}), {})
+        collector.collect(MockCheck({"command": "hostname", "timeout": 5}), {})
+        collector.collect(MockCheck({"command": "hostname", "timeout": "invalid"}), {})
+        parent.get_remaining_time = lambda: 2.5
+        collector.collect(MockCheck({"command": "hostname", "timeout": 5}), {})
+        parent.get_remaining_time = lambda: None
+        collector.collect(MockCheck({"command": "hostname", "timeout": 5}), {})
+        assert parent.timeouts == [100.0, 5.0, 100.0, 2.5, 5.0]
+
+    def test_collect_with_session_pool(self):
+        """
+        Test non-root checks run in the session pool and fall back to su when it fails
+        """
+
+        class MockSessionPool:
+            def __init__(self):
+                self.calls = []
+                self.fail = False
+
+            def execute(self, user, command, timeout=100):
+                self.calls.append((user, command, timeout))
+                if self.fail:
+                    raise ShellSessionError("session failed")
+                return "session_output\n"
+
+        parent = MockParent()
+        parent.session_pool = MockSessionPool()
+        collector = CommandCollector(parent)
+        check = MockCheck({"command": "R3trans -d", "user": "db2sid", "timeout": 10})
+        assert collector.collect(check, {"database_sid": "DB1"}) == "session_output"
+        assert parent.session_pool.calls == [("db2db1", "R3trans -d", 10.0)]
+        assert check.command == "su - db2db1 -c 'R3trans -d'"
+        assert collector.collect(MockCheck({"command": "hostname", "user": "root"}), {}) == (
+            "mock_output"
+        )
+        assert len(parent.session_pool.calls) == 1
+        parent.session_pool.fail = True
+        assert collector.collect(check, {"database_sid": "DB1"}) == "mock_output"
+
+    def test_collect_many(self):
+        """
+        Test concurrent command collection keeps check order and reports build errors
+        """
+        collector = CommandCollector(MockParent())
+        checks = [
+            MockCheck({"command": "cat {{ CONTEXT.file }}"}),
+            MockCheck({"command": "rm -rf /tmp"}),
+            MockCheck({"command": "whoami", "user": "sapadm"}),
+            MockCheck({"command": "hostname", "shell": False}),
+        ]
+        result = collector.collect_many(checks, {"file": "/etc/hosts"})
+        assert result[0] == "output of cat /etc/hosts"
+        assert "ERROR: Command sanitization failed" in result[1]
+        assert result[2] == "output of su - sapadm -c whoami"
+        assert result[3] == "mock_output"
+        assert collector.parent.timeouts == [100.0, [100.0, 100.0]]
+
+    def test_collect_many_exception_handling(self, monkeypatch):
+        """
+        Test collect_many reports an error for every batched check when execution fails
+        """
+        parent = MockParent()
+        collector = CommandCollector(parent)
+
+        def mock_execute_failing(commands, **kwargs):
+            raise Exception("Loop failed")
+
+        monkeypatch.setattr(parent, "execute_many", mock_execute_failing)
+        result = collector.collect_many([MockCheck({"command": "ls"})] * 2, {})
+        assert result == ["ERROR: Command execution failed: Loop failed"] * 2
+        assert len(parent.errors) == 1
+
+    def test_collect_many_strips_like_collect(self, monkeypatch):
+        """
+        Test collect_many strips surrounding whitespace from outputs the same way as collect
+        """
+        parent = MockParent()
+        collector = CommandCollector(parent)
+        monkeypatch.setattr(
+            parent, "execute_command_subprocess", lambda command, **kwargs: "  value\n"
+        )
+        monkeypatch.setattr(parent, "execute_many", lambda commands, **kwargs: ["  value\n"])
+        check = MockCheck({"command": "cat /proc/sys/vm/swappiness"})
+        assert collector.collect(check, {}) == "value"
+        assert collector.collect_many([check], {}) == ["value"]
+
 
 class TestAzureDataParser:
     """
@@ -285,6 +392,33 @@ class TestAzureDataParser:
         )
         assert "ERROR: ANF property parsing failed" in result
 
+    def test_parse_disks_vars_memoised(self):
+        """
+        Test repeated lookups are served from the run cache until the context changes
+        """
+        parent = MockParent()
+        parser = AzureDataParser(parent)
+        filesystem = {"target": "/hana/data", "azure_disk_names": ["disk1", "disk2"]}
+        context = {
+            "filesystems": [filesystem],
+            "azure_disks_metadata": [
+                '{"name": "disk1", "iops": 1500}',
+                {"name": "disk2", "iops": 500},
+            ],
+        }
+        check = MockCheck({"mount_point": "/hana/data", "property": "iops"})
+        assert parser.parse_disks_vars(check, context) == "2000"
+        assert AzureDataParser(parent).parse_disks_vars(check, context) == "2000"
+        parsing_logs = [log for log in parent.logs if "Parsing Azure disk" in log["message"]]
+        assert len(parsing_logs) == 1
+        assert parent.azure_parser_cache["values"] == {("disks", "/hana/data", "iops"): "2000"}
+
+        context["azure_disks_metadata"].append({"name": "disk3", "iops": 100})
+        filesystem["azure_disk_names"].append("disk3")
+        assert parser.parse_disks_vars(check, context) == "2100"
+        context["azure_disks_metadata"] = [{"name": "disk1", "iops": 100}]
+        assert parser.parse_disks_vars(check, context) == "100"
+
     def test_parse_disks_vars_property_in_filesystem(self):
         """
         Test disk parsing when property exists in filesystem entry
@@ -0,0 +1,159 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the failover_timeline module.
+"""
+
+import os
+import subprocess
+import time
+
+from src.module_utils.failover_timeline import FailoverTimelineRecorder, parse_cluster_state
+
+
+def cluster_status(primary, secondary, online=("node1", "node2"), unclean=(), fenced=()):
+    """
+    Build crm_mon XML output for a two node HANA cluster.
+    """
+    nodes = "".join(
+        f'<node name="{node}" online="{str(node in online).lower()}" '
+        + f'unclean="{str(node in unclean).lower()}"/>'
+        for node in ("node1", "node2")
+    )
+    hana = "".join(
+        f'<resource id="rsc_SAPHana_HDB" resource_agent="ocf::suse:SAPHana" role="{role}">'
+        + f'<node name="{node}"/></resource>'
+        for node, role in ((primary, "Promoted"), (secondary, "Unpromoted"))
+        if node
+    )
+    attributes = "".join(
+        f'<node name="{node}"><attribute name="hana_hdb_sync_state" value="{state}"/>'
+        + '<attribute name="hana_hdb_lpt" value="1700000000"/></node>'
+        for node, state in ((primary, "PRIM"), (secondary, "SOK"))
+        if node
+    )
+    fencing = "".join(
+        f'<fence_event action="reboot" target="{node}" status="success" '
+        + 'completed="2025-01-01 10:00:20Z"/>'
+        for node in fenced
+    )
+    return (
+        f"<pacemaker-result><nodes>{nodes}</nodes><resources>{hana}"
+        + '<resource id="rsc_ip_HDB" resource_agent="ocf::heartbeat:IPaddr2" role="Started">'
+        + f'<node name="{primary}"/></resource></resources>'
+        + f"<node_attributes>{attributes}</node_attributes>"
+        + f"<fence_history>{fencing}</fence_history></pacemaker-result>"
+    )
+
+
+class TestFailoverTimelineRecorder:
+    """
+    Test suite for FailoverTimelineRecorder
+    """
+
+    def test_parse_cluster_state(self):
+        """
+        Test the cluster state keeps nodes, resource roles and tracked attributes only
+        """
+        state, agents = parse_cluster_state(cluster_status("node1", "node2"))
+        assert state[("node", "node1", "online")] == "true"
+        assert state[("resource", "rsc_SAPHana_HDB", "node1")] == "Promoted"
+        assert state[("resource", "rsc_ip_HDB", "node1")] == "Started"
+        assert state[("attribute", "node2", "hana_hdb_sync_state")] == "SOK"
+        assert ("attribute", "node1", "hana_hdb_lpt") not in state
+        assert agents["rsc_ip_HDB"] == "ocf::heartbeat:IPaddr2"
+
+    def test_record_failover(self):
+        """
+        Test the transitions of a failover are recorded with their elapsed time
+        """
+        recorder = FailoverTimelineRecorder(duration=60)
+        state = recorder.record_sample(None, cluster_status("node1", "node2"), 0.0)
+        assert recorder.timeline == []
+        state = recorder.record_sample(
+            state, cluster_status("node1", "node2", online=("node2",), unclean=("node1",)), 2.5
+        )
+        state = recorder.record_sample(
+            state, cluster_status("node2", "", online=("node2",), fenced=("node1",)), 9.0
+        )
+
+        events = [(event["elapsed"], event["event"], event["node"]) for event in recorder.timeline]
+        assert (2.5, "node_offline", "node1") in events
+        assert (2.5, "fencing_pending", "node1") in events
+        assert (9.0, "fencing", "node1") in events
+        assert (9.0, "resource_promoted", "node2") in events
+        assert (9.0, "ip_started", "node2") in events
+        assert (9.0, "ip_stopped", "node1") in events
+        assert (9.0, "sr_state_changed", "node2") in events
+        summary = recorder.summarize()
+        assert summary["node_offline"] == 2.5
+        assert summary["resource_promoted"] == 9.0
+        assert summary["recovery_seconds"] == 6.5
+        summary = recorder.summarize(fault_elapsed=2.0)
+        assert summary["node_offline"] == 0.5
+        assert summary["resource_promoted"] == 7.0
+        assert summary["recovery_seconds"] == 7.0
+        assert recorder.summarize(fault_elapsed=5.0)["recovery_seconds"] == 4.0
+        assert "node_offline" not in recorder.summarize(fault_elapsed=5.0)
+
+    def test_run_until_stop_file(self, mocker, tmp_path):
+        """
+        Test the recording stops on the stop file and survives failing samples
+        """
+        stop_file = tmp_path / "stop"
+        samples = iter(
+            [
+                cluster_status("node1", "node2"),
+                subprocess.CalledProcessError(1, "crm_mon"),
+                cluster_status("node2", "node1"),
+            ]
+        )
+
+        def query_cluster_status():
+            sample = next(samples)
+            if isinstance(sample, Exception):
+                raise sample
+            if sample == cluster_status("node2", "node1"):
+                stop_file.touch()
+            return sample
+
+        recorder = FailoverTimelineRecorder(duration=60, interval=0, stop_file=str(stop_file))
+        mocker.patch.object(recorder, "_query_cluster_status", side_effect=query_cluster_status)
+        result = recorder.run()
+
+        assert result["status"] == "PASSED"
+        assert result["details"]["samples"] == 2
+        assert result["details"]["failed_samples"] == 1
+        assert "resource_promoted" in result["details"]["summary"]
+        assert not stop_file.exists()
+
+    def test_run_measures_from_fault_file(self, mocker, tmp_path):
+        """
+        Test the summary is measured from the modification time of the fault file
+        """
+        fault_file = tmp_path / "fault"
+        samples = iter([cluster_status("node1", "node2"), cluster_status("node2", "node1")])
+
+        def query_cluster_status():
+            sample = next(samples)
+            if sample == cluster_status("node2", "node1"):
+                fault_file.touch()
+                os.utime(fault_file, (time.time() - 0.25, time.time() - 0.25))
+            return sample
+
+        recorder = FailoverTimelineRecorder(
+            duration=60, interval=0, stop_file=str(tmp_path / "stop"), fault_file=str(fault_file)
+        )
+        mocker.patch.object(recorder, "_query_cluster_status", side_effect=query_cluster_status)
+        mocker.patch.object(recorder, "_stop_requested", side_effect=[False, True])
+        result = recorder.run()
+
+        details = result["details"]
+        assert details["fault"] is not None
+        assert details["fault_elapsed"] <= details["timeline"][0]["elapsed"]
+        assert details["summary"]["recovery_seconds"] == round(
+            details["timeline"][-1]["elapsed"] - details["fault_elapsed"], 3
+        )
+        assert 0 <= details["summary"]["resource_promoted"] < 1
+        assert not fault_file.exists()
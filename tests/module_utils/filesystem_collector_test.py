@@ -323,6 +323,18 @@ class TestCollectLvmVolumes:
         _, lvm_groups = collector.collect_lvm_volumes(lvm_fullreport_invalid)
         assert lvm_groups["testvg"]["disks"] == 0
 
+    def test_collect_lvm_volumes_from_json_text(self, collector):
+        """Test LVM collection accepts the raw JSON output of lvm fullreport"""
+        lvm_fullreport = (
+            '{"report": [{"vg": [{"vg_name": "logvg", "pv_count": "1"}], '
+            '"lv": [{"lv_name": "loglv", "lv_full_name": "logvg/loglv", "lv_uuid": "u1"}], '
+            '"seg": [{"lv_uuid": "u1", "stripes": "1", "stripe_size": "0"}]}]}\n'
+            "WARNING: lvmetad is not running"
+        )
+        lvm_volumes, lvm_groups = collector.collect_lvm_volumes(lvm_fullreport)
+        assert lvm_volumes["loglv"]["stripes"] == "1"
+        assert lvm_groups["logvg"]["disks"] == 1
+
     def test_collect_lvm_volumes_exception(self, collector):
         """Test LVM collection handles exceptions and returns error message"""
         result = collector.collect_lvm_volumes(None)
@@ -755,6 +767,75 @@ class TestCollectMethod:
         assert "lvm_volumes_info" in result
         assert "anf_volumes_info" in result
         assert len(result["filesystems"]) > 0
+        assert mock_parent.storage_topology.filesystems == result["filesystems"]
+
+    def test_collect_native_filesystems(self, collector, mock_parent, monkeypatch):
+        """Test filesystems are read natively when the context carries no mount text"""
+        monkeypatch.setattr(
+            "src.module_utils.filesystem_collector.LocalStorageDiscovery.get_filesystems",
+            lambda self: [
+                {
+                    "target": "/hana/shared",
+                    "source": "10.0.0.4:/shared",
+                    "fstype": "nfs4",
+                    "options": "rw,vers=4.1",
+                    "size": "1G",
+                    "free": "1G",
+                    "used": "0G",
+                    "used_percent": "0%",
+                    "size_bytes": 4194304,
+                    "free_bytes": 2097152,
+                    "used_bytes": 2097152,
+                }
+            ],
+        )
+        context = {
+            "lvm_fullreport": {"report": []},
+            "anf_storage_metadata": [{"ip": "10.0.0.4", "throughputMibps": 64}],
+        }
+        result = collector.collect(MockCheck(), context)
+        filesystem = result["filesystems"][0]
+        assert filesystem["nfs_type"] == "ANF"
+        assert filesystem["max_mbps"] == 64
+        assert filesystem["size_bytes"] == 4194304
+
+    def test_collect_context_filesystems(self, collector, mock_parent, monkeypatch):
+        """Test the filesystems of the node in the context are used instead of local ones"""
+        monkeypatch.setattr(
+            "src.module_utils.filesystem_collector.LocalStorageDiscovery.get_filesystems",
+            lambda self: pytest.fail("local filesystems must not be read"),
+        )
+        context = {
+            "hostname": "sapnode",
+            "lvm_fullreport": {"report": []},
+            "mounted_filesystems": [
+                {
+                    "target": "/hana/log",
+                    "source": "/dev/sdd",
+                    "fstype": "xfs",
+                    "options": "rw",
+                    "size": "128G",
+                    "free": "100G",
+                    "used": "28G",
+                    "used_percent": "22%",
+                }
+            ],
+        }
+        result = collector.collect(MockCheck(), context)
+        assert [fs["target"] for fs in result["filesystems"]] == ["/hana/log"]
+
+    def test_collect_skips_local_filesystems_of_other_host(
+        self, collector, mock_parent, monkeypatch
+    ):
+        """Test the filesystems of the controller are not taken for those of the node"""
+        monkeypatch.setattr("src.module_utils.filesystem_collector.platform.node", lambda: "ctl")
+        monkeypatch.setattr(
+            "src.module_utils.filesystem_collector.LocalStorageDiscovery.get_filesystems",
+            lambda self: pytest.fail("local filesystems must not be read"),
+        )
+        context = {"hostname": "sapnode", "lvm_fullreport": {"report": []}}
+        result = collector.collect(MockCheck(), context)
+        assert result["filesystems"] == []
 
     def test_collect_empty_lvm_fullreport(self, collector, mock_parent):
         """Test collect handles empty lvm_fullreport"""
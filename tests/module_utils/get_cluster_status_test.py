@@ -5,11 +5,12 @@
 Unit tests for the get_cluster_status module.
 """
 
+import gzip
 import logging
 import xml.etree.ElementTree as ET
 from typing import Dict, Any
 import pytest
-from src.module_utils.get_cluster_status import BaseClusterStatusChecker
+from src.module_utils.get_cluster_status import BaseClusterStatusChecker, parse_cluster_status
 from src.module_utils.enums import OperatingSystemFamily
 
 
@@ -401,3 +402,179 @@ class TestBaseClusterStatusChecker:
         result = base_checker.run()
 
         assert result["status"] == "PASSED"
+
+    def test_run_wait_for_expected_state(self, mocker, base_checker: TestableBaseClusterChecker):
+        """
+        Test the run method polls the cluster status until it matches the expected state,
+        retrying failed queries.
+
+        :param mocker: Mocking library to patch methods.
+        :type mocker: mocker.MockerFixture
+        :param base_checker: Instance of TestableBaseClusterChecker.
+        :type base_checker: TestableBaseClusterChecker
+        """
+        cluster_xml = "<cluster_status><node_attributes/></cluster_status>"
+        mock_execute = mocker.patch.object(base_checker, "execute_command_subprocess")
+        mock_execute.side_effect = [
+            "reboot",
+            cluster_xml,
+            "active",
+            Exception("crm_mon: connection refused"),
+            cluster_xml,
+            "active",
+        ]
+        primary_nodes = iter(["node1", "node2"])
+        mocker.patch.object(
+            base_checker,
+            "_process_node_attributes",
+            side_effect=lambda cluster_status_xml: base_checker.result.update(
+                {"primary_node": next(primary_nodes)}
+            ),
+        )
+        mock_time = mocker.patch("src.module_utils.get_cluster_status.time")
+        mock_time.monotonic.return_value = 0
+        base_checker.test_stable = True
+
+        result = base_checker.run({"primary_node": "node2"}, timeout=60, interval=5)
+
+        assert result["status"] == "PASSED"
+        assert result["state_reached"] is True
+        assert result["polls"] == 3
+        assert mock_time.sleep.call_count == 2
+        assert "Failed to get cluster status: crm_mon: connection refused" in result["logs"]
+
+    def test_run_wait_for_expected_state_timeout(
+        self, mocker, base_checker: TestableBaseClusterChecker
+    ):
+        """
+        Test the run method fails when the expected state is not reached in time.
+
+        :param mocker: Mocking library to patch methods.
+        :type mocker: mocker.MockerFixture
+        :param base_checker: Instance of TestableBaseClusterChecker.
+        :type base_checker: TestableBaseClusterChecker
+        """
+        mocker.patch.object(
+            base_checker,
+            "execute_command_subprocess",
+            side_effect=lambda command: (
+                "active"
+                if command[0] == "systemctl"
+                else "<cluster_status><node_attributes/></cluster_status>"
+            ),
+        )
+        mock_time = mocker.patch("src.module_utils.get_cluster_status.time")
+        mock_time.monotonic.side_effect = range(0, 100, 10)
+        base_checker.result["primary_node"] = "node1"
+
+        result = base_checker.run({"primary_node": "node2"}, timeout=30, interval=10)
+
+        assert result["status"] == "FAILED"
+        assert result["state_reached"] is False
+        assert "did not reach the expected state" in result["message"]
+        assert result["polls"] == 3
+
+    def test_run_returns_compact_summary(
+        self, mocker, base_checker: TestableBaseClusterChecker, tmp_path
+    ):
+        """
+        Test the result carries a compact summary instead of the raw XML, which is only
+        returned or written to a gzip file on request.
+
+        :param mocker: Mocking library to patch methods.
+        :type mocker: mocker.MockerFixture
+        :param base_checker: Instance of TestableBaseClusterChecker.
+        :type base_checker: TestableBaseClusterChecker
+        :param tmp_path: Temporary directory
+        :type tmp_path: pathlib.Path
+        """
+        cluster_xml = """
+        <pacemaker-result>
+            <nodes>
+                <node name="node1" online="true"/>
+                <node name="node2" online="false" unclean="true"/>
+            </nodes>
+            <resources>
+                <clone id="msl_SAPHana_HDB">
+                    <resource id="rsc_SAPHana_HDB" resource_agent="ocf::suse:SAPHana"
+                        role="Promoted"><node name="node1"/></resource>
+                </clone>
+                <resource id="rsc_ip_HDB" resource_agent="ocf::heartbeat:IPaddr2"
+                    role="Started" failed="true"><node name="node1"/></resource>
+            </resources>
+            <node_attributes>
+                <node name="node1"><attribute name="hana_hdb_sync_state" value="PRIM"/></node>
+            </node_attributes>
+        </pacemaker-result>
+        """
+        mocker.patch.object(
+            base_checker,
+            "execute_command_subprocess",
+            side_effect=lambda command: "active" if command[0] == "systemctl" else cluster_xml,
+        )
+        base_checker.test_ready = True
+        base_checker._update_cluster_status()
+        result = base_checker.run()
+
+        assert result["cluster_status"] == ""
+        assert result["cluster_summary"] == {
+            "nodes": {"node1": "online", "node2": "unclean"},
+            "resources": {
+                "rsc_SAPHana_HDB": {"agent": "ocf::suse:SAPHana", "roles": {"node1": "Promoted"}},
+                "rsc_ip_HDB": {
+                    "agent": "ocf::heartbeat:IPaddr2",
+                    "roles": {"node1": "Started"},
+                    "failed": True,
+                },
+            },
+            "attributes": {"node1": {"hana_hdb_sync_state": "PRIM"}},
+        }
+        assert "cluster_status_xml" not in result
+
+        status_file = tmp_path / "status" / "crm_mon.xml.gz"
+        base_checker.export_raw_status(include=True, status_file=str(status_file))
+        assert result["cluster_status_xml"] == cluster_xml
+        with gzip.open(status_file, "rt", encoding="utf-8") as raw_status:
+            assert raw_status.read() == cluster_xml
+        assert result["cluster_status_file"] == str(status_file)
+
+    def test_parse_cluster_status_keeps_wanted_sections(self):
+        """
+        Test the streaming extractor keeps the used sections and the wanted resources only.
+        """
+        cluster_xml = """<pacemaker-result api-version="2.2">
+            <summary><nodes_configured number="2"/></summary>
+            <nodes><node name="node1" online="true"/></nodes>
+            <resources>
+                <group id="g-ASCS">
+                    <resource id="rsc_sap_ASCS00" role="Started"><node name="node1"/></resource>
+                    <resource id="rsc_ip_ASCS" role="Started"><node name="node1"/></resource>
+                </group>
+                <clone id="cln_fs">
+                    <resource id="rsc_fs" role="Started"><node name="node1"/></resource>
+                    <resource id="rsc_fs" role="Started"><node name="node2"/></resource>
+                </clone>
+                <resource id="rsc_sap_ERS01" role="Started"><node name="node2"/></resource>
+            </resources>
+            <node_attributes><node name="node1"/></node_attributes>
+            <node_history><node name="node1"/></node_history>
+            <fence_history/>
+        </pacemaker-result>"""
+
+        pruned, resources_by_id = parse_cluster_status(
+            cluster_xml, ["rsc_sap_ASCS00", "rsc_sap_ERS01"]
+        )
+        assert [child.tag for child in pruned] == [
+            "summary",
+            "nodes",
+            "node_attributes",
+            "resources",
+        ]
+        assert pruned.get("api-version") == "2.2"
+        assert sorted(resources_by_id) == ["rsc_sap_ASCS00", "rsc_sap_ERS01"]
+        assert resources_by_id["rsc_sap_ASCS00"].find("node").get("name") == "node1"
+        assert pruned.find("resources/resource[@id='rsc_sap_ERS01']") is not None
+
+        pruned, resources_by_id = parse_cluster_status(cluster_xml)
+        assert len(pruned.find("resources")) == 5
+        assert resources_by_id["rsc_fs"].find("node").get("name") == "node1"
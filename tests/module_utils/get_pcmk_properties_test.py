@@ -241,6 +241,10 @@ class TestBaseHAClusterValidator:
             "src.module_utils.sap_automation_qa.SapAutomationQA.execute_command_subprocess",
             mock_execute_command,
         )
+        monkeypatch.setattr(
+            "src.module_utils.sap_automation_qa.SapAutomationQA.execute_many",
+            lambda self, commands, **kwargs: [mock_execute_command(cmd) for cmd in commands],
+        )
 
         return TestableBaseHAClusterValidator(
             os_type=OperatingSystemFamily.REDHAT,
@@ -0,0 +1,74 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the lvm_report module.
+"""
+
+import json
+
+import pytest
+
+from src.module_utils.lvm_report import LvmReport
+
+FULLREPORT = {
+    "report": [
+        {
+            "vg": [{"vg_name": "datavg", "pv_count": "2", "lv_count": "1", "vg_size": "1024g"}],
+            "pv": [{"pv_name": "/dev/sdc"}, {"pv_name": "/dev/sdd"}],
+            "lv": [
+                {
+                    "lv_name": "datalv",
+                    "lv_full_name": "datavg/datalv",
+                    "lv_uuid": "uuid-data",
+                    "lv_path": "/dev/datavg/datalv",
+                    "lv_dm_path": "/dev/mapper/datavg-datalv",
+                    "lv_layout": "striped",
+                    "lv_size": "1024g",
+                }
+            ],
+            "seg": [{"lv_uuid": "uuid-data", "stripes": "2", "stripe_size": "256k"}],
+        },
+        {"vg": [], "pv": [{"pv_name": "/dev/sde"}], "lv": [], "seg": []},
+    ]
+}
+
+
+class TestLvmReport:
+    """
+    Test suite for LvmReport
+    """
+
+    def test_parse_json_text(self):
+        """
+        Test raw LVM output is decoded report by report, ignoring trailing log and warnings
+        """
+        text = (
+            json.dumps(FULLREPORT)[:-1]
+            + ', "log": [{"log_type": "status"}]}\n'
+            + "ERROR:   WARNING: Failed to connect to lvmetad."
+        )
+        lvm_report = LvmReport.parse(text)
+        assert lvm_report.report_count == 2
+        assert [(pv.device_name, pv.vg_name) for pv in lvm_report.pvs] == [
+            ("sdc", "datavg"),
+            ("sdd", "datavg"),
+            ("sde", ""),
+        ]
+        assert lvm_report.vgs[0].name == "datavg"
+        assert lvm_report.lvs[0].vg_name == "datavg"
+        assert lvm_report.lvs[0].dm_path == "/dev/mapper/datavg-datalv"
+        assert lvm_report.get_segment("uuid-data").stripe_size == "256k"
+        assert not hasattr(lvm_report.lvs[0], "__dict__")
+
+    def test_parse_dict_and_empty_input(self):
+        """
+        Test decoded reports, empty output and unsupported types
+        """
+        lvm_report = LvmReport.parse(FULLREPORT)
+        assert lvm_report.report_count == 2
+        assert LvmReport.parse(lvm_report) is lvm_report
+        assert LvmReport.parse("").report_count == 0
+        assert LvmReport.parse('{"report": []}').report_count == 0
+        with pytest.raises(TypeError):
+            LvmReport.parse(None)
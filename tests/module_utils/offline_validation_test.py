@@ -0,0 +1,132 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the offline_validation module.
+"""
+
+import os
+
+from src.module_utils.enums import TestStatus
+from src.module_utils.offline_validation import OfflineCIBValidator, get_cib_hostname
+
+
+class MockValidator:
+    """
+    Validator reporting every name=value line of the CIB as a parameter.
+    """
+
+    def __init__(self, virtual_machine_name, cib_output, constants):
+        parameters = []
+        for line in cib_output.splitlines():
+            name, _, value = line.partition("=")
+            expected_value = constants.get(name)
+            parameters.append(
+                {
+                    "category": "crm_config",
+                    "id": f"options-{name}",
+                    "name": name,
+                    "value": value,
+                    "expected_value": expected_value,
+                    "status": (
+                        TestStatus.SUCCESS.value
+                        if value == expected_value
+                        else TestStatus.ERROR.value
+                    ),
+                }
+            )
+        failed = any(parameter["status"] == TestStatus.ERROR.value for parameter in parameters)
+        self.result = {
+            "status": TestStatus.ERROR.value if failed else TestStatus.SUCCESS.value,
+            "message": f"Validated {virtual_machine_name} in process {os.getpid()}",
+            "details": {"parameters": parameters},
+            "logs": [],
+        }
+
+    def get_result(self):
+        """
+        Get the validation result.
+        """
+        return self.result
+
+
+def write_cib_files(tmp_path, cibs):
+    """
+    Write CIB files in the offline_validation/<host>/cib layout.
+    """
+    cib_files = []
+    for hostname, content in cibs.items():
+        cib_file = tmp_path / "offline_validation" / hostname / "cib"
+        cib_file.parent.mkdir(parents=True)
+        cib_file.write_text(content, encoding="utf-8")
+        cib_files.append(str(cib_file))
+    return cib_files
+
+
+class TestOfflineCIBValidator:
+    """
+    Test suite for OfflineCIBValidator
+    """
+
+    def test_get_cib_hostname(self):
+        """
+        Test the host name is taken from the directory of the CIB file
+        """
+        assert get_cib_hostname("/workspace/offline_validation/hanadb1/cib") == "hanadb1"
+
+    def test_validate_in_worker_processes(self, tmp_path):
+        """
+        Test every host is validated in a worker process and differences are reported
+        """
+        cib_files = write_cib_files(
+            tmp_path,
+            {
+                "node1": "stonith-enabled=true\nconcurrent-fencing=true",
+                "node2": "stonith-enabled=true\nconcurrent-fencing=true",
+                "node3": "stonith-enabled=false",
+            },
+        )
+        result = OfflineCIBValidator(
+            MockValidator,
+            {"constants": {"stonith-enabled": "true", "concurrent-fencing": "true"}},
+            max_workers=3,
+        ).validate(cib_files)
+
+        hosts = result["details"]["hosts"]
+        assert list(hosts) == ["node1", "node2", "node3"]
+        assert hosts["node1"]["status"] == TestStatus.SUCCESS.value
+        assert hosts["node3"]["status"] == TestStatus.ERROR.value
+        assert str(os.getpid()) not in hosts["node1"]["message"]
+        assert result["status"] == TestStatus.ERROR.value
+        assert "2 passed, 0 with warnings, 1 failed" in result["message"]
+        assert result["details"]["differences"] == [
+            {
+                "category": "crm_config",
+                "id": "options-stonith-enabled",
+                "name": "stonith-enabled",
+                "values": {"node1": "true", "node2": "true", "node3": "false"},
+            },
+            {
+                "category": "crm_config",
+                "id": "options-concurrent-fencing",
+                "name": "concurrent-fencing",
+                "values": {"node1": "true", "node2": "true", "node3": None},
+            },
+        ]
+
+    def test_validate_missing_and_empty_files(self, tmp_path):
+        """
+        Test unreadable and empty CIB files fail their host only
+        """
+        cib_files = write_cib_files(tmp_path, {"node1": "stonith-enabled=true", "node2": ""})
+        cib_files.append(str(tmp_path / "offline_validation" / "node3" / "cib"))
+        result = OfflineCIBValidator(
+            MockValidator, {"constants": {"stonith-enabled": "true"}}, max_workers=1
+        ).validate(cib_files)
+
+        hosts = result["details"]["hosts"]
+        assert hosts["node1"]["status"] == TestStatus.SUCCESS.value
+        assert str(os.getpid()) in hosts["node1"]["message"]
+        assert "is empty" in hosts["node2"]["message"]
+        assert "Could not read CIB file" in hosts["node3"]["message"]
+        assert result["status"] == TestStatus.ERROR.value
@@ -0,0 +1,111 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the pcmk_constants module.
+"""
+
+import os
+
+import pytest
+
+from src.module_utils import pcmk_constants
+from src.module_utils.pcmk_constants import (
+    compile_constants,
+    load_compiled_constants,
+    resolve_provider_values,
+)
+
+BASIC_CATEGORIES = {"crm_config": "CRM_CONFIG_DEFAULTS", "op_defaults": "OP_DEFAULTS"}
+CONSTANTS = {
+    "VALID_CONFIGS": {
+        "SUSE": {"priority-fencing-delay": "30", "stonith-timeout": {"required": True}},
+        "SBD": {"stonith-timeout": {"value": "144", "required": True}},
+    },
+    "CRM_CONFIG_DEFAULTS": {"stonith-enabled": "true", "stonith-timeout": "900"},
+    "OP_DEFAULTS": {"timeout": {"value": "600", "required": False}},
+    "RESOURCE_DEFAULTS": {
+        "SUSE": {
+            "filesystem": {
+                "instance_attributes": {
+                    "options": {"value": {"ANF": ["nfsvers=4.1"], "AFS": {"value": "vers=4"}}}
+                },
+                "operations": {"monitor": {"timeout": {"value": ["40", "40s"], "required": True}}},
+            },
+            "optional": "not a dictionary",
+        }
+    },
+}
+
+
+class TestPcmkConstants:
+    """
+    Test suite for the constants compiler
+    """
+
+    def test_compile_constants(self):
+        """
+        Test the precedence of fencing, OS and default values and the resource lookups.
+        """
+        compiled = compile_constants(CONSTANTS, "SUSE", "SBD", BASIC_CATEGORIES, "ANF")
+
+        assert compiled.get("crm_config", "stonith-timeout") == ("144", True)
+        assert compiled.get("crm_config", "priority-fencing-delay") == ("30", False)
+        assert compiled.get("crm_config", "stonith-enabled") == ("true", False)
+        assert compiled.get("op_defaults", "timeout") == ("600", False)
+        assert compiled.get("crm_config", "unknown") is None
+        assert compiled.get("filesystem", "timeout", "operations", "monitor") == (
+            ["40", "40s"],
+            True,
+        )
+        assert compiled.get("filesystem", "timeout", "operations") is None
+        assert compiled.get("filesystem", "timeout", "invalid_section", "monitor") is None
+        expected, required = compiled.get("filesystem", "options", "instance_attributes", "x")
+        assert not required
+        assert isinstance(expected, dict)
+        assert compiled.get_provider_values(
+            "filesystem", "options", "instance_attributes", "x"
+        ) == ["nfsvers=4.1"]
+        assert compiled.get_provider_values("filesystem", "options", "meta_attributes") is None
+        assert compiled.get_provider_values("crm_config", "stonith-timeout") is None
+
+    def test_resolve_provider_values(self):
+        """
+        Test provider values fall back to the values of all providers.
+        """
+        options = CONSTANTS["RESOURCE_DEFAULTS"]["SUSE"]["filesystem"]["instance_attributes"]
+        assert resolve_provider_values(options["options"]["value"], "AFS") == ["vers=4"]
+        assert resolve_provider_values(options["options"]["value"]) == ["nfsvers=4.1", "vers=4"]
+        with pytest.raises(TypeError):
+            resolve_provider_values(["value"])
+
+    def test_load_compiled_constants_disk_cache(self, mocker, tmp_path):
+        """
+        Test the compiled constants are read back from the disk cache by content hash.
+        """
+        mocker.patch.dict(pcmk_constants._COMPILED, clear=True)
+        compiled = load_compiled_constants(
+            CONSTANTS, "SUSE", "SBD", BASIC_CATEGORIES, "ANF", str(tmp_path)
+        )
+        assert load_compiled_constants(CONSTANTS, "SUSE", "SBD", BASIC_CATEGORIES, "ANF") is (
+            compiled
+        )
+        assert len(os.listdir(tmp_path)) == 1
+
+        pcmk_constants._COMPILED.clear()
+        mock_compile = mocker.patch(
+            "src.module_utils.pcmk_constants.compile_constants",
+            side_effect=pcmk_constants.compile_constants,
+        )
+        cached = load_compiled_constants(
+            CONSTANTS, "SUSE", "SBD", BASIC_CATEGORIES, "ANF", str(tmp_path)
+        )
+        mock_compile.assert_not_called()
+        assert cached.expected_values == compiled.expected_values
+        assert cached.get_provider_values("filesystem", "options", "instance_attributes") == [
+            "nfsvers=4.1"
+        ]
+
+        load_compiled_constants(CONSTANTS, "REDHAT", "SBD", BASIC_CATEGORIES, "ANF", str(tmp_path))
+        mock_compile.assert_called_once()
+        assert len(os.listdir(tmp_path)) == 2
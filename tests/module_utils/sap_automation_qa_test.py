@@ -5,6 +5,8 @@
 Unit tests for the sap_automation_qa module.
 """
 
+import asyncio
+import time
 import xml.etree.ElementTree as ET
 from src.module_utils.sap_automation_qa import SapAutomationQA
 from src.module_utils.enums import TestStatus
@@ -187,6 +189,91 @@ class TestSapAutomationQA:
             result_list = sap_qa.execute_command_subprocess(command_list, shell_command=False)
             assert "Hello World" in result_list
 
+            start = time.time()
+            result = sap_qa.execute_command_subprocess(
+                "sleep 5 | cat", shell_command=True, timeout=0.2
+            )
+            assert result == "ERROR: Command timed out after 0.2 seconds"
+            assert time.time() - start < 3
+            assert sap_qa.result["status"] == TestStatus.ERROR.value
+
+    def test_execute_many(self, monkeypatch):
+        """
+        Test the execute_many method keeps the order of results and bounds the concurrency.
+
+        :param monkeypatch: Monkeypatch fixture for mocking.
+        :type monkeypatch: pytest.MonkeyPatch
+        """
+
+        class MockProcess:
+            """
+            Mock asyncio process finishing after a delay.
+            """
+
+            running = 0
+            max_running = 0
+
+            def __init__(self, output, delay):
+                self.output = output
+                self.delay = delay
+                self.pid = 0
+                self.returncode = 0
+
+            async def communicate(self):
+                """
+                Mock communicate method.
+
+                :return: Standard output and standard error
+                :rtype: tuple
+                """
+                MockProcess.running += 1
+                MockProcess.max_running = max(MockProcess.max_running, MockProcess.running)
+                await asyncio.sleep(self.delay)
+                MockProcess.running -= 1
+                return self.output.encode("utf-8"), b""
+
+        delays = {"first": 0.03, "second": 0.01, "third": 0.02}
+
+        async def mock_create_subprocess_exec(*args, **kwargs):
+            """
+            Mock create_subprocess_exec method.
+
+            :return: Mock process echoing the name of the command
+            :rtype: MockProcess
+            """
+            name = args[-1].split()[-1]
+            return MockProcess(f"{name}\n", delays[name])
+
+        with monkeypatch.context() as monkey_patch:
+            monkey_patch.setattr("src.module_utils.sap_automation_qa.logging.getLogger", MockLogger)
+            monkey_patch.setattr(
+                "src.module_utils.sap_automation_qa.asyncio.create_subprocess_exec",
+                mock_create_subprocess_exec,
+            )
+            sap_qa = SapAutomationQA()
+
+            for max_concurrency in (3, 2, 1):
+                MockProcess.max_running = 0
+                results = sap_qa.execute_many(
+                    ["echo first", "echo second", "echo third"],
+                    shell_command=True,
+                    max_concurrency=max_concurrency,
+                )
+                assert [result.strip() for result in results] == ["first", "second", "third"]
+                assert MockProcess.max_running == max_concurrency
+
+        with monkeypatch.context() as monkey_patch:
+            monkey_patch.setattr("src.module_utils.sap_automation_qa.logging.getLogger", MockLogger)
+            sap_qa = SapAutomationQA()
+            results = sap_qa.execute_many([["echo", "Hello World"], ["false"]])
+            assert "Hello World" in results[0]
+            assert results[1].startswith("ERROR: Command failed with exit code 1")
+
+            results = sap_qa.execute_many(["sleep 5"], shell_command=True, timeout=0.2)
+            assert results == ["ERROR: Command timed out after 0.2 seconds"]
+            assert sap_qa.result["status"] == TestStatus.ERROR.value
+            assert sap_qa.execute_many([]) == []
+
     def test_parse_xml_output(self, monkeypatch):
         """
         Test the parse_xml_output method.
@@ -241,3 +328,56 @@ class TestSapAutomationQA:
             sap_qa = SapAutomationQA()
             result = sap_qa.get_result()
             assert isinstance(result, dict)
+
+    def test_read_ini_file(self, monkeypatch, tmp_path):
+        """
+        Test the read_ini_file method indexes every section and reuses unchanged files.
+
+        :param monkeypatch: Monkeypatch fixture for mocking.
+        :type monkeypatch: pytest.MonkeyPatch
+        :param tmp_path: Temporary directory fixture.
+        :type tmp_path: pathlib.Path
+        """
+        ini_file = tmp_path / "global.ini"
+        ini_file.write_text(
+            "# comment\n"
+            "[ha_dr_provider_chksrv]\n"
+            "execution_order = 2\n"
+            "; comment\n"
+            "action_on_lost = stop\n"
+            "provider = ChkSrv\n"
+            "\n"
+            "[trace]\n"
+            "ha_dr_chksrv = info\n"
+            "[ha_dr_provider_chksrv]\n"
+            "path = /usr/share/\\\n"
+            "  SAPHanaSR/srHook\n",
+            encoding="utf-8",
+        )
+        with monkeypatch.context() as monkey_patch:
+            monkey_patch.setattr("src.module_utils.sap_automation_qa.logging.getLogger", MockLogger)
+            sap_qa = SapAutomationQA()
+            index = sap_qa.read_ini_file(str(ini_file))
+            assert index == {
+                "ha_dr_provider_chksrv": {
+                    "execution_order": "2",
+                    "action_on_lost": "stop",
+                    "provider": "ChkSrv",
+                    "path": "/usr/share/SAPHanaSR/srHook",
+                },
+                "trace": {"ha_dr_chksrv": "info"},
+            }
+
+            opened = []
+            original_open = open
+            monkey_patch.setattr(
+                "builtins.open",
+                lambda *args, **kwargs: opened.append(args) or original_open(*args, **kwargs),
+            )
+            index["trace"]["ha_dr_chksrv"] = "debug"
+            assert sap_qa.read_ini_file(str(ini_file))["trace"] == {"ha_dr_chksrv": "info"}
+            assert not opened
+
+            ini_file.write_text("[trace]\nha_dr_chksrv = debug\n", encoding="utf-8")
+            assert sap_qa.read_ini_file(str(ini_file)) == {"trace": {"ha_dr_chksrv": "debug"}}
+            assert len(opened) == 1
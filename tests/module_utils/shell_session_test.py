@@ -0,0 +1,137 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the shell_session module.
+"""
+
+import pytest
+from src.module_utils.sap_automation_qa import SapAutomationQA
+from src.module_utils.shell_session import ShellSessionError, ShellSessionPool
+from src.module_utils.enums import TestStatus
+
+
+class MockParent(SapAutomationQA):
+    """
+    SapAutomationQA parent that keeps log messages in memory
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def log(self, level: int, message: str) -> None:
+        """
+        Mock log method
+        """
+        self.messages.append(message)
+
+
+@pytest.fixture
+def pool():
+    """
+    Session pool that starts plain /bin/sh shells instead of login shells.
+
+    :return: Session pool
+    :rtype: ShellSessionPool
+    """
+    session_pool = ShellSessionPool(MockParent(), login_command=("/bin/sh",), startup_timeout=5)
+    yield session_pool
+    session_pool.close()
+
+
+class TestShellSessionPool:
+    """
+    Test suite for ShellSessionPool
+    """
+
+    def test_execute_reuses_session(self, pool):
+        """
+        Test commands of the same user run in one session and keep their output intact
+        """
+        assert pool.execute("sidadm", "echo $$ > /dev/null; printf 'a\\nb'") == "a\nb"
+        session = pool.sessions["sidadm"]
+        assert pool.execute("sidadm", 'echo "it\'s"; echo "$HOME" > /dev/null') == "it's\n"
+        assert pool.sessions["sidadm"] is session
+        assert pool.execute("sidadm", "true") == ""
+        assert pool.execute("db2sid", "echo other") == "other\n"
+        assert len(pool.sessions) == 2
+
+    def test_execute_isolates_commands(self, pool):
+        """
+        Test commands cannot change the session state or read the protocol stream
+        """
+        assert pool.execute("sidadm", "cd /tmp && export SAPQA_TEST=1 && pwd") == "/tmp\n"
+        assert pool.execute("sidadm", "echo ${SAPQA_TEST:-unset}") == "unset\n"
+        assert pool.execute("sidadm", "cat") == ""
+        assert pool.execute("sidadm", "exit 0") == ""
+        assert pool.execute("sidadm", "echo alive") == "alive\n"
+
+    def test_execute_errors(self, pool):
+        """
+        Test failed commands and stderr follow the format of execute_command_subprocess
+        """
+        assert pool.execute("sidadm", "echo out; echo err >&2") == "out\n\nERROR: err\n"
+        result = pool.execute("sidadm", "echo failure >&2; exit 3")
+        assert result == "ERROR: Command failed with exit code 3: failure"
+        assert pool.parent.result["status"] == TestStatus.ERROR.value
+        assert pool.execute("sidadm", "echo ok") == "ok\n"
+
+    def test_execute_timeout(self, pool):
+        """
+        Test a timed out command discards its session and the next command gets a new one
+        """
+        pool.execute("sidadm", "true")
+        session = pool.sessions["sidadm"]
+        result = pool.execute("sidadm", "sleep 5", timeout=0.2)
+        assert result == "ERROR: Command timed out after 0.2 seconds"
+        assert "sidadm" not in pool.sessions
+        assert session.process is None
+        assert pool.execute("sidadm", "echo again") == "again\n"
+
+    def test_start_failure(self):
+        """
+        Test a session that exits during startup raises ShellSessionError
+        """
+        session_pool = ShellSessionPool(MockParent(), login_command=("/bin/false",))
+        with pytest.raises(ShellSessionError):
+            session_pool.execute("sidadm", "true")
+        assert not session_pool.sessions
+
+    def test_execute_in_login_shell(self, monkeypatch, tmp_path):
+        """
+        Test commands run in the login shell of the user given by $SHELL, as with su -c
+        """
+        login_shell = tmp_path / "login_shell"
+        login_shell.write_text('#!/bin/sh\nSAPQA_LOGIN_SHELL=yes exec /bin/sh "$@"\n')
+        login_shell.chmod(0o755)
+        monkeypatch.setenv("SHELL", str(login_shell))
+        session_pool = ShellSessionPool(MockParent(), login_command=("/bin/sh",))
+        try:
+            assert session_pool.execute("sidadm", "echo $SAPQA_LOGIN_SHELL") == "yes\n"
+        finally:
+            session_pool.close()
+
+    def test_execute_loads_profile_once(self, monkeypatch, tmp_path):
+        """
+        Test the profile of a csh login shell is sourced once per session, not per command
+        """
+        profile_count = tmp_path / "profile_count"
+        login_shell = tmp_path / "csh"
+        login_shell.write_text(
+            "#!/bin/sh\n"
+            'if [ "$1" = "-f" ]; then shift; else '
+            f"echo sourced >> {profile_count}; export SAPQA_PROFILE=loaded; fi\n"
+            'exec /bin/sh "$@"\n'
+        )
+        login_shell.chmod(0o755)
+        monkeypatch.setenv("SHELL", str(login_shell))
+        session_pool = ShellSessionPool(
+            MockParent(), login_command=(str(login_shell), "-c", "exec /bin/sh")
+        )
+        try:
+            for _ in range(3):
+                assert session_pool.execute("sidadm", "echo $SAPQA_PROFILE") == "loaded\n"
+        finally:
+            session_pool.close()
+        assert profile_count.read_text() == "sourced\n"
@@ -0,0 +1,241 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the storage_discovery module.
+"""
+
+import io
+import os
+import urllib.error
+from collections import namedtuple
+
+import pytest
+
+from src.module_utils import mount_probe, storage_discovery
+from src.module_utils.storage_discovery import LocalStorageDiscovery, GIB
+
+MOUNTINFO = (
+    "22 1 8:2 / / rw,relatime shared:1 - xfs /dev/sda2 rw,attr2,inode64,noquota\n"
+    "23 22 0:5 / /proc rw,nosuid shared:2 - proc proc rw\n"
+    "40 22 253:0 / /hana/data rw,relatime shared:20 - xfs /dev/mapper/vg_hana-data rw,attr2\n"
+    "41 22 253:0 / /hana/data\\040copy rw,relatime shared:21 - xfs /dev/mapper/vg_hana-data rw\n"
+    "50 22 0:50 / /hana/shared rw,relatime shared:30 - nfs4 10.0.0.4:/shared rw,vers=4.1\n"
+    "51 22 0:51 / /sapmnt rw,relatime shared:31 - nfs4 "
+    "afsacct.file.core.windows.net:/afsacct/sapmnt rw,vers=4.1\n"
+)
+
+StatVfs = namedtuple("StatVfs", ["f_blocks", "f_bfree", "f_bavail", "f_frsize"])
+
+
+class MockParent:
+    """
+    Mock SapAutomationQA parent for testing
+    """
+
+    def __init__(self, command_output: str = ""):
+        self.logs = []
+        self.command_output = command_output
+
+    def log(self, level: int, message: str) -> None:
+        """
+        Mock log method
+        """
+        self.logs.append(message)
+
+    def execute_command_subprocess(self, command, shell_command: bool = False) -> str:
+        """
+        Mock execute_command_subprocess method
+        """
+        return self.command_output
+
+
+@pytest.fixture
+def discovery(monkeypatch, tmp_path):
+    """
+    Discovery reading a fixed mountinfo file.
+
+    :return: Discovery instance
+    :rtype: LocalStorageDiscovery
+    """
+    mountinfo = tmp_path / "mountinfo"
+    mountinfo.write_text(MOUNTINFO)
+    monkeypatch.setattr(storage_discovery, "MOUNTINFO_PATH", str(mountinfo))
+    return LocalStorageDiscovery(MockParent())
+
+
+class TestLocalStorageDiscovery:
+    """
+    Test suite for LocalStorageDiscovery
+    """
+
+    def test_read_mounts(self, discovery):
+        """
+        Test mountinfo is decoded with superblock options appended to the mount options
+        """
+        mounts = discovery.read_mounts()
+        assert len(mounts) == 6
+        assert mounts[0] == {
+            "target": "/",
+            "source": "/dev/sda2",
+            "fstype": "xfs",
+            "options": "rw,relatime,attr2,inode64,noquota",
+            "device": "8:2",
+        }
+        assert mounts[3]["target"] == "/hana/data copy"
+        assert mounts[4]["options"] == "rw,relatime,vers=4.1"
+
+    def test_get_filesystems(self, discovery, monkeypatch):
+        """
+        Test usage is computed with statvfs, skipping pseudo and duplicate filesystems
+        """
+        stats = {
+            "/": StatVfs(30 * GIB // 4096, 20 * GIB // 4096, 19 * GIB // 4096, 4096),
+            "/proc": StatVfs(0, 0, 0, 4096),
+            "/hana/data": StatVfs(512 * GIB // 4096, 256 * GIB // 4096, 256 * GIB // 4096, 4096),
+            "/hana/data copy": StatVfs(512 * GIB // 4096, 256 * GIB // 4096, 0, 4096),
+            "/hana/shared": StatVfs(1024, 1024, 1024, 4096),
+        }
+
+        def mock_statvfs(path):
+            if path not in stats:
+                raise OSError("Stale file handle")
+            return stats[path]
+
+        monkeypatch.setattr(storage_discovery.os, "statvfs", mock_statvfs)
+        monkeypatch.setattr(
+            mount_probe,
+            "STAT_FILESYSTEM",
+            [
+                "sh",
+                "-c",
+                'test "$1" = /hana/shared || { echo Stale file handle >&2; exit 1; }; '
+                + "echo 1024 1024 1024 4096",
+                "sh",
+            ],
+        )
+        filesystems = discovery.get_filesystems()
+        assert [
+            (fs["source"], fs["size"], fs["used"], fs["free"], fs["used_percent"], fs["target"])
+            for fs in filesystems
+        ] == [
+            ("/dev/sda2", "30G", "10G", "19G", "35%", "/"),
+            ("/dev/mapper/vg_hana-data", "512G", "256G", "256G", "50%", "/hana/data"),
+            ("10.0.0.4:/shared", "1G", "0G", "1G", "0%", "/hana/shared"),
+        ]
+        assert filesystems[0]["fstype"] == "xfs"
+        assert filesystems[0]["size_bytes"] == 30 * GIB
+        assert filesystems[0]["used_bytes"] == 10 * GIB
+        assert filesystems[0]["free_bytes"] == 19 * GIB
+        assert filesystems[2]["options"] == "rw,relatime,vers=4.1"
+        assert not any(filesystem["stale"] for filesystem in filesystems)
+        assert any("Stale file handle" in message for message in discovery.parent.logs)
+
+    def test_get_filesystems_stale_nfs_mount(self, discovery, monkeypatch):
+        """
+        Test a hung NFS mount is killed and marked stale without blocking the others
+        """
+        monkeypatch.setattr(
+            storage_discovery.os, "statvfs", lambda path: StatVfs(1024, 512, 512, 4096)
+        )
+        monkeypatch.setattr(
+            mount_probe,
+            "STAT_FILESYSTEM",
+            [
+                "sh",
+                "-c",
+                'test "$1" = /hana/shared && exec sleep 30; echo 1024 512 512 4096',
+                "sh",
+            ],
+        )
+        filesystems = {fs["target"]: fs for fs in discovery.get_filesystems(timeout=0.5)}
+        assert filesystems["/hana/shared"]["stale"] is True
+        assert filesystems["/hana/shared"]["size"] == ""
+        assert filesystems["/hana/shared"]["size_bytes"] is None
+        assert filesystems["/sapmnt"]["stale"] is False
+        assert filesystems["/sapmnt"]["size_bytes"] == 1024 * 4096
+        assert filesystems["/"]["used_bytes"] == 512 * 4096
+        assert any("no answer within 0.5s" in message for message in discovery.parent.logs)
+
+    def test_discover(self, discovery, monkeypatch):
+        """
+        Test the topology carries the mounted filesystems, read from one mountinfo pass
+        """
+        mock_filesystems = [{"target": "/hana/data"}]
+        read_mounts = []
+        monkeypatch.setattr(
+            discovery, "read_mounts", lambda: read_mounts.append(True) or [{"target": "/"}]
+        )
+        monkeypatch.setattr(
+            discovery,
+            "get_filesystems",
+            lambda mounts: mock_filesystems if mounts == [{"target": "/"}] else [],
+        )
+        monkeypatch.setattr(discovery, "get_lvm_fullreport", lambda: {})
+        monkeypatch.setattr(discovery, "get_device_lun_map", lambda: {})
+        monkeypatch.setattr(discovery, "get_imds_data_disks", lambda: [])
+        monkeypatch.setattr(
+            discovery, "classify_nfs_mounts", lambda mounts: {"has_nfs_mounts": False}
+        )
+        topology = discovery.discover()
+        assert topology["mounted_filesystems"] == mock_filesystems
+        assert not topology["has_nfs_mounts"]
+        assert len(read_mounts) == 1
+
+    def test_get_device_lun_map(self, discovery, monkeypatch, tmp_path):
+        """
+        Test device names are mapped to the LUN of their Azure symlink
+        """
+        (tmp_path / "sdc").write_text("")
+        os.symlink(tmp_path / "sdc", tmp_path / "lun0")
+        monkeypatch.setattr(storage_discovery, "AZURE_LUN_LINKS", str(tmp_path / "lun*"))
+        assert discovery.get_device_lun_map() == {"sdc": "0"}
+
+    def test_get_lvm_fullreport(self):
+        """
+        Test the LVM report is decoded even when LVM warnings follow it
+        """
+        parent = MockParent('{"report": [{"vg": []}]}\nERROR: WARNING: lvmetad is not running')
+        assert LocalStorageDiscovery(parent).get_lvm_fullreport() == {"report": [{"vg": []}]}
+        parent.command_output = "ERROR: Command failed with exit code 127"
+        assert LocalStorageDiscovery(parent).get_lvm_fullreport() == {}
+
+    def test_classify_nfs_mounts(self, discovery, monkeypatch):
+        """
+        Test NFS servers are classified as ANF or AFS
+        """
+
+        class MockOpener:
+            def open(self, url, timeout=None):
+                if "10.0.0.4" in url:
+                    raise urllib.error.URLError("Connection refused")
+                raise AssertionError(url)
+
+        monkeypatch.setattr(
+            storage_discovery.urllib.request, "build_opener", lambda *args: MockOpener()
+        )
+        assert discovery.classify_nfs_mounts(discovery.read_mounts()) == {
+            "has_nfs_mounts": True,
+            "anf_ip_addresses": ["10.0.0.4"],
+            "afs_storage_accounts": ["afsacct"],
+        }
+
+    def test_probe_afs_account(self, discovery, monkeypatch):
+        """
+        Test the storage account of an Azure Files endpoint is read from its HTTP answer
+        """
+
+        class MockOpener:
+            def open(self, url, timeout=None):
+                raise urllib.error.HTTPError(
+                    url,
+                    400,
+                    "Bad Request",
+                    {},
+                    io.BytesIO(b"<Error>afsacct2.file.core.windows.net</Error>"),
+                )
+
+        monkeypatch.setattr(
+            storage_discovery.urllib.request, "build_opener", lambda *args: MockOpener()
+        )
+        assert discovery._probe_afs_account("10.0.0.5") == "afsacct2"
@@ -0,0 +1,140 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the storage_topology module.
+"""
+
+import json
+
+import pytest
+
+from src.module_utils.collector import AzureDataParser
+from src.module_utils.storage_topology import StorageTopology
+
+
+class MockCheck:
+    """
+    Mock Check object for testing
+    """
+
+    def __init__(self, collector_args):
+        self.collector_args = collector_args
+
+
+class MockParent:
+    """
+    Mock SapAutomationQA parent for testing
+    """
+
+    def __init__(self):
+        self.logs = []
+        self.errors = []
+
+    def log(self, level: int, message: str) -> None:
+        """
+        Mock log method
+        """
+        self.logs.append(message)
+
+    def handle_error(self, error: Exception) -> None:
+        """
+        Mock handle_error method
+        """
+        self.errors.append(error)
+
+
+@pytest.fixture
+def topology():
+    """
+    Topology of a host with LVM, direct disk, ANF and AFS storage.
+
+    :return: Storage topology
+    :rtype: StorageTopology
+    """
+    topology = StorageTopology.from_context(
+        {
+            "azure_disks_metadata": [
+                json.dumps({"name": "vm-data-0", "iops": 3000, "mbps": 125}),
+                {"name": "vm-data-1", "iops": 5000, "mbps": 200},
+                {"name": "vm-log-sdd", "iops": 500, "mbps": 60},
+            ],
+            "anf_storage_metadata": json.dumps(
+                [{"ip": "10.0.0.4", "throughputMibps": 64}, {"ip": "10.0.0.4"}]
+            ),
+            "afs_storage_metadata": [
+                {"Pool": "sap", "NFSAddress": "sap.file.core.windows.net:/sap/trans"},
+                {"Pool": "sapmnt", "NFSAddress": "10.0.1.5:/sapmnt/share", "IOPS": 4024},
+            ],
+            "imds_disks_metadata": [{"lun": 0, "name": "vm-data-0"}],
+        },
+        MockParent().log,
+        lvm_volumes={"datalv": {"dm_path": "/dev/mapper/datavg-datalv", "vg_name": "datavg"}},
+        vg_to_disk_names={"datavg": ["vm-data-0", "vm-data-1"]},
+    )
+    topology.index_filesystems(
+        [
+            {"target": "/hana/data/HDB", "source": "/dev/mapper/datavg-datalv"},
+            {"target": "/hana/data", "source": "/dev/sdd"},
+        ]
+    )
+    return topology
+
+
+class TestStorageTopology:
+    """
+    Test suite for StorageTopology
+    """
+
+    def test_lookups(self, topology):
+        """
+        Test each index answers with the first matching entry
+        """
+        assert topology.get_logical_volume("/dev/mapper/datavg-datalv")["vg_name"] == "datavg"
+        assert topology.get_vg_disk_names("datavg") == ["vm-data-0", "vm-data-1"]
+        assert topology.get_vg_disk_names("missing") == []
+        assert topology.get_disk("vm-data-0")["iops"] == 3000
+        assert topology.get_imds_disk("0")["name"] == "vm-data-0"
+        assert topology.get_anf_volume("10.0.0.4") == {"ip": "10.0.0.4", "throughputMibps": 64}
+        assert topology.get_anf_volume("10.0.0.5") is None
+
+    def test_get_filesystem(self, topology):
+        """
+        Test the earliest mounted of several candidate mount points is returned
+        """
+        assert topology.get_filesystem("/hana/data", "/hana/data/HDB")["source"] == (
+            "/dev/mapper/datavg-datalv"
+        )
+        assert topology.get_filesystem("/hana/data")["source"] == "/dev/sdd"
+        assert topology.get_filesystem("/hana/log") is None
+
+    def test_find_disk_by_device(self, topology):
+        """
+        Test disks are found by device name suffix or substring
+        """
+        assert topology.find_disk_by_device("sdd")["name"] == "vm-log-sdd"
+        assert topology.find_disk_by_device("data-1", suffix=False)["name"] == "vm-data-1"
+        assert topology.find_disk_by_device("sde") is None
+        assert ("sdd", True) in topology._disk_by_device
+
+    def test_find_afs_share(self, topology):
+        """
+        Test AFS shares match by server address or by storage account component
+        """
+        assert topology.find_afs_share("10.0.1.5:/sapmnt/share")["IOPS"] == 4024
+        assert topology.find_afs_share("10.0.2.9:/sapmnt/share")["IOPS"] == 4024
+        assert topology.find_afs_share("sap.file.core.windows.net:/sap/trans")["Pool"] == "sap"
+        assert topology.find_afs_share("10.0.2.9:/other/share") is None
+
+    def test_azure_data_parser_uses_run_topology(self, topology):
+        """
+        Test the parser answers from the topology of the run instead of the context
+        """
+        parent = MockParent()
+        parent.storage_topology = topology
+        parser = AzureDataParser(parent)
+        check = MockCheck({"mount_point": "/hana/data", "property": "iops"})
+        topology.filesystems[0]["azure_disk_names"] = ["vm-data-0", "vm-data-1"]
+        assert parser.parse_disks_vars(check, {"database_sid": "hdb"}) == "8000"
+        check = MockCheck({"mount_point": "/hana/data", "property": "mbps"})
+        assert parser.parse_disks_vars(check, {}) == "60"
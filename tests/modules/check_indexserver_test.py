@@ -104,6 +104,37 @@ class TestIndexServerCheck:
             result = checker.get_result()
             assert result["status"] == TestStatus.SUCCESS.value
 
+    def test_indexserver_properties_in_any_order(self, monkeypatch):
+        """
+        Simulate a global.ini file with comments and the provider after other properties.
+
+        :param monkeypatch: Monkeypatch fixture for modifying built-in functions.
+        :type monkeypatch: pytest.MonkeyPatch
+        """
+        file_lines = [
+            "[ha_dr_provider_suschksrv]",
+            "# Added for the indexserver check",
+            "execution_order = 3",
+            "action_on_lost = stop",
+            "",
+            "path = /usr/share/SAPHanaSR-angi",
+            "provider = susChkSrv",
+            "[trace]",
+            "ha_dr_suschksrv = info",
+        ]
+        with monkeypatch.context() as monkey_patch:
+            monkey_patch.setattr("builtins.open", fake_open_factory(file_lines))
+            checker = IndexServerCheck(
+                database_sid="TEST", os_distribution=OperatingSystemFamily.SUSE
+            )
+            checker.check_indexserver()
+            result = checker.get_result()
+
+            assert result["status"] == TestStatus.SUCCESS.value
+            assert result["indexserver_enabled"] == "yes"
+            assert result["details"]["provider"] == "susChkSrv"
+            assert result["details"]["action_on_lost"] == "stop"
+
     def test_unsupported_os(self):
         """
         Test unsupported OS distribution.
@@ -633,6 +633,40 @@ checks:
             assert len(results) == 1
             assert results[0].status == TestStatus.INFO.value
 
+    def test_execute_checks_time_budget_exhausted(self, config_module):
+        """Test checks that start after the run time budget is spent are not executed"""
+        config_module.set_context({"hostname": "testhost"})
+        yaml_content = """
+checks:
+  - id: check_001
+    name: Check 1
+    collector_args:
+      command: "echo test"
+    validator_args:
+      expected: "test"
+  - id: check_002
+    name: Check 2
+    collector_args:
+      command: "echo test"
+    validator_args:
+      expected: "test"
+"""
+        config_module.load_checks(yaml_content)
+
+        def mock_collect(check, context):
+            config_module._deadline = 0
+            return "test"
+
+        with patch(
+            "src.module_utils.collector.CommandCollector.collect", side_effect=mock_collect
+        ) as mock_collector:
+            results = config_module.execute_checks(time_budget=30)
+            assert mock_collector.call_count == 1
+            assert results[0].status == TestStatus.SUCCESS.value
+            assert results[1].status == TestStatus.WARNING.value
+            assert "budget of 30 seconds exhausted" in results[1].details
+            assert config_module.result["shed_checks"] == ["check_002"]
+
     def test_execute_checks_with_tag_filter(self, config_module):
         """Test check execution with tag filtering"""
         config_module.set_context({"hostname": "testhost"})
@@ -684,6 +718,40 @@ checks:
         results = config_module.execute_checks(filter_tags=["nonexistent"])
         assert len(results) == 0
 
+    def test_execute_checks_with_command_concurrency(self, config_module):
+        """Test command outputs are collected in one concurrent batch"""
+        config_module.set_context({"hostname": "testhost"})
+        config_module.command_concurrency = 4
+        yaml_content = """
+checks:
+  - id: check_001
+    name: Check 1
+    collector_args:
+      command: "echo first"
+    validator_args:
+      expected: "first"
+  - id: check_002
+    name: Check 2
+    collector_args:
+      command: "echo second"
+    validator_args:
+      expected: "second"
+"""
+        config_module.load_checks(yaml_content)
+
+        with patch(
+            "src.module_utils.sap_automation_qa.SapAutomationQA.execute_many",
+            return_value=["first\n", "second\n"],
+        ) as mock_execute_many, patch(
+            "src.module_utils.collector.CommandCollector.collect"
+        ) as mock_collect:
+            results = config_module.execute_checks()
+            mock_execute_many.assert_called_once()
+            mock_collect.assert_not_called()
+            assert [result.actual_value for result in results] == ["first", "second"]
+            assert all(result.status == TestStatus.SUCCESS.value for result in results)
+            assert not config_module._prefetched_data
+
 
 class TestGetResultsSummary:
     """Test suite for get_results_summary method"""
@@ -823,6 +891,50 @@ checks:
         assert "failed" in mock_ansible_module.fail_calls[0]["msg"]
 
 
+class TestLoadStorageContext:
+    """Test suite for load_storage_context method"""
+
+    def test_load_storage_context(self, config_module, tmp_path):
+        """Test storage context is loaded from the workspace cache file"""
+        cache_file = tmp_path / "hana_storage_context.json"
+        cache_file.write_text(
+            json.dumps({"mount_info": "/hana/data /dev/sdc xfs rw", "lvm_fullreport": {}})
+        )
+        storage_context = config_module.load_storage_context(str(cache_file))
+        assert storage_context["mount_info"] == "/hana/data /dev/sdc xfs rw"
+        assert storage_context["lvm_fullreport"] == {}
+
+    def test_load_storage_context_invalid(self, config_module, tmp_path):
+        """Test missing or malformed cache files yield an empty context"""
+        assert config_module.load_storage_context(str(tmp_path / "missing.json")) == {}
+        cache_file = tmp_path / "invalid.json"
+        cache_file.write_text("not json")
+        assert config_module.load_storage_context(str(cache_file)) == {}
+        cache_file.write_text("[]")
+        assert config_module.load_storage_context(str(cache_file)) == {}
+
+    def test_run_with_storage_context_file(self, mock_ansible_module, tmp_path):
+        """Test run passes the cached storage context to the filesystem collector"""
+        cache_file = tmp_path / "hana_storage_context.json"
+        cache_file.write_text(json.dumps({"df_info": "Filesystem 1G-blocks"}))
+        mock_ansible_module.params.update(
+            {
+                "check_file_content": "checks: []",
+                "context": {"hostname": "testhost", "check_type": {"file_name": "hana"}},
+                "storage_context_file": str(cache_file),
+            }
+        )
+        module = ConfigurationCheckModule(mock_ansible_module)
+
+        with patch(
+            "src.modules.configuration_check_module.FileSystemCollector.collect",
+            return_value={"filesystems": []},
+        ) as mock_collect:
+            module.run()
+            assert mock_collect.call_args.kwargs["context"]["df_info"] == "Filesystem 1G-blocks"
+        assert module.context["filesystems"] == []
+
+
 class TestCreateValidationResult:
     """Test suite for _create_validation_result method"""
 
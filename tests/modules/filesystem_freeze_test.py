@@ -94,6 +94,41 @@ class TestFileSystemFreeze:
             assert result["message"] == "The filesystem mounted on /hana/shared was not found."
             assert result["changed"] is False
 
+    def test_file_system_not_responding(self, monkeypatch, filesystem_freeze):
+        """
+        Test the run method when the filesystem does not answer the probe.
+
+        :param monkeypatch: Monkeypatch fixture for modifying built-in functions.
+        :type monkeypatch: pytest.MonkeyPatch
+        :param filesystem_freeze: FileSystemFreeze instance.
+        :type filesystem_freeze: FileSystemFreeze
+        """
+
+        def mock_probe(self, targets, isolated=()):
+            assert not targets
+            assert isolated == ["/hana/shared"]
+            self.stale_mounts = list(isolated)
+            return {}
+
+        with monkeypatch.context() as monkey_patch:
+            monkey_patch.setattr(
+                "builtins.open",
+                fake_open_factory(["10.0.0.4:/shared /hana/shared nfs4 rw,relatime 0 0"]),
+            )
+            monkey_patch.setattr("src.modules.filesystem_freeze.MountProbe.probe", mock_probe)
+            monkey_patch.setattr(
+                filesystem_freeze,
+                "execute_command_subprocess",
+                lambda x: pytest.fail("The filesystem must not be frozen"),
+            )
+            filesystem_freeze.run()
+            result = filesystem_freeze.get_result()
+
+            assert result["status"] == "FAILED"
+            assert result["message"] == "The filesystem mounted on /hana/shared is not responding."
+            assert result["stale_mounts"] == ["/hana/shared"]
+            assert result["changed"] is False
+
     def test_main_method_anf_provider(self, monkeypatch):
         """
         Test the main method when NFS provider is ANF
@@ -2,6 +2,8 @@
 Unit tests for the get_azure_lb module.
 """
 
+import json
+
 import pytest
 from src.modules.get_azure_lb import AzureLoadBalancer, main
 
@@ -107,6 +109,119 @@ class TestAzureLoadBalancer:
         azure_lb._create_network_client()
         assert len(azure_lb.get_load_balancers()) == 1
 
+    def test_get_load_balancers_scoped_and_stops_early(self, azure_lb, mocker):
+        """
+        Test the resource group is listed and pages stop once all frontend IPs are found.
+
+        :param azure_lb: AzureLoadBalancer instance
+        :type azure_lb: AzureLoadBalancer
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        """
+
+        def pages():
+            yield LoadBalancer("other", "127.0.0.1")
+            yield LoadBalancer("test", "127.0.0.1")
+            raise AssertionError("Listing should have stopped")
+
+        azure_lb.module_params["resource_group"] = "rg"
+        azure_lb.network_client = mocker.MagicMock()
+        azure_lb.network_client.load_balancers.list.return_value = pages()
+        load_balancers = azure_lb.get_load_balancers(["127.0.0.1"])
+        assert len(load_balancers) == 1
+        azure_lb.network_client.load_balancers.list.assert_called_once_with("rg")
+        azure_lb.network_client.load_balancers.list_all.assert_not_called()
+
+    def test_get_load_balancers_falls_back_to_subscription(self, azure_lb, mocker):
+        """
+        Test frontend IPs missing from the resource group are searched in the subscription.
+
+        :param azure_lb: AzureLoadBalancer instance
+        :type azure_lb: AzureLoadBalancer
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        """
+        azure_lb.module_params["resource_group"] = "rg"
+        azure_lb.network_client = mocker.MagicMock()
+        azure_lb.network_client.load_balancers.list.return_value = [
+            LoadBalancer("test", "127.0.0.1")
+        ]
+        azure_lb.network_client.load_balancers.list_all.return_value = [
+            LoadBalancer("test", "127.0.0.2")
+        ]
+        load_balancers = azure_lb.get_load_balancers(["127.0.0.1", "127.0.0.2"])
+        assert len(load_balancers) == 2
+        assert set(azure_lb.frontend_ip_index) == {"127.0.0.1", "127.0.0.2"}
+        azure_lb.network_client.load_balancers.list_all.assert_called_once_with()
+
+    def test_get_load_balancers_details_multiple_frontends(self, azure_lb, mocker):
+        """
+        Test the load balancers of all frontend IPs are validated and only they are converted.
+
+        :param azure_lb: AzureLoadBalancer instance
+        :type azure_lb: AzureLoadBalancer
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        """
+        frontend = mocker.MagicMock(private_ip_address="127.0.0.2")
+        scs_lb = LoadBalancer("test", "127.0.0.1")
+        scs_lb.frontend_ip_configurations = [frontend]
+        scs_lb.name = "scs"
+        unrelated_lb = mocker.MagicMock(location="test", frontend_ip_configurations=[])
+        patched_client = mocker.patch("src.modules.get_azure_lb.NetworkManagementClient")
+        patched_client.return_value.load_balancers.list_all.return_value = [
+            LoadBalancer("test", "127.0.0.1"),
+            unrelated_lb,
+            scs_lb,
+        ]
+        azure_lb.module_params["inbound_rules"] = repr(
+            [{"privateIpAddress": "127.0.0.1"}, {"privateIpAddress": "127.0.0.2"}]
+        )
+        azure_lb.get_load_balancers_details()
+        assert azure_lb.result["status"] == "PASSED"
+        assert set(azure_lb.frontend_ip_index) == {"127.0.0.1", "127.0.0.2"}
+        assert len(azure_lb.result["details"]["parameters"]) == 8
+        assert "scs" in azure_lb.result["message"]
+        unrelated_lb.as_dict.assert_not_called()
+
+    def test_record_and_replay_snapshot(self, azure_lb, mocker, tmp_path):
+        """
+        Test the matched load balancers are recorded and validated offline from the snapshot.
+
+        :param azure_lb: AzureLoadBalancer instance
+        :type azure_lb: AzureLoadBalancer
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        :param tmp_path: Temporary directory
+        :type tmp_path: pathlib.Path
+        """
+        snapshot_file = tmp_path / "offline_validation" / "host1" / "loadbalancer.json"
+        azure_lb.module_params["snapshot_file"] = str(snapshot_file)
+        azure_lb.get_load_balancers_details()
+        assert azure_lb.result["status"] == "PASSED"
+        snapshot = json.loads(snapshot_file.read_text(encoding="utf-8"))
+        assert [lb["location"] for lb in snapshot["load_balancers"]] == ["test"]
+        assert snapshot["inbound_rules"][0]["privateIpAddress"] == "127.0.0.1"
+
+        patched_client = mocker.patch("src.modules.get_azure_lb.NetworkManagementClient")
+        offline_lb = AzureLoadBalancer(
+            module_params={
+                "constants": azure_lb.module_params["constants"],
+                "loadbalancer_snapshot": snapshot_file.read_text(encoding="utf-8"),
+            }
+        )
+        offline_lb.get_load_balancers_details()
+        patched_client.assert_not_called()
+        assert offline_lb.result["status"] == "PASSED"
+        assert offline_lb.result["details"] == azure_lb.result["details"]
+
+        broken_lb = AzureLoadBalancer(
+            module_params={"constants": {}, "loadbalancer_snapshot": "not json"}
+        )
+        broken_lb.get_load_balancers_details()
+        assert broken_lb.result["status"] == "FAILED"
+        assert "Failed to load the load balancer snapshot" in broken_lb.result["message"]
+
     def test_get_load_balancers_details(self, azure_lb):
         """
         Test the get_load_balancers_details method.
@@ -0,0 +1,413 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the get_azure_storage_metadata module.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+from src.module_utils.azure_rest_client import AzureRestClient
+from src.modules.get_azure_storage_metadata import AzureStorageMetadata, main
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+SUBSCRIPTION = "https://management.azure.com/subscriptions/sub"
+ACCOUNT = f"{SUBSCRIPTION}/resourceGroups/anf-rg/providers/Microsoft.NetApp/netAppAccounts/anf"
+STORAGE_ID = "/subscriptions/sub/resourceGroups/afs-rg/providers/Microsoft.Storage/storageAccounts"
+RESOURCE_GRAPH = "https://management.azure.com/providers/Microsoft.ResourceGraph/resources"
+
+RESPONSES = {
+    f"{SUBSCRIPTION}/resourceGroups/rg/providers/Microsoft.Compute/disks": {
+        "value": [
+            {
+                "name": "data0",
+                "sku": {"name": "PremiumV2_LRS"},
+                "properties": {
+                    "diskSizeGB": 512,
+                    "diskIOPSReadWrite": 3000,
+                    "diskMBpsReadWrite": 125,
+                    "encryption": {"type": "EncryptionAtRestWithPlatformKey"},
+                },
+            }
+        ],
+        "nextLink": f"{SUBSCRIPTION}/disks?page=2",
+    },
+    f"{SUBSCRIPTION}/disks?page=2": {
+        "value": [{"name": "data1", "properties": {}}, {"name": "osdisk", "properties": {}}]
+    },
+    f"{ACCOUNT}/capacityPools": {
+        "value": [{"name": "anf/pool1", "properties": {"qosType": "Manual"}}]
+    },
+    f"{ACCOUNT}/capacityPools/pool1/volumes": {
+        "value": [
+            {
+                "name": "anf/pool1/hanadata",
+                "id": "volume-id",
+                "properties": {
+                    "throughputMibps": 400,
+                    "serviceLevel": "Ultra",
+                    "protocolTypes": ["NFSv4.1"],
+                    "creationToken": "hanadata",
+                    "mountTargets": [{"ipAddress": "10.0.0.4"}],
+                },
+            }
+        ]
+    },
+    f"{SUBSCRIPTION}/providers/Microsoft.Storage/storageAccounts": {
+        "value": [
+            {"name": "afsacct", "id": f"{STORAGE_ID}/afsacct"},
+            {"name": "other", "id": f"{STORAGE_ID}/other"},
+        ]
+    },
+    f"https://management.azure.com{STORAGE_ID}/afsacct/fileServices/default/shares": {
+        "value": [
+            {
+                "name": "sapmnt",
+                "properties": {
+                    "enabledProtocols": "NFS",
+                    "accessTier": "Premium",
+                    "shareQuota": 1024,
+                },
+            },
+            {"name": "smb", "properties": {"enabledProtocols": "SMB"}},
+        ]
+    },
+}
+
+
+def resource_graph_pages():
+    """
+    Resource Graph pages with the resources served by the list calls of RESPONSES.
+
+    :return: Pages by skip token
+    :rtype: dict
+    """
+    disks = [
+        dict(disk, type="microsoft.compute/disks")
+        for page in (
+            RESPONSES[f"{SUBSCRIPTION}/resourceGroups/rg/providers/Microsoft.Compute/disks"],
+            RESPONSES[f"{SUBSCRIPTION}/disks?page=2"],
+        )
+        for disk in page["value"]
+    ]
+    pools = [
+        dict(pool, type="microsoft.netapp/netappaccounts/capacitypools")
+        for pool in RESPONSES[f"{ACCOUNT}/capacityPools"]["value"]
+    ]
+    volumes = [
+        dict(volume, type="Microsoft.NetApp/netAppAccounts/capacityPools/volumes")
+        for volume in RESPONSES[f"{ACCOUNT}/capacityPools/pool1/volumes"]["value"]
+        + [{"name": "anf/pool2/other", "properties": {}}]
+    ]
+    accounts = [
+        dict(
+            RESPONSES[f"{SUBSCRIPTION}/providers/Microsoft.Storage/storageAccounts"]["value"][0],
+            type="microsoft.storage/storageaccounts",
+        )
+    ]
+    return {
+        None: {"data": disks + pools, "$skipToken": "page2"},
+        "page2": {"data": volumes + accounts},
+    }
+
+
+class MockResponse:
+    """
+    Mock requests response
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        """
+        Mock raise_for_status method
+        """
+
+    def json(self):
+        """
+        Mock json method
+        """
+        return self.body
+
+
+class MockSession:
+    """
+    Mock requests session serving the responses of a stub Resource Manager
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.queries = []
+
+    def request(self, method, url, headers=None, timeout=None, params=None, json=None):
+        """
+        Mock request method
+        """
+        self.requests.append((url, headers["Authorization"]))
+        if url == RESOURCE_GRAPH:
+            self.queries.append(json)
+            return MockResponse(resource_graph_pages()[json["options"].get("$skipToken")])
+        if url not in RESPONSES:
+            raise ValueError(f"Unexpected request {url}")
+        return MockResponse(RESPONSES[url])
+
+
+class MockCredential:
+    """
+    Mock Azure credential counting the tokens it issues
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_token(self, scope):
+        """
+        Mock get_token method
+        """
+        self.calls += 1
+        return AccessToken(f"token-{self.calls}", time.time() + 3600)
+
+
+@pytest.fixture
+def module_params():
+    """
+    Module parameters for a VM with disks, an ANF account and an AFS share.
+
+    :return: Module parameters
+    :rtype: dict
+    """
+    return {
+        "subscription_id": "sub",
+        "resource_group_name": "rg",
+        "disk_names": ["data0", "data1"],
+        "anf_account_resource_group": "anf-rg",
+        "anf_account_name": "anf",
+        "afs_storage_accounts": ["afsacct"],
+        "msi_client_id": None,
+        "use_resource_graph": False,
+        "cache_file": None,
+        "cache_ttl": 300,
+    }
+
+
+class TestAzureStorageMetadata:
+    """
+    Test suite for AzureStorageMetadata
+    """
+
+    def test_collect(self, module_params):
+        """
+        Test all storage metadata is collected with paged list calls and one token
+        """
+        credential, session = MockCredential(), MockSession()
+        collector = AzureStorageMetadata(
+            module_params, client=AzureRestClient(credential, session=session)
+        )
+        result = collector.collect()
+
+        assert result["status"] == "PASSED"
+        assert result["azure_disks_metadata"] == [
+            {
+                "name": "data0",
+                "sku": "PremiumV2_LRS",
+                "size": 512,
+                "encryption": "EncryptionAtRestWithPlatformKey",
+                "iops": 3000,
+                "mbps": 125,
+                "tier": None,
+            },
+            {
+                "name": "data1",
+                "sku": None,
+                "size": None,
+                "encryption": None,
+                "iops": None,
+                "mbps": None,
+                "tier": None,
+            },
+        ]
+        assert result["anf_storage_metadata"][0]["ip"] == "10.0.0.4"
+        assert result["anf_storage_metadata"][0]["qosType"] == "Manual"
+        assert result["anf_storage_metadata"][0]["throughputMibps"] == 400
+        assert result["afs_storage_metadata"] == [
+            {
+                "Type": "AFS",
+                "Name": "sapmnt",
+                "Pool": "afsacct",
+                "ServiceLevel": "Premium",
+                "Quota": "1024",
+                "ThroughputMibps": 203,
+                "ProtocolTypes": "NFS4.1",
+                "NFSAddressDNS": "afsacct.privatelink.file.core.windows.net:/afsacct/sapmnt",
+                "NFSAddress": "afsacct.privatelink.file.core.windows.net:/afsacct/sapmnt",
+                "QoSType": "Manual",
+                "IOPS": 4024,
+                "Id": f"{STORAGE_ID}/afsacct",
+            }
+        ]
+        assert len(session.requests) == 6
+        assert credential.calls == 1
+        assert {header for _, header in session.requests} == {"Bearer token-1"}
+
+    def test_collect_resource_graph(self, module_params):
+        """
+        Test disks, pools, volumes and accounts come from one paged Resource Graph query
+        """
+        expected = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=MockSession())
+        ).collect()
+        module_params["use_resource_graph"] = True
+        session = MockSession()
+        result = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=session)
+        ).collect()
+
+        assert result["status"] == "PASSED"
+        for key in ("azure_disks_metadata", "anf_storage_metadata", "afs_storage_metadata"):
+            assert result[key] == expected[key]
+        assert [url for url, _ in session.requests] == [
+            RESOURCE_GRAPH,
+            RESOURCE_GRAPH,
+            f"https://management.azure.com{STORAGE_ID}/afsacct/fileServices/default/shares",
+        ]
+        assert session.queries[0]["subscriptions"] == ["sub"]
+        assert "name startswith 'anf/'" in session.queries[0]["query"]
+        assert "name in~ ('afsacct')" in session.queries[0]["query"]
+        assert session.queries[1]["options"]["$skipToken"] == "page2"
+
+    def test_collect_cache(self, module_params, tmp_path):
+        """
+        Test collected metadata is reused from the cache file until the TTL expires
+        """
+        module_params["cache_file"] = str(tmp_path / "cache" / "azure_storage_metadata.json")
+        first = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=MockSession())
+        ).collect()
+        assert first["cached"] is False
+
+        session = MockSession()
+        second = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=session)
+        ).collect()
+        assert second["cached"] is True
+        assert second["status"] == "PASSED"
+        assert second["afs_storage_metadata"] == first["afs_storage_metadata"]
+        assert session.requests == []
+
+        module_params["disk_names"] = ["data0"]
+        third = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=session)
+        ).collect()
+        assert third["cached"] is False
+        assert len(third["azure_disks_metadata"]) == 1
+
+        module_params["cache_ttl"] = 0
+        session = MockSession()
+        AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=session)
+        ).collect()
+        assert len(session.requests) == 6
+
+    def test_save_cached_metadata_concurrent_hosts(self, module_params, monkeypatch, tmp_path):
+        """
+        Test hosts saving to the same cache file at the same time keep each other's entries
+        """
+        module_params["cache_file"] = str(tmp_path / "azure_storage_metadata.json")
+        read_cache = AzureStorageMetadata._read_cache
+
+        def slow_read_cache(self):
+            cache = read_cache(self)
+            time.sleep(0.05)
+            return cache
+
+        monkeypatch.setattr(AzureStorageMetadata, "_read_cache", slow_read_cache)
+        collectors = [
+            AzureStorageMetadata(dict(module_params, disk_names=[f"data{index}"]))
+            for index in range(4)
+        ]
+        threads = [
+            threading.Thread(target=collector.save_cached_metadata, args=({"index": index},))
+            for index, collector in enumerate(collectors)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index, collector in enumerate(collectors):
+            assert collector.load_cached_metadata() == {"index": index}
+
+    def test_collect_partial_failure(self, module_params):
+        """
+        Test a failing storage type is reported without dropping the others
+        """
+        module_params["anf_account_name"] = "missing"
+        collector = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=MockSession())
+        )
+        result = collector.collect()
+        assert result["status"] == "WARNING"
+        assert result["message"] == "Failed to collect anf_storage_metadata"
+        assert result["anf_storage_metadata"] == []
+        assert len(result["azure_disks_metadata"]) == 2
+        assert len(result["afs_storage_metadata"]) == 1
+
+    def test_collect_skips_unrequested_storage(self, module_params):
+        """
+        Test ANF and AFS are not queried when no account is given
+        """
+        module_params.update({"anf_account_name": None, "afs_storage_accounts": []})
+        session = MockSession()
+        result = AzureStorageMetadata(
+            module_params, client=AzureRestClient(MockCredential(), session=session)
+        ).collect()
+        assert result["status"] == "PASSED"
+        assert len(session.requests) == 2
+
+    def test_token_refresh(self):
+        """
+        Test the access token is refreshed once it is about to expire
+        """
+        credential = MockCredential()
+        client = AzureRestClient(credential, session=MockSession())
+        client.get("/subscriptions/sub/providers/Microsoft.Storage/storageAccounts", "v1")
+        client._token = AccessToken("expired", time.time() + 60)
+        client.get("/subscriptions/sub/providers/Microsoft.Storage/storageAccounts", "v1")
+        assert credential.calls == 2
+
+    def test_main(self, monkeypatch, module_params):
+        """
+        Test the main function of the module
+
+        :param monkeypatch: Monkeypatch fixture for mocking.
+        :type monkeypatch: pytest.MonkeyPatch
+        """
+        mock_result = {}
+
+        class MockAnsibleModule:
+            def __init__(self, *args, **kwargs):
+                self.params = module_params
+
+            def exit_json(self, **kwargs):
+                mock_result.update(kwargs)
+
+        monkeypatch.setattr(
+            "src.modules.get_azure_storage_metadata.AnsibleModule", MockAnsibleModule
+        )
+        monkeypatch.setattr(
+            "src.modules.get_azure_storage_metadata.get_credential",
+            lambda msi_client_id: MockCredential(),
+        )
+        monkeypatch.setattr(
+            "src.modules.get_azure_storage_metadata.AzureRestClient",
+            lambda credential: AzureRestClient(credential, session=MockSession()),
+        )
+        main()
+        assert mock_result["status"] == "PASSED"
+        assert len(mock_result["azure_disks_metadata"]) == 2
@@ -62,15 +62,18 @@ class TestHanaClusterStatusChecker:
         :param hana_checker_classic: Instance of HanaClusterStatusChecker.
         :type hana_checker_classic: HanaClusterStatusChecker
         """
-        mocker.patch.object(
+        mock_execute = mocker.patch.object(
             hana_checker_classic,
-            "execute_command_subprocess",
-            return_value="true",
+            "execute_many",
+            return_value=["true", "30"],
         )
 
         hana_checker_classic._get_cluster_parameters()
 
+        mock_execute.assert_called_once()
+        assert len(mock_execute.call_args[0][0]) == 2
         assert hana_checker_classic.result["AUTOMATED_REGISTER"] == "true"
+        assert hana_checker_classic.result["PRIORITY_FENCING_DELAY"] == "30"
 
     def test_get_cluster_parameters_exception(self, mocker, hana_checker_classic):
         """
@@ -82,13 +85,55 @@ class TestHanaClusterStatusChecker:
         :type hana_checker_classic: HanaClusterStatusChecker
         """
         mocker.patch.object(
-            hana_checker_classic, "execute_command_subprocess", side_effect=Exception("Test error")
+            hana_checker_classic, "execute_many", side_effect=Exception("Test error")
         )
 
         hana_checker_classic._get_cluster_parameters()
 
         assert hana_checker_classic.result["AUTOMATED_REGISTER"] == "unknown"
 
+    def test_get_cluster_parameters_snapshot(self, mocker, hana_checker_classic):
+        """
+        Test the snapshot mode reads the parameters from one CIB configuration query and only
+        falls back to the command line tools for the missing ones.
+
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        :param hana_checker_classic: Instance of HanaClusterStatusChecker.
+        :type hana_checker_classic: HanaClusterStatusChecker
+        """
+        configuration_xml = """<configuration>
+            <crm_config>
+                <cluster_property_set id="cib-bootstrap-options">
+                    <nvpair name="stonith-action" value="off"/>
+                </cluster_property_set>
+            </crm_config>
+            <resources>
+                <clone id="rsc_SAPHanaCon_TEST_HDB00">
+                    <primitive id="rsc_SAPHanaPrm_TEST_HDB00">
+                        <instance_attributes>
+                            <nvpair name="AUTOMATED_REGISTER" value="true"/>
+                        </instance_attributes>
+                    </primitive>
+                </clone>
+            </resources>
+        </configuration>"""
+        hana_checker_classic.use_snapshot = True
+        mock_query = mocker.patch.object(
+            hana_checker_classic, "execute_command_subprocess", return_value=configuration_xml
+        )
+        mock_execute = mocker.patch.object(hana_checker_classic, "execute_many", return_value=["5"])
+
+        hana_checker_classic._get_stonith_action()
+        hana_checker_classic._get_cluster_parameters()
+
+        mock_query.assert_called_once_with(["cibadmin", "--query", "--scope", "configuration"])
+        mock_execute.assert_called_once()
+        assert mock_execute.call_args[0][0][0][0] == "crm_attribute"
+        assert hana_checker_classic.result["stonith_action"] == "off"
+        assert hana_checker_classic.result["AUTOMATED_REGISTER"] == "true"
+        assert hana_checker_classic.result["PRIORITY_FENCING_DELAY"] == "5"
+
     def test_process_node_attributes_primary_only(self, hana_checker_classic):
         """
         Test processing node attributes with only the primary node.
@@ -260,9 +305,9 @@ class TestHanaClusterStatusChecker:
 
         mock_get_automation = mocker.patch.object(hana_checker_classic, "_get_cluster_parameters")
 
-        result = hana_checker_classic.run()
+        result = hana_checker_classic.run({"primary_node": "node2"}, 300, 2)
 
-        mock_super_run.assert_called_once()
+        mock_super_run.assert_called_once_with({"primary_node": "node2"}, 300, 2)
         mock_get_automation.assert_called_once()
         assert result["status"] == "PASSED"
 
@@ -303,3 +348,47 @@ class TestRunModule:
         run_module()
 
         mock_ansible_module.exit_json.assert_called_once_with(status="PASSED")
+        mock_run.assert_called_once_with({}, 0, 5)
+
+        mock_ansible_module.params.update(
+            {"expect_primary": "node2", "expect_secondary": "", "timeout": 300, "interval": 2}
+        )
+        run_module()
+        mock_run.assert_called_with({"primary_node": "node2", "secondary_node": ""}, 300, 2)
+
+    def test_run_module_runs_checker(self, mocker):
+        """
+        Test run_module passes the expected state to the run method of the checker.
+
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        """
+        mock_ansible_module = mocker.MagicMock()
+        mock_ansible_module.params = {
+            "database_sid": "TEST",
+            "operation_step": "check",
+            "saphanasr_provider": "SAPHanaSR",
+            "db_instance_number": "00",
+            "expect_primary": "node2",
+            "timeout": 300,
+            "interval": 2,
+        }
+        mocker.patch(
+            "src.modules.get_cluster_status_db.ansible_facts", return_value={"os_family": "REDHAT"}
+        )
+        mocker.patch(
+            "src.modules.get_cluster_status_db.AnsibleModule", return_value=mock_ansible_module
+        )
+        mock_super_run = mocker.patch(
+            "src.module_utils.get_cluster_status.BaseClusterStatusChecker.run",
+            return_value={"status": "PASSED"},
+        )
+        mock_get_parameters = mocker.patch(
+            "src.modules.get_cluster_status_db.HanaClusterStatusChecker._get_cluster_parameters"
+        )
+
+        run_module()
+
+        mock_super_run.assert_called_once_with({"primary_node": "node2"}, 300, 2)
+        mock_get_parameters.assert_called_once()
+        mock_ansible_module.exit_json.assert_called_once()
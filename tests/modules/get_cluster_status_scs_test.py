@@ -60,6 +60,53 @@ class TestSCSClusterStatusChecker:
         assert scs_checker.ascs_resource_id == "rsc_sap_TST_ASCS00"
         assert scs_checker.ers_resource_id == "rsc_sap_TST_ERS01"
 
+    def test_resource_id_cache(self, mocker, tmp_path):
+        """
+        Test the resource IDs are cached by CIB epoch and only re-read on configuration changes.
+
+        :param mocker: Mocking library to patch methods.
+        :type mocker: pytest_mock.MockerFixture
+        :param tmp_path: Temporary directory
+        :type tmp_path: pathlib.Path
+        """
+        resources_xml = """<resources>
+            <primitive id="rsc_sap_TST_ASCS00" type="SAPInstance">
+                <instance_attributes><nvpair name="IS_ERS" value="false"/></instance_attributes>
+            </primitive>
+            <primitive id="rsc_sap_TST_ERS01" type="SAPInstance">
+                <instance_attributes><nvpair name="IS_ERS" value="true"/></instance_attributes>
+            </primitive>
+        </resources>"""
+        cib = {"epoch": '<cib admin_epoch="0" epoch="42" num_updates="7"/>'}
+        calls = []
+
+        def execute(command):
+            calls.append(command[-1])
+            return cib["epoch"] if command[-1] == "--no-children" else resources_xml
+
+        status = '<crm_mon><summary><last_change time="{}"/></summary></crm_mon>'
+        cache_file = str(tmp_path / "cache" / "scs_resource_ids.json")
+        checker = SCSClusterStatusChecker("TST", "REDHAT", cache_file=cache_file)
+        mocker.patch.object(checker, "execute_command_subprocess", side_effect=execute)
+        assert checker.ascs_resource_id == ""
+
+        checker._refresh_resource_ids(status.format("Mon 10:00"))
+        checker._refresh_resource_ids(status.format("Mon 10:00"))
+        assert calls == ["--no-children", "resources"]
+        assert checker.result["ers_resource_id"] == "rsc_sap_TST_ERS01"
+
+        checker = SCSClusterStatusChecker("TST", "REDHAT", cache_file=cache_file)
+        assert checker.ascs_resource_id == "rsc_sap_TST_ASCS00"
+        mocker.patch.object(checker, "execute_command_subprocess", side_effect=execute)
+        calls.clear()
+        checker._refresh_resource_ids(status.format("Mon 10:00"))
+        checker._refresh_resource_ids(status.format("Mon 10:05"))
+        assert calls == ["--no-children"]
+        cib["epoch"] = '<cib admin_epoch="0" epoch="43" num_updates="0"/>'
+        checker._refresh_resource_ids(status.format("Mon 10:10"))
+        assert calls == ["--no-children", "--no-children", "resources"]
+        assert checker.ers_resource_id == "rsc_sap_TST_ERS01"
+
     def test_process_node_attributes(self, mocker, scs_checker):
         """
         Test processing node attributes to identify ASCS and ERS nodes.
@@ -0,0 +1,40 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the get_failover_timeline module.
+"""
+
+from src.modules.get_failover_timeline import main
+
+
+class TestGetFailoverTimeline:
+    """
+    Test cases for the get_failover_timeline module.
+    """
+
+    def test_main(self, mocker):
+        """
+        Test the module records with its parameters and exits with the result.
+
+        :param mocker: Mocking library for Python.
+        :type mocker: _mocker.MagicMock
+        """
+        mock_module = mocker.MagicMock()
+        mock_module.params = {
+            "duration": 0,
+            "interval": 0.1,
+            "stop_file": None,
+            "attribute_pattern": "_sync_state$",
+        }
+        mocker.patch("src.modules.get_failover_timeline.AnsibleModule", return_value=mock_module)
+        mocker.patch(
+            "src.module_utils.failover_timeline.subprocess.run",
+            side_effect=FileNotFoundError("crm_mon"),
+        )
+        main()
+
+        result = mock_module.exit_json.call_args.kwargs
+        assert result["status"] == "FAILED"
+        assert result["details"]["failed_samples"] == 1
+        assert result["details"]["interval"] == 0.1
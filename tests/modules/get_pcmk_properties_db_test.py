@@ -331,6 +331,9 @@ class TestableHAClusterValidator(HAClusterValidator):
     def execute_command_subprocess(self, command, shell_command=False):
         return self._mock_execute_command(command, shell_command)
 
+    def execute_many(self, commands, shell_command=False, timeout=100, max_concurrency=4):
+        return [self._mock_execute_command(command, shell_command) for command in commands]
+
 
 class TestHAClusterValidator:
     """
@@ -631,6 +634,49 @@ class TestHAClusterValidator:
             module_under_test.AnsibleModule = original_ansible_module
             builtins.open = original_open
 
+    def test_main_with_cib_files(self, tmp_path, monkeypatch):
+        """
+        Test main validates the CIB files of several hosts in one call.
+        """
+        mock_result = {}
+        cib_files = []
+        for hostname in ("hanadb1", "hanadb2"):
+            cib_file = tmp_path / "offline_validation" / hostname / "cib"
+            cib_file.parent.mkdir(parents=True)
+            cib_file.write_text(DUMMY_XML_FULL_CIB, encoding="utf-8")
+            cib_files.append(str(cib_file))
+
+        class MockAnsibleModule:
+            def __init__(self, argument_spec=None, **kwargs):
+                self.params = {
+                    "sid": "HDB",
+                    "instance_number": "00",
+                    "virtual_machine_name": None,
+                    "fencing_mechanism": "sbd",
+                    "pcmk_constants": DUMMY_CONSTANTS,
+                    "saphanasr_provider": "SAPHanaSR",
+                    "cib_output": "",
+                    "cib_files": cib_files,
+                    "max_workers": 2,
+                    "os_family": "RedHat",
+                }
+
+            def exit_json(self, **kwargs):
+                nonlocal mock_result
+                mock_result = kwargs
+
+        monkeypatch.setattr("src.modules.get_pcmk_properties_db.AnsibleModule", MockAnsibleModule)
+        main()
+
+        hosts = mock_result["details"]["hosts"]
+        assert list(hosts) == ["hanadb1", "hanadb2"]
+        assert (
+            hosts["hanadb1"]["details"]["parameters"] == hosts["hanadb2"]["details"]["parameters"]
+        )
+        assert hosts["hanadb1"]["details"]["parameters"]
+        assert mock_result["details"]["differences"] == []
+        assert "Validated 2 CIB files" in mock_result["message"]
+
     def test_all_resource_types_parsed(self, validator):
         """
         Test that all defined resource categories can be parsed.
@@ -690,6 +736,50 @@ class TestHAClusterValidator:
         )
         assert expected == ("15", False)
 
+    def test_concurrent_validation(self, mocker, mock_xml_outputs):
+        """
+        Test the concurrent mode queries the CIB once and returns the sequential result.
+        """
+        mock_xml_outputs["configuration"] = (
+            "<configuration>"
+            + "".join(mock_xml_outputs[scope] for scope in list(mock_xml_outputs))
+            + "</configuration>"
+        )
+        mocker.patch("builtins.open", MockOpen(DUMMY_GLOBAL_INI_SAPHANASR))
+        results = {}
+        for concurrent in (False, True):
+            mock_execute = mocker.MagicMock(side_effect=MockExecuteCommand(mock_xml_outputs))
+            results[concurrent] = TestableHAClusterValidator(
+                mock_execute,
+                None,
+                os_type=OperatingSystemFamily.SUSE,
+                sid="HDB",
+                instance_number="00",
+                fencing_mechanism="sbd",
+                virtual_machine_name="vmname",
+                constants=DUMMY_CONSTANTS,
+                saphanasr_provider=HanaSRProvider.SAPHANASR,
+                cib_output="",
+                concurrent=concurrent,
+            ).get_result()
+            cibadmin_calls = [
+                call.args[0] for call in mock_execute.call_args_list if "cibadmin" in call.args[0]
+            ]
+
+        assert cibadmin_calls == [["cibadmin", "--query", "--scope", "configuration"]]
+        assert results[True]["details"]["parameters"] == results[False]["details"]["parameters"]
+        assert results[True]["status"] == results[False]["status"]
+        assert results[True]["message"] == results[False]["message"]
+        assert list(results[True]["details"]["timings"]) == [
+            "crm_config",
+            "rsc_defaults",
+            "op_defaults",
+            "resources",
+            "constraints",
+            "os",
+            "additional",
+        ]
+
     def test_successful_validation_result(self, validator):
         """
         Test that validator returns proper result structure.
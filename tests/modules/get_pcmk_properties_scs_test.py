@@ -248,6 +248,9 @@ class TestableHAClusterValidator(HAClusterValidator):
     def execute_command_subprocess(self, command, shell_command=False):
         return self._mock_execute_command(command, shell_command)
 
+    def execute_many(self, commands, shell_command=False, timeout=100, max_concurrency=4):
+        return [self._mock_execute_command(command, shell_command) for command in commands]
+
 
 class TestHAClusterValidator:
     """
@@ -371,6 +374,28 @@ class TestHAClusterValidator:
         )
         assert status == TestStatus.SUCCESS.value
 
+    def test_determine_parameter_status_with_provider_values(self, validator, mocker):
+        """
+        Test _create_parameter passes the values compiled for the parameter key to
+        _determine_parameter_status.
+        """
+        expected = {"AFS": ["10.0.1.100"], "ANF": ["10.0.1.101"]}
+        compiled = mocker.MagicMock()
+        compiled.get.return_value = (dict(expected), False)
+        compiled.get_provider_values.return_value = ["10.0.1.101"]
+        mocker.patch.object(validator, "_get_compiled_constants", return_value=compiled)
+        param = validator._create_parameter(
+            category="ascs", subcategory="instance_attributes", name="ip", value="10.0.1.101"
+        )
+        assert param["status"] == TestStatus.SUCCESS.value
+        compiled.get_provider_values.assert_called_once_with(
+            "ascs", "ip", "instance_attributes", None
+        )
+        status = validator._determine_parameter_status(
+            "10.0.1.100", (expected, False), ["10.0.1.101"]
+        )
+        assert status == TestStatus.ERROR.value
+
     def test_determine_parameter_status_info_cases(self, validator):
         """
         Test _determine_parameter_status method for INFO status cases.
@@ -0,0 +1,60 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the get_storage_context module.
+"""
+
+from src.modules.get_storage_context import StorageContext, main
+
+
+class TestStorageContext:
+    """
+    Test suite for StorageContext
+    """
+
+    def test_discover(self, monkeypatch):
+        """
+        Test the discovered topology is returned in the result
+
+        :param monkeypatch: Monkeypatch fixture for mocking.
+        :type monkeypatch: pytest.MonkeyPatch
+        """
+        monkeypatch.setattr(
+            "src.modules.get_storage_context.LocalStorageDiscovery.discover",
+            lambda self: {"device_lun_map": {"sdc": "0"}, "lvm_fullreport": {}},
+        )
+        result = StorageContext().discover()
+        assert result["status"] == "PASSED"
+        assert result["device_lun_map"] == {"sdc": "0"}
+
+    def test_main_failure(self, monkeypatch):
+        """
+        Test the module fails when the topology cannot be read
+
+        :param monkeypatch: Monkeypatch fixture for mocking.
+        :type monkeypatch: pytest.MonkeyPatch
+        """
+        mock_result = {}
+
+        class MockAnsibleModule:
+            def __init__(self, *args, **kwargs):
+                self.params = {}
+
+            def exit_json(self, **kwargs):
+                mock_result.update(kwargs)
+
+            def fail_json(self, **kwargs):
+                mock_result.update(kwargs)
+                mock_result["failed"] = True
+
+        def mock_discover(self):
+            raise FileNotFoundError("/proc/self/mountinfo")
+
+        monkeypatch.setattr("src.modules.get_storage_context.AnsibleModule", MockAnsibleModule)
+        monkeypatch.setattr(
+            "src.modules.get_storage_context.LocalStorageDiscovery.discover", mock_discover
+        )
+        main()
+        assert mock_result["failed"] is True
+        assert mock_result["status"] == "FAILED"